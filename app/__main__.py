@@ -8,7 +8,7 @@ based on manifest files.
 import os
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import typer
 import multiprocessing
 
@@ -27,8 +27,9 @@ Environment.load_working_environment()
 # This is a temporary workaround for the import system.
 # A better long-term solution is to install the package in editable mode.
 sys.path.append(str(Path(__file__).parent))
-from src.commands import run_manifest, run_preprocessing
+from src.commands import run_manifest, run_preprocessing, run_tiledb_maintenance
 from src.manifest import PipelineManifest
+from es_sfgtools.tiledb_tools.maintenance import MaintenancePolicy
 
 # This adds the PRIDE binary path to the system's PATH.
 # A better long-term solution is for the user to configure this in their shell.
@@ -88,5 +89,45 @@ def preprocess(
     )
 
 
+@app.command()
+def maintain(
+    main_dir: Path = typer.Option(..., help="Main directory for the workflow"),
+    network: str = typer.Option(..., help="Network ID"),
+    stations: List[str] = typer.Option(..., help="List of station IDs"),
+    arrays: Optional[List[str]] = typer.Option(
+        None, help="TileDB arrays to maintain (e.g. shot_data); defaults to all"
+    ),
+    max_fragments: int = typer.Option(
+        32, help="Consolidate arrays with more fragments than this"
+    ),
+    force: bool = typer.Option(
+        False, help="Consolidate fragments regardless of thresholds"
+    ),
+    measure_latency: bool = typer.Option(
+        True, help="Time a one-day read before and after consolidating"
+    ),
+):
+    """
+    Consolidates and vacuums the TileDB arrays of the given stations.
+
+    Prints fragment counts and read latency before and after for every array.
+    """
+    policy = MaintenancePolicy(
+        max_fragments=max_fragments, measure_latency=measure_latency
+    )
+    summary = run_tiledb_maintenance(
+        main_dir=str(main_dir),
+        network_id=network,
+        stations=stations,
+        policy=policy,
+        arrays=arrays or None,
+        force=force,
+    )
+    if summary.empty:
+        print("No TileDB arrays found")
+    else:
+        print(summary.to_string(index=False))
+
+
 if __name__ == "__main__":
     app()
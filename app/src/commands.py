@@ -5,8 +5,18 @@ It orchestrates the data handling and processing workflows based on the
 parsed manifest file.
 """
 
+from typing import List, Optional
+
+import pandas as pd
+
+from es_sfgtools.data_mgmt.directorymgmt import DirectoryHandler
 from es_sfgtools.data_mgmt.ingestion.archive_pull import list_campaign_files
 from es_sfgtools.modeling.garpos_tools.load_utils import load_lib
+from es_sfgtools.tiledb_tools.maintenance import (
+    MaintenancePolicy,
+    maintain_tiledb_dir,
+    summarize_maintenance,
+)
 from es_sfgtools.utils.model_update import validate_and_merge_config
 from es_sfgtools.workflows.workflow_handler import WorkflowHandler
 
@@ -109,3 +119,47 @@ def run_preprocessing(network_id: str, campaign_id: str, stations: list, main_di
             campaign_id=campaign_id,
         )
         wfh.preprocess_run_pipeline_sv3(job="all")
+
+
+def run_tiledb_maintenance(
+    main_dir: str,
+    network_id: str,
+    stations: List[str],
+    policy: Optional[MaintenancePolicy] = None,
+    arrays: Optional[List[str]] = None,
+    force: bool = False,
+) -> pd.DataFrame:
+    """
+    Consolidates and vacuums the TileDB arrays of a set of stations.
+
+    Args:
+        main_dir: The main project directory.
+        network_id: The network identifier.
+        stations: A list of station identifiers.
+        policy: Consolidation thresholds. Defaults to `MaintenancePolicy()`.
+        arrays: Restrict to these TileDBDir fields, e.g. ``shot_data``.
+        force: Consolidate fragments regardless of the thresholds.
+
+    Returns:
+        A summary with one row per station array, including read latency
+        before and after.
+    """
+    directory_handler = DirectoryHandler.load_from_path(main_dir)
+    network_dir = directory_handler[network_id]
+    if network_dir is None:
+        raise ValueError(f"Network {network_id} not found in {main_dir}")
+    summaries = []
+    for station_id in stations:
+        station_dir = network_dir.stations.get(station_id)
+        if station_dir is None:
+            print(f"Station {station_id} not found in {network_id}")
+            continue
+        reports = maintain_tiledb_dir(
+            station_dir.tiledb_directory, policy=policy, arrays=arrays, force=force
+        )
+        summary = summarize_maintenance(reports)
+        summary.insert(0, "station", station_id)
+        summaries.append(summary)
+    if not summaries:
+        return pd.DataFrame()
+    return pd.concat(summaries, ignore_index=True)
@@ -0,0 +1,81 @@
+"""
+Benchmark asset catalog updates.
+
+Compares per-entry PreProcessCatalogHandler.add_or_update calls (one SQLite
+connection and transaction each) against the single-transaction
+add_or_update_many and mark_processed_many at 10k entries.
+
+Usage:
+    python dev/benchmarks/bench_catalog_bulk.py [n_entries]
+"""
+
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from es_sfgtools.config.file_config import AssetType
+from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+
+
+def make_entries(n: int) -> list:
+    return [
+        AssetEntry(
+            local_path=f"/data/NCC1/file_{i:06d}.raw",
+            remote_path=f"s3://bucket/NCC1/file_{i:06d}.raw",
+            network="cascadia-gorda",
+            station="NCC1",
+            campaign="2025_A_1126",
+            type=AssetType.DFOP00,
+            timestamp_created=datetime.datetime(2025, 5, 1),
+        )
+        for i in range(n)
+    ]
+
+
+def stored_entries(catalog: PreProcessCatalogHandler) -> list:
+    return catalog.get_single_entries_to_process(
+        network="cascadia-gorda",
+        station="NCC1",
+        campaign="2025_A_1126",
+        parent_type=AssetType.DFOP00,
+    )
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def single_insert(catalog, entries):
+    for entry in entries:
+        catalog.add_or_update(entry)
+
+
+def single_mark_processed(catalog, entries):
+    for entry in entries:
+        entry.is_processed = True
+        catalog.add_or_update(entry)
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    with tempfile.TemporaryDirectory() as tmp:
+        single = PreProcessCatalogHandler(Path(tmp) / "single.sqlite")
+        bulk = PreProcessCatalogHandler(Path(tmp) / "bulk.sqlite")
+
+        insert_single = timed(single_insert, single, make_entries(n_entries))
+        insert_bulk = timed(bulk.add_or_update_many, make_entries(n_entries))
+
+        mark_single = timed(single_mark_processed, single, stored_entries(single))
+        mark_bulk = timed(bulk.mark_processed_many, stored_entries(bulk))
+
+    print(f"{n_entries:,} entries {'single [s]':>12} {'bulk [s]':>10} {'speedup':>8}")
+    for name, before, after in (
+        ("add_or_update", insert_single, insert_bulk),
+        ("mark processed", mark_single, mark_bulk),
+    ):
+        print(f"{name:<16} {before:12.2f} {after:10.3f} {before / after:7.1f}x")
@@ -0,0 +1,89 @@
+"""
+Benchmark asset catalog lookups on a large multi-station catalog.
+
+Fills a catalog with entries spread over several networks, stations,
+campaigns and types, then times get_assets, get_ctds and is_merge_complete
+with and without the secondary indexes.
+
+Usage:
+    python dev/benchmarks/bench_catalog_queries.py [n_entries]
+"""
+
+import datetime
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import sqlalchemy as sa
+
+from es_sfgtools.config.file_config import AssetType
+from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.data_mgmt.assetcatalog.tables import Base
+
+NETWORKS = ["cascadia-gorda", "aleutian", "alaska-shumagins"]
+STATIONS = [f"ST{i:02d}" for i in range(10)]
+CAMPAIGNS = [f"202{y}_A_1126" for y in range(5)]
+TYPES = [AssetType.DFOP00, AssetType.NOVATEL770, AssetType.RINEX2, AssetType.CTD]
+
+
+def make_entries(n: int) -> list:
+    keys = itertools.cycle(itertools.product(NETWORKS, STATIONS, CAMPAIGNS, TYPES))
+    return [
+        AssetEntry(
+            local_path=f"/data/{station}/file_{i:07d}.raw",
+            remote_path=f"s3://bucket/{station}/file_{i:07d}.raw",
+            network=network,
+            station=station,
+            campaign=campaign,
+            type=asset_type,
+            timestamp_created=datetime.datetime(2025, 5, 1),
+        )
+        for i, (network, station, campaign, asset_type) in zip(range(n), keys)
+    ]
+
+
+def time_queries(catalog: PreProcessCatalogHandler, repeat: int = 20) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(repeat):
+        catalog.get_assets("aleutian", "ST03", "2022_A_1126", AssetType.DFOP00)
+    timings["get_assets"] = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        catalog.get_ctds("ST03", "2022_A_1126")
+    timings["get_ctds"] = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        catalog.is_merge_complete("novatel770", "gnssobstdb", list(range(500, 600)))
+    timings["is_merge_complete"] = (time.perf_counter() - start) / repeat
+    return timings
+
+
+def main(n_entries: int = 200_000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = PreProcessCatalogHandler(Path(tmp) / "catalog.db")
+        catalog.add_or_update_many(make_entries(n_entries))
+        for i in range(0, 2000, 10):
+            catalog.add_merge_job("novatel770", "gnssobstdb", list(range(i, i + 100)))
+
+        indexed = time_queries(catalog)
+        with catalog.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    conn.execute(sa.text(f"DROP INDEX {index.name}"))
+        scanned = time_queries(catalog)
+
+    print(f"{n_entries} assets")
+    for name in indexed:
+        print(
+            f"{name:>18}: {scanned[name] * 1e3:8.2f} ms full scan | "
+            f"{indexed[name] * 1e3:8.2f} ms indexed | "
+            f"{scanned[name] / indexed[name]:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
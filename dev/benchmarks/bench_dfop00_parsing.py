@@ -0,0 +1,79 @@
+"""
+Benchmark DFOP00 parsing into shot data.
+
+Compares the Pydantic path (dfop00_to_shotdata, whole file in memory) against
+the streaming iter_dfop00_shotdata parser on a synthetic DFOP00 file built from
+the tests/resources/sv3 sample events, reporting wall time and peak Python
+memory (tracemalloc) for each.
+
+Usage:
+    python dev/benchmarks/bench_dfop00_parsing.py
+"""
+
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from es_sfgtools.data_models.constants import TRIGGER_DELAY_SV3
+from es_sfgtools.sonardyne_tools.sv3_operations import (
+    dfop00_to_shotdata,
+    iter_dfop00_shotdata,
+)
+
+SAMPLE = next((Path(__file__).parents[2] / "tests" / "resources" / "sv3").glob("*DFOP00*"))
+N_TRANSPONDERS = 3
+
+
+def write_dfop00(path: Path, n_pings: int) -> None:
+    interrogation, reply = json.loads(SAMPLE.read_text())
+    start = interrogation["time"]["common"]
+    with open(path, "w") as f:
+        for i in range(n_pings):
+            ping_time = start + 20.0 * i
+            interrogation["time"]["common"] = ping_time
+            f.write(json.dumps(interrogation) + "\n")
+            for j in range(N_TRANSPONDERS):
+                two_way = 2.0 + 0.5 * j
+                reply["range"]["cn"] = f"IR520{j}"
+                reply["range"]["range"] = two_way
+                reply["range"]["diag"]["xc"] = [50]
+                reply["time"]["common"] = ping_time + two_way - TRIGGER_DELAY_SV3
+                f.write(json.dumps(reply) + "\n")
+
+
+def legacy_path(path: Path) -> int:
+    return len(dfop00_to_shotdata(path))
+
+
+def streaming_path(path: Path) -> int:
+    return sum(len(batch) for batch in iter_dfop00_shotdata(path, batch_size=10000))
+
+
+def measure(func, path: Path) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    n_rows = func(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n_rows, elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    print(
+        f"{'pings':>8} {'rows':>8} {'pydantic [s]':>13} {'[MiB]':>8} "
+        f"{'streaming [s]':>14} {'[MiB]':>8} {'speedup':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_pings in (1_000, 10_000, 50_000):
+            path = Path(tmp) / f"bench_{n_pings}.DFOP00.raw"
+            write_dfop00(path, n_pings)
+            n_rows, before, before_mem = measure(legacy_path, path)
+            n_stream, after, after_mem = measure(streaming_path, path)
+            assert n_rows == n_stream
+            print(
+                f"{n_pings:>8,} {n_rows:>8,} {before:13.2f} {before_mem:8.1f} "
+                f"{after:14.2f} {after_mem:8.1f} {before / after:7.1f}x"
+            )
@@ -0,0 +1,93 @@
+"""
+Benchmark ENU interpolation of shot positions onto kinematic GNSS positions.
+
+Compares the legacy path of ``interpolate_enu`` (a KDTree plus three
+``GaussianProcessRegressor`` fits per block of 200 shots) against
+`TimeSeriesInterpolator.kernel_predict`, which factorizes one banded kernel
+matrix for all three axes. Reports the runtime of both and their maximum
+error against the synthetic trajectory.
+
+Usage:
+    python dev/benchmarks/bench_enu_interpolation.py
+"""
+
+import itertools
+import time
+import warnings
+
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF
+from sklearn.neighbors import KDTree
+
+from es_sfgtools.workflows.pipelines.interpolation import TimeSeriesInterpolator
+
+LENGTH_SCALE = 3.0  # seconds, as in interpolate_enu
+
+
+def trajectory(times: np.ndarray) -> np.ndarray:
+    return np.column_stack(
+        (
+            -2.6e6 + 2.0 * np.sin(times / 40.0),
+            -3.7e6 + times / 120.0,
+            4.3e6 + np.cos(times / 25.0),
+        )
+    )
+
+
+def legacy_gp(train_t, train_y, predict_t, block_size: int = 200) -> np.ndarray:
+    kernel = RBF(length_scale=LENGTH_SCALE)
+    X_train = train_t.reshape(-1, 1)
+    tree = KDTree(X_train)
+    prediction = np.full((predict_t.shape[0], 3), np.nan)
+    for i in range(0, predict_t.shape[0], block_size):
+        idx = np.s_[i : i + block_size]
+        ind = tree.query_radius(predict_t[idx].reshape(-1, 1), r=LENGTH_SCALE)
+        ind = np.unique(list(itertools.chain.from_iterable(ind))).astype(int)
+        if len(ind) == 0:
+            continue
+        for j in range(3):
+            gp = GaussianProcessRegressor(kernel=kernel).fit(
+                X_train[ind], train_y[ind, j]
+            )
+            prediction[idx, j] = gp.predict(predict_t[idx].reshape(-1, 1))
+    return prediction
+
+
+def engine(train_t, train_y, predict_t) -> np.ndarray:
+    interpolator = TimeSeriesInterpolator(train_t, train_y)
+    mean, _ = interpolator.kernel_predict(predict_t, LENGTH_SCALE, return_std=True)
+    return mean
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", ConvergenceWarning)
+    rng = np.random.default_rng(0)
+    for n_shots in (500, 2_000, 8_000):
+        # 1 Hz kinematic positions and a shot every 15 s with a 3 s reply
+        duration = 7.5 * n_shots
+        train_t = np.arange(0.0, duration)
+        train_y = trajectory(train_t) + rng.normal(0, 0.005, (train_t.size, 3))
+        ping = np.sort(rng.uniform(10, duration - 10, n_shots // 2))
+        predict_t = np.sort(np.concatenate((ping, ping + 3.0)))
+        truth = trajectory(predict_t)
+
+        before, before_s = timed(legacy_gp, train_t, train_y, predict_t)
+        after, after_s = timed(engine, train_t, train_y, predict_t)
+
+        print(f"{n_shots:>7,} shots / {train_t.size:>9,} positions")
+        print(
+            f"  time:      {before_s:9.3f} s -> {after_s:9.3f} s "
+            f"({before_s / after_s:,.0f}x)"
+        )
+        print(
+            f"  max error: {np.nanmax(np.abs(before - truth)):9.4f} m -> "
+            f"{np.abs(after - truth).max():9.4f} m"
+        )
@@ -0,0 +1,57 @@
+"""
+Benchmark the PRIDE residual exclusion used by filter_pride_residuals.
+
+Compares the legacy loop (one full-length boolean mask per high WRMS epoch)
+against the merged-interval + searchsorted engine for a day of 1 Hz shots
+and N_bad high WRMS epochs from 10 to 100k.
+
+Usage:
+    python dev/benchmarks/bench_filter_pride_residuals.py
+"""
+
+import time
+
+import numpy as np
+
+from es_sfgtools.prefiltering.utils import exclusion_mask, merge_exclusion_intervals
+
+N_SHOTS = 86_400
+BUFFER_SECONDS = 1.0
+# The legacy loop is O(N_shots x N_bad); skip it where it would take minutes
+LEGACY_MAX_BAD = 10_000
+
+
+def legacy_mask(times: np.ndarray, bad_times: np.ndarray) -> np.ndarray:
+    mask = np.ones(times.shape, dtype=bool)
+    for bad_time in bad_times:
+        in_range = (times >= bad_time - BUFFER_SECONDS) & (
+            times <= bad_time + BUFFER_SECONDS
+        )
+        mask = mask & ~in_range
+    return mask
+
+
+def merged_mask(times: np.ndarray, bad_times: np.ndarray) -> np.ndarray:
+    starts, ends = merge_exclusion_intervals(bad_times, BUFFER_SECONDS)
+    return exclusion_mask(times, starts, ends)
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    times = 1.7e9 + np.sort(rng.uniform(0, 86400, N_SHOTS))
+    print(f"{N_SHOTS:,} shots, ±{BUFFER_SECONDS}s buffer")
+    print(f"{'N_bad':>8} {'legacy [s]':>12} {'merged [s]':>12}")
+    for n_bad in (10, 100, 1_000, 10_000, 100_000):
+        bad_times = 1.7e9 + rng.uniform(0, 86400, n_bad)
+        after = timed(merged_mask, times, bad_times)
+        if n_bad <= LEGACY_MAX_BAD:
+            before = f"{timed(legacy_mask, times, bad_times):12.4f}"
+        else:
+            before = f"{'skipped':>12}"
+        print(f"{n_bad:>8,} {before} {after:12.4f}")
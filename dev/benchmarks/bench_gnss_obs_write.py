@@ -0,0 +1,71 @@
+"""
+Benchmark writing RANGEA strings to a GNSS observation TileDB array.
+
+Compares the two TDBGNSSObsArray.write_rangea_strings backends on the RANGEA
+strings in the tests/resources/qcdata QC PIN samples:
+
+- "python": in-memory decode_rangea_batch + write_columns
+- "nova2tile": temporary file + nova2tile golang binary
+
+The samples are repeated with shifted GPS seconds so every epoch is distinct.
+The nova2tile column is skipped if the binary has not been built.
+
+Usage:
+    python dev/benchmarks/bench_gnss_obs_write.py
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from es_sfgtools.novatel_tools.rangea_parser import extract_rangea_strings_from_qcpin
+from es_sfgtools.novatel_tools.utils import get_nova2tile_binary_path
+from es_sfgtools.tiledb_tools.tiledb_schemas import TDBGNSSObsArray
+
+QC_DATA_DIR = Path(__file__).parents[2] / "tests" / "resources" / "qcdata"
+
+
+def shifted_epochs(samples: list, n_epochs: int) -> list:
+    """Repeat the samples, moving each copy forward by whole seconds."""
+    out = []
+    for i in range(n_epochs):
+        header, data = samples[i % len(samples)].split(";", 1)
+        fields = header.split(",")
+        fields[6] = f"{float(fields[6]) + 60.0 * (i // len(samples)):.3f}"
+        out.append(",".join(fields) + ";" + data)
+    return out
+
+
+def timed_write(rangea_strings: list, backend: str) -> float:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        array = TDBGNSSObsArray(Path(tmpdir) / "gnss_obs.tdb")
+        start = time.perf_counter()
+        array.write_rangea_strings(rangea_strings, backend=backend)
+        return time.perf_counter() - start
+
+
+def nova2tile_available() -> bool:
+    try:
+        return get_nova2tile_binary_path().exists()
+    except FileNotFoundError:
+        return False
+
+
+if __name__ == "__main__":
+    samples = []
+    for pin_file in sorted(QC_DATA_DIR.glob("*.pin")):
+        samples.extend(extract_rangea_strings_from_qcpin(pin_file))
+    samples = sorted(set(samples))
+    has_binary = nova2tile_available()
+    if not has_binary:
+        print("nova2tile binary not built; timing the python backend only")
+
+    print(f"{'epochs':>8} {'nova2tile [s]':>14} {'python [s]':>11} {'speedup':>8}")
+    for n_epochs in (1_000, 10_000, 100_000):
+        rangea_strings = shifted_epochs(samples, n_epochs)
+        after = timed_write(rangea_strings, "python")
+        if has_binary:
+            before = timed_write(rangea_strings, "nova2tile")
+            print(f"{n_epochs:>8,} {before:14.3f} {after:11.3f} {before / after:7.1f}x")
+        else:
+            print(f"{n_epochs:>8,} {'-':>14} {after:11.3f} {'-':>8}")
@@ -0,0 +1,83 @@
+"""
+Benchmark pulling many small archive files over HTTP.
+
+Compares one new connection per file, downloaded in sequence (as
+``download_file_from_archive`` does), against `HTTPDownloader.download_many`
+with pooled keep-alive connections. The local server adds a fixed latency to
+every connection and request to stand in for the round trips to the archive.
+
+Usage:
+    python dev/benchmarks/bench_http_download.py
+"""
+
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from es_sfgtools.data_mgmt.ingestion.http_download import HTTPDownloader
+
+LATENCY_S = 0.02
+N_FILES = 400
+FILE_SIZE = 64 * 1024
+
+
+class LatencyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        # Connection setup (TCP + TLS) costs extra round trips
+        time.sleep(2 * LATENCY_S)
+        super().setup()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        time.sleep(LATENCY_S)
+        body = b"x" * FILE_SIZE
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def legacy_download(urls, dest_dir: Path) -> None:
+    for url in urls:
+        with urllib.request.urlopen(url) as response:
+            (dest_dir / Path(url).name).write_bytes(response.read())
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LatencyHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/file_{i:05d}.raw" for i in range(N_FILES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_dir, after_dir = Path(tmp) / "before", Path(tmp) / "after"
+        before_dir.mkdir()
+        _, before_s = timed(legacy_download, urls, before_dir)
+
+        for workers in (1, 8, 16):
+            with HTTPDownloader(max_workers=workers) as downloader:
+                results, after_s = timed(
+                    lambda: dict(
+                        downloader.download_many((url, after_dir) for url in urls)
+                    )
+                )
+            assert all(path is not None for path in results.values())
+            print(
+                f"{N_FILES} files, {workers:>2} workers: "
+                f"{before_s:6.2f} s -> {after_s:6.2f} s ({before_s / after_s:.1f}x)"
+            )
+    server.shutdown()
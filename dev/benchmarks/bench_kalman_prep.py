@@ -0,0 +1,107 @@
+"""
+Benchmark building the Kalman smoother input for one day of data.
+
+Compares the DataFrame path of ``main`` before the columnar preparation
+(``prepare_positions_data`` + ``prepare_kinematic_data`` + ``combine_data``
++ ``dropna().to_numpy()``) against the `kalman_prep` state matrices built
+from raw TileDB-style column dicts, on a synthetic 24 h day of 10 Hz IMU
+positions and 1 Hz PPP positions. Reports wall time and peak traced memory.
+
+Usage:
+    python dev/benchmarks/bench_kalman_prep.py
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from es_sfgtools.workflows.pipelines.kalman_prep import (
+    STATE_COLUMNS,
+    combine_state_matrices,
+    kinematic_state_matrix,
+    positions_state_matrix,
+)
+from es_sfgtools.workflows.pipelines.shotdata_gnss_refinement import (
+    combine_data,
+    prepare_kinematic_data,
+    prepare_positions_data,
+)
+
+DAY_START = np.datetime64("2025-05-01T00:00:00", "ms")
+IMU_COLUMNS = (
+    "azimuth",
+    "pitch",
+    "roll",
+    "northVelocity",
+    "eastVelocity",
+    "upVelocity",
+    "latitude_std",
+    "longitude_std",
+    "height_std",
+    "northVelocity_std",
+    "eastVelocity_std",
+    "upVelocity_std",
+    "roll_std",
+    "pitch_std",
+    "azimuth_std",
+)
+
+
+def synthetic_day(rng: np.random.Generator):
+    n_imu, n_kin = 864_000, 86_400
+    imu = {
+        "time": DAY_START + (np.arange(n_imu) * 100).astype("timedelta64[ms]"),
+        "latitude": 44.0 + np.cumsum(rng.normal(0, 1e-7, n_imu)),
+        "longitude": -125.0 + np.cumsum(rng.normal(0, 1e-7, n_imu)),
+        "height": 10.0 + rng.normal(0, 0.1, n_imu),
+    }
+    for column in IMU_COLUMNS:
+        imu[column] = rng.uniform(0.01, 1.0, n_imu)
+    kin = {
+        "time": DAY_START + (np.arange(n_kin) * 1000).astype("timedelta64[ms]"),
+        "east": -2.6e6 + np.cumsum(rng.normal(0, 0.5, n_kin)),
+        "north": -3.7e6 + np.cumsum(rng.normal(0, 0.5, n_kin)),
+        "up": 4.3e6 + rng.normal(0, 0.05, n_kin),
+    }
+    return imu, kin
+
+
+def dataframe_path(imu: pd.DataFrame, kin: pd.DataFrame) -> np.ndarray:
+    df_all = combine_data(prepare_positions_data(imu), prepare_kinematic_data(kin))
+    return df_all.dropna().to_numpy()
+
+
+def columnar_path(imu: dict, kin: dict) -> np.ndarray:
+    states = combine_state_matrices(
+        positions_state_matrix(imu), kinematic_state_matrix(kin)
+    )
+    return states[~np.isnan(states).any(axis=1)]
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+if __name__ == "__main__":
+    imu, kin = synthetic_day(np.random.default_rng(0))
+    imu_df = pd.DataFrame(imu)
+    kin_df = pd.DataFrame(kin)
+
+    before, before_s, before_mb = measure(dataframe_path, imu_df, kin_df)
+    after, after_s, after_mb = measure(columnar_path, imu, kin)
+
+    assert before.shape == after.shape and before.shape[1] == len(STATE_COLUMNS)
+    print(f"{len(imu_df):,} IMU + {len(kin_df):,} PPP rows")
+    print(
+        f"  time:        {before_s:8.2f} s  -> {after_s:8.2f} s "
+        f"({before_s / after_s:.0f}x)"
+    )
+    print(f"  peak memory: {before_mb:8.0f} MiB -> {after_mb:8.0f} MiB")
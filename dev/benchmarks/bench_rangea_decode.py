@@ -0,0 +1,45 @@
+"""
+Benchmark RANGEA decoding into GNSS observation buffers.
+
+Compares the Pydantic path (deserialize_rangea -> GNSSEpoch -> flatten)
+against the columnar decode_rangea_batch decoder on the RANGEA strings in the
+tests/resources/qcdata QC PIN samples, repeated to the requested size.
+
+Usage:
+    python dev/benchmarks/bench_rangea_decode.py
+"""
+
+import time
+from pathlib import Path
+
+from es_sfgtools.novatel_tools.rangea_parser import (
+    decode_rangea_batch,
+    deserialize_rangea,
+    epochs_to_columns,
+    extract_rangea_strings_from_qcpin,
+)
+
+QC_DATA_DIR = Path(__file__).parents[2] / "tests" / "resources" / "qcdata"
+
+
+def pydantic_path(rangea_strings):
+    return epochs_to_columns(deserialize_rangea(s) for s in rangea_strings)
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    samples = []
+    for pin_file in sorted(QC_DATA_DIR.glob("*.pin")):
+        samples.extend(extract_rangea_strings_from_qcpin(pin_file))
+
+    print(f"{'epochs':>8} {'pydantic [s]':>13} {'columnar [s]':>13} {'speedup':>8}")
+    for n_epochs in (1_000, 10_000, 100_000):
+        rangea_strings = (samples * (n_epochs // len(samples) + 1))[:n_epochs]
+        before = timed(pydantic_path, rangea_strings)
+        after = timed(decode_rangea_batch, rangea_strings)
+        print(f"{n_epochs:>8,} {before:13.3f} {after:13.3f} {before / after:7.1f}x")
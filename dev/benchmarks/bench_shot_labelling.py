@@ -0,0 +1,135 @@
+"""
+Benchmark labelling shots with their survey, benchmark and TAT.
+
+Compares per-shot calls of ``Campaign.get_survey_by_datetime``,
+``Benchmark.get_transponder_by_datetime`` and
+``Transponder.get_tat_by_datetime`` against one
+`MetadataIndex.label_shotdata` call, for a campaign of 40 surveys and a
+site of 20 benchmarks with two transponders each.
+
+Usage:
+    python dev/benchmarks/bench_shot_labelling.py
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from es_sfgtools.data_models.metadata import Campaign, MetadataIndex
+from es_sfgtools.data_models.metadata.benchmark import Benchmark
+
+T0 = datetime(2025, 5, 1)
+N_SURVEYS = 40
+N_BENCHMARKS = 20
+SWAP = T0 + timedelta(days=5)
+
+
+def make_metadata():
+    campaign = Campaign(
+        name="2025_A_1126",
+        type="measure",
+        vesselCode="1126",
+        start=T0,
+        end=T0 + timedelta(days=N_SURVEYS // 4),
+        surveys=[
+            {
+                "id": f"2025_A_1126_{i + 1}",
+                "type": "circledrive",
+                "benchmarkIDs": [],
+                "start": T0 + timedelta(hours=6 * i),
+                "end": T0 + timedelta(hours=6 * i + 5),
+            }
+            for i in range(N_SURVEYS)
+        ],
+    )
+    benchmarks = [
+        Benchmark(
+            name=f"BM{i:02d}",
+            transponders=[
+                {
+                    "address": f"{5000 + 2 * i}",
+                    "start": T0 - timedelta(days=1),
+                    "end": SWAP,
+                    "tat": [{"value": 100.0 + i}],
+                },
+                {
+                    "address": f"{5001 + 2 * i}",
+                    "start": SWAP,
+                    "tat": [
+                        {"value": 200.0, "start": SWAP, "end": SWAP + timedelta(1)},
+                        {"value": 210.0, "start": SWAP + timedelta(1)},
+                    ],
+                },
+            ],
+        )
+        for i in range(N_BENCHMARKS)
+    ]
+    return campaign, benchmarks
+
+
+def legacy_labels(campaign, benchmarks, shots: pd.DataFrame):
+    by_address = {
+        transponder.address: benchmark
+        for benchmark in benchmarks
+        for transponder in benchmark.transponders
+    }
+    survey_ids, benchmark_names, tats = [], [], []
+    for ping_time, address in zip(shots.pingTime, shots.transponderID):
+        dt = datetime.fromtimestamp(ping_time, tz=timezone.utc).replace(tzinfo=None)
+        try:
+            survey_ids.append(campaign.get_survey_by_datetime(dt).id)
+        except ValueError:
+            survey_ids.append(None)
+        benchmark = by_address[address]
+        transponder = benchmark.get_transponder_by_datetime(dt)
+        if transponder is None or transponder.address != address:
+            benchmark_names.append(None)
+            tats.append(np.nan)
+        else:
+            benchmark_names.append(benchmark.name)
+            tats.append(transponder.get_tat_by_datetime(dt))
+    return survey_ids, benchmark_names, tats
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    campaign, benchmarks = make_metadata()
+    addresses = [t.address for b in benchmarks for t in b.transponders]
+    rng = np.random.default_rng(0)
+    epoch = T0.replace(tzinfo=timezone.utc).timestamp()
+    for n_shots in (10_000, 100_000, 1_000_000):
+        shots = pd.DataFrame(
+            {
+                "pingTime": np.sort(
+                    epoch + rng.uniform(0, N_SURVEYS * 6 * 3600, n_shots)
+                ).round(3),
+                "transponderID": rng.choice(addresses, n_shots),
+            }
+        )
+        # Per-shot Python calls are extrapolated past 100k shots
+        legacy_rows = min(n_shots, 100_000)
+        legacy, before_s = timed(
+            legacy_labels, campaign, benchmarks, shots.iloc[:legacy_rows]
+        )
+        before_s *= n_shots / legacy_rows
+
+        index, build_s = timed(MetadataIndex, campaign.surveys, benchmarks)
+        labelled, after_s = timed(index.label_shotdata, shots)
+
+        head = labelled.iloc[:legacy_rows]
+        assert head.surveyID.tolist() == legacy[0]
+        assert head.benchmarkName.tolist() == legacy[1]
+        np.testing.assert_array_equal(head.tat.to_numpy(), legacy[2])
+
+        print(f"{n_shots:>9,} shots")
+        print(
+            f"  time: {before_s:9.3f} s -> {after_s:9.3f} s "
+            f"(+{build_s * 1e3:.1f} ms build, {before_s / after_s:,.0f}x)"
+        )
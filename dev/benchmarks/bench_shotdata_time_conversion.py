@@ -0,0 +1,56 @@
+"""
+Benchmark the shot data timestamp conversion used by TDBShotDataArray.
+
+Compares the legacy per-row ``.apply`` conversions against the vectorized
+epoch-seconds <-> datetime64[ns] helpers and reports rows/sec for both the
+write (seconds -> datetime64) and read (datetime64 -> seconds) directions.
+
+Usage:
+    python dev/benchmarks/bench_shotdata_time_conversion.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    as_py_datetime_object_col,
+    datetime64_to_epoch_seconds,
+    epoch_seconds_to_datetime64,
+)
+
+
+def legacy_write(ping_time: pd.Series) -> pd.Series:
+    return ping_time.apply(lambda x: np.datetime64(int(x * 1e9), "ns"))
+
+
+def legacy_read(ping_time: pd.Series) -> pd.Series:
+    return as_py_datetime_object_col(ping_time).apply(lambda x: x.timestamp())
+
+
+def rows_per_second(func, values, n_rows: int) -> float:
+    start = time.perf_counter()
+    func(values)
+    return n_rows / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    for n_rows in (10_000, 100_000, 1_000_000):
+        seconds = pd.Series(1.7e9 + 15.0 * np.arange(n_rows) + 0.123456)
+        as_datetime = pd.Series(epoch_seconds_to_datetime64(seconds))
+
+        write_before = rows_per_second(legacy_write, seconds, n_rows)
+        write_after = rows_per_second(epoch_seconds_to_datetime64, seconds, n_rows)
+        read_before = rows_per_second(legacy_read, as_datetime, n_rows)
+        read_after = rows_per_second(datetime64_to_epoch_seconds, as_datetime, n_rows)
+
+        print(f"{n_rows:>9,} rows")
+        print(
+            f"  write: {write_before:14,.0f} -> {write_after:14,.0f} rows/s "
+            f"({write_after / write_before:,.0f}x)"
+        )
+        print(
+            f"  read:  {read_before:14,.0f} -> {read_after:14,.0f} rows/s "
+            f"({read_after / read_before:,.0f}x)"
+        )
@@ -1,16 +1,49 @@
+import hashlib
 import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 import pandas as pd
 import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from .schemas import AssetEntry
+from ..sqlite_utils import set_sqlite_pragmas
 from es_sfgtools.config.file_config import AssetType
 
 from es_sfgtools.logging import ProcessLogger as logger
 
-from .tables import Assets, Base, MergeJobs
+from .tables import Assets, Base, MergeJobs, ModelResults
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+SQLITE_MAX_IN_PARAMS = 500
+
+
+def merge_signature(parent_type: str, child_type: str, parent_ids: Iterable) -> str:
+    """Returns the hashed signature identifying a merge job.
+
+    Parameters
+    ----------
+    parent_type : str
+        The parent asset type.
+    child_type : str
+        The child asset type.
+    parent_ids : Iterable
+        The parent asset IDs (or dates), in any order.
+
+    Returns
+    -------
+    str
+        The hex sha256 digest of the types and the sorted parent IDs.
+    """
+    return _hash_merge_job(
+        parent_type, child_type, "-".join(str(x) for x in sorted(parent_ids))
+    )
+
+
+def _hash_merge_job(parent_type: str, child_type: str, parent_id_string: str) -> str:
+    key = f"{parent_type}|{child_type}|{parent_id_string}"
+    return hashlib.sha256(key.encode()).hexdigest()
 
 
 class PreProcessCatalogHandler:
@@ -30,7 +63,88 @@ class PreProcessCatalogHandler:
         self.engine = self.engine = sa.create_engine(
             f"sqlite+pysqlite:///{self.db_path}", poolclass=sa.pool.NullPool
         )
+        sa.event.listen(self.engine, "connect", set_sqlite_pragmas)
         Base.metadata.create_all(self.engine)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Brings catalogs created by earlier versions up to the current schema.
+
+        Adds and backfills the merge job signature column, dropping duplicate
+        merge jobs, and creates any missing indexes. The query planner
+        statistics are refreshed only if anything changed, so opening an up
+        to date catalog does not rescan it. Safe to run repeatedly.
+        """
+        changed = False
+        with self.engine.begin() as conn:
+            columns = {
+                column["name"]
+                for column in sa.inspect(conn).get_columns(MergeJobs.__tablename__)
+            }
+            if MergeJobs.signature.name not in columns:
+                logger.loginfo(f"Migrating catalog {self.db_path}: adding merge job signatures")
+                changed = True
+                conn.execute(
+                    sa.text(
+                        f"ALTER TABLE {MergeJobs.__tablename__} "
+                        f"ADD COLUMN {MergeJobs.signature.name} VARCHAR"
+                    )
+                )
+
+            rows = conn.execute(
+                sa.select(
+                    MergeJobs.id,
+                    MergeJobs.parent_type,
+                    MergeJobs.child_type,
+                    MergeJobs.parent_ids,
+                )
+                .where(MergeJobs.signature.is_(None))
+                .order_by(MergeJobs.id)
+            ).fetchall()
+            if rows:
+                changed = True
+                existing = set(
+                    conn.execute(
+                        sa.select(MergeJobs.signature).where(
+                            MergeJobs.signature.is_not(None)
+                        )
+                    ).scalars()
+                )
+                updates, duplicates = [], []
+                for row in rows:
+                    # parent_ids was stored sorted; dates contain "-" so hash it as is
+                    signature = _hash_merge_job(
+                        row.parent_type, row.child_type, row.parent_ids or ""
+                    )
+                    if signature in existing:
+                        duplicates.append(row.id)
+                        continue
+                    existing.add(signature)
+                    updates.append({"_id": row.id, "_signature": signature})
+                if updates:
+                    conn.execute(
+                        sa.update(MergeJobs)
+                        .where(MergeJobs.id == sa.bindparam("_id"))
+                        .values(signature=sa.bindparam("_signature")),
+                        updates,
+                    )
+                if duplicates:
+                    conn.execute(
+                        sa.delete(MergeJobs).where(MergeJobs.id.in_(duplicates))
+                    )
+
+            # create_all only creates indexes along with new tables
+            inspector = sa.inspect(conn)
+            for table in Base.metadata.sorted_tables:
+                existing_indexes = {
+                    index["name"] for index in inspector.get_indexes(table.name)
+                }
+                for index in table.indexes:
+                    if index.name not in existing_indexes:
+                        index.create(conn)
+                        changed = True
+            if changed:
+                conn.execute(sa.text("ANALYZE"))
 
     def get_dtype_counts(
         self, network: str, station: str, campaign: str, **kwargs
@@ -466,6 +580,149 @@ class PreProcessCatalogHandler:
                     pass
         return False
 
+    @staticmethod
+    def _upsert_statement(conflict_column: sa.Column):
+        """Build an INSERT that updates all non-id columns on a unique conflict."""
+        stmt = sqlite_insert(Assets)
+        return stmt.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={
+                column: stmt.excluded[column]
+                for column in Assets.__table__.columns.keys()
+                if column != Assets.id.name
+            },
+        )
+
+    def add_or_update_many(self, entries: Iterable[AssetEntry]) -> int:
+        """Adds or updates many entries in a single transaction.
+
+        The bulk counterpart of `add_or_update`: entries with an ``id``
+        update that row, entries without one are inserted or, if their
+        ``remote_path`` is already cataloged, update that row. Runs as
+        executemany ``INSERT ... ON CONFLICT DO UPDATE`` statements. If the
+        batch cannot be written as a whole, the entries are retried one at
+        a time with `add_or_update`.
+
+        Parameters
+        ----------
+        entries : Iterable[AssetEntry]
+            The entries to add or update.
+
+        Returns
+        -------
+        int
+            The number of entries added or updated.
+        """
+        entries = [entry for entry in entries if entry is not None]
+        if not entries:
+            return 0
+
+        with_id = [entry.model_dump() for entry in entries if entry.id is not None]
+        without_id = [entry.to_update_dict() for entry in entries if entry.id is None]
+        try:
+            with self.engine.begin() as conn:
+                if with_id:
+                    conn.execute(self._upsert_statement(Assets.id), with_id)
+                if without_id:
+                    conn.execute(self._upsert_statement(Assets.remote_path), without_id)
+            return len(entries)
+        except sa.exc.IntegrityError as e:
+            logger.logwarn(
+                f"Bulk catalog update failed ({e}), retrying {len(entries)} entries individually"
+            )
+        return sum(bool(self.add_or_update(entry)) for entry in entries)
+
+    def mark_processed_many(
+        self, entries: Iterable[AssetEntry], is_processed: bool = True
+    ) -> int:
+        """Sets the processed flag of many entries in a single transaction.
+
+        Entries are matched by ``id``, or by ``local_path`` if they have no id.
+        The ``is_processed`` attribute of each entry is updated to match.
+
+        Parameters
+        ----------
+        entries : Iterable[AssetEntry]
+            The entries to update.
+        is_processed : bool, optional
+            The value to set, by default True.
+
+        Returns
+        -------
+        int
+            The number of catalog rows updated.
+        """
+        entries = [entry for entry in entries if entry is not None]
+        for entry in entries:
+            entry.is_processed = is_processed
+        ids = [entry.id for entry in entries if entry.id is not None]
+        local_paths = [
+            str(entry.local_path)
+            for entry in entries
+            if entry.id is None and entry.local_path is not None
+        ]
+        updated = 0
+        with self.engine.begin() as conn:
+            for column, values in ((Assets.id, ids), (Assets.local_path, local_paths)):
+                for i in range(0, len(values), SQLITE_MAX_IN_PARAMS):
+                    result = conn.execute(
+                        sa.update(Assets)
+                        .where(column.in_(values[i : i + SQLITE_MAX_IN_PARAMS]))
+                        .values(is_processed=is_processed)
+                    )
+                    updated += result.rowcount
+        return updated
+
+    def update_local_paths(self, entries: Iterable[AssetEntry]) -> int:
+        """Sets the local path of many entries in a single transaction.
+
+        The bulk counterpart of `update_local_path`. Entries are matched by
+        ``id``, or by ``remote_path`` if they have no id; only ``local_path``
+        is written, so the rest of each row is left as cataloged.
+
+        Parameters
+        ----------
+        entries : Iterable[AssetEntry]
+            The entries to update, with their new ``local_path``.
+
+        Returns
+        -------
+        int
+            The number of catalog rows updated.
+        """
+        entries = [
+            entry
+            for entry in entries
+            if entry is not None and entry.local_path is not None
+        ]
+        by_id = [
+            {"key": entry.id, "new_local_path": str(entry.local_path)}
+            for entry in entries
+            if entry.id is not None
+        ]
+        by_remote_path = [
+            {"key": str(entry.remote_path), "new_local_path": str(entry.local_path)}
+            for entry in entries
+            if entry.id is None and entry.remote_path is not None
+        ]
+        updated = 0
+        with self.engine.begin() as conn:
+            for column, params in (
+                (Assets.id, by_id),
+                (Assets.remote_path, by_remote_path),
+            ):
+                statement = (
+                    sa.update(Assets.__table__)
+                    .where(column == sa.bindparam("key"))
+                    .values(local_path=sa.bindparam("new_local_path"))
+                )
+                for i in range(0, len(params), SQLITE_MAX_IN_PARAMS):
+                    result = conn.execute(
+                        statement, params[i : i + SQLITE_MAX_IN_PARAMS]
+                    )
+                    updated += result.rowcount
+        return updated
+
     def query_catalog(self, query: str) -> pd.DataFrame:
         """Queries the catalog.
 
@@ -580,15 +837,55 @@ class PreProcessCatalogHandler:
         parent_id_string = "-".join([str(x) for x in parent_ids])
         with self.engine.begin() as conn:
             conn.execute(
-                sa.insert(MergeJobs).values(
+                sqlite_insert(MergeJobs)
+                .values(
                     {
                         MergeJobs.parent_type.name: parent_type,
                         MergeJobs.child_type.name: child_type,
                         MergeJobs.parent_ids.name: parent_id_string,
+                        MergeJobs.signature.name: _hash_merge_job(
+                            parent_type, child_type, parent_id_string
+                        ),
                     }
                 )
+                .on_conflict_do_nothing(index_elements=[MergeJobs.signature])
             )
 
+    def add_model_results(self, results: pd.DataFrame) -> int:
+        """Adds model run summaries to the model results table.
+
+        Parameters
+        ----------
+        results : pd.DataFrame
+            One row per run with ``obsfile_path``, ``hyper_params``,
+            ``rms_tt``, ``abic`` and ``delta_center_east``,
+            ``delta_center_north``, ``delta_center_up`` columns.
+
+        Returns
+        -------
+        int
+            The number of rows added.
+        """
+        if results.empty:
+            return 0
+        rows = [
+            {
+                ModelResults.asset_local_path.name: str(row["obsfile_path"]),
+                ModelResults.hyper_params.name: row["hyper_params"],
+                ModelResults.rms_tt.name: float(row["rms_tt"]),
+                ModelResults.abic.name: float(row["abic"]),
+                ModelResults.delta_center_position.name: [
+                    float(row["delta_center_east"]),
+                    float(row["delta_center_north"]),
+                    float(row["delta_center_up"]),
+                ],
+            }
+            for _, row in results.iterrows()
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(sa.insert(ModelResults), rows)
+        return len(rows)
+
     def is_merge_complete(
         self, parent_type: str, child_type: str, parent_ids: List[int], **kwargs
     ) -> bool:
@@ -608,15 +905,10 @@ class PreProcessCatalogHandler:
         bool
             True if the merge job is complete, False otherwise.
         """
-        parent_ids.sort()
-        parent_id_string = "-".join([str(x) for x in parent_ids])
+        signature = merge_signature(parent_type, child_type, parent_ids)
         with self.engine.begin() as conn:
             results = conn.execute(
-                sa.select(MergeJobs).where(
-                    MergeJobs.parent_type == parent_type,
-                    MergeJobs.child_type == child_type,
-                    MergeJobs.parent_ids == parent_id_string,
-                )
+                sa.select(MergeJobs.id).where(MergeJobs.signature == signature)
             ).fetchone()
             if results:
                 return True
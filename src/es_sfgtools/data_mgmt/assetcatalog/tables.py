@@ -11,6 +11,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -27,6 +28,12 @@ class Assets(Base):
     """
 
     __tablename__ = "assets"
+    __table_args__ = (
+        # station-first so get_ctds (no network filter) can use it too
+        Index("ix_assets_station_campaign_type", "station", "campaign", "type", "network"),
+        Index("ix_assets_local_path", "local_path"),
+        Index("ix_assets_parent_id", "parent_id"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     network = Column(String)
     station = Column(String)
@@ -65,7 +72,12 @@ class MergeJobs(Base):
     """
 
     __tablename__ = "mergejobs"
+    __table_args__ = (
+        Index("ix_mergejobs_signature", "signature", unique=True),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     child_type = Column(String)
     parent_ids = Column(String)
     parent_type = Column(String)
+    # sha256 of parent_type, child_type and the sorted parent ids
+    signature = Column(String, nullable=True)
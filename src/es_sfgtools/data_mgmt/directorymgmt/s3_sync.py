@@ -0,0 +1,334 @@
+"""
+Incremental, parallel upload of local directories to S3.
+
+`S3Sync.sync_directory` lists the remote prefix once with ``ListObjectsV2``
+instead of sending one HEAD request per file, and uploads only what differs.
+A sync of a few named files (``files=``) sends one HEAD request per file
+instead, so it does not list a large prefix:
+
+- Files inside a TileDB array's ``__*`` directories (fragments, commits,
+  fragment and array metadata, schemas) are immutable and uniquely named,
+  so they are uploaded only if their key is missing.
+- Any other file is uploaded if its key is missing or its size or ETag
+  differs from the local file.
+
+Uploads run in a thread pool through boto3's transfer manager, which splits
+large files into multipart uploads. Each call returns a `SyncReport` of the
+files and bytes transferred.
+"""
+
+import concurrent.futures
+import hashlib
+import time
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from cloudpathlib import S3Path
+from pydantic import BaseModel, Field
+
+from ...logging import ProcessLogger as logger
+
+MB = 1024 * 1024
+# S3 allows at most this many parts per multipart upload
+MAX_PARTS = 10_000
+# S3 DeleteObjects accepts at most this many keys per request
+MAX_DELETE_KEYS = 1000
+# Syncs of at most this many named files use HEAD requests, not a listing
+MAX_HEAD_FILES = 10
+
+
+class RemoteObject(BaseModel):
+    """Size and ETag of an object from a bucket listing."""
+
+    size: int
+    etag: str
+
+
+class SyncReport(BaseModel):
+    """Outcome of `S3Sync.sync_directory`."""
+
+    files_uploaded: int = 0
+    bytes_uploaded: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    files_deleted: int = 0
+    failed: List[str] = Field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def __add__(self, other: "SyncReport") -> "SyncReport":
+        return SyncReport(
+            files_uploaded=self.files_uploaded + other.files_uploaded,
+            bytes_uploaded=self.bytes_uploaded + other.bytes_uploaded,
+            files_skipped=self.files_skipped + other.files_skipped,
+            files_failed=self.files_failed + other.files_failed,
+            files_deleted=self.files_deleted + other.files_deleted,
+            failed=self.failed + other.failed,
+            elapsed_s=self.elapsed_s + other.elapsed_s,
+        )
+
+
+def is_immutable(relative_path: PurePosixPath) -> bool:
+    """Whether a path inside a TileDB array names an immutable file.
+
+    TileDB writes fragments, commits, fragment metadata, array metadata and
+    schemas once, under unique timestamped names in ``__*`` directories.
+    """
+    return len(relative_path.parts) > 1 and relative_path.parts[0].startswith("__")
+
+
+def split_s3_uri(uri: S3Path | str) -> Tuple[str, str]:
+    """Bucket and key prefix of an S3 URI, e.g. ``s3://bucket/a/b``."""
+    bucket, _, prefix = str(uri).removeprefix("s3://").partition("/")
+    return bucket, prefix.strip("/")
+
+
+class S3Sync:
+    """Upload local directories to S3, transferring only what changed.
+
+    Parameters
+    ----------
+    client : boto3 S3 client, optional
+        By default a client from the default boto3 session.
+    max_workers : int, optional
+        Files uploaded at once, by default 16.
+    multipart_threshold : int, optional
+        Files at least this large (bytes) use multipart uploads, by default
+        8 MiB.
+    multipart_chunksize : int, optional
+        Multipart part size in bytes, by default 8 MiB.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_workers: int = 16,
+        multipart_threshold: int = 8 * MB,
+        multipart_chunksize: int = 8 * MB,
+    ):
+        self.max_workers = max_workers
+        self.client = client or boto3.client(
+            "s3", config=Config(max_pool_connections=max_workers)
+        )
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        # Parallelism comes from uploading many files at once
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            use_threads=False,
+        )
+
+    @classmethod
+    def for_path(cls, path: S3Path, max_workers: int = 16, **kwargs) -> "S3Sync":
+        """Use the credentials of a cloudpathlib ``S3Path``'s client."""
+        client = path.client.sess.client(
+            "s3", config=Config(max_pool_connections=max_workers)
+        )
+        return cls(client=client, max_workers=max_workers, **kwargs)
+
+    def list_remote(self, bucket: str, prefix: str) -> Dict[str, RemoteObject]:
+        """Every object under a prefix, keyed by its path relative to it."""
+        prefix = f"{prefix.strip('/')}/" if prefix.strip("/") else ""
+        objects = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                objects[obj["Key"][len(prefix) :]] = RemoteObject(
+                    size=obj["Size"], etag=obj["ETag"].strip('"')
+                )
+        return objects
+
+    def head_remote(
+        self, bucket: str, prefix: str, names: Iterable[str]
+    ) -> Dict[str, RemoteObject]:
+        """The objects at the given paths relative to a prefix, if they exist."""
+        prefix = prefix.strip("/")
+        objects = {}
+        for name in names:
+            key = f"{prefix}/{name}" if prefix else name
+            try:
+                response = self.client.head_object(Bucket=bucket, Key=key)
+            except ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    continue
+                raise
+            objects[name] = RemoteObject(
+                size=response["ContentLength"], etag=response["ETag"].strip('"')
+            )
+        return objects
+
+    def local_etag(self, path: Path) -> str:
+        """The ETag S3 gives ``path`` when uploaded with this configuration."""
+        size = path.stat().st_size
+        if size < self.multipart_threshold:
+            digest = hashlib.md5()
+            with open(path, "rb") as f:
+                while chunk := f.read(MB):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        # boto3 grows the part size until the upload fits in MAX_PARTS parts
+        chunksize = self.multipart_chunksize
+        while -(-size // chunksize) > MAX_PARTS:
+            chunksize *= 2
+        part_digests = []
+        with open(path, "rb") as f:
+            while chunk := f.read(chunksize):
+                part_digests.append(hashlib.md5(chunk).digest())
+        combined = hashlib.md5(b"".join(part_digests)).hexdigest()
+        return f"{combined}-{len(part_digests)}"
+
+    def needs_upload(
+        self,
+        path: Path,
+        relative_path: PurePosixPath,
+        remote: Optional[RemoteObject],
+        tiledb: bool = False,
+    ) -> bool:
+        """Whether a local file differs from its remote copy."""
+        if remote is None:
+            return True
+        if tiledb and is_immutable(relative_path):
+            return False
+        return (
+            path.stat().st_size != remote.size or self.local_etag(path) != remote.etag
+        )
+
+    def _upload(self, path: Path, bucket: str, key: str) -> int:
+        self.client.upload_file(str(path), bucket, key, Config=self.transfer_config)
+        return path.stat().st_size
+
+    def _upload_many(
+        self, uploads: List[Tuple[Path, str]], bucket: str, report: SyncReport
+    ) -> None:
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures = {
+                executor.submit(self._upload, path, bucket, key): path
+                for path, key in uploads
+            }
+            for future in concurrent.futures.as_completed(futures):
+                path = futures[future]
+                try:
+                    report.bytes_uploaded += future.result()
+                    report.files_uploaded += 1
+                except Exception as e:
+                    logger.logerr(f"Failed to upload {path} to S3: {e}")
+                    report.files_failed += 1
+                    report.failed.append(str(path))
+
+    def sync_directory(
+        self,
+        local_dir: Path,
+        remote_dir: S3Path | str,
+        files: Optional[Iterable[Path]] = None,
+        tiledb: bool = False,
+        overwrite: bool = False,
+        delete: bool = False,
+    ) -> SyncReport:
+        """Upload the new and changed files of a local directory.
+
+        Parameters
+        ----------
+        local_dir : Path
+            The directory to upload.
+        remote_dir : S3Path or str
+            Its S3 location, e.g. ``s3://bucket/network/station/TileDB/x.tdb``.
+        files : Iterable[Path], optional
+            Only sync these files under ``local_dir``, by default every file.
+            Up to ``MAX_HEAD_FILES`` files are looked up with one HEAD
+            request each instead of listing ``remote_dir``.
+        tiledb : bool, optional
+            ``local_dir`` is a TileDB array: files in its ``__*`` directories
+            are compared by name only. By default False.
+        overwrite : bool, optional
+            Upload every file, by default False.
+        delete : bool, optional
+            Delete remote objects under ``remote_dir`` that no longer exist
+            locally, e.g. fragments removed by vacuuming. Skipped when
+            ``files`` is given or an upload failed. By default False.
+
+        Returns
+        -------
+        SyncReport
+            The files and bytes transferred.
+        """
+        start = time.perf_counter()
+        local_dir = Path(local_dir)
+        bucket, prefix = split_s3_uri(remote_dir)
+        report = SyncReport()
+        if not local_dir.exists():
+            return report
+
+        if files is None:
+            local_files = [path for path in local_dir.rglob("*") if path.is_file()]
+        else:
+            local_files = [Path(path) for path in files if Path(path).is_file()]
+        relative_paths = {
+            path: PurePosixPath(path.relative_to(local_dir).as_posix())
+            for path in local_files
+        }
+        if files is not None and len(local_files) <= MAX_HEAD_FILES:
+            remote = self.head_remote(
+                bucket, prefix, [str(name) for name in relative_paths.values()]
+            )
+        else:
+            remote = self.list_remote(bucket, prefix)
+
+        uploads = []
+        for path, relative_path in relative_paths.items():
+            if overwrite or self.needs_upload(
+                path, relative_path, remote.get(str(relative_path)), tiledb=tiledb
+            ):
+                key = f"{prefix}/{relative_path}" if prefix else str(relative_path)
+                uploads.append((path, key))
+            else:
+                report.files_skipped += 1
+
+        # Commit files go last so a reader never sees a commit before its
+        # fragment is complete
+        first, last = [], []
+        for path, key in uploads:
+            is_commit = tiledb and path.parent.name == "__commits"
+            (last if is_commit else first).append((path, key))
+        for batch in (first, last):
+            self._upload_many(batch, bucket, report)
+
+        # Never delete what a failed upload was meant to replace
+        if delete and files is None and not report.files_failed:
+            local_keys = {
+                path.relative_to(local_dir).as_posix() for path in local_files
+            }
+            # Commits go first, the reverse of the upload order
+            stale = sorted(
+                (name for name in remote if name not in local_keys),
+                key=lambda name: "/__commits/" not in f"/{name}",
+            )
+            report.files_deleted = self._delete(
+                bucket, [f"{prefix}/{name}" if prefix else name for name in stale]
+            )
+
+        report.elapsed_s = time.perf_counter() - start
+        logger.loginfo(
+            f"Synced {local_dir} to s3://{bucket}/{prefix}: "
+            f"{report.files_uploaded} files ({report.bytes_uploaded / MB:.1f} MiB) "
+            f"uploaded, {report.files_skipped} unchanged, "
+            f"{report.files_deleted} deleted, {report.files_failed} failed"
+        )
+        return report
+
+    def _delete(self, bucket: str, keys: List[str]) -> int:
+        deleted = 0
+        for i in range(0, len(keys), MAX_DELETE_KEYS):
+            batch = keys[i : i + MAX_DELETE_KEYS]
+            response = self.client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                logger.logerr(f"Failed to delete {error['Key']} from S3: {error}")
+            deleted += len(batch) - len(response.get("Errors", []))
+        return deleted
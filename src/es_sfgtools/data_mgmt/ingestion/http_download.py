@@ -0,0 +1,340 @@
+"""
+Concurrent, resumable HTTP downloads from the data archive.
+
+`HTTPDownloader` fetches many files at once through one pooled
+``urllib3.PoolManager``, which keeps a bounded pool of keep-alive
+connections per host so a campaign pull of thousands of small files is not
+bound by one TLS handshake and round trip per file.
+
+Each file is streamed to a hidden ``.<name>.part`` file next to its
+destination and moved into place only once verified:
+
+- An interrupted transfer, in this run or a previous one, is resumed with
+  an HTTP ``Range`` request. The resume is guarded with ``If-Range`` on the
+  ETag of the first response, so a file changed on the server is fetched
+  again from the start.
+- The size is checked against ``Content-Length``/``Content-Range``, and the
+  sha256 against a caller supplied digest or one sent by the server
+  (``Repr-Digest``, ``Digest`` or ``x-amz-checksum-sha256``).
+- Expired tokens (HTTP 401) are refreshed once through ``token_provider``.
+"""
+
+import base64
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import urllib3
+from tqdm.auto import tqdm
+
+from ...logging import ProcessLogger as logger
+
+CHUNK_SIZE = 1 << 20
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+_DIGEST_PATTERN = re.compile(r"sha-256=:?([A-Za-z0-9+/=]+):?", re.IGNORECASE)
+
+
+class DownloadError(Exception):
+    """A file could not be downloaded or failed verification."""
+
+
+class IncompleteDownload(DownloadError):
+    """The connection ended before the whole file was received."""
+
+
+def _server_sha256(headers: urllib3.HTTPHeaderDict) -> Optional[str]:
+    """Hex sha256 of the full file, if the server sent one."""
+    for name in ("repr-digest", "digest"):
+        if match := _DIGEST_PATTERN.search(headers.get(name, "")):
+            return base64.b64decode(match.group(1)).hex()
+    if amz := headers.get("x-amz-checksum-sha256"):
+        return base64.b64decode(amz).hex()
+    return None
+
+
+def _total_size(response: urllib3.BaseHTTPResponse) -> Optional[int]:
+    """Size of the full file from ``Content-Range`` or ``Content-Length``."""
+    if content_range := response.headers.get("content-range"):
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return int(length) if length is not None and length.isdigit() else None
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HTTPDownloader:
+    """Download files concurrently over pooled, keep-alive connections.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Files downloaded at once, by default 8.
+    max_connections_per_host : int, optional
+        Connections kept open to each host, by default ``max_workers``.
+        Requests beyond it wait for a free connection.
+    token_provider : Callable[[], str], optional
+        Returns a bearer token, e.g. `archive_pull.retrieve_token`. Called
+        on the first request and again if the server answers 401, so
+        creating a downloader never fails on authentication. By default
+        None (no authorization header).
+    timeout : float, optional
+        Connect and read timeout in seconds, by default 60.
+    retries : int, optional
+        Attempts to resume an interrupted transfer, and retries of
+        connection errors and 429/5xx answers, by default 3.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_connections_per_host: Optional[int] = None,
+        token_provider: Optional[Callable[[], str]] = None,
+        timeout: float = 60.0,
+        retries: int = 3,
+    ):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.token_provider = token_provider
+        self._token: Optional[str] = None
+        self._token_fetched = False
+        self._token_lock = threading.Lock()
+        self.pool = urllib3.PoolManager(
+            maxsize=max_connections_per_host or max_workers,
+            block=True,
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            retries=urllib3.Retry(
+                total=retries,
+                read=0,
+                backoff_factor=0.5,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False,
+            ),
+        )
+
+    def _current_token(self) -> Optional[str]:
+        """The bearer token, fetched on first use."""
+        if self.token_provider is not None and not self._token_fetched:
+            with self._token_lock:
+                if not self._token_fetched:
+                    self._token = self.token_provider()
+                    self._token_fetched = True
+        return self._token
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"accept-encoding": "identity"}
+        if (token := self._current_token()) is not None:
+            headers["authorization"] = f"Bearer {token}"
+        return headers
+
+    def _refresh_token(self, used: Optional[str]) -> bool:
+        """Fetch a new token unless another thread already has."""
+        if self.token_provider is None:
+            return False
+        with self._token_lock:
+            if self._token == used:
+                self._token = self.token_provider()
+                self._token_fetched = True
+        return True
+
+    def _request(
+        self, url: str, headers: Dict[str, str]
+    ) -> urllib3.BaseHTTPResponse:
+        token = self._token
+        response = self.pool.request(
+            "GET", url, headers=headers, preload_content=False, decode_content=False
+        )
+        if response.status == 401 and self._refresh_token(token):
+            response.drain_conn()
+            response.release_conn()
+            headers = {**headers, **self._headers()}
+            response = self.pool.request(
+                "GET", url, headers=headers, preload_content=False, decode_content=False
+            )
+        return response
+
+    def _transfer(self, url: str, part: Path, state_path: Path) -> Dict[str, str]:
+        """Stream ``url`` into ``part``, resuming it if it exists.
+
+        Returns
+        -------
+        dict
+            The ETag and sha256 announced by the server for the full file.
+
+        Raises
+        ------
+        IncompleteDownload
+            If the transfer stopped early; ``part`` is kept to resume from.
+        DownloadError
+            If the server refused the request or sent too much data.
+        """
+        offset = part.stat().st_size if part.exists() else 0
+        state = json.loads(state_path.read_text()) if state_path.exists() else {}
+        headers = self._headers()
+        if offset:
+            headers["range"] = f"bytes={offset}-"
+            if state.get("etag"):
+                headers["if-range"] = state["etag"]
+
+        response = self._request(url, headers)
+        try:
+            if response.status == 416:
+                # Nothing left to send: the part is complete or stale
+                if _total_size(response) == offset:
+                    return state
+                part.unlink()
+                raise IncompleteDownload(f"Stale partial download of {url}")
+            if response.status not in (200, 206):
+                raise DownloadError(
+                    f"HTTP {response.status} {response.reason} for {url}"
+                )
+            if response.status == 200:
+                # Full body: either a fresh download or the file changed
+                offset = 0
+                state = {
+                    "etag": response.headers.get("etag"),
+                    "sha256": _server_sha256(response.headers),
+                }
+                state_path.write_text(json.dumps(state))
+            elif not response.headers.get("content-range", "").startswith(
+                f"bytes {offset}-"
+            ):
+                raise DownloadError(f"Unexpected Content-Range for {url}")
+
+            expected = _total_size(response)
+            received = offset
+            with open(part, "r+b" if offset else "wb") as f:
+                f.seek(offset)
+                try:
+                    for chunk in response.stream(CHUNK_SIZE):
+                        f.write(chunk)
+                        received += len(chunk)
+                except (urllib3.exceptions.HTTPError, OSError) as e:
+                    raise IncompleteDownload(
+                        f"Transfer of {url} interrupted at {received} bytes: {e}"
+                    ) from e
+                f.truncate()
+        finally:
+            response.drain_conn()
+            response.release_conn()
+
+        if expected is not None and received < expected:
+            raise IncompleteDownload(
+                f"Received {received} of {expected} bytes of {url}"
+            )
+        if expected is not None and received > expected:
+            part.unlink()
+            raise DownloadError(f"Received {received} of {expected} bytes of {url}")
+        return state
+
+    def download(
+        self, url: str, dest_dir: Path, sha256: Optional[str] = None
+    ) -> Path:
+        """Download one file, resuming and verifying it.
+
+        Parameters
+        ----------
+        url : str
+            The URL of the file.
+        dest_dir : Path
+            The directory to save it to, under its remote name.
+        sha256 : str, optional
+            Expected hex digest. By default the digest sent by the server,
+            if any, is checked.
+
+        Returns
+        -------
+        Path
+            The downloaded file.
+
+        Raises
+        ------
+        DownloadError
+            If the file could not be downloaded or failed verification.
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = dest_dir / Path(urlparse(url).path).name
+        part = dest_dir / f".{dest.name}.part"
+        state_path = dest_dir / f".{dest.name}.part.json"
+
+        for attempt in range(self.retries + 1):
+            try:
+                state = self._transfer(url, part, state_path)
+                break
+            except IncompleteDownload as e:
+                if attempt == self.retries:
+                    raise
+                logger.logwarn(f"{e}, resuming")
+                time.sleep(min(0.5 * 2**attempt, 10))
+            except urllib3.exceptions.HTTPError as e:
+                raise DownloadError(f"Failed to download {url}: {e}") from e
+
+        expected = sha256 or state.get("sha256")
+        if expected is not None and _sha256(part) != expected.lower():
+            part.unlink()
+            state_path.unlink(missing_ok=True)
+            raise DownloadError(f"Checksum mismatch for {url}")
+        os.replace(part, dest)
+        state_path.unlink(missing_ok=True)
+        return dest
+
+    def download_many(
+        self,
+        files: Iterable[Tuple[str, Path]],
+        desc: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Optional[Path]]]:
+        """Download files concurrently.
+
+        Parameters
+        ----------
+        files : Iterable[Tuple[str, Path]]
+            ``(url, dest_dir)`` pairs.
+        desc : str, optional
+            Progress bar label, by default None (no progress bar).
+
+        Yields
+        ------
+        Tuple[str, Optional[Path]]
+            Each URL with its downloaded file, or None if it failed, in
+            order of completion.
+        """
+        files = list(files)
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures = {
+                executor.submit(self.download, url, dest_dir): url
+                for url, dest_dir in files
+            }
+            completed = concurrent.futures.as_completed(futures)
+            if desc is not None:
+                completed = tqdm(completed, total=len(futures), desc=desc)
+            for future in completed:
+                url = futures[future]
+                try:
+                    yield url, future.result()
+                except Exception as e:
+                    logger.logerr(f"Error downloading {url} \n {e}")
+                    yield url, None
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.pool.clear()
+
+    def __enter__(self) -> "HTTPDownloader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
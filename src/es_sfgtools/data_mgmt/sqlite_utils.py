@@ -0,0 +1,26 @@
+"""
+Connection settings shared by the SQLite databases of the package.
+
+Register `set_sqlite_pragmas` on an engine so every new connection gets
+them::
+
+    sa.event.listen(engine, "connect", set_sqlite_pragmas)
+"""
+
+# Applied to every new connection. journal_mode=WAL is persistent in the
+# database file and lets readers proceed while a writer commits;
+# synchronous=NORMAL is durable under WAL except on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+}
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """SQLAlchemy ``connect`` event listener applying `SQLITE_PRAGMAS`."""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
@@ -1,5 +1,6 @@
 from .benchmark import Benchmark
 from .campaign import Campaign, Survey, SurveyType, classify_survey_type
+from .interval_index import IntervalIndex, MetadataIndex
 from .site import Site, import_site
 from .vessel import Vessel, import_vessel
 
@@ -13,4 +14,6 @@ __all__ = [
     "import_vessel",
     "SurveyType",
     "classify_survey_type",
+    "IntervalIndex",
+    "MetadataIndex",
 ]
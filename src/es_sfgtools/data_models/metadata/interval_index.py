@@ -0,0 +1,363 @@
+"""
+Vectorized lookup of survey, transponder and TAT intervals.
+
+`Campaign.get_survey_by_datetime`, `Benchmark.get_transponder_by_datetime`
+and `Transponder.get_tat_by_datetime` answer one datetime at a time.
+`IntervalIndex` compiles a list of intervals once into sorted breakpoints
+so whole arrays of epoch times are labelled with one ``np.searchsorted``,
+and `MetadataIndex` builds those indexes from `Site` / `Campaign` metadata
+to label every shot of a shot data frame at once.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .benchmark import Benchmark, Transponder
+from .campaign import Campaign, Survey
+from .site import Site
+
+
+def to_epoch_seconds(dt: Optional[datetime], default: float) -> float:
+    """Convert a metadata datetime to epoch seconds; naive datetimes are UTC.
+
+    Parameters
+    ----------
+    dt : Optional[datetime]
+        The datetime to convert.
+    default : float
+        The value returned when ``dt`` is None, e.g. ``-np.inf`` for an
+        open start.
+
+    Returns
+    -------
+    float
+        The epoch seconds.
+    """
+    if dt is None:
+        return default
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def times_to_epoch_seconds(times: Any) -> np.ndarray:
+    """Convert an array of epoch seconds, datetime64 values or datetimes.
+
+    Parameters
+    ----------
+    times : array-like
+        Epoch seconds (e.g. ``pingTime``), datetime64 values or datetimes.
+        Naive datetimes are UTC.
+
+    Returns
+    -------
+    np.ndarray
+        The times as float epoch seconds.
+    """
+    if isinstance(times, pd.Series) and isinstance(
+        times.dtype, pd.DatetimeTZDtype
+    ):
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return times.astype("datetime64[ns]").astype(np.int64) / 1e9
+    if times.dtype == object:
+        return np.array([to_epoch_seconds(dt, np.nan) for dt in times], dtype=float)
+    return times.astype(float)
+
+
+class IntervalIndex:
+    """Closed ``[start, end]`` intervals compiled for vectorized lookup.
+
+    Lookups return the position of the first interval, in the order given,
+    that contains each time, matching the first-match loops of the
+    ``get_*_by_datetime`` methods. The intervals are split at every start
+    and end into elementary segments, each labelled once with its first
+    covering interval, so a lookup is a single binary search.
+
+    Parameters
+    ----------
+    starts : Sequence[float]
+        Interval starts in epoch seconds; ``-inf`` for an open start.
+    ends : Sequence[float]
+        Interval ends in epoch seconds (inclusive); ``inf`` for an open end.
+
+    Raises
+    ------
+    ValueError
+        If the starts and ends differ in length.
+    """
+
+    def __init__(self, starts: Sequence[float], ends: Sequence[float]):
+        starts = np.asarray(starts, dtype=float)
+        ends = np.asarray(ends, dtype=float)
+        if starts.shape != ends.shape:
+            raise ValueError(f"Got {starts.size} interval starts and {ends.size} ends")
+        # [start, end] is [start, next float after end)
+        stops = np.nextafter(ends, np.inf)
+        self.breakpoints = np.unique(np.concatenate((starts, stops)))
+        # One extra slot so the segment -1 before the first breakpoint is -1
+        self.segment_position = np.full(self.breakpoints.shape[0] + 1, -1)
+        # Later intervals first so the first covering interval wins
+        for position in range(starts.shape[0] - 1, -1, -1):
+            covered = (self.breakpoints >= starts[position]) & (
+                self.breakpoints < stops[position]
+            )
+            self.segment_position[:-1][covered] = position
+        self._n_intervals = starts.shape[0]
+
+    @classmethod
+    def from_datetimes(
+        cls, intervals: Sequence[Tuple[Optional[datetime], Optional[datetime]]]
+    ) -> "IntervalIndex":
+        """Build the index from ``(start, end)`` datetimes; None is open.
+
+        Parameters
+        ----------
+        intervals : Sequence[Tuple[Optional[datetime], Optional[datetime]]]
+            The intervals in lookup priority order.
+
+        Returns
+        -------
+        IntervalIndex
+            The compiled index.
+        """
+        starts = [to_epoch_seconds(start, -np.inf) for start, _ in intervals]
+        ends = [to_epoch_seconds(end, np.inf) for _, end in intervals]
+        return cls(starts, ends)
+
+    def __len__(self) -> int:
+        return self._n_intervals
+
+    def lookup(self, times: Any) -> np.ndarray:
+        """Find the interval containing each time.
+
+        Parameters
+        ----------
+        times : array-like
+            Epoch seconds, datetime64 values or datetimes.
+
+        Returns
+        -------
+        np.ndarray
+            The position of the first interval containing each time, or -1
+            where no interval (or a NaN time) matches.
+        """
+        times = times_to_epoch_seconds(times)
+        segment = np.searchsorted(self.breakpoints, times, side="right") - 1
+        return np.where(np.isnan(times), -1, self.segment_position[segment])
+
+
+def _take(values: np.ndarray, positions: np.ndarray, fill: Any) -> np.ndarray:
+    """Index ``values`` by interval positions, using ``fill`` for -1."""
+    out = np.append(values, np.array([fill], dtype=values.dtype))
+    return out[positions]
+
+
+class MetadataIndex:
+    """Survey, transponder and TAT intervals of a site compiled for lookup.
+
+    Build once with `from_site` or `from_campaign`, then label whole arrays
+    of ping times with `survey_ids`, or every row of a shot data frame with
+    `label_shotdata`.
+
+    Parameters
+    ----------
+    surveys : List[Survey]
+        The surveys, in lookup priority order.
+    benchmarks : List[Benchmark]
+        The benchmarks whose transponders are matched to ``transponderID``.
+    """
+
+    def __init__(self, surveys: List[Survey], benchmarks: List[Benchmark]):
+        self.surveys = list(surveys)
+        self.survey_index = IntervalIndex.from_datetimes(
+            [(survey.start, survey.end) for survey in self.surveys]
+        )
+        self._survey_ids = np.array(
+            [survey.id for survey in self.surveys], dtype=object
+        )
+
+        # Transponders by address, in benchmark order, with their TAT indexes
+        self.transponders: Dict[str, List[Tuple[Benchmark, Transponder]]] = {}
+        intervals: Dict[str, list] = {}
+        for benchmark in benchmarks:
+            for transponder in benchmark.transponders:
+                # A benchmark's only transponder is used at any time
+                if len(benchmark.transponders) == 1:
+                    interval = (None, None)
+                else:
+                    interval = (transponder.start, transponder.end)
+                address = str(transponder.address)
+                self.transponders.setdefault(address, []).append(
+                    (benchmark, transponder)
+                )
+                intervals.setdefault(address, []).append(interval)
+        self.transponder_index = {
+            address: IntervalIndex.from_datetimes(address_intervals)
+            for address, address_intervals in intervals.items()
+        }
+        self.tat_index: Dict[int, Tuple[IntervalIndex, np.ndarray]] = {}
+        for address_transponders in self.transponders.values():
+            for _, transponder in address_transponders:
+                self.tat_index[id(transponder)] = self._compile_tats(transponder)
+
+    @staticmethod
+    def _compile_tats(transponder: Transponder) -> Tuple[IntervalIndex, np.ndarray]:
+        # A single TAT is used at any time
+        if len(transponder.tat) == 1:
+            tat_intervals = [(None, None)]
+        else:
+            tat_intervals = [(tat.start, tat.end) for tat in transponder.tat]
+        values = np.array([tat.value for tat in transponder.tat], dtype=float)
+        return IntervalIndex.from_datetimes(tat_intervals), values
+
+    @classmethod
+    def from_campaign(
+        cls, campaign: Campaign, benchmarks: Optional[List[Benchmark]] = None
+    ) -> "MetadataIndex":
+        """Index the surveys of a campaign.
+
+        Parameters
+        ----------
+        campaign : Campaign
+            The campaign metadata.
+        benchmarks : List[Benchmark], optional
+            The site benchmarks used for transponder and TAT labels, by
+            default none.
+
+        Returns
+        -------
+        MetadataIndex
+            The compiled index.
+        """
+        return cls(campaign.surveys, benchmarks or [])
+
+    @classmethod
+    def from_site(
+        cls, site: Site, campaign_name: Optional[str] = None
+    ) -> "MetadataIndex":
+        """Index the surveys and benchmarks of a site.
+
+        Parameters
+        ----------
+        site : Site
+            The site metadata.
+        campaign_name : str, optional
+            Only index the surveys of this campaign, by default all
+            campaigns.
+
+        Returns
+        -------
+        MetadataIndex
+            The compiled index.
+
+        Raises
+        ------
+        ValueError
+            If ``campaign_name`` is not a campaign of the site.
+        """
+        campaigns = [
+            campaign
+            for campaign in site.campaigns
+            if campaign_name is None or campaign.name == campaign_name
+        ]
+        if campaign_name is not None and not campaigns:
+            raise ValueError(f"Campaign {campaign_name} not found in site metadata")
+        surveys = [survey for campaign in campaigns for survey in campaign.surveys]
+        return cls(surveys, site.benchmarks)
+
+    def survey_positions(self, times: Any) -> np.ndarray:
+        """Position in `surveys` of the survey containing each time, or -1."""
+        return self.survey_index.lookup(times)
+
+    def survey_ids(self, times: Any) -> np.ndarray:
+        """ID of the survey containing each time, or None.
+
+        Parameters
+        ----------
+        times : array-like
+            Epoch seconds (e.g. ``pingTime``), datetime64 values or
+            datetimes.
+
+        Returns
+        -------
+        np.ndarray
+            Object array of survey IDs.
+        """
+        return _take(self._survey_ids, self.survey_positions(times), None)
+
+    def transponder_labels(
+        self, transponder_ids: Any, times: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Benchmark name and TAT of the transponder of each shot.
+
+        The transponder of a shot is the first transponder with its
+        ``transponderID`` address deployed at the shot time, as
+        `Benchmark.get_transponder_by_datetime`; its TAT is found as
+        `Transponder.get_tat_by_datetime`.
+
+        Parameters
+        ----------
+        transponder_ids : array-like
+            Transponder address of each shot.
+        times : array-like
+            Time of each shot.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Object array of benchmark names (None where unknown) and float
+            array of TATs in ms (NaN where unknown).
+        """
+        times = times_to_epoch_seconds(times)
+        # Hash the IDs once and only stringify the distinct ones
+        inverse, addresses = pd.factorize(np.asarray(transponder_ids))
+        benchmark_names = np.full(times.shape[0], None, dtype=object)
+        tats = np.full(times.shape[0], np.nan)
+        for k, address in enumerate(addresses.astype(str)):
+            if address not in self.transponder_index:
+                continue
+            rows = np.flatnonzero(inverse == k)
+            positions = self.transponder_index[address].lookup(times[rows])
+            for position, (benchmark, transponder) in enumerate(
+                self.transponders[address]
+            ):
+                matched = rows[positions == position]
+                if matched.size == 0:
+                    continue
+                benchmark_names[matched] = benchmark.name
+                tat_index, tat_values = self.tat_index[id(transponder)]
+                tat_positions = tat_index.lookup(times[matched])
+                tats[matched] = _take(tat_values, tat_positions, np.nan)
+        return benchmark_names, tats
+
+    def label_shotdata(
+        self, df: pd.DataFrame, time_column: str = "pingTime"
+    ) -> pd.DataFrame:
+        """Label every shot with its survey, benchmark and TAT.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Shot data with ``time_column`` and, for the benchmark and TAT
+            labels, ``transponderID`` columns.
+        time_column : str, optional
+            The column of shot times, by default "pingTime".
+
+        Returns
+        -------
+        pd.DataFrame
+            A copy of ``df`` with ``surveyID``, ``benchmarkName`` and ``tat``
+            columns; unmatched shots are None / NaN.
+        """
+        times = times_to_epoch_seconds(df[time_column])
+        labels = {"surveyID": self.survey_ids(times)}
+        if "transponderID" in df.columns:
+            labels["benchmarkName"], labels["tat"] = self.transponder_labels(
+                df["transponderID"], times
+            )
+        return df.assign(**labels)
@@ -22,7 +22,11 @@ from .load_utils import load_lib
 try:
     LIB_DIRECTORY, LIB_RAYTRACE = load_lib()
 except Exception:
-    from garpos import LIB_DIRECTORY, LIB_RAYTRACE
+    try:
+        from garpos import LIB_DIRECTORY, LIB_RAYTRACE
+    except ImportError:
+        # GARPOS is only needed to run inversions, not to build their inputs
+        LIB_DIRECTORY, LIB_RAYTRACE = None, None
 
 
 class GPPositionLLH(BaseModel):
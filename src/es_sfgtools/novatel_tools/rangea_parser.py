@@ -14,8 +14,9 @@ import datetime
 from enum import IntEnum
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 from pydantic import BaseModel, Field, computed_field
 
 
@@ -345,6 +346,11 @@ def deserialize_rangea(rangea_string: str) -> GNSSEpoch:
     """
     Parse a NovAtel RANGEA ASCII log string into an Epoch object.
 
+    The Pydantic epoch tree is intended for inspecting and debugging single
+    messages. Bulk ingest should use `decode_rangea_batch`, which produces the
+    columnar buffers written to TileDB without building any Python objects
+    per observation.
+
     This function is the Python equivalent of the Go code:
         rangea, err := novatelascii.DeserializeRANGEA(m.Data)
         epoch, err := rangea.SerializeGNSSEpoch(m.Time())
@@ -467,6 +473,249 @@ def deserialize_rangea(rangea_string: str) -> GNSSEpoch:
     return epoch
 
 
+# Columns of the GNSS observation TileDB array, in schema order
+GNSS_OBS_COLUMNS: Tuple[str, ...] = (
+    "time",
+    "sys",
+    "sat",
+    "obs",
+    "range",
+    "phase",
+    "doppler",
+    "snr",
+    "slip",
+    "flags",
+    "fcn",
+)
+GNSS_OBS_DTYPES: Dict[str, type] = {
+    "time": np.int64,
+    "sys": np.uint8,
+    "sat": np.uint8,
+    "obs": np.uint16,
+    "range": np.float64,
+    "phase": np.float64,
+    "doppler": np.float64,
+    "snr": np.float32,
+    "slip": np.uint16,
+    "flags": np.uint16,
+    "fcn": np.int8,
+}
+_FIELDS_PER_OBS = 10
+_GPS_EPOCH_UNIX_US = int(GPS_EPOCH.timestamp()) * 1_000_000
+_VALID_SYSTEMS = np.array([e.value for e in GNSSSystem])
+
+
+def empty_gnss_obs_columns() -> Dict[str, np.ndarray]:
+    """Return zero-length GNSS observation buffers with the array dtypes."""
+    return {
+        name: np.array([], dtype=GNSS_OBS_DTYPES[name]) for name in GNSS_OBS_COLUMNS
+    }
+
+
+def _cast_column(name: str, values) -> np.ndarray:
+    """
+    Cast a GNSS observation column to its array dtype.
+
+    Out-of-range integers wrap (e.g. 32-bit tracking status words stored as
+    uint16 flags) and floats are truncated toward zero before integer casts.
+    """
+    dtype = np.dtype(GNSS_OBS_DTYPES[name])
+    values = np.asarray(values)
+    if dtype.kind in "iu" and values.dtype.kind == "f":
+        values = values.astype(np.int64)
+    return values.astype(dtype)
+
+
+def _gps_to_unix_ms(
+    gps_week: np.ndarray, gps_seconds: np.ndarray, leap_seconds: int = GPS_LEAP_SECONDS
+) -> np.ndarray:
+    """
+    Vectorized GPS week/seconds to UTC milliseconds since the Unix epoch.
+
+    Reproduces ``int(_gps_to_utc(week, seconds).timestamp() * 1000)``
+    bit-for-bit: the offset is rounded to microseconds as ``timedelta`` does,
+    and the final millisecond value is truncated.
+    """
+    total_seconds = gps_week * 604800 + gps_seconds - leap_seconds
+    unix_us = _GPS_EPOCH_UNIX_US + np.round(total_seconds * 1e6).astype(np.int64)
+    return (unix_us / 1e6 * 1000).astype(np.int64)
+
+
+def _parse_hex_status(tokens: List[str]) -> np.ndarray:
+    """Parse hex tracking status words into uint32 values."""
+    joined = "".join(tokens)
+    if len(joined) == 8 * len(tokens):
+        # Every word is 8 hex digits: decode them all as big-endian uint32
+        return np.frombuffer(bytes.fromhex(joined), dtype=">u4").astype(np.uint32)
+    return np.array([int(t, 16) for t in tokens], dtype=np.uint32)
+
+
+def _parse_observation_fields(tokens: List[str]) -> Tuple[np.ndarray, ...]:
+    """
+    Convert flattened RANGEA observation tokens into column arrays.
+
+    Columns are taken with strided list slices and converted with the C
+    ``float``/``int`` parsers, avoiding NumPy's slow string-array casts.
+
+    Returns:
+        Tuple of (prn, glo_freq, numeric, status) where numeric has shape
+        (n_obs, 7) holding psr, psr_std, adr, adr_std, dopp, cn0, locktime.
+    """
+    n_obs = len(tokens) // _FIELDS_PER_OBS
+    prn = np.fromiter(map(int, tokens[0::_FIELDS_PER_OBS]), np.int64, n_obs)
+    glo_freq = np.fromiter(map(int, tokens[1::_FIELDS_PER_OBS]), np.int64, n_obs)
+    numeric = np.empty((n_obs, 7), dtype=np.float64)
+    for col in range(7):
+        numeric[:, col] = np.fromiter(
+            map(float, tokens[col + 2 :: _FIELDS_PER_OBS]), np.float64, n_obs
+        )
+    status = _parse_hex_status(tokens[9::_FIELDS_PER_OBS])
+    return prn, glo_freq, numeric, status
+
+
+def _valid_observation_rows(tokens: List[str]) -> np.ndarray:
+    """Flag observation rows whose fields all parse; used only on malformed input."""
+    n_obs = len(tokens) // _FIELDS_PER_OBS
+    valid = np.ones(n_obs, dtype=bool)
+    for row_idx in range(n_obs):
+        row = tokens[row_idx * _FIELDS_PER_OBS : (row_idx + 1) * _FIELDS_PER_OBS]
+        try:
+            int(row[0]), int(row[1]), int(row[9], 16)
+            [float(v) for v in row[2:9]]
+        except ValueError:
+            valid[row_idx] = False
+    return valid
+
+
+def decode_rangea_batch(rangea_strings: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Decode many NovAtel RANGEA ASCII logs into columnar GNSS observation buffers.
+
+    This is the bulk equivalent of `deserialize_rangea` followed by the
+    flattening in ``TDBGNSSObsArray.write_epochs``. Strings are split once per
+    message; numeric fields are converted column-wise and the channel
+    tracking status is decoded with vectorized bit operations, so no Python
+    objects are created per observation.
+
+    Messages that fail to parse are skipped, as are individual malformed
+    observations. Duplicate (time, sys, sat, obs) rows are not removed here.
+
+    Args:
+        rangea_strings: Iterable of complete RANGEA ASCII log strings
+
+    Returns:
+        Dictionary of NumPy arrays keyed by `GNSS_OBS_COLUMNS`, with the dtypes
+        of the GNSS observation TileDB array.
+    """
+    gps_weeks: List[int] = []
+    gps_seconds: List[float] = []
+    obs_counts: List[int] = []
+    tokens: List[str] = []
+
+    for rangea_string in rangea_strings:
+        if not rangea_string or "#RANGEA" not in rangea_string:
+            continue
+        parts = rangea_string.split("*")[0].split(";")
+        if len(parts) != 2:
+            continue
+        try:
+            gps_week, gps_second, _ = _parse_header(parts[0])
+            data_fields = parts[1].split(",")
+            num_obs = min(
+                int(data_fields[0]), (len(data_fields) - 1) // _FIELDS_PER_OBS
+            )
+        except ValueError:
+            continue
+        if num_obs <= 0:
+            continue
+        gps_weeks.append(gps_week)
+        gps_seconds.append(gps_second)
+        obs_counts.append(num_obs)
+        tokens.extend(data_fields[1 : 1 + num_obs * _FIELDS_PER_OBS])
+
+    if not tokens:
+        return empty_gnss_obs_columns()
+
+    epoch_ms = _gps_to_unix_ms(
+        np.array(gps_weeks, dtype=np.int64), np.array(gps_seconds, dtype=np.float64)
+    )
+    time_ms = np.repeat(epoch_ms, obs_counts)
+
+    try:
+        prn, glo_freq, numeric, status = _parse_observation_fields(tokens)
+    except ValueError:
+        valid = _valid_observation_rows(tokens)
+        tokens = [
+            token
+            for row_idx in np.flatnonzero(valid)
+            for token in tokens[
+                row_idx * _FIELDS_PER_OBS : (row_idx + 1) * _FIELDS_PER_OBS
+            ]
+        ]
+        time_ms = time_ms[valid]
+        prn, glo_freq, numeric, status = _parse_observation_fields(tokens)
+
+    status = status.astype(np.int64)
+    system = (status >> 16) & 0x1F
+    system = np.where(np.isin(system, _VALID_SYSTEMS), system, GNSSSystem.GPS.value)
+    signal_type = (status >> 21) & 0x1F
+    fcn = np.where(system == GNSSSystem.GLONASS.value, glo_freq, 0)
+
+    # numeric holds psr, psr_std, adr, adr_std, dopp, cn0, locktime
+    columns = {
+        "time": time_ms,
+        "sys": system,
+        "sat": prn,
+        "obs": signal_type,
+        "range": numeric[:, 0],
+        "phase": numeric[:, 2],
+        "doppler": numeric[:, 4],
+        "snr": numeric[:, 5],
+        "slip": numeric[:, 6],
+        "flags": status,
+        "fcn": fcn,
+    }
+    return {name: _cast_column(name, values) for name, values in columns.items()}
+
+
+def epochs_to_columns(epochs: Iterable[GNSSEpoch]) -> Dict[str, np.ndarray]:
+    """
+    Flatten GNSSEpoch objects into columnar GNSS observation buffers.
+
+    Args:
+        epochs: Iterable of GNSSEpoch objects, e.g. from `deserialize_rangea`
+
+    Returns:
+        Dictionary of NumPy arrays keyed by `GNSS_OBS_COLUMNS`.
+    """
+    rows = []
+    for epoch in epochs:
+        epoch_time_ms = int(epoch.time.timestamp() * 1000)
+        for sat in epoch.satellites.values():
+            for obs in sat.observations.values():
+                rows.append(
+                    (
+                        epoch_time_ms,
+                        sat.system.value,
+                        sat.prn,
+                        obs.signal_type,
+                        obs.pseudorange,
+                        obs.carrier_phase,
+                        obs.doppler,
+                        obs.cn0,
+                        obs.locktime,
+                        obs.tracking_status,
+                        sat.fcn,
+                    )
+                )
+    if not rows:
+        return empty_gnss_obs_columns()
+    return {
+        name: _cast_column(name, values)
+        for name, values in zip(GNSS_OBS_COLUMNS, zip(*rows))
+    }
+
+
 def extract_rangea_from_qcpin(source: str | Path) -> List[GNSSEpoch]:
     """
     Extract and parse all RANGEA logs from a QC PIN file.
@@ -50,6 +50,10 @@ class PrideResidualsConfig(BaseModel):
     max_residual_mm: float = Field(
         8.0, description="Maximum PRIDE residual in millimeters to keep a shot"
     )
+    time_buffer_s: float = Field(
+        1.0,
+        description="Buffer in seconds before/after each high residual epoch to exclude",
+    )
 
 
 class FilterConfig(BaseModel):
@@ -1,16 +1,30 @@
 from datetime import datetime, timezone
-from typing import Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Union
 import numpy as np
 import pandas as pd
-import pymap3d as pm
+import tiledb
 
 from es_sfgtools.data_models.metadata import Site, SurveyType, classify_survey_type
 from es_sfgtools.logging import GarposLogger as logger
-from es_sfgtools.tiledb_tools.tiledb_schemas import TDBKinPositionArray
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    TDBKinPositionArray,
+    datetime64_to_epoch_seconds,
+)
 from es_sfgtools.utils.model_update import validate_and_merge_config
 
 from .schemas import FilterLevel, FilterConfig
 
+if TYPE_CHECKING:
+    from es_sfgtools.modeling.garpos_tools.functions import CoordTransformer
+
+# Acoustic diagnostics thresholds of each filter level
+ACOUSTIC_THRESHOLDS = {
+    FilterLevel.GOOD: dict(snr_min=20, dbv_min=-26, dbv_max=-3, xc_min=60),
+    FilterLevel.OK: dict(snr_min=12, dbv_min=-36, dbv_max=-3, xc_min=45),
+    FilterLevel.DIFFICULT: dict(snr_min=12, dbv_min=-36, dbv_max=-3, xc_min=45),
+}
+
 
 def filter_shotdata(
     survey_type: Union[str, SurveyType],
@@ -39,6 +53,8 @@ def filter_shotdata(
         The start time of the survey.
     end_time : datetime
         The end time of the survey.
+    base_config : FilterConfig, optional
+        The filter configuration, by default ``FilterConfig()``.
     custom_filters : dict, optional
         Custom filters to apply.
 
@@ -48,11 +64,8 @@ def filter_shotdata(
         The filtered shot data.
     """
 
-    if base_config is None:
-        filter_config = FilterConfig()
-
     initial_count = len(shot_data)
-    new_shot_data_df = shot_data.copy()
+    filter_config = base_config if base_config is not None else FilterConfig()
 
     if custom_filters:
         filter_config = validate_and_merge_config(
@@ -60,32 +73,39 @@ def filter_shotdata(
         )
         logger.loginfo(f"Using custom filter configuration: {filter_config}")
 
+    # Each stage contributes a mask aligned to shot_data; the frame is
+    # indexed once with their intersection
+    keep = pd.Series(True, index=shot_data.index)
+
+    def apply_stage(mask: pd.Series, description: str) -> None:
+        nonlocal keep
+        logger.loginfo(f"Removed {int((keep & ~mask).sum())} records {description}")
+        keep = keep & mask
+
     """
     Apply acoustic diagnostics filtering. This is based on the SNR, DBV, and XC thresholds.
     """
     acoustic_config = filter_config.acoustic_filters
     if acoustic_config.enabled:
-        level = acoustic_config.level
-        match level:
-            case FilterLevel.GOOD:
-                new_shot_data_df = good_acoustic_diagnostics(new_shot_data_df)
-            case FilterLevel.OK:
-                new_shot_data_df = ok_acoustic_diagnostics(new_shot_data_df)
-            case FilterLevel.DIFFICULT:
-                new_shot_data_df = difficult_acoustic_diagnostics(new_shot_data_df)
-            case _:
-                logger.loginfo(
-                    "No acoustic filtering applied, using original shot data"
-                )
+        thresholds = ACOUSTIC_THRESHOLDS.get(acoustic_config.level)
+        if thresholds is None:
+            logger.loginfo("No acoustic filtering applied, using original shot data")
+        else:
+            apply_stage(
+                get_acoustic_diagnostics_mask(shot_data, **thresholds),
+                f"outside {acoustic_config.level.value} acoustic diagnostics",
+            )
 
     """
     Apply ping replies filtering. This is based on the minimum number of replies.
+    Replies are counted after the acoustic filtering.
     """
     ping_replies_config = filter_config.ping_replies
     if ping_replies_config.enabled:
         min_replies = ping_replies_config.min_replies
-        new_shot_data_df = filter_ping_replies(
-            new_shot_data_df, min_replies=min_replies
+        apply_stage(
+            get_ping_replies_mask(shot_data, min_replies=min_replies, keep=keep),
+            f"of pings with < {min_replies} replies",
         )
 
     """
@@ -94,24 +114,34 @@ def filter_shotdata(
     if survey_type == SurveyType.CENTER:
         max_distance = filter_config.max_distance_from_center
         if max_distance.enabled:
-            new_shot_data_df = filter_wg_distance_from_center(
-                df=new_shot_data_df,
-                array_center_lat=site.arrayCenter.latitude,
-                array_center_lon=site.arrayCenter.longitude,
-                max_distance_m=max_distance.max_distance_m,
+            apply_stage(
+                get_wg_distance_mask(
+                    shot_data,
+                    array_center_lat=site.arrayCenter.latitude,
+                    array_center_lon=site.arrayCenter.longitude,
+                    max_distance_m=max_distance.max_distance_m,
+                ),
+                f"> {max_distance.max_distance_m}m horizontal distance from "
+                "array center",
             )
     """
     Apply PRIDE residuals filtering. This removes shots with high PRIDE residuals.
     """
     if filter_config.pride_residuals.enabled:
-        new_shot_data_df = filter_pride_residuals(
-            df=new_shot_data_df,
-            kinPostionTDBUri=kinPostionTDBUri,
-            start_time=start_time.replace(tzinfo=timezone.utc),
-            end_time=end_time.replace(tzinfo=timezone.utc),
-            max_wrms=filter_config.pride_residuals.max_residual_mm,
+        max_wrms = filter_config.pride_residuals.max_residual_mm
+        apply_stage(
+            get_pride_residuals_mask(
+                shot_data,
+                kinPostionTDBUri=kinPostionTDBUri,
+                start_time=start_time.replace(tzinfo=timezone.utc),
+                end_time=end_time.replace(tzinfo=timezone.utc),
+                max_wrms=max_wrms,
+                time_buffer_seconds=filter_config.pride_residuals.time_buffer_s,
+            ),
+            f"due to high WRMS (>{max_wrms}mm) in Pride PPP data",
         )
 
+    new_shot_data_df = shot_data[keep].copy()
     filtered_count = len(new_shot_data_df)
     logger.loginfo(
         f"Filtered {initial_count - filtered_count} records from shot data based on filtering criteria: {filter_config}"
@@ -120,11 +150,82 @@ def filter_shotdata(
     return new_shot_data_df
 
 
+@lru_cache(maxsize=64)
+def get_enu_transformer(
+    latitude: float, longitude: float, elevation: float = 0.0
+) -> "CoordTransformer":
+    """
+    Return a cached ENU transformer centered on a station's array center.
+
+    Parameters
+    ----------
+    latitude : float
+        Latitude of the array center in degrees.
+    longitude : float
+        Longitude of the array center in degrees.
+    elevation : float, default 0.0
+        Height of the array center in meters.
+
+    Returns
+    -------
+    CoordTransformer
+        The transformer, shared between calls with the same center.
+    """
+    # Imported here so prefiltering does not pull in the GARPOS plotting stack
+    from es_sfgtools.modeling.garpos_tools.functions import CoordTransformer
+
+    return CoordTransformer(latitude, longitude, elevation)
+
+
+def get_wg_distance_mask(
+    df: pd.DataFrame,
+    array_center_lat: float,
+    array_center_lon: float,
+    max_distance_m: float = 150,
+    transformer: Optional["CoordTransformer"] = None,
+) -> pd.Series:
+    """
+    Flag shots where the waveglider is within ``max_distance_m`` of the array center.
+
+    The distance is measured horizontally in the local ENU frame of the array
+    center.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with shotdata; ``east0``, ``north0`` and ``up0`` are ECEF
+        coordinates in meters.
+    array_center_lat : float
+        Latitude of the array center.
+    array_center_lon : float
+        Longitude of the array center.
+    max_distance_m : float, optional
+        Maximum distance from center in meters, by default 150.
+    transformer : CoordTransformer, optional
+        Precomputed transformer for the array center. Defaults to the cached
+        sea-level transformer from `get_enu_transformer`.
+
+    Returns
+    -------
+    pd.Series
+        Boolean mask indexed like ``df`` that is True for shots to keep.
+    """
+    if transformer is None:
+        transformer = get_enu_transformer(array_center_lat, array_center_lon)
+    east, north, _ = transformer.ECEF2ENU_vec(
+        df["east0"].to_numpy(dtype=np.float64),
+        df["north0"].to_numpy(dtype=np.float64),
+        df["up0"].to_numpy(dtype=np.float64),
+    )
+    return pd.Series(np.hypot(east, north) <= max_distance_m, index=df.index)
+
+
 def filter_wg_distance_from_center(
     df: pd.DataFrame,
     array_center_lat: float,
     array_center_lon: float,
     max_distance_m: float = 150,
+    transformer: Optional["CoordTransformer"] = None,
 ) -> pd.DataFrame:
     """
     Remove data where waveglider is > x meters from array center. Typically used for center surveys.
@@ -139,38 +240,26 @@ def filter_wg_distance_from_center(
         Longitude of the array center.
     max_distance_m : float, optional
         Maximum distance from center in meters, by default 150.
+    transformer : CoordTransformer, optional
+        Precomputed transformer for the array center, see `get_wg_distance_mask`.
 
     Returns
     -------
     pd.DataFrame
         Filtered DataFrame.
     """
-    # Convert array center lat/lon to ECEF coordinates (assuming sea level)
-    center_x, center_y, center_z = pm.geodetic2ecef(
-        lat=array_center_lat, lon=array_center_lon, alt=0
+    keep = get_wg_distance_mask(
+        df,
+        array_center_lat=array_center_lat,
+        array_center_lon=array_center_lon,
+        max_distance_m=max_distance_m,
+        transformer=transformer,
     )
-
-    def calc_horizontal_distance(row):
-        # Calculate horizontal distance only (ignore Z/up component)
-        dx = row["east0"] - center_x
-        dy = row["north0"] - center_y
-
-        horizontal_distance = np.sqrt(dx**2 + dy**2)
-        return horizontal_distance
-
-    # Calculate horizontal distance from center for each row
-    df = df.copy()
-    df["distance_from_center"] = df.apply(calc_horizontal_distance, axis=1)
-
-    # Filter data
-    filtered_df = df[df["distance_from_center"] <= max_distance_m].copy()
+    filtered_df = df[keep].copy()
 
     logger.loginfo(
         f"Removed {len(df) - len(filtered_df)} records > {max_distance_m}m horizontal distance from array center"
     )
-
-    # Drop the temporary column if you don't want to keep it
-    filtered_df = filtered_df.drop("distance_from_center", axis=1)
     return filtered_df
 
 
@@ -303,6 +392,45 @@ def filter_acoustic_diagnostics(df, snr_min=12, dbv_min=-36, dbv_max=-3, xc_min=
     return df
 
 
+def get_acoustic_diagnostics_mask(
+    df: pd.DataFrame, snr_min=12, dbv_min=-36, dbv_max=-3, xc_min=45
+) -> pd.Series:
+    """
+    Flag shots whose acoustic diagnostics (SNR, DBV, XC) are within thresholds.
+
+    A diagnostic whose column is missing is not checked.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with shotdata.
+    snr_min : int, optional
+        Minimum SNR threshold.
+    dbv_min : int, optional
+        Minimum DBV threshold.
+    dbv_max : int, optional
+        Maximum DBV threshold.
+    xc_min : int, optional
+        Minimum XC threshold.
+
+    Returns
+    -------
+    pd.Series
+        Boolean mask indexed like ``df`` that is True for shots to keep.
+    """
+    keep = pd.Series(True, index=df.index)
+    for column, within in (
+        ("snr", lambda x: x >= snr_min),
+        ("dbv", lambda x: (x >= dbv_min) & (x <= dbv_max)),
+        ("xc", lambda x: x >= xc_min),
+    ):
+        if column not in df.columns:
+            logger.logerr(f"{column.upper()} column not found, skipping filter")
+            continue
+        keep &= within(df[column])
+    return keep
+
+
 def good_acoustic_diagnostics(df):
     """
     Filter for "good" level acoustic diagnostics.
@@ -312,9 +440,7 @@ def good_acoustic_diagnostics(df):
     :return: Filtered DataFrame with "good" acoustic diagnostics.
     :rtype: pd.DataFrame
     """
-    return filter_acoustic_diagnostics(
-        df, snr_min=20, dbv_min=-26, dbv_max=-3, xc_min=60
-    )
+    return filter_acoustic_diagnostics(df, **ACOUSTIC_THRESHOLDS[FilterLevel.GOOD])
 
 
 def ok_acoustic_diagnostics(df):
@@ -326,9 +452,7 @@ def ok_acoustic_diagnostics(df):
     :return: Filtered DataFrame with "ok" level acoustic diagnostics.
     :rtype: pd.DataFrame
     """
-    return filter_acoustic_diagnostics(
-        df, snr_min=12, dbv_min=-36, dbv_max=-3, xc_min=45
-    )
+    return filter_acoustic_diagnostics(df, **ACOUSTIC_THRESHOLDS[FilterLevel.OK])
 
 
 def difficult_acoustic_diagnostics(df):
@@ -340,7 +464,40 @@ def difficult_acoustic_diagnostics(df):
     :return: Filtered DataFrame with "difficult" level acoustic diagnostics.
     :rtype: pd.DataFrame
     """
-    return filter_acoustic_diagnostics(df)
+    return filter_acoustic_diagnostics(
+        df, **ACOUSTIC_THRESHOLDS[FilterLevel.DIFFICULT]
+    )
+
+
+def get_ping_replies_mask(
+    df: pd.DataFrame, min_replies: int = 3, keep: Optional[pd.Series] = None
+) -> pd.Series:
+    """
+    Flag shots whose ping has at least ``min_replies`` replies.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with shotdata.
+    min_replies : int, default 3
+        Minimum number of replies required.
+    keep : pd.Series, optional
+        Mask of the shots left by earlier filter stages; only those replies
+        are counted. By default every shot is counted.
+
+    Returns
+    -------
+    pd.Series
+        Boolean mask indexed like ``df`` that is True for shots to keep.
+    """
+    if "pingTime" not in df.columns:
+        logger.logerr("pingTime column not found, skipping filter")
+        return pd.Series(True, index=df.index)
+
+    ping_times = df["pingTime"] if keep is None else df["pingTime"][keep]
+    ping_counts = ping_times.value_counts()
+    valid_ping_times = ping_counts.index[ping_counts >= min_replies]
+    return df["pingTime"].isin(valid_ping_times)
 
 
 def filter_ping_replies(df, min_replies=3):
@@ -358,16 +515,9 @@ def filter_ping_replies(df, min_replies=3):
         logger.logerr("pingTime column not found, skipping filter")
         return df
 
-    # Count replies per ping time
-    ping_counts = df["pingTime"].value_counts()
+    filtered_df = df[get_ping_replies_mask(df, min_replies=min_replies)].copy()
 
-    # Get ping times that have at least min_replies
-    valid_ping_times = ping_counts[ping_counts >= min_replies].index
-
-    # Filter dataframe to only include pings with enough replies
-    filtered_df = df[df["pingTime"].isin(valid_ping_times)].copy()
-
-    removed_pings = len(ping_counts) - len(valid_ping_times)
+    removed_pings = df["pingTime"].nunique() - filtered_df["pingTime"].nunique()
     removed_records = len(df) - len(filtered_df)
 
     logger.loginfo(
@@ -377,8 +527,149 @@ def filter_ping_replies(df, min_replies=3):
     return filtered_df
 
 
+def merge_exclusion_intervals(
+    times: np.ndarray, buffer_seconds: float = 1.0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build sorted, non-overlapping exclusion intervals around a set of times.
+
+    Each time ``t`` excludes ``[t - buffer_seconds, t + buffer_seconds]``;
+    overlapping or touching windows are coalesced into a single interval.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Times to exclude around [s]. NaN values are ignored.
+    buffer_seconds : float, default 1.0
+        Half-width of the exclusion window [s].
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The interval start and end times [s], both sorted ascending.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    times = np.sort(times[~np.isnan(times)])
+    if times.size == 0:
+        return np.array([]), np.array([])
+
+    starts = times - buffer_seconds
+    ends = times + buffer_seconds
+    # A new interval begins wherever a window starts after every earlier one ended
+    running_end = np.maximum.accumulate(ends)
+    is_new = np.empty(times.size, dtype=bool)
+    is_new[0] = True
+    is_new[1:] = starts[1:] > running_end[:-1]
+    group_end = np.append(np.flatnonzero(is_new)[1:], times.size) - 1
+    return starts[is_new], running_end[group_end]
+
+
+def exclusion_mask(
+    times: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> np.ndarray:
+    """
+    Flag the times that fall outside of every exclusion interval.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Times to test [s].
+    starts : np.ndarray
+        Sorted, non-overlapping interval start times [s], as returned by
+        `merge_exclusion_intervals`.
+    ends : np.ndarray
+        Matching interval end times [s]. Both ends are inclusive.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask that is True for times to keep.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if starts.size == 0:
+        return np.ones(times.shape, dtype=bool)
+    # Index of the last interval starting at or before each time
+    idx = np.searchsorted(starts, times, side="right") - 1
+    excluded = (idx >= 0) & (times <= ends[np.clip(idx, 0, None)])
+    return ~excluded
+
+
+def get_pride_residuals_mask(
+    df: pd.DataFrame,
+    kinPostionTDBUri: str,
+    start_time: datetime,
+    end_time: datetime,
+    max_wrms: float = 15,
+    time_buffer_seconds: float = 1.0,
+) -> pd.Series:
+    """
+    Flag shots that are not within ``time_buffer_seconds`` of a high WRMS epoch.
+
+    The mask is aligned to ``df`` so it can be combined with other filter
+    stages before any rows are dropped.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with shotdata.
+    kinPostionTDBUri : str
+        URI for the KinPosition tileDB array.
+    start_time : datetime
+        Start time for filtering.
+    end_time : datetime
+        End time for filtering.
+    max_wrms : float, default 15
+        Maximum WRMS threshold in millimeters.
+    time_buffer_seconds : float, default 1.0
+        Buffer before/after each high WRMS epoch [s].
+
+    Returns
+    -------
+    pd.Series
+        Boolean mask indexed like ``df`` that is True for shots to keep.
+    """
+    keep = pd.Series(True, index=df.index)
+
+    # Only read the times of high WRMS epochs; the threshold is applied by TileDB
+    pride_data = TDBKinPositionArray(kinPostionTDBUri)
+    try:
+        ppp_data = pride_data.read_df(
+            start=start_time,
+            end=end_time,
+            attrs=["wrms"],
+            cond=f"wrms > {float(max_wrms)}",
+            raw=True,
+        )
+    except tiledb.TileDBError as e:
+        logger.logerr(
+            f"WRMS could not be read from Pride data ({e}), skipping residual filter"
+        )
+        return keep
+
+    # Pride PPP times as Unix timestamps to match pingTime format
+    high_wrms_times = ppp_data["time"]
+    if high_wrms_times.size == 0:
+        logger.loginfo(f"No Pride PPP data exceeds WRMS threshold of {max_wrms}mm")
+        return keep
+
+    starts, ends = merge_exclusion_intervals(
+        datetime64_to_epoch_seconds(high_wrms_times), time_buffer_seconds
+    )
+    logger.loginfo(
+        f"Merged {len(high_wrms_times)} high WRMS epochs into {len(starts)} "
+        f"exclusion ranges with ±{time_buffer_seconds}s buffer"
+    )
+    keep[:] = exclusion_mask(df["pingTime"].to_numpy(), starts, ends)
+    return keep
+
+
 def filter_pride_residuals(
-    df, kinPostionTDBUri: str, start_time: datetime, end_time: datetime, max_wrms=15
+    df,
+    kinPostionTDBUri: str,
+    start_time: datetime,
+    end_time: datetime,
+    max_wrms=15,
+    time_buffer_seconds: float = 1.0,
 ):
     """
     Filter Pride PPP data based on wrms residuals in position tileDB array.
@@ -393,69 +684,24 @@ def filter_pride_residuals(
     :type end_time: datetime
     :param max_wrms: Maximum WRMS threshold in millimeters. Defaults to 15.
     :type max_wrms: int, optional
+    :param time_buffer_seconds: Buffer before/after each high WRMS epoch. Defaults to 1.
+    :type time_buffer_seconds: float, optional
     :return: Filtered DataFrame.
     :rtype: pd.DataFrame
     """
-
-    # Convert tileDB array to dataframe
-    pride_data = TDBKinPositionArray(kinPostionTDBUri)
-    ppp_df = pride_data.read_df(start=start_time, end=end_time)
-    if ppp_df.empty:
-        logger.logerr("No Pride PPP data found, skipping residual filter")
-        return df
-
-    # Check if wrms column exists
-    if "wrms" not in ppp_df.columns:
-        logger.logerr("WRMS column not found in Pride data, skipping residual filter")
-        return df
-
-    # Filter Pride data for high WRMS values
-    high_wrms_times = ppp_df[ppp_df["wrms"] > max_wrms]["time"].tolist()
-
-    if not high_wrms_times:
-        logger.loginfo(f"No Pride PPP data exceeds WRMS threshold of {max_wrms}mm")
-        return df
-
-    # Convert Pride PPP datetime to Unix timestamp to match pingTime format
-    high_wrms_unix_times = []
-    for bad_time in high_wrms_times:
-        if pd.isna(bad_time):
-            continue
-        # Convert datetime to Unix timestamp
-        unix_timestamp = bad_time.timestamp()
-        high_wrms_unix_times.append(unix_timestamp)
-
-    # Create exclusion time ranges using Unix timestamps
-    exclusion_ranges = []
-    time_buffer_seconds = 1  # 1 second buffer before/after
-
-    for bad_unix_time in high_wrms_unix_times:
-        exclusion_ranges.append(
-            {
-                "start": bad_unix_time - time_buffer_seconds,
-                "end": bad_unix_time + time_buffer_seconds,
-            }
-        )
-
-    # Filter shot data - remove shots that fall within any exclusion range
     initial_count = len(df)
-    mask = pd.Series(True, index=df.index)  # Start with all True
-
-    for time_range in exclusion_ranges:
-        # Mark shots within this exclusion range as False (pingTime is Unix timestamp)
-        in_range = (df["pingTime"] >= time_range["start"]) & (
-            df["pingTime"] <= time_range["end"]
-        )
-        mask = mask & ~in_range  # Remove shots in this range
-
-    filtered_df = df[mask].copy()
+    keep = get_pride_residuals_mask(
+        df,
+        kinPostionTDBUri=kinPostionTDBUri,
+        start_time=start_time,
+        end_time=end_time,
+        max_wrms=max_wrms,
+        time_buffer_seconds=time_buffer_seconds,
+    )
+    filtered_df = df[keep].copy()
 
     removed_count = initial_count - len(filtered_df)
     logger.loginfo(
         f"Removed {removed_count} shot records due to high WRMS (>{max_wrms}mm) in Pride PPP data"
     )
-    logger.loginfo(
-        f"Used {len(exclusion_ranges)} time exclusion ranges with ±1s buffer"
-    )
-
-    return filtered_df  # Return filtered_df instead of original df
+    return filtered_df
@@ -1,18 +1,27 @@
 from .sv3_operations import (
     dfop00_to_SFGDSTFSeafloorAcousticData,
     dfop00_to_shotdata,
+    iter_dfop00_shotdata,
     merge_interrogation_reply,
     novatelInterrogation_to_garpos_interrogation,
     novatelReply_to_garpos_reply,
 )
-from .sv3_qc_operations import qcjson_to_shotdata, batch_qc_by_day
+from .sv3_qc_operations import (
+    batch_qc_by_day,
+    qcjson_to_shotdata,
+    read_qcpin,
+    read_qcpin_batch,
+)
 
 __all__ = [
     "dfop00_to_SFGDSTFSeafloorAcousticData",
     "dfop00_to_shotdata",
+    "iter_dfop00_shotdata",
     "merge_interrogation_reply",
     "novatelInterrogation_to_garpos_interrogation",
     "novatelReply_to_garpos_reply",
     "qcjson_to_shotdata",
     "batch_qc_by_day",
+    "read_qcpin",
+    "read_qcpin_batch",
 ]
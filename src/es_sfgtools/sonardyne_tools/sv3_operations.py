@@ -2,13 +2,24 @@
 import json
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterator, List
 
+import numpy as np
 import pandas as pd
 import pymap3d as pm
 from pandera.typing import DataFrame
 
+# Decoder for SV3 JSON records, shared with sv3_qc_operations
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    # orjson is optional; the stdlib decoder produces identical objects
+    json_loads = json.loads
+
 from ..data_models.community_standards import SFGDSTFSeafloorAcousticData, SFGDTSFSite
-from ..data_models.constants import LEAP_SECONDS, TRIGGER_DELAY_SV3
+from ..data_models.constants import GNSS_START_TIME, LEAP_SECONDS, TRIGGER_DELAY_SV3
 
 # Local imports
 from ..data_models.log_models import SV3InterrogationData, SV3ReplyData
@@ -260,6 +271,290 @@ def dfop00_to_shotdata(source: str | Path) -> DataFrame[ShotDataFrame] | None:
     return ShotDataFrame.validate(df, lazy=True)
 
 
+# Columns collected per merged ping/reply by the streaming DFOP00 parser
+_STREAM_COLUMNS = (
+    "pingTime",
+    "head0",
+    "pitch0",
+    "roll0",
+    "latitude0",
+    "longitude0",
+    "hae0",
+    "east_std0",
+    "north_std0",
+    "up_std0",
+    "transponderID",
+    "returnTime",
+    "head1",
+    "pitch1",
+    "roll1",
+    "latitude1",
+    "longitude1",
+    "hae1",
+    "east_std1",
+    "north_std1",
+    "up_std1",
+    "range",
+    "tat",
+    "dbv",
+    "snr",
+    "xc",
+)
+_MIN_COMMON_TIME = GNSS_START_TIME.timestamp()
+
+
+def _in_range(value, low: float, high: float) -> float:
+    """Return ``value`` as a float, raising ValueError outside ``[low, high]``."""
+    value = float(value)
+    if not low <= value <= high:
+        raise ValueError(f"{value} outside [{low}, {high}]")
+    return value
+
+
+def _optional_std(value) -> float | None:
+    """Return a non-negative standard deviation or None."""
+    if value is None:
+        return None
+    value = float(value)
+    if value < 0:
+        raise ValueError(f"Negative standard deviation {value}")
+    return value
+
+
+def _scalar(value) -> float:
+    """Unwrap single-element diagnostic lists, as NovatelRangeDiagnosticData does."""
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    return float(value)
+
+
+def extract_pose(event: dict) -> tuple:
+    """
+    Extract the AHRS attitude, GNSS position/std and common time of an event.
+
+    Applies the same bounds as the ``NovatelAHRSData``, ``NovatelGNSSData``
+    and ``TimeData`` models for the fields used in the shot data, without
+    building the models.
+
+    Parameters
+    ----------
+    event : dict
+        A decoded interrogation or range event with ``observations`` and
+        ``time`` blocks.
+
+    Returns
+    -------
+    tuple
+        GPS time, heading, pitch, roll, latitude, longitude, height and
+        the three position standard deviations.
+
+    Raises
+    ------
+    KeyError, TypeError, ValueError
+        If a required field is missing or out of bounds.
+    """
+    observations = event["observations"]
+    ahrs = observations["AHRS"]
+    gnss = observations["GNSS"]
+    common_time = float(event["time"]["common"])
+    if common_time < _MIN_COMMON_TIME:
+        raise ValueError(f"Common time {common_time} before GNSS start time")
+    return (
+        common_time + LEAP_SECONDS,  # GPS time is ahead of UTC by 18 seconds
+        _in_range(ahrs["h"], 0, 360),
+        _in_range(ahrs["p"], -90, 90),
+        _in_range(ahrs["r"], -180, 180),
+        _in_range(gnss["latitude"], -90, 90),
+        _in_range(gnss["longitude"], -180, 180),
+        _in_range(gnss["hae"], -1000, 1000),
+        _optional_std(gnss["sdx"]),
+        _optional_std(gnss["sdy"]),
+        _optional_std(gnss["sdz"]),
+    )
+
+
+def extract_reply(event: dict) -> tuple:
+    """
+    Extract the fields of a range event needed to build a shot data row.
+
+    Parameters
+    ----------
+    event : dict
+        A decoded range event.
+
+    Returns
+    -------
+    tuple
+        The transponder ID, the `extract_pose` fields of the reply, then
+        range, turn around time (s), dbv, snr and xc.
+
+    Raises
+    ------
+    KeyError, TypeError, ValueError
+        If a required field is missing or out of bounds.
+    """
+    reply = event["range"]
+    transponder_id = str(reply["cn"])
+    if len(transponder_id) > 20:
+        raise ValueError(f"Transponder ID {transponder_id} too long")
+    tat = float(reply["tat"])
+    if tat < 0:
+        raise ValueError(f"Negative turn around time {tat}")
+    diag = reply["diag"]
+    return (
+        transponder_id,
+        *extract_pose(event),
+        float(reply["range"]),
+        tat / 1000.0,  # Convert from milliseconds to seconds
+        _scalar(diag["dbv"]),
+        _scalar(diag["snr"]),
+        _scalar(diag["xc"]),
+    )
+
+
+def rows_to_shotdata(rows: List[tuple], source: str | Path) -> pd.DataFrame | None:
+    """
+    Convert merged ping/reply rows into a validated ShotDataFrame.
+
+    ECEF conversion, travel time and the ping/reply consistency checks of
+    `merge_interrogation_reply` are applied to the whole batch at once.
+
+    Parameters
+    ----------
+    rows : List[tuple]
+        Interrogation `extract_pose` fields followed by `extract_reply`
+        fields, one tuple per ping/reply pair.
+    source : str | Path
+        The file the rows came from, for log messages.
+
+    Returns
+    -------
+    pd.DataFrame or None
+        The validated shot data, or None if no pair passed the checks.
+    """
+    batch = pd.DataFrame.from_records(rows, columns=_STREAM_COLUMNS)
+    for col in ("east_std0", "north_std0", "up_std0", "east_std1", "north_std1", "up_std1"):
+        batch[col] = batch[col].astype(np.float64)
+    for i in (0, 1):
+        (
+            batch[f"east{i}"],
+            batch[f"north{i}"],
+            batch[f"up{i}"],
+        ) = pm.geodetic2ecef(
+            batch[f"latitude{i}"].to_numpy(),
+            batch[f"longitude{i}"].to_numpy(),
+            batch[f"hae{i}"].to_numpy(),
+        )
+    batch["tt"] = batch["range"] - batch["tat"] - TRIGGER_DELAY_SV3
+
+    ping_time = batch["pingTime"].to_numpy()
+    return_time = batch["returnTime"].to_numpy()
+    range_ok = np.abs(batch["tt"] + batch["tat"] + TRIGGER_DELAY_SV3) > 1e-3
+    delay_ok = np.abs(return_time - ping_time) <= 15
+    return_ok = np.abs(ping_time + batch["tt"] + batch["tat"] - return_time) < 1e-6
+    merged_ok = (range_ok & delay_ok & return_ok).to_numpy()
+    if not merged_ok.all():
+        logger.logerr(
+            f"Dropped {int((~merged_ok).sum())} ping/reply pairs from {source} "
+            "that failed the merge consistency checks"
+        )
+    batch = batch.loc[merged_ok].drop(
+        columns=[
+            "latitude0",
+            "longitude0",
+            "hae0",
+            "latitude1",
+            "longitude1",
+            "hae1",
+            "range",
+        ]
+    )
+    if batch.empty:
+        return None
+    batch["isUpdated"] = False
+    return ShotDataFrame.validate(batch, lazy=True)
+
+
+def iter_dfop00_shotdata(
+    source: str | Path, batch_size: int = 10000
+) -> Iterator[DataFrame[ShotDataFrame]]:
+    """Stream a DFOP00-format file as ShotDataFrame batches.
+
+    The streaming counterpart of `dfop00_to_shotdata`: the file is read one
+    line at a time and each merged ping/reply pair is held only as a tuple
+    of the fields needed for the shot data, so memory is bounded by
+    ``batch_size`` rather than the file size. Only those fields are
+    validated; the remaining observation blocks (NOV_HEADING, NOV_INS,
+    NOV_RANGE) are not parsed into Pydantic models.
+
+    Parameters
+    ----------
+    source : str | Path
+        Path to the DFOP00-format file containing event data.
+    batch_size : int, optional
+        Number of merged ping/reply pairs per yielded batch, by default 10000.
+
+    Yields
+    ------
+    DataFrame[ShotDataFrame]
+        Validated shot data for up to ``batch_size`` ping/reply pairs.
+    """
+    good_parse_count_interrogation = 0
+    fail_parse_count_interrogation = 0
+    good_parse_count_reply = 0
+    fail_parse_count_reply = 0
+
+    interrogation = None
+    rows: List[tuple] = []
+    try:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json_loads(line)
+                except ValueError:
+                    continue
+                event = data.get("event")
+                if event == "interrogation":
+                    try:
+                        interrogation = extract_pose(data)
+                        good_parse_count_interrogation += 1
+                    except (KeyError, TypeError, ValueError):
+                        interrogation = None
+                        fail_parse_count_interrogation += 1
+                elif event == "range":
+                    try:
+                        transponder_id, *reply, range_, tat, dbv, snr, xc = (
+                            extract_reply(data)
+                        )
+                        good_parse_count_reply += 1
+                    except (KeyError, TypeError, ValueError):
+                        fail_parse_count_reply += 1
+                        continue
+                    if interrogation is None:
+                        continue
+                    rows.append(
+                        (*interrogation, transponder_id, *reply, range_, tat, dbv, snr, xc)
+                    )
+                    if len(rows) >= batch_size:
+                        shotdata = rows_to_shotdata(rows, source)
+                        rows = []
+                        if shotdata is not None:
+                            yield shotdata
+    except (FileNotFoundError, PermissionError, UnicodeDecodeError) as e:
+        logger.logerr(f"Error reading {source}: {e}")
+        return
+
+    if rows:
+        shotdata = rows_to_shotdata(rows, source)
+        if shotdata is not None:
+            yield shotdata
+
+    logger.loginfo(
+        f"Good parses - Interrogation: {good_parse_count_interrogation}, Reply: {good_parse_count_reply}. "
+        f"Fail parses - Interrogation: {fail_parse_count_interrogation}, Reply: {fail_parse_count_reply}."
+    )
+
+
 def dfop00_to_SFGDSTFSeafloorAcousticData(
     source: str | Path, siteData: SFGDTSFSite
 ) -> SFGDSTFSeafloorAcousticData | None:
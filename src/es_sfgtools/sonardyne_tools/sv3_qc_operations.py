@@ -1,6 +1,6 @@
 from pathlib import Path
 import json
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 import pandas as pd
 from pandera.typing import DataFrame
@@ -14,6 +14,10 @@ from es_sfgtools.data_models.sv3_models import (
 )
 from es_sfgtools.logging import ProcessLogger as logger
 from es_sfgtools.sonardyne_tools.sv3_operations import (
+    extract_pose,
+    extract_reply,
+    json_loads,
+    rows_to_shotdata,
     novatelInterrogation_to_garpos_interrogation,
     novatelReply_to_garpos_reply,
     merge_interrogation_reply,
@@ -106,6 +110,146 @@ def qcjson_to_shotdata(source: str | Path) -> DataFrame[ShotDataFrame] | None:
     return ShotDataFrame.validate(df, lazy=True)
 
 
+def _load_qcpin_json(path: Path) -> dict | None:
+    """Decode a QC PIN file, falling back to latin-1 if it is not valid UTF-8."""
+    try:
+        data = path.read_bytes()
+    except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
+        logger.logerr(f"Error reading QC JSON {path}: {e}")
+        return None
+    try:
+        raw = json_loads(data)
+    except ValueError:
+        try:
+            raw = json.loads(data.decode("latin-1"))
+        except ValueError as e:
+            logger.logerr(f"Error reading QC JSON {path}: {e}")
+            return None
+    if not isinstance(raw, dict):
+        logger.logerr(f"QC JSON {path} does not contain a .pin object")
+        return None
+    return raw
+
+
+def _event_rangea_string(event: dict) -> str | None:
+    """Return the raw RANGEA log of a PIN event's NOV_RANGE observation, if any."""
+    for container in (event.get("observations"), event):
+        if not isinstance(container, dict):
+            continue
+        nov_range = container.get("NOV_RANGE")
+        if isinstance(nov_range, dict):
+            raw_rangea = nov_range.get("raw")
+            if isinstance(raw_rangea, str) and "#RANGEA" in raw_rangea:
+                return raw_rangea
+    return None
+
+
+def _qcpin_rows(raw: dict, path: Path) -> Tuple[List[tuple], List[str]]:
+    """Collect the shot data rows and RANGEA strings of a decoded QC PIN object."""
+    rangea_strings: Dict[str, None] = {}
+    for value in raw.values():
+        if isinstance(value, dict):
+            rangea = _event_rangea_string(value)
+            if rangea is not None:
+                rangea_strings[rangea] = None
+
+    interrogation_raw = raw.get("interrogation")
+    if not isinstance(interrogation_raw, dict):
+        logger.logerr(f"QC JSON {path} is missing 'interrogation' block")
+        return [], list(rangea_strings)
+    try:
+        interrogation = extract_pose(interrogation_raw)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.logerr(f"Failed to parse interrogation block in {path}: {e}")
+        return [], list(rangea_strings)
+
+    rows: List[tuple] = []
+    for key, value in raw.items():
+        if key == "interrogation" or not isinstance(value, dict):
+            continue
+        if value.get("event") != "range":
+            continue
+        try:
+            transponder_id, *reply, range_, tat, dbv, snr, xc = extract_reply(value)
+        except (KeyError, TypeError, ValueError):
+            continue
+        rows.append((*interrogation, transponder_id, *reply, range_, tat, dbv, snr, xc))
+    if not rows:
+        logger.logerr(f"No valid range entries found in QC JSON {path}")
+    return rows, list(rangea_strings)
+
+
+def read_qcpin_batch(
+    sources: Iterable[str | Path],
+) -> Tuple[DataFrame[ShotDataFrame] | None, List[str], List[Path]]:
+    """Read shot data and RANGEA strings from QC PIN files in a single pass.
+
+    Each file is decoded once. The interrogation and range events are read
+    with the same field extraction and checks as the streaming DFOP00
+    parser, and the NOV_RANGE observation of each event is checked for a
+    raw RANGEA log. Batching many small files amortizes the ECEF conversion
+    and ShotDataFrame validation over the whole batch.
+
+    Parameters
+    ----------
+    sources : Iterable[str | Path]
+        Paths to QC PIN files in JSON format.
+
+    Returns
+    -------
+    Tuple[DataFrame[ShotDataFrame] | None, List[str], List[Path]]
+        The validated shot data of all files (None if there was none), the
+        unique RANGEA strings of all files and the files that could be
+        decoded.
+    """
+    rows: List[tuple] = []
+    rangea_strings: Dict[str, None] = {}
+    read_sources: List[Path] = []
+    for source in sources:
+        path = Path(source)
+        raw = _load_qcpin_json(path)
+        if raw is None:
+            continue
+        read_sources.append(path)
+        file_rows, file_rangea = _qcpin_rows(raw, path)
+        rows.extend(file_rows)
+        rangea_strings.update(dict.fromkeys(file_rangea))
+
+    shotdata = None
+    if rows:
+        label = (
+            read_sources[0]
+            if len(read_sources) == 1
+            else f"{len(read_sources)} QC PIN files"
+        )
+        shotdata = rows_to_shotdata(rows, label)
+    return shotdata, list(rangea_strings), read_sources
+
+
+def read_qcpin(
+    source: str | Path,
+) -> Tuple[DataFrame[ShotDataFrame] | None, List[str]]:
+    """Read the shot data and RANGEA strings of a single QC PIN file.
+
+    Single-file form of `read_qcpin_batch`; equivalent to calling
+    ``qcjson_to_shotdata`` and ``extract_rangea_strings_from_qcpin`` but the
+    file is decoded only once.
+
+    Parameters
+    ----------
+    source : str | Path
+        Path to the QC.pin file in JSON format.
+
+    Returns
+    -------
+    Tuple[DataFrame[ShotDataFrame] | None, List[str]]
+        The validated shot data (None if the file has none) and the unique
+        RANGEA strings found in the file.
+    """
+    shotdata, rangea_strings, _ = read_qcpin_batch([source])
+    return shotdata, rangea_strings
+
+
 def batch_qc_by_day(
     dataframes: List[pd.DataFrame], date_column: str = "pingTime"
 ) -> Dict[str, pd.DataFrame]:
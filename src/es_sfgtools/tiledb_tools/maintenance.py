@@ -0,0 +1,348 @@
+"""
+Fragment-aware consolidation and vacuuming of the station TileDB arrays.
+
+Every TileDB write creates a fragment and every metadata update (for example
+the day index kept by `TBDArray.update_date_index`) creates an array
+metadata file. Reads have to open all of them, so read latency grows with
+the number of writes. `maintain_array` inspects an array with
+``tiledb.FragmentInfoList`` and only consolidates what exceeds the
+thresholds of a `MaintenancePolicy`, vacuums afterwards and optionally
+times a one-day read before and after so the effect can be reported.
+`maintain_tiledb_dir` does the same for every array of a station's
+`TileDBDir`.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import tiledb
+from cloudpathlib import S3Path
+from pydantic import BaseModel, Field
+
+from ..logging import ProcessLogger as logger
+from .tiledb_schemas import config as tiledb_config
+from .tiledb_schemas import ctx
+
+# Integer time dimensions (GNSS observations) are stored in milliseconds
+_DAY_MS = 86_400_000
+
+# TileDBDir fields that point at TileDB arrays
+TILEDB_DIR_ARRAYS = (
+    "shot_data",
+    "shot_data_pre",
+    "kin_position_data",
+    "gnss_obs_data",
+    "gnss_obs_data_secondary",
+    "imu_position_data",
+    "acoustic_data",
+    "qc_shot_data",
+    "qc_shot_data_pre",
+    "qc_kin_position_data",
+    "qc_gnss_obs_data",
+)
+
+
+class MaintenancePolicy(BaseModel):
+    """Thresholds that trigger consolidation of a TileDB array."""
+
+    enabled: bool = Field(
+        False, title="Run maintenance at the end of each pipeline stage"
+    )
+    max_fragments: int = Field(
+        default=32, ge=1, title="Consolidate fragments above this many fragments"
+    )
+    small_fragment_cells: int = Field(
+        default=100_000, ge=1, title="Fragments with fewer cells count as small"
+    )
+    max_small_fragments: int = Field(
+        default=8, ge=1, title="Consolidate fragments above this many small ones"
+    )
+    max_fragment_metadata: int = Field(
+        default=16,
+        ge=1,
+        title="Consolidate fragment metadata above this many unconsolidated",
+    )
+    max_array_metadata: int = Field(
+        default=32, ge=1, title="Consolidate array metadata above this many files"
+    )
+    consolidation_steps: int = Field(
+        default=3, ge=1, title="TileDB fragment consolidation steps"
+    )
+    vacuum: bool = Field(True, title="Vacuum after consolidating")
+    measure_latency: bool = Field(
+        True, title="Time a one-day read before and after maintenance"
+    )
+    latency_repeats: int = Field(
+        default=3, ge=1, title="Reads timed per latency measurement"
+    )
+
+
+class FragmentStats(BaseModel):
+    """Fragment and metadata counts of a TileDB array."""
+
+    n_fragments: int = 0
+    n_small_fragments: int = 0
+    n_cells: int = 0
+    unconsolidated_metadata: int = 0
+    n_array_metadata: int = 0
+    n_bytes: int = 0
+
+
+class ArrayMaintenanceReport(BaseModel):
+    """Outcome of `maintain_array` for one array."""
+
+    name: str
+    uri: str
+    before: FragmentStats
+    after: Optional[FragmentStats] = None
+    consolidated: List[str] = Field(default_factory=list)
+    vacuumed: bool = False
+    read_latency_before_s: Optional[float] = None
+    read_latency_after_s: Optional[float] = None
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+
+def fragment_stats(
+    uri: Path | S3Path | str, small_fragment_cells: int = 100_000
+) -> FragmentStats:
+    """
+    Count the fragments, small fragments and metadata files of an array.
+
+    Args:
+        uri (Path | S3Path | str): The array URI.
+        small_fragment_cells (int, optional): Fragments with fewer cells are
+            counted as small.
+
+    Returns:
+        FragmentStats: The counts and the array's size on disk in bytes.
+    """
+    uri = str(uri)
+    fragments = tiledb.FragmentInfoList(uri, ctx=ctx)
+    cell_num = [int(fragment.cell_num) for fragment in fragments]
+    vfs = tiledb.VFS(ctx=ctx)
+    meta_dir = f"{uri.rstrip('/')}/__meta"
+    n_array_metadata = len(vfs.ls(meta_dir)) if vfs.is_dir(meta_dir) else 0
+    return FragmentStats(
+        n_fragments=len(cell_num),
+        n_small_fragments=sum(n < small_fragment_cells for n in cell_num),
+        n_cells=sum(cell_num),
+        unconsolidated_metadata=int(fragments.unconsolidated_metadata_num),
+        n_array_metadata=n_array_metadata,
+        n_bytes=int(vfs.dir_size(uri)),
+    )
+
+
+def plan_consolidation(stats: FragmentStats, policy: MaintenancePolicy) -> List[str]:
+    """
+    Choose the consolidation modes an array needs, in the order to run them.
+
+    Returns:
+        List[str]: A subset of ``["fragments", "fragment_meta", "array_meta"]``.
+    """
+    modes = []
+    if stats.n_fragments > 1 and (
+        stats.n_fragments > policy.max_fragments
+        or stats.n_small_fragments > policy.max_small_fragments
+    ):
+        modes.append("fragments")
+    if stats.unconsolidated_metadata > policy.max_fragment_metadata:
+        modes.append("fragment_meta")
+    if stats.n_array_metadata > policy.max_array_metadata:
+        modes.append("array_meta")
+    return modes
+
+
+def consolidate_array(
+    uri: Path | S3Path | str,
+    modes: List[str],
+    steps: int = 3,
+    vacuum: bool = True,
+) -> None:
+    """
+    Consolidate an array in each of ``modes`` and optionally vacuum.
+
+    Uses the module's S3-aware TileDB configuration.
+
+    Args:
+        uri (Path | S3Path | str): The array URI.
+        modes (List[str]): TileDB consolidation modes.
+        steps (int, optional): Fragment consolidation steps. Defaults to 3.
+        vacuum (bool, optional): Vacuum each mode after consolidating.
+            Defaults to True.
+    """
+    uri = str(uri)
+    for mode in modes:
+        mode_config = tiledb.Config(tiledb_config.dict())
+        mode_config["sm.consolidation.mode"] = mode
+        mode_config["sm.consolidation.steps"] = steps
+        mode_config["sm.vacuum.mode"] = mode
+        tiledb.consolidate(uri, config=mode_config, ctx=ctx)
+        logger.logdebug(f" Consolidated {mode} of {uri}")
+        if vacuum:
+            tiledb.vacuum(uri, config=mode_config, ctx=ctx)
+
+
+def measure_read_latency(
+    uri: Path | S3Path | str, repeats: int = 3
+) -> Optional[float]:
+    """
+    Time reading the first day of an array, including opening it.
+
+    Returns:
+        Optional[float]: The median time in seconds, or None if the array
+        is empty.
+    """
+    uri = str(uri)
+    with tiledb.open(uri, mode="r", ctx=ctx) as array:
+        domain = array.nonempty_domain()
+        if domain is None:
+            return None
+        start, end = domain[0]
+        if np.issubdtype(array.schema.domain.dim(0).dtype, np.datetime64):
+            day = np.timedelta64(1, "D").astype(np.asarray(end - start).dtype)
+        else:
+            day = _DAY_MS
+        end = min(end, start + day)
+
+    timings = []
+    for _ in range(repeats):
+        tick = time.perf_counter()
+        with tiledb.open(uri, mode="r", ctx=ctx) as array:
+            array.multi_index[start:end]
+        timings.append(time.perf_counter() - tick)
+    return float(np.median(timings))
+
+
+def maintain_array(
+    uri: Path | S3Path | str,
+    policy: Optional[MaintenancePolicy] = None,
+    name: Optional[str] = None,
+    force: bool = False,
+) -> ArrayMaintenanceReport:
+    """
+    Consolidate and vacuum an array where it exceeds the policy thresholds.
+
+    Errors are recorded in the report rather than raised.
+
+    Args:
+        uri (Path | S3Path | str): The array URI.
+        policy (MaintenancePolicy, optional): Thresholds. Defaults to
+            `MaintenancePolicy()`.
+        name (str, optional): Name used in logs and the report. Defaults to
+            the URI.
+        force (bool, optional): Consolidate fragments regardless of the
+            thresholds. Defaults to False.
+
+    Returns:
+        ArrayMaintenanceReport: Fragment counts, what was consolidated and
+        read latency before and after.
+    """
+    policy = policy or MaintenancePolicy()
+    tick = time.perf_counter()
+    report = ArrayMaintenanceReport(
+        name=name or str(uri), uri=str(uri), before=FragmentStats()
+    )
+    try:
+        report.before = fragment_stats(uri, policy.small_fragment_cells)
+        modes = plan_consolidation(report.before, policy)
+        if force and "fragments" not in modes and report.before.n_fragments > 1:
+            modes.insert(0, "fragments")
+        if not modes:
+            report.after = report.before
+            return report
+
+        if policy.measure_latency:
+            report.read_latency_before_s = measure_read_latency(
+                uri, policy.latency_repeats
+            )
+        consolidate_array(uri, modes, policy.consolidation_steps, policy.vacuum)
+        report.consolidated = modes
+        report.vacuumed = policy.vacuum
+        report.after = fragment_stats(uri, policy.small_fragment_cells)
+        if policy.measure_latency:
+            report.read_latency_after_s = measure_read_latency(
+                uri, policy.latency_repeats
+            )
+        logger.loginfo(
+            f"Consolidated {report.name} ({', '.join(modes)}): "
+            f"{report.before.n_fragments} -> {report.after.n_fragments} fragments"
+        )
+    except Exception as e:
+        logger.logerr(f"Maintenance of {report.name} failed: {e}")
+        report.error = str(e)
+    finally:
+        report.elapsed_s = time.perf_counter() - tick
+    return report
+
+
+def tiledb_dir_arrays(tiledb_dir) -> Dict[str, str]:
+    """
+    Return the existing arrays of a `TileDBDir`, keyed by field name.
+
+    Args:
+        tiledb_dir (TileDBDir): A station's TileDB directory.
+    """
+    tiledb_dir.build()
+    arrays = {}
+    for field_name in TILEDB_DIR_ARRAYS:
+        uri = getattr(tiledb_dir, field_name, None)
+        if uri is not None and tiledb.array_exists(str(uri), ctx=ctx):
+            arrays[field_name] = str(uri)
+    return arrays
+
+
+def maintain_tiledb_dir(
+    tiledb_dir,
+    policy: Optional[MaintenancePolicy] = None,
+    arrays: Optional[List[str]] = None,
+    force: bool = False,
+) -> List[ArrayMaintenanceReport]:
+    """
+    Run `maintain_array` over every array of a `TileDBDir`.
+
+    Args:
+        tiledb_dir (TileDBDir): A station's TileDB directory.
+        policy (MaintenancePolicy, optional): Thresholds. Defaults to
+            `MaintenancePolicy()`.
+        arrays (List[str], optional): Restrict to these `TileDBDir` field
+            names, e.g. ``["shot_data", "gnss_obs_data"]``.
+        force (bool, optional): Consolidate fragments regardless of the
+            thresholds. Defaults to False.
+
+    Returns:
+        List[ArrayMaintenanceReport]: One report per existing array.
+    """
+    reports = []
+    for field_name, uri in tiledb_dir_arrays(tiledb_dir).items():
+        if arrays is not None and field_name not in arrays:
+            continue
+        reports.append(maintain_array(uri, policy, name=field_name, force=force))
+    return reports
+
+
+def summarize_maintenance(reports: List[ArrayMaintenanceReport]) -> pd.DataFrame:
+    """Tabulate maintenance reports, one row per array."""
+    rows = []
+    for report in reports:
+        after = report.after or report.before
+        rows.append(
+            {
+                "name": report.name,
+                "fragments_before": report.before.n_fragments,
+                "fragments_after": after.n_fragments,
+                "array_metadata_before": report.before.n_array_metadata,
+                "array_metadata_after": after.n_array_metadata,
+                "bytes_before": report.before.n_bytes,
+                "bytes_after": after.n_bytes,
+                "consolidated": ",".join(report.consolidated),
+                "read_latency_before_s": report.read_latency_before_s,
+                "read_latency_after_s": report.read_latency_after_s,
+                "elapsed_s": report.elapsed_s,
+                "error": report.error,
+            }
+        )
+    return pd.DataFrame(rows)
@@ -12,14 +12,21 @@ local and S3 storage.
 
 import datetime
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
 from collections import defaultdict
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from es_sfgtools.novatel_tools.rangea_parser import GNSSEpoch
+from es_sfgtools.novatel_tools.rangea_parser import (
+    GNSS_OBS_COLUMNS,
+    GNSSEpoch,
+    decode_rangea_batch,
+    epochs_to_columns,
+)
 import tiledb
 from cloudpathlib import S3Path
 import tempfile
@@ -54,6 +61,116 @@ def as_py_datetime_object_col(s: pd.Series) -> pd.Series:
     return pd.Series(py, index=s.index, dtype=object)
 
 
+def epoch_seconds_to_datetime64(values: pd.Series | np.ndarray) -> np.ndarray:
+    """
+    Convert a column of timestamps to a naive UTC ``datetime64[ns]`` array.
+
+    Float/integer input is interpreted as epoch seconds and truncated to
+    nanoseconds, matching ``np.datetime64(int(x * 1e9), "ns")``. Datetime-like
+    input (numpy datetime64, tz-aware or naive pandas timestamps, Python
+    datetime objects) is converted to UTC and stripped of its timezone.
+
+    Parameters
+    ----------
+        values (pd.Series | np.ndarray): The timestamps to convert.
+
+    Returns
+    -------
+        np.ndarray: A ``datetime64[ns]`` array of the same length.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype.kind in "fiu":
+        ns = (values.astype(np.float64) * 1e9).astype(np.int64)
+        return ns.view("datetime64[ns]")
+    if values.dtype.kind == "M":
+        return values.astype("datetime64[ns]")
+    # object/tz-aware input: let pandas resolve the timezones in one pass
+    dt = pd.to_datetime(values, utc=True)
+    return dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+def datetime64_to_epoch_seconds(values: pd.Series | np.ndarray) -> np.ndarray:
+    """
+    Convert a column of ``datetime64`` timestamps to float64 epoch seconds.
+
+    Parameters
+    ----------
+        values (pd.Series | np.ndarray): Naive UTC datetime64 values.
+
+    Returns
+    -------
+        np.ndarray: A float64 array of seconds since the Unix epoch.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.asarray(values).astype("datetime64[ns]")
+    return values.view(np.int64) / 1e9
+
+
+def check_time_range(
+    values: np.ndarray,
+    start: np.datetime64,
+    end: np.datetime64,
+    field: str,
+) -> None:
+    """
+    Check that every timestamp in ``values`` falls within ``[start, end]``.
+
+    Parameters
+    ----------
+        values (np.ndarray): ``datetime64[ns]`` values to check.
+        start (np.datetime64): The inclusive lower bound.
+        end (np.datetime64): The inclusive upper bound.
+        field (str): The column name, used in the error message.
+
+    Raises
+    ------
+        ValueError: If any value falls outside of the range.
+    """
+    out_of_range = (values < start) | (values > end)
+    if out_of_range.any():
+        raise ValueError(
+            f"{field} range mismatch: {int(out_of_range.sum())} values outside "
+            f"[{start}, {end}]"
+        )
+
+
+def to_unique_days(values: pd.Series | np.ndarray) -> np.ndarray:
+    """
+    Reduce a column of timestamps to its sorted unique days.
+
+    Integer input is interpreted as milliseconds since the Unix epoch, which
+    is how the GNSS observation arrays store time.
+
+    Parameters
+    ----------
+        values (pd.Series | np.ndarray): The timestamps to reduce.
+
+    Returns
+    -------
+        np.ndarray: A sorted ``datetime64[D]`` array of unique days.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        values = values.astype(np.int64).view("datetime64[ms]")
+    elif values.dtype.kind != "M":
+        values = epoch_seconds_to_datetime64(values)
+    return np.unique(values.astype("datetime64[D]"))
+
+
+# Array metadata keys for the persistent day index. Each indexed day is its own
+# key, so writers in different processes only ever add keys and never
+# overwrite each other's days.
+DATE_INDEX_PREFIX = "date_index/"
+DATE_INDEX_TIMESTAMP_KEY = "date_index_timestamp"
+# Avoids rewriting the same days from writer threads of one process
+_date_index_lock = threading.Lock()
+
+
 filters = tiledb.FilterList([tiledb.ZstdFilter(7)])
 TimeDomain = tiledb.Dim(name="time", dtype="datetime64[ms]")
 TransponderDomain = tiledb.Dim(name="transponderID", dtype="ascii")
@@ -335,6 +452,7 @@ class TBDArray:
     dataframe_schema = None
     array_schema = None
     name = "TBD Array"
+    time_dimension = "time"
 
     def __init__(self, uri: Path | S3Path | str):
         """
@@ -366,18 +484,27 @@ class TBDArray:
         logger.logdebug(f" Writing dataframe to {self.uri}")
         if validate:
             df_val = self.dataframe_schema.validate(df, lazy=True)
+        else:
+            df_val = df
         tiledb.from_pandas(str(self.uri), df_val, mode="append")
+        self.update_date_index(df_val[self.time_dimension])
 
     def read_df(
         self,
         start: datetime.datetime | np.datetime64,
         end: datetime.datetime | np.datetime64 = None,
         validate: bool = True,
+        attrs: Optional[List[str]] = None,
+        cond: Optional[str | tiledb.QueryCondition] = None,
+        raw: bool = False,
         **kwargs,
-    ) -> pd.DataFrame:
+    ) -> pd.DataFrame | Dict[str, np.ndarray]:
         """
         Read a DataFrame from the array between a start and end date.
 
+        ``attrs`` and ``cond`` are pushed down to TileDB, so only the
+        requested attributes of the matching cells are read.
+
         Args:
             start (datetime.datetime | np.datetime64): The start date for the
                 data slice.
@@ -385,10 +512,17 @@ class TBDArray:
                 the data slice. If None, defaults to one day after start.
                 Defaults to None.
             validate (bool, optional): Whether to validate the returned
-                DataFrame. Defaults to True.
+                DataFrame. Projected reads are validated against the
+                requested columns only. Defaults to True.
+            attrs (List[str], optional): Attributes to read. The dimensions
+                are always returned. Defaults to all attributes.
+            cond (str | tiledb.QueryCondition, optional): A TileDB query
+                condition on attributes, e.g. ``"wrms > 15"``.
+            raw (bool, optional): Return a dict of NumPy arrays keyed by
+                field name, skipping pandas and validation. Defaults to False.
 
         Returns:
-            pd.DataFrame: A DataFrame containing the data for the specified
+            pd.DataFrame | Dict[str, np.ndarray]: The data for the specified
             date range. Returns an empty DataFrame if no data is found or
             on error.
         """
@@ -412,28 +546,174 @@ class TBDArray:
         end = end.replace(tzinfo=datetime.timezone.utc)
 
         with tiledb.open(str(self.uri), mode="r") as array:
+            query = array.query(attrs=attrs, cond=cond)
+            time_slice = slice(np.datetime64(start), np.datetime64(end))
             try:
-                df = array.df[slice(np.datetime64(start), np.datetime64(end))]
+                if raw:
+                    return query.multi_index[time_slice]
+                df = query.df[time_slice]
             except IndexError as e:
                 logger.logerr(e)
                 return pd.DataFrame()  # Return empty df on error
         if df.empty:
             logger.logwarn("Dataframe is empty")
             return pd.DataFrame()
+        return self._prepare_df(df, validate=validate)
+
+    def iter_df(
+        self,
+        start: datetime.datetime | np.datetime64,
+        end: datetime.datetime | np.datetime64,
+        chunk: datetime.timedelta | int = datetime.timedelta(hours=1),
+        validate: bool = True,
+        attrs: Optional[List[str]] = None,
+        cond: Optional[str | tiledb.QueryCondition] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the data between ``start`` and ``end`` in bounded chunks.
+
+        With a ``timedelta`` chunk, the range is paged in consecutive
+        half-open time windows, so chunks come in time order and each row is
+        yielded once. With an ``int`` chunk, a TileDB incomplete query reads
+        the range with buffers sized for about that many rows and the results
+        are re-batched to exactly ``chunk`` rows (the last chunk may be
+        shorter); rows come in the array's global order. Empty windows are
+        skipped. Each chunk is prepared like a `read_df` result.
+
+        Args:
+            start (datetime.datetime | np.datetime64): Start of the range,
+                inclusive. Naive datetimes are UTC.
+            end (datetime.datetime | np.datetime64): End of the range,
+                inclusive.
+            chunk (datetime.timedelta | int, optional): Window length or
+                number of rows per chunk. Defaults to one hour.
+            validate (bool, optional): Validate each chunk. Defaults to True.
+            attrs (List[str], optional): Attributes to read. Defaults to all.
+            cond (str | tiledb.QueryCondition, optional): A TileDB query
+                condition on attributes.
+
+        Yields:
+            pd.DataFrame: The next non-empty chunk.
+        """
+        dim = self.array_schema.domain.dim(0)
+        low, high = self._dim_bounds(start, end, dim.dtype)
+
+        def to_dim(value: int):
+            if np.issubdtype(dim.dtype, np.datetime64):
+                return np.int64(value).astype(dim.dtype)
+            return value
+
+        if isinstance(chunk, datetime.timedelta):
+            if chunk <= datetime.timedelta(0):
+                raise ValueError(f"chunk must be positive, got {chunk}")
+            step = self._dim_step(chunk, dim.dtype)
+            with tiledb.open(str(self.uri), mode="r", ctx=ctx) as array:
+                query = array.query(attrs=attrs, cond=cond)
+                for window_start in range(low, high + 1, step):
+                    window_end = min(window_start + step - 1, high)
+                    df = query.df[to_dim(window_start) : to_dim(window_end)]
+                    if not df.empty:
+                        yield self._prepare_df(df, validate=validate)
+            return
+
+        if chunk < 1:
+            raise ValueError(f"chunk must be at least one row, got {chunk}")
+        # Buffers are sized per field; 8 bytes covers the widest fixed-size field
+        chunk_config = tiledb.Config(config.dict())
+        chunk_config["py.init_buffer_bytes"] = str(max(8 * chunk, 1024))
+        pending: List[pd.DataFrame] = []
+        n_pending = 0
+        with tiledb.open(
+            str(self.uri), mode="r", ctx=tiledb.Ctx(chunk_config)
+        ) as array:
+            query = array.query(attrs=attrs, cond=cond, return_incomplete=True)
+            for part in query.df[to_dim(low) : to_dim(high)]:
+                if part.empty:
+                    continue
+                pending.append(part)
+                n_pending += len(part)
+                while n_pending >= chunk:
+                    df = pd.concat(pending, ignore_index=True)
+                    yield self._prepare_df(df.iloc[:chunk].copy(), validate)
+                    pending = [df.iloc[chunk:]]
+                    n_pending = len(pending[0])
+        if n_pending:
+            df = pd.concat(pending, ignore_index=True)
+            yield self._prepare_df(df, validate=validate)
+
+    @staticmethod
+    def _dim_bounds(
+        start: datetime.datetime | np.datetime64,
+        end: datetime.datetime | np.datetime64,
+        dtype: np.dtype,
+    ) -> tuple[int, int]:
+        """Convert a time range to integer bounds in the time dimension's unit."""
+        # Integer time dimensions (GNSS observations) are stored in milliseconds
+        unit = (
+            np.datetime_data(dtype)[0] if np.issubdtype(dtype, np.datetime64) else "ms"
+        )
+        bounds = []
+        for value in (start, end):
+            timestamp = pd.Timestamp(value)
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+            value = timestamp.to_datetime64().astype(f"datetime64[{unit}]")
+            bounds.append(int(value.view(np.int64)))
+        return bounds[0], bounds[1]
+
+    @staticmethod
+    def _dim_step(chunk: datetime.timedelta, dtype: np.dtype) -> int:
+        """Length of a time window in the time dimension's unit."""
+        unit = (
+            np.datetime_data(dtype)[0] if np.issubdtype(dtype, np.datetime64) else "ms"
+        )
+        step = np.timedelta64(chunk).astype(f"timedelta64[{unit}]").view(np.int64)
+        return max(int(step), 1)
+
+    def _prepare_df(self, df: pd.DataFrame, validate: bool = True) -> pd.DataFrame:
+        """Convert a raw TileDB result to the array's DataFrame form."""
         if validate:
-            df = self.dataframe_schema.validate(df, lazy=True)
+            df = self._validate_columns(df)
         return df
 
-    def get_unique_dates(self, field: str) -> np.ndarray:
+    def _validate_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validate a DataFrame against the columns of `dataframe_schema` it has.
+
+        Projected reads would otherwise have every missing column added back
+        by the schema.
+        """
+        if self.dataframe_schema is None:
+            return df
+        schema = self.dataframe_schema.to_schema()
+        if set(schema.columns) - set(df.columns):
+            schema = schema.select_columns(
+                [column for column in schema.columns if column in df.columns]
+            )
+        return schema.validate(df, lazy=True)
+
+    def get_unique_dates(self, field: str = None) -> np.ndarray:
         """
         Gets the unique dates from a specified datetime field in the array.
 
+        Dates for the time dimension are answered from the array's day index
+        (see `read_date_index`) without reading any cells. Any other field
+        falls back to a full scan of that field.
+
         Args:
-            field (str): The name of the datetime field to query.
+            field (str, optional): The name of the datetime field to query.
+                Defaults to the array's time dimension.
 
         Returns:
             np.ndarray: An array of unique dates, or None if an error occurs.
         """
+        if field is None or field == self.time_dimension:
+            try:
+                return self.read_date_index()
+            except tiledb.TileDBError as e:
+                logger.logerr(e)
+                return None
+
         with tiledb.open(str(self.uri), mode="r") as array:
             values = array[:][field]
             try:
@@ -443,16 +723,168 @@ class TBDArray:
                 logger.logerr(e)
                 return None
 
-    def consolidate(self):
+    def _fragment_dates(self, newer_than: int = -1) -> np.ndarray:
+        """
+        Get the days spanned by the non-empty domain of each fragment.
+
+        Only fragment metadata is read, so the result is a superset of the
+        days that actually hold data when a fragment straddles midnight.
+
+        Args:
+            newer_than (int, optional): Only consider fragments written after
+                this TileDB timestamp [ms]. Defaults to -1 (all fragments).
+
+        Returns:
+            np.ndarray: A sorted ``datetime64[D]`` array of unique days.
+        """
+        dim_dtype = self.array_schema.domain.dim(self.time_dimension).dtype
+        days = []
+        for fragment in tiledb.FragmentInfoList(str(self.uri)):
+            if fragment.timestamp_range[1] <= newer_than:
+                continue
+            time_domain = np.asarray(fragment.nonempty_domain[0])
+            if dim_dtype.kind == "M" and time_domain.dtype.kind != "M":
+                time_domain = time_domain.astype(np.int64).view(dim_dtype)
+            first, last = to_unique_days(time_domain)[[0, -1]]
+            days.append(np.arange(first, last + 1, dtype="datetime64[D]"))
+        if not days:
+            return np.array([], dtype="datetime64[D]")
+        return np.unique(np.concatenate(days))
+
+    def _latest_fragment_timestamp(self) -> int:
+        """Get the TileDB timestamp [ms] of the most recently written fragment."""
+        timestamps = [
+            fragment.timestamp_range[1]
+            for fragment in tiledb.FragmentInfoList(str(self.uri))
+        ]
+        return max(timestamps, default=-1)
+
+    def read_date_index(self) -> np.ndarray:
+        """
+        Get the unique days with data from the array's persistent day index.
+
+        The index lives in the array metadata, one ``date_index/<day>`` key
+        per day, and is kept current by `write_df`. Fragments written after
+        the index was last updated (for example by the Go TileDB writers) are
+        covered with their fragment non-empty domains, so this never reads
+        any cells.
+
+        Returns:
+            np.ndarray: A sorted ``datetime64[D]`` array of unique days.
+        """
+        days, indexed_until = self._indexed_days()
+        return np.union1d(days, self._fragment_dates(newer_than=indexed_until))
+
+    def _indexed_days(self) -> Tuple[np.ndarray, int]:
+        """Get the indexed days and the TileDB timestamp [ms] they cover."""
+        with tiledb.open(str(self.uri), mode="r") as array:
+            days = [
+                np.datetime64(key[len(DATE_INDEX_PREFIX) :], "D")
+                for key in array.meta.keys()
+                if key.startswith(DATE_INDEX_PREFIX)
+            ]
+            indexed_until = array.meta.get(DATE_INDEX_TIMESTAMP_KEY, -1)
+        return np.unique(np.array(days, dtype="datetime64[D]")), indexed_until
+
+    def update_date_index(self, values: pd.Series | np.ndarray) -> None:
+        """
+        Add the days of newly written timestamps to the persistent day index.
+
+        Nothing is written when every day is already indexed, so repeated
+        writes to indexed days do not add array metadata files. Otherwise the
+        missing days, and those of fragments written since the last update,
+        are added. Because every day is a separate metadata key, concurrent
+        updates from other processes are merged by TileDB rather than
+        overwritten.
+
+        Args:
+            values (pd.Series | np.ndarray): The time dimension values that
+                were just written.
+        """
+        new_days = to_unique_days(values)
+        with _date_index_lock:
+            indexed, indexed_until = self._indexed_days()
+            if np.setdiff1d(new_days, indexed).size == 0:
+                return
+            # Take the timestamp first so concurrent external writes are re-checked
+            latest = self._latest_fragment_timestamp()
+            days = np.union1d(
+                new_days, self._fragment_dates(newer_than=indexed_until)
+            )
+            with tiledb.open(str(self.uri), mode="w") as array:
+                for day in np.setdiff1d(days, indexed):
+                    array.meta[f"{DATE_INDEX_PREFIX}{day}"] = 1
+                array.meta[DATE_INDEX_TIMESTAMP_KEY] = int(latest)
+
+    def buffered_writer(
+        self,
+        max_rows: int = 1_000_000,
+        max_bytes: int = 256 * 1024**2,
+        max_interval_s: Optional[float] = None,
+        sort: bool = False,
+        validate: bool = True,
+    ) -> "TDBBufferedWriter":
+        """
+        Returns a writer that coalesces many small writes into few fragments.
+
+        Use it as a context manager; see `TDBBufferedWriter`.
+        """
+        return TDBBufferedWriter(
+            self,
+            max_rows=max_rows,
+            max_bytes=max_bytes,
+            max_interval_s=max_interval_s,
+            sort=sort,
+            validate=validate,
+        )
+
+    def drop_duplicate_cells(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop rows that repeat a cell, keeping the last one.
+
+        Arrays that do not allow duplicates reject a write that repeats a
+        cell. Separate writes of the same cell succeed, the later one
+        superseding the earlier, so coalesced buffers keep the last row.
+
+        Args:
+            df (pd.DataFrame): Rows in write order.
+
+        Returns:
+            pd.DataFrame: The rows with unique cells.
+        """
+        if self.array_schema is None or self.array_schema.allows_duplicates:
+            return df
+        dims = [dim.name for dim in self.array_schema.domain]
+        if not set(dims).issubset(df.columns):
+            return df
+        return df.drop_duplicates(subset=dims, keep="last")
+
+    def _write_buffered(self, df: pd.DataFrame) -> None:
+        """Write a coalesced, already validated buffer from `TDBBufferedWriter`."""
+        self.write_df(df, validate=False)
+
+    def consolidate(self, policy=None, force: bool = False):
         """
         Consolidates and vacuums the TileDB array to improve performance.
+
+        Only the fragments and metadata that exceed the policy thresholds are
+        consolidated, so calling this on a healthy array is cheap. See
+        `es_sfgtools.tiledb_tools.maintenance`.
+
+        Args:
+            policy (MaintenancePolicy, optional): Consolidation thresholds.
+                Defaults to `MaintenancePolicy()` without latency timing.
+            force (bool, optional): Consolidate fragments regardless of the
+                thresholds. Defaults to False.
+
+        Returns:
+            ArrayMaintenanceReport: What was consolidated.
         """
-        ctx = tiledb.Ctx()
-        config = tiledb.Config()
-        config["sm.consolidation.steps"] = 3
-        uri = tiledb.consolidate(uri=str(self.uri), ctx=ctx, config=config)
-        logger.logdebug(f" Consolidated {self.name} to {uri}")
-        tiledb.vacuum(str(self.uri))
+        from .maintenance import MaintenancePolicy, maintain_array
+
+        if policy is None:
+            policy = MaintenancePolicy(measure_latency=False)
+        return maintain_array(self.uri, policy, name=self.name, force=force)
 
     def view(self, network: str = "", station: str = ""):
         """
@@ -501,20 +933,39 @@ class TDBAcousticArray(TBDArray):
         """Gets unique dates from the 'triggerTime' field."""
         return super().get_unique_dates(field)
 
-    def write_df(self, df: pd.DataFrame):
+    def write_df(self, df: pd.DataFrame, validate: bool = True):
         """Writes an acoustic data DataFrame to the array."""
-        df = self.dataframe_schema.validate(df, lazy=True)
+        if validate:
+            df = self.dataframe_schema.validate(df, lazy=True)
         tiledb.from_pandas(str(self.uri), df, mode="append")
+        self.update_date_index(df[self.time_dimension])
+
+    def read_df(
+        self,
+        start: datetime,
+        end: datetime = None,
+        validate: bool = True,
+        attrs: Optional[List[str]] = None,
+        cond: Optional[str | tiledb.QueryCondition] = None,
+        raw: bool = False,
+        **kwargs,
+    ) -> pd.DataFrame | Dict[str, np.ndarray]:
+        """Reads acoustic data for a given time range.
 
-    def read_df(self, start: datetime, end: datetime = None, **kwargs) -> pd.DataFrame:
-        """Reads acoustic data for a given time range."""
+        See `TBDArray.read_df` for ``attrs``, ``cond`` and ``raw``.
+        """
         if isinstance(start, datetime.date):
             start = datetime.datetime.combine(start, datetime.datetime.min.time())
         if end is None:
             end = start
         with tiledb.open(str(self.uri), mode="r") as array:
-            df = array.df[slice(np.datetime64(start), np.datetime64(end)), :]
-        df = self.dataframe_schema.validate(df, lazy=True)
+            query = array.query(attrs=attrs, cond=cond)
+            time_slice = slice(np.datetime64(start), np.datetime64(end))
+            if raw:
+                return query.multi_index[time_slice, :]
+            df = query.df[time_slice, :]
+        if validate:
+            df = self._validate_columns(df)
         return df
 
 
@@ -553,6 +1004,7 @@ class TDBShotDataArray(TBDArray):
     dataframe_schema = ShotDataFrame
     array_schema = ShotDataArraySchema
     name = "Shot Data"
+    time_dimension = "pingTime"
 
     def __init__(self, uri: Path | S3Path | str):
         super().__init__(uri)
@@ -561,16 +1013,36 @@ class TDBShotDataArray(TBDArray):
         """Gets unique dates from the 'pingTime' field."""
         return super().get_unique_dates(field)
 
-    def read_df(self, start: datetime, end: datetime = None, **kwargs) -> pd.DataFrame:
+    def read_df(
+        self,
+        start: datetime,
+        end: datetime = None,
+        validate: bool = True,
+        attrs: Optional[List[str]] = None,
+        cond: Optional[str | tiledb.QueryCondition] = None,
+        raw: bool = False,
+        **kwargs,
+    ) -> pd.DataFrame | Dict[str, np.ndarray]:
         """
         Read a DataFrame from the array between the start and end dates.
 
+        ``pingTime`` and ``returnTime`` are returned as epoch seconds, also
+        for ``raw`` reads.
+
         Args:
             start (datetime.datetime): The start date.
             end (datetime.datetime, optional): The end date. Defaults to None.
+            validate (bool, optional): Whether to validate the returned
+                DataFrame. Defaults to True.
+            attrs (List[str], optional): Attributes to read, see
+                `TBDArray.read_df`. Defaults to all attributes.
+            cond (str | tiledb.QueryCondition, optional): A TileDB query
+                condition on attributes, e.g. ``"snr > 20"``.
+            raw (bool, optional): Return a dict of NumPy arrays, skipping
+                pandas and validation. Defaults to False.
 
         Returns:
-            pd.DataFrame: A DataFrame of shot data, or None on error.
+            pd.DataFrame | Dict[str, np.ndarray]: Shot data, or None on error.
         """
         if isinstance(start, datetime.date) and not isinstance(
             start, datetime.datetime
@@ -584,25 +1056,40 @@ class TDBShotDataArray(TBDArray):
         start = start.replace(tzinfo=datetime.timezone.utc)
         end = end.replace(tzinfo=datetime.timezone.utc)
 
+        start_ns = np.datetime64(start.replace(tzinfo=None), "ns")
+        end_ns = np.datetime64(end.replace(tzinfo=None), "ns")
+
         with tiledb.open(str(self.uri), mode="r") as array:
+            query = array.query(attrs=attrs, cond=cond)
             try:
-                df = array.df[slice(np.datetime64(start), np.datetime64(end)), :]
-                if df.empty:
-                    return df  # skip if the dataframe is empty
+                if raw:
+                    data = query.multi_index[slice(start_ns, end_ns), :]
+                else:
+                    df = query.df[slice(start_ns, end_ns), :]
+                    if df.empty:
+                        return df  # skip if the dataframe is empty
             except IndexError as e:
                 logger.logerr(e)
                 return None
-        df.pingTime = as_py_datetime_object_col(df.pingTime)
-        df.returnTime = as_py_datetime_object_col(df.returnTime)
-
-        assert df.pingTime[0] >= start, "pingTime start date mismatch"
-        assert df.pingTime.iloc[-1] <= end, "pingTime end date mismatch"
 
-        df.pingTime = df.pingTime.apply(lambda x: x.timestamp())
-        df.returnTime = df.returnTime.apply(lambda x: x.timestamp())
-
-        df = self.dataframe_schema.validate(df, lazy=True)
-        return df
+        if raw:
+            ping_time = data["pingTime"].astype("datetime64[ns]")
+            check_time_range(ping_time, start_ns, end_ns, "pingTime")
+            for column in ("pingTime", "returnTime"):
+                if column in data:
+                    data[column] = datetime64_to_epoch_seconds(data[column])
+            return data
+
+        ping_time = df.pingTime.to_numpy(dtype="datetime64[ns]")
+        check_time_range(ping_time, start_ns, end_ns, "pingTime")
+        return self._prepare_df(df, validate=validate)
+
+    def _prepare_df(self, df: pd.DataFrame, validate: bool = True) -> pd.DataFrame:
+        """Convert ``pingTime`` and ``returnTime`` to epoch seconds and validate."""
+        df.pingTime = datetime64_to_epoch_seconds(df.pingTime)
+        if "returnTime" in df.columns:
+            df.returnTime = datetime64_to_epoch_seconds(df.returnTime)
+        return super()._prepare_df(df, validate=validate)
 
     def write_df(self, df: pd.DataFrame, validate: bool = True):
         """
@@ -624,22 +1111,16 @@ class TDBShotDataArray(TBDArray):
         if df_val.empty:
             logger.logwarn(f"Dataframe is empty, not writing to {self.uri}")
             return
-        if isinstance(df_val.pingTime.iloc[0], float):
-            # Convert pingTime and returnTime to datetime64[ns] if they are floats
-            df_val.pingTime = df_val.pingTime.apply(
-                lambda x: np.datetime64(int(x * 1e9), "ns")
-            )
-            df_val.returnTime = df_val.returnTime.apply(
-                lambda x: np.datetime64(int(x * 1e9), "ns")
-            )
-        else:
-            # Convert pingTime and returnTime to datetime64[ns] if they are datetime objects
-            df_val.pingTime = df_val.pingTime.apply(lambda x: np.datetime64(x, "ns"))
-            df_val.returnTime = df_val.returnTime.apply(
-                lambda x: np.datetime64(x, "ns")
-            )
+        # Convert pingTime and returnTime (epoch seconds or datetimes) to datetime64[ns]
+        df_val.pingTime = epoch_seconds_to_datetime64(df_val.pingTime)
+        df_val.returnTime = epoch_seconds_to_datetime64(df_val.returnTime)
 
         tiledb.from_pandas(str(self.uri), df_val, mode="append")
+        self.update_date_index(df_val.pingTime)
+
+
+# Writers for TDBGNSSObsArray.write_rangea_strings
+GNSSObsBackend = Literal["python", "nova2tile"]
 
 
 class TDBGNSSObsArray(TBDArray):
@@ -652,7 +1133,10 @@ class TDBGNSSObsArray(TBDArray):
 
     def get_unique_dates(self, field: str = "time") -> np.ndarray:
         """
-        Gets unique dates from a specified datetime field in the array.
+        Gets unique dates from the 'time' field.
+
+        The 'time' dimension holds milliseconds since the Unix epoch; dates
+        are answered from the day index without reading any observations.
 
         Args:
             field (str, optional): The name of the datetime field to query.
@@ -661,14 +1145,7 @@ class TDBGNSSObsArray(TBDArray):
         Returns:
             np.ndarray: An array of unique dates, or None if an error occurs.
         """
-        with tiledb.open(str(self.uri), mode="r") as array:
-            values = array[:][field]
-            try:
-                values = values.astype("datetime64[ms]")
-                return np.unique(values)
-            except Exception as e:
-                logger.logerr(e)
-                return None
+        return super().get_unique_dates(field)
 
     def write_epochs(self, epochs: List[GNSSEpoch], region: str = "us-east-2") -> int:
         """
@@ -676,7 +1153,9 @@ class TDBGNSSObsArray(TBDArray):
 
         This method is the Python equivalent of the Go WriteObsV3Array function.
         It flattens the hierarchical epoch/satellite/observation structure into
-        columnar buffers and writes them to the TileDB array.
+        columnar buffers and writes them to the TileDB array. For bulk ingest
+        of RANGEA strings prefer `write_columns` with
+        `decode_rangea_batch`, which never builds the epoch objects.
 
         Array Schema (dimensions):
             - time (int64): UTC timestamp in milliseconds since Unix epoch
@@ -693,100 +1172,76 @@ class TDBGNSSObsArray(TBDArray):
             - flags (uint16): Observation flags
             - fcn (int8): GLONASS frequency channel number
         """
+        return self.write_columns(epochs_to_columns(epochs))
 
-        # Now build buffers from deduplicated dict
-        d0_buffer, d1_buffer, d2_buffer, d3_buffer = [], [], [], []
-        a0_buffer, a1_buffer, a2_buffer, a3_buffer, a4_buffer, a5_buffer, a6_buffer = (
-            [],
-            [],
-            [],
-            [],
-            [],
-            [],
-            [],
-        )
-        for epoch in epochs:
-            epoch_time_ms = int(epoch.time.timestamp() * 1000)
-            for sat in epoch.satellites.values():
-                sys_id = sat.system.value
-                sat_id = sat.prn
-                for obs in sat.observations.values():
-                    obs_code = obs.signal_type
-                    d0_buffer.append(epoch_time_ms)
-                    d1_buffer.append(sys_id)
-                    d2_buffer.append(sat_id)
-                    d3_buffer.append(obs_code)
-                    a0_buffer.append(obs.pseudorange)
-                    a1_buffer.append(obs.carrier_phase)
-                    a2_buffer.append(obs.doppler)
-                    a3_buffer.append(obs.cn0)
-                    a4_buffer.append(obs.locktime)
-                    a5_buffer.append(obs.tracking_status)
-                    a6_buffer.append(sat.fcn)
-
-        # Convert to numpy arrays
-        d0_arr = np.array(d0_buffer, dtype=np.int64)
-        d1_arr = np.array(d1_buffer, dtype=np.uint8)
-        d2_arr = np.array(d2_buffer, dtype=np.uint8)
-        d3_arr = np.array(d3_buffer, dtype=np.uint16)
-        a0_arr = np.array(a0_buffer, dtype=np.float64)
-        a1_arr = np.array(a1_buffer, dtype=np.float64)
-        a2_arr = np.array(a2_buffer, dtype=np.float64)
-        a3_arr = np.array(a3_buffer, dtype=np.float32)
-        a4_arr = np.array(a4_buffer, dtype=np.uint16)
-        a5_arr = np.array(a5_buffer, dtype=np.uint16)
-        a6_arr = np.array(a6_buffer, dtype=np.int8)
-
-        df = pd.DataFrame(
-            {
-                "time": d0_arr,
-                "sys": d1_arr,
-                "sat": d2_arr,
-                "obs": d3_arr,
-                "range": a0_arr,
-                "phase": a1_arr,
-                "doppler": a2_arr,
-                "snr": a3_arr,
-                "slip": a4_arr,
-                "flags": a5_arr,
-                "fcn": a6_arr,
-            }
-        ).drop_duplicates(
-            subset=["time", "sys", "sat", "obs"], keep="first"
-        )  # Ensure no duplicates based on dimensions
-        # Open array and write
-        # with tiledb.open(str(self.uri), mode="w") as array:
-        #     array[d0_arr, d1_arr, d2_arr, d3_arr] = {
-        #         "range": a0_arr,
-        #         "phase": a1_arr,
-        #         "doppler": a2_arr,
-        #         "snr": a3_arr,
-        #         "slip": a4_arr,
-        #         "flags": a5_arr,
-        #         "fcn": a6_arr,
-        #     }
+    def write_columns(self, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Write columnar GNSS observation buffers to this TileDB array.
+
+        Rows that repeat a (time, sys, sat, obs) cell are dropped, keeping
+        the first occurrence.
+
+        Args:
+            columns (Dict[str, np.ndarray]): Buffers keyed by the array's
+                dimension and attribute names, as returned by
+                `decode_rangea_batch` or `epochs_to_columns`.
 
+        Returns:
+            int: The number of observations received.
+        """
+        n_obs = len(columns["time"])
+        if n_obs == 0:
+            logger.logwarn(f"No GNSS observations to write to {self.uri}")
+            return 0
+        df = pd.DataFrame({name: columns[name] for name in GNSS_OBS_COLUMNS})
+        # Ensure no duplicates based on dimensions
+        df = df.drop_duplicates(subset=["time", "sys", "sat", "obs"], keep="first")
         tiledb.from_pandas(str(self.uri), df, mode="append")
-        return len(d0_buffer)
+        self.update_date_index(df["time"].to_numpy())
+        return n_obs
+
+    def _write_buffered(self, df: pd.DataFrame) -> None:
+        self.write_columns({name: df[name].to_numpy() for name in GNSS_OBS_COLUMNS})
 
     def write_rangea_strings(
-        self, rangea_strings: List[str], verbose: bool = False
-    ) -> int:
+        self,
+        rangea_strings: List[str],
+        verbose: bool = False,
+        backend: "GNSSObsBackend" = "python",
+    ) -> Optional[int]:
         """
-        Write GNSS observation epochs to this TileDB array from RINEX 3.05
-        observation file lines.
+        Write GNSS observations to this TileDB array from RANGEA strings.
 
-        This method parses the RINEX observation lines, extracts the relevant
-        data, and writes it to the TileDB array using the same schema as
-        `write_epochs`.
+        With the default ``"python"`` backend the strings are decoded in
+        memory with `decode_rangea_batch` and written with `write_columns`.
+        The ``"nova2tile"`` backend writes them to a temporary file and runs
+        the nova2tile golang binary on it.
 
         Parameters
         ----------
             rangea_strings (List[str])
-                A list of strings
+                A list of raw RANGEA log strings
             verbose (bool, optional)
                 Whether to print verbose output during processing. Defaults to False.
+            backend (GNSSObsBackend, optional)
+                ``"python"`` or ``"nova2tile"``. Defaults to ``"python"``.
+
+        Returns
+        -------
+            Optional[int]
+                The number of observations decoded, or None with the
+                nova2tile backend, which does not report it.
         """
+        if backend == "python":
+            columns = decode_rangea_batch(rangea_strings)
+            if verbose:
+                logger.loginfo(
+                    f"Decoded {len(columns['time'])} GNSS observations from "
+                    f"{len(rangea_strings)} RANGEA strings"
+                )
+            return self.write_columns(columns)
+        if backend != "nova2tile":
+            raise ValueError(f"Unknown GNSS observation backend {backend!r}")
 
         with tempfile.NamedTemporaryFile(mode="w+", delete=True) as tmp_file:
             for line in rangea_strings:
@@ -798,3 +1253,132 @@ class TDBGNSSObsArray(TBDArray):
                 n_procs=1,
                 verbose=verbose,
             )
+        return None
+
+
+class TDBBufferedWriter:
+    """
+    Coalesce many small writes to a TBDArray into a few large fragments.
+
+    Every ``write_df`` on an array is a separate TileDB fragment. The buffered
+    writer collects DataFrames (or columnar buffers) in memory and writes
+    them as one fragment once ``max_rows`` rows or ``max_bytes`` bytes are
+    buffered, once ``max_interval_s`` seconds have passed since the last
+    write (checked when data is added), and when the writer is closed.
+
+    Frames are validated against the array's ``dataframe_schema`` as they
+    are added, so a bad frame is rejected on its own instead of failing a
+    whole flush. Rows that repeat a cell are dropped on flush, keeping the
+    last one, as separate writes would. The writer is thread safe.
+
+    Example:
+        >>> with shotdata_tdb.buffered_writer(sort=True) as writer:
+        ...     for df in frames:
+        ...         writer.write_df(df)
+
+    Args:
+        array (TBDArray): The array to write to.
+        max_rows (int, optional): Rows buffered before a flush.
+        max_bytes (int, optional): Bytes buffered before a flush.
+        max_interval_s (float, optional): Maximum seconds between flushes.
+            Defaults to None (no time limit).
+        sort (bool, optional): Sort each flush by the array's time
+            dimension. Defaults to False.
+        validate (bool, optional): Validate frames as they are added.
+            Defaults to True.
+    """
+
+    def __init__(
+        self,
+        array: TBDArray,
+        max_rows: int = 1_000_000,
+        max_bytes: int = 256 * 1024**2,
+        max_interval_s: Optional[float] = None,
+        sort: bool = False,
+        validate: bool = True,
+    ):
+        self.array = array
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_interval_s = max_interval_s
+        self.sort = sort
+        self.validate = validate
+        self.rows_written = 0
+        self.n_flushes = 0
+        self._frames: List[pd.DataFrame] = []
+        self._rows = 0
+        self._bytes = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "TDBBufferedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def rows_buffered(self) -> int:
+        return self._rows
+
+    def write_df(self, df: Optional[pd.DataFrame]) -> None:
+        """
+        Add a DataFrame to the buffer, flushing if a threshold is reached.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to write. None or empty frames
+                are ignored.
+        """
+        if df is None or df.empty:
+            return
+        if self.validate and self.array.dataframe_schema is not None:
+            df = self.array.dataframe_schema.validate(df, lazy=True)
+            if df.empty:
+                return
+        with self._lock:
+            self._frames.append(df)
+            self._rows += len(df)
+            self._bytes += int(df.memory_usage(index=False, deep=True).sum())
+            if (
+                self._rows >= self.max_rows
+                or self._bytes >= self.max_bytes
+                or (
+                    self.max_interval_s is not None
+                    and time.monotonic() - self._last_flush >= self.max_interval_s
+                )
+            ):
+                self.flush()
+
+    def write_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        """Add columnar buffers keyed by column name to the buffer."""
+        self.write_df(pd.DataFrame(columns))
+
+    def flush(self) -> int:
+        """
+        Write everything buffered as a single fragment.
+
+        Returns:
+            int: The number of rows written.
+        """
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._frames:
+                return 0
+            df = (
+                pd.concat(self._frames, ignore_index=True)
+                if len(self._frames) > 1
+                else self._frames[0]
+            )
+            df = self.array.drop_duplicate_cells(df)
+            if self.sort and self.array.time_dimension in df.columns:
+                df = df.sort_values(self.array.time_dimension, kind="stable")
+            self._frames, self._rows, self._bytes = [], 0, 0
+            self.array._write_buffered(df)
+            self.rows_written += len(df)
+            self.n_flushes += 1
+            logger.logdebug(f" Flushed {len(df)} rows to {self.array.uri}")
+            return len(df)
+
+    def close(self) -> None:
+        """Flush any remaining buffered data."""
+        self.flush()
@@ -6,7 +6,7 @@ import json
 import os
 from pathlib import Path
 import shutil
-from typing import List, Optional
+from typing import Iterable, List, Optional
 import datetime
 from datetime import timezone
 
@@ -14,6 +14,7 @@ import numpy as np
 import pandas as pd
 
 from es_sfgtools.data_mgmt.directorymgmt import DirectoryHandler, GARPOSSurveyDir
+from es_sfgtools.data_mgmt.directorymgmt.s3_sync import S3Sync, SyncReport
 
 from es_sfgtools.data_models.metadata.campaign import Survey
 from es_sfgtools.data_models.metadata.site import Site
@@ -52,6 +53,44 @@ from es_sfgtools.workflows.utils.protocols import (
 )
 from es_sfgtools.utils.model_update import validate_and_merge_config
 
+# Time window per chunk when streaming survey data out of TileDB
+SURVEY_READ_CHUNK = datetime.timedelta(hours=6)
+
+
+def write_chunks_to_csv(chunks: Iterable[pd.DataFrame], dest: Path) -> int:
+    """Write DataFrame chunks to a single CSV file with a continuous index.
+
+    The file is written next to ``dest`` and moved into place once complete,
+    so an interrupted write never leaves a partial file behind. Nothing is
+    written if there are no rows.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        The chunks to write, all with the same columns.
+    dest : Path
+        The CSV file to write.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    dest = Path(dest)
+    part_path = dest.with_name(dest.name + ".part")
+    n_rows = 0
+    try:
+        for chunk in chunks:
+            chunk.index = pd.RangeIndex(n_rows, n_rows + len(chunk))
+            chunk.to_csv(part_path, mode="a" if n_rows else "w", header=n_rows == 0)
+            n_rows += len(chunk)
+        if n_rows:
+            os.replace(part_path, dest)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+    return n_rows
+
 
 class IntermediateDataProcessor(WorkflowABC):
     """
@@ -86,9 +125,13 @@ class IntermediateDataProcessor(WorkflowABC):
         survey_id: Optional[str] = None,
         override: bool = False,
         write_intermediate: bool = False,
+        chunk: datetime.timedelta | int = SURVEY_READ_CHUNK,
     ):
         """Parses the surveys from the current campaign and adds them to the directory structure.
 
+        Survey data is streamed from TileDB to CSV in chunks, so memory use
+        does not grow with the survey length.
+
         Parameters
         ----------
         survey_id : Optional[str], optional
@@ -97,6 +140,8 @@ class IntermediateDataProcessor(WorkflowABC):
             Whether to override existing files, by default False.
         write_intermediate : bool, optional
             Whether to write intermediate files, by default False.
+        chunk : datetime.timedelta or int, optional
+            Time window or number of rows read per chunk, by default 6 hours.
         """
 
         tileDBDir = self.current_station_dir.tiledb_directory
@@ -136,17 +181,17 @@ class IntermediateDataProcessor(WorkflowABC):
                 or shotdata_file_dest.stat().st_size == 0
                 or override
             ):
-                shot_data_queried = shotDataTDB.read_df(
-                    start=survey.start,
-                    end=survey.end,
+                n_shots = write_chunks_to_csv(
+                    shotDataTDB.iter_df(
+                        start=survey.start, end=survey.end, chunk=chunk
+                    ),
+                    shotdata_file_dest,
                 )
-                if shot_data_queried.empty:
+                if n_shots == 0:
                     logger.logwarn(
                         f"No shot data found for survey {survey.id} from {survey.start} to {survey.end}, skipping survey."
                     )
                     continue
-                else:
-                    shot_data_queried.to_csv(shotdata_file_dest)
 
             if write_intermediate:
                 # Prepare PPP kinematic Position Data
@@ -165,17 +210,18 @@ class IntermediateDataProcessor(WorkflowABC):
                     or override
                 ):
                     kinPositionTDB = TDBKinPositionArray(tileDBDir.kin_position_data)
-                    kinposition_data_queried = kinPositionTDB.read_df(
-                        start=survey.start,
-                        end=survey.end,
+                    n_positions = write_chunks_to_csv(
+                        kinPositionTDB.iter_df(
+                            start=survey.start, end=survey.end, chunk=chunk
+                        ),
+                        kinpositiondata_file_dest,
                     )
-                    if kinposition_data_queried.empty:
+                    if n_positions == 0:
                         logger.logwarn(
                             f"No kinposition data found for survey {survey.id} from {survey.start} to {survey.end}"
                         )
 
                     else:
-                        kinposition_data_queried.to_csv(kinpositiondata_file_dest)
                         self.current_survey_dir.kinpositiondata = (
                             kinpositiondata_file_dest
                         )
@@ -195,16 +241,17 @@ class IntermediateDataProcessor(WorkflowABC):
                     or override
                 ):
                     imuPositionTDB = TDBIMUPositionArray(tileDBDir.imu_position_data)
-                    imuposition_data_queried = imuPositionTDB.read_df(
-                        start=survey.start,
-                        end=survey.end,
+                    n_positions = write_chunks_to_csv(
+                        imuPositionTDB.iter_df(
+                            start=survey.start, end=survey.end, chunk=chunk
+                        ),
+                        imupositiondata_file_dest,
                     )
-                    if imuposition_data_queried.empty:
+                    if n_positions == 0:
                         logger.logwarn(
                             f"No imuposition data found for survey {survey.id} from {survey.start} to {survey.end}"
                         )
                     else:
-                        imuposition_data_queried.to_csv(imupositiondata_file_dest)
                         self.current_survey_dir.imupositiondata = (
                             imupositiondata_file_dest
                         )
@@ -399,24 +446,47 @@ class IntermediateDataProcessor(WorkflowABC):
         self.directory_handler.save()
 
     @validate_network_station_campaign
-    def midprocess_sync_s3(self, overwrite: bool = False):
+    def midprocess_sync_s3(
+        self, overwrite: bool = False, delete: bool = False, max_workers: int = 16
+    ) -> Optional[SyncReport]:
         """Uploads the current station directory to S3 for synchronization.
 
 
         SFGMain/cascadia-gorda/NCC1/2025_A_1126 -->
         s3://<bucket_name>/cascadia-gorda/NCC1/2025_A_1126
 
+        Each directory is listed once, and the SVP file is checked with a
+        single HEAD request; only new TileDB fragments and changed files are
+        uploaded, in parallel (see `S3Sync`).
+
+        Parameters
+        ----------
+        overwrite : bool, optional
+            Whether to upload every file, by default False.
+        delete : bool, optional
+            Whether to delete remote TileDB files that no longer exist
+            locally, e.g. fragments removed by vacuuming, by default False.
+        max_workers : int, optional
+            The number of files uploaded at once, by default 16.
+
+        Returns
+        -------
+        Optional[SyncReport]
+            The files and bytes transferred, or None if no S3 bucket is
+            configured.
         """
         try:
             s3_bucket = load_s3_sync_bucket()
         except ValueError as e:
             logger.logwarn(f"S3 synchronization skipped: {e}")
-            return
+            return None
 
         s3_directory_handler = self.directory_handler.point_to_s3(s3_bucket)
         s3_station_dir = s3_directory_handler.networks[
             self.current_network_name
         ].stations[self.current_station_name]
+        syncer = S3Sync.for_path(s3_station_dir.location, max_workers=max_workers)
+        report = SyncReport()
 
         # map the current station directory to s3
         local_tdb = self.current_station_dir.tiledb_directory
@@ -430,19 +500,13 @@ class IntermediateDataProcessor(WorkflowABC):
         ]
 
         for tdb_array in tdb_arrays:
-            local_tdb_array = getattr(local_tdb, tdb_array)
-            s3_tdb_array = getattr(s3_tdb, tdb_array)
-
-            for tdb_file in local_tdb_array.rglob("*"):
-                relative_path = tdb_file.relative_to(local_tdb_array)
-                s3_file_path = s3_tdb_array / relative_path
-                try:
-                    if not s3_file_path.exists() or overwrite:
-                        s3_file_path.upload_from(
-                            tdb_file, force_overwrite_to_cloud=overwrite
-                        )
-                except Exception as e:
-                    logger.logerr(f"Failed to upload {tdb_file} to S3: {e}")
+            report += syncer.sync_directory(
+                getattr(local_tdb, tdb_array),
+                getattr(s3_tdb, tdb_array),
+                tiledb=True,
+                overwrite=overwrite,
+                delete=delete,
+            )
 
         for s3_campaign_dir, local_campaign_dir in zip(
             s3_station_dir.campaigns.values(),
@@ -450,27 +514,27 @@ class IntermediateDataProcessor(WorkflowABC):
         ):
             # upload svp file
             local_svp = local_campaign_dir.svp_file
-            s3_svp = s3_campaign_dir.svp_file
-            try:
-                if local_svp.exists() and not s3_svp.exists():
-                    s3_svp.upload_from(local_svp, force_overwrite_to_cloud=overwrite)
-            except Exception as e:
-                logger.logerr(f"Failed to upload {local_svp} to S3: {e}")
+            report += syncer.sync_directory(
+                local_svp.parent,
+                s3_campaign_dir.svp_file.parent,
+                files=[local_svp],
+                overwrite=overwrite,
+            )
 
             # upload log directory files
-            local_log_dir = local_campaign_dir.log_directory
-            s3_log_dir = s3_campaign_dir.log_directory
-            if local_log_dir.exists():
-                for log_file in local_log_dir.rglob("*"):
-                    if log_file.is_file():
-                        relative_path = log_file.relative_to(local_log_dir)
-                        s3_log_file = s3_log_dir / relative_path
-                        try:
-                            s3_log_file.upload_from(
-                                log_file, force_overwrite_to_cloud=overwrite
-                            )
-                        except Exception as e:
-                            logger.logerr(f"Failed to upload {log_file} to S3: {e}")
+            report += syncer.sync_directory(
+                local_campaign_dir.log_directory,
+                s3_campaign_dir.log_directory,
+                overwrite=overwrite,
+            )
+
+        logger.loginfo(
+            f"S3 sync of {self.current_station_name}: uploaded "
+            f"{report.files_uploaded} files ({report.bytes_uploaded / 1e6:.1f} MB), "
+            f"{report.files_skipped} unchanged, {report.files_deleted} deleted, "
+            f"{report.files_failed} failed in {report.elapsed_s:.1f} s"
+        )
+        return report
 
     def get_pseudo_surveys(self, shotdatatdb: TDBShotDataArray) -> List[Survey]:
         """Generates pseudo-surveys based on shotdata timestamps.
@@ -35,10 +35,23 @@ except ImportError:
     pass
 from es_sfgtools.modeling.garpos_tools.schemas import GarposInput, ObservationData
 from es_sfgtools.logging import GarposLogger as logger
-from es_sfgtools.modeling.garpos_tools.functions import process_garpos_results
 
 from es_sfgtools.utils.model_update import validate_and_merge_config
 from ..utils.protocols import WorkflowABC
+from .garpos_scheduler import (
+    GarposScheduler,
+    GarposTask,
+    run_garpos_iterations,
+    summarize_results,
+)
+from .garpos_sweep import (
+    expand_param_grid,
+    load_sweep_manifest,
+    summarize_run_results,
+    sweep_hash,
+    sweep_run_id,
+    write_sweep_manifest,
+)
 
 colors = [
     "blue",
@@ -206,66 +219,6 @@ class GarposHandler(WorkflowABC):
             base_class=self.garpos_fixed.inversion_params, override_config=parameters
         )
 
-    def _run_garpos(
-        self,
-        obsfile_path: Path,
-        results_dir: Path,
-        custom_settings: Optional[dict | InversionParams] = None,
-        run_id: int | str = 0,
-        override: bool = False,
-    ) -> Path:
-        """Runs the GARPOS model.
-
-        Parameters
-        ----------
-        obsfile_path : Path
-            The path to the observation file.
-        results_dir : Path
-            The path to the results directory.
-        custom_settings : Optional[dict | InversionParams], optional
-            Custom GARPOS settings to apply, by default None.
-        run_id : int | str, optional
-            The run ID, by default 0.
-        override : bool, optional
-            If True, override existing results, by default False.
-
-        Returns
-        -------
-        Path
-            The path to the results file.
-        """
-
-        garpos_fixed_params = self.garpos_fixed.model_copy()
-        if custom_settings is not None:
-            garpos_fixed_params.inversion_params = validate_and_merge_config(
-                base_class=garpos_fixed_params.inversion_params,
-                override_config=custom_settings,
-            )
-
-        garpos_input = GarposInput.from_datafile(obsfile_path)
-        results_suffix = f"{garpos_input.survey_id}_{run_id}"
-        results_path = results_dir / f"{results_suffix}-res.dat"
-
-        if results_path.exists() and not override:
-            print(f"Results already exist for {str(results_path)}")
-            return None
-        logger.loginfo(
-            f"Running GARPOS model for {garpos_input.site_name}, {garpos_input.survey_id}. Run ID: {run_id}"
-        )
-        input_path = results_dir / f"_{run_id}_observation.ini"
-        fixed_path = results_dir / f"_{run_id}_settings.ini"
-        garpos_fixed_params._to_datafile(fixed_path)
-        garpos_input.to_datafile(input_path)
-
-        rf = drive_garpos(
-            str(input_path),
-            str(fixed_path),
-            str(results_dir) + "/",
-            f"{garpos_input.survey_id}_{run_id}",
-            13,
-        )
-        return rf
-
     def _run_garpos_survey_dir(
         self,
         garpos_survey_dir: GARPOSSurveyDir,
@@ -298,58 +251,22 @@ class GarposHandler(WorkflowABC):
             f"Running GARPOS model for survey {garpos_survey_dir.location.parent.stem}. Run ID: {run_id}"
         )
 
-        results_dir_main = garpos_survey_dir.results_dir
-        results_dir = results_dir_main / f"run_{run_id}"
-        if results_dir.exists() and override:
-            # Remove existing results directory if override is True
-            try:
-                shutil.rmtree(results_dir)
-            except Exception as e:
-                logger.logerr(
-                    f"Failed to remove existing results directory {results_dir}: {e}"
-                )
-
-        elif results_dir.exists() and not override:
+        results_dir = garpos_survey_dir.results_dir / f"run_{run_id}"
+        if results_dir.exists() and not override:
             logger.loginfo(
                 f"Results directory {results_dir} already exists. Use override=True to overwrite existing results."
             )
             return
-        results_dir.mkdir(parents=True, exist_ok=True)
-
-        obsfile_path = garpos_survey_dir.default_obsfile
-
-        if not obsfile_path.exists():
-            raise ValueError(f"Observation file not found at {obsfile_path}")
 
-        initialInput = GarposInput.from_datafile(obsfile_path)
-
-        for i in range(iterations):
-            logger.loginfo(
-                f"Iteration {i + 1} of {iterations} for survey {garpos_survey_dir.location.parent.stem}"
-            )
-
-            obsfile_path = self._run_garpos(
-                custom_settings=custom_settings,
-                obsfile_path=obsfile_path,
-                results_dir=results_dir,
-                run_id=f"{i}",
-                override=override,
-            )
-            if iterations > 1 and i < iterations - 1:
-                iterationInput = GarposInput.from_datafile(obsfile_path)
-                delta_position = iterationInput.delta_center_position.get_position()
-                iterationInput.array_center_enu.east += delta_position[0]
-                iterationInput.array_center_enu.north += delta_position[1]
-                iterationInput.array_center_enu.up += delta_position[2]
-                # zero out delta position for next iteration
-                iterationInput.delta_center_position = (
-                    initialInput.delta_center_position
-                )
-                iterationInput.to_datafile(obsfile_path)
-            # Add array delta center position to the array center enu
-
-        results = GarposInput.from_datafile(obsfile_path)
-        process_garpos_results(results)
+        task = self._build_garpos_task(
+            garpos_survey_dir,
+            survey_id=garpos_survey_dir.location.parent.stem,
+            custom_settings=custom_settings,
+            run_id=run_id,
+            iterations=iterations,
+            override=override,
+        )
+        self._run_garpos_task(task)
 
     def _run_garpos_survey(
         self,
@@ -387,8 +304,79 @@ class GarposHandler(WorkflowABC):
             logger.logwarn(f"Skipping survey {survey_id}: {e}")
             return
 
-        results_dir_main = self.current_garpos_survey_dir.results_dir
-        results_dir = results_dir_main / f"run_{run_id}"
+        task = self._build_garpos_task(
+            self.current_garpos_survey_dir,
+            survey_id=survey_id,
+            custom_settings=custom_settings,
+            run_id=run_id,
+            iterations=iterations,
+            override=override,
+        )
+        self._run_garpos_task(task)
+
+    def _run_garpos_task(self, task: GarposTask) -> Optional[Path]:
+        """Run a GARPOS task in this process.
+
+        The iterations are run by `run_garpos_iterations`, the same function
+        the parallel scheduler's workers use.
+
+        Parameters
+        ----------
+        task : GarposTask
+            The task to run, from `_build_garpos_task`.
+
+        Returns
+        -------
+        Optional[Path]
+            The results observation file of the last iteration, or None if
+            the results already existed.
+        """
+        return run_garpos_iterations(
+            drive_garpos=drive_garpos,
+            garpos_fixed=task.garpos_fixed,
+            obsfile_path=task.obsfile_path,
+            results_dir=task.results_dir,
+            iterations=task.iterations,
+            override=task.override,
+        )
+
+    def _build_garpos_task(
+        self,
+        garpos_survey_dir: GARPOSSurveyDir,
+        survey_id: str,
+        custom_settings: Optional[dict | InversionParams] = None,
+        run_id: int | str = 0,
+        iterations: int = 1,
+        override: bool = False,
+    ) -> GarposTask:
+        """Prepare the results directory and settings of a GARPOS task.
+
+        Parameters
+        ----------
+        garpos_survey_dir : GARPOSSurveyDir
+            The GARPOS survey directory to run.
+        survey_id : str
+            The ID of the survey.
+        custom_settings : dict | InversionParams, optional
+            Custom inversion parameters to merge, by default None.
+        run_id : int | str, optional
+            The run identifier, by default 0.
+        iterations : int, optional
+            The number of iterations to run, by default 1.
+        override : bool, optional
+            If True, override existing results, by default False.
+
+        Returns
+        -------
+        GarposTask
+            The task to schedule.
+
+        Raises
+        ------
+        ValueError
+            If the observation file does not exist.
+        """
+        results_dir = garpos_survey_dir.results_dir / f"run_{run_id}"
         if results_dir.exists() and override:
             # Remove existing results directory if override is True
             try:
@@ -397,43 +385,262 @@ class GarposHandler(WorkflowABC):
                 logger.logerr(
                     f"Failed to remove existing results directory {results_dir}: {e}"
                 )
-
         results_dir.mkdir(parents=True, exist_ok=True)
 
-        obsfile_path = self.current_garpos_survey_dir.default_obsfile
-
+        obsfile_path = garpos_survey_dir.default_obsfile
         if not obsfile_path.exists():
             raise ValueError(f"Observation file not found at {obsfile_path}")
 
-        initialInput = GarposInput.from_datafile(obsfile_path)
+        garpos_fixed_params = self.garpos_fixed.model_copy()
+        if custom_settings is not None:
+            garpos_fixed_params.inversion_params = validate_and_merge_config(
+                base_class=garpos_fixed_params.inversion_params,
+                override_config=custom_settings,
+            )
+        return GarposTask(
+            task_id=f"{survey_id}_run_{run_id}",
+            survey_id=survey_id,
+            run_id=str(run_id),
+            obsfile_path=obsfile_path,
+            results_dir=results_dir,
+            garpos_fixed=garpos_fixed_params,
+            iterations=iterations,
+            override=override,
+        )
 
-        for i in range(iterations):
-            logger.loginfo(f"Iteration {i + 1} of {iterations} for survey {survey_id}")
+    def _collect_survey_dirs(
+        self,
+        survey_id: Optional[str] = None,
+        surveys: Optional[list[GARPOSSurveyDir]] = None,
+    ) -> list[tuple[str, GARPOSSurveyDir]]:
+        """Resolve the (survey ID, GARPOS survey directory) pairs to run."""
+        if surveys is not None:
+            return [(s.location.parent.stem, s) for s in surveys]
+
+        survey_ids = (
+            [s.id for s in self.current_campaign_metadata.surveys]
+            if survey_id is None
+            else [survey_id]
+        )
+        survey_dirs = []
+        for sid in survey_ids:
+            try:
+                self.set_survey(survey_id=sid)
+            except ValueError as e:
+                logger.logwarn(f"Skipping survey {sid}: {e}")
+                continue
+            survey_dirs.append((sid, self.current_garpos_survey_dir))
+        return survey_dirs
 
-            obsfile_path = self._run_garpos(
-                custom_settings=custom_settings,
-                obsfile_path=obsfile_path,
-                results_dir=results_dir,
-                run_id=f"{i}",
-                override=override,
-            )
-            if iterations > 1 and i < iterations - 1:
-                iterationInput = GarposInput.from_datafile(obsfile_path)
-                delta_position = iterationInput.delta_center_position.get_position()
-                iterationInput.array_center_enu.east += delta_position[0]
-                iterationInput.array_center_enu.north += delta_position[1]
-                iterationInput.array_center_enu.up += delta_position[2]
-                # zero out delta position for next iteration
-                iterationInput.delta_center_position = (
-                    initialInput.delta_center_position
+    def run_garpos_parallel(
+        self,
+        run_settings: dict[int | str, Optional[dict | InversionParams]],
+        survey_id: Optional[str] = None,
+        iterations: int = 1,
+        override: bool = False,
+        surveys: Optional[list[GARPOSSurveyDir]] = None,
+        n_processes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        garpos_path: Optional[str | Path] = None,
+    ) -> pd.DataFrame:
+        """Run GARPOS for every survey and settings combination in parallel.
+
+        Each survey/run pair is an independent inversion written to its own
+        ``results_dir/run_{run_id}`` directory, with its output captured in a
+        per-task log file there.
+
+        Parameters
+        ----------
+        run_settings : dict[int | str, dict | InversionParams | None]
+            Custom inversion parameters keyed by run ID. Use a single entry to
+            run every survey with one set of settings, or several entries for
+            a settings sweep.
+        survey_id : str, optional
+            The ID of the survey to run, by default all surveys of the campaign.
+        iterations : int, optional
+            The number of iterations to run, by default 1.
+        override : bool, optional
+            If True, override existing results, by default False.
+        surveys : list[GARPOSSurveyDir], optional
+            GARPOS survey directories to run instead of the campaign surveys.
+        n_processes : int, optional
+            Number of concurrent inversions, by default the number of CPUs.
+        timeout : float, optional
+            Wall-clock limit per inversion in seconds, by default no limit.
+        garpos_path : str | Path, optional
+            GARPOS_PATH to load GARPOS from in each worker, by default the
+            current environment.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per task with its status, results file, log file,
+            elapsed time and error message.
+        """
+        tasks = []
+        for sid, garpos_survey_dir in self._collect_survey_dirs(
+            survey_id=survey_id, surveys=surveys
+        ):
+            for run_id, settings in run_settings.items():
+                try:
+                    tasks.append(
+                        self._build_garpos_task(
+                            garpos_survey_dir=garpos_survey_dir,
+                            survey_id=sid,
+                            custom_settings=settings,
+                            run_id=run_id,
+                            iterations=iterations,
+                            override=override,
+                        )
+                    )
+                except ValueError as e:
+                    logger.logwarn(f"Skipping survey {sid}, run {run_id}: {e}")
+
+        scheduler = GarposScheduler(
+            n_workers=n_processes, timeout=timeout, garpos_path=garpos_path
+        )
+        summary = summarize_results(scheduler.run(tasks))
+        n_failed = summary.status.isin(["failed", "timeout"]).sum()
+        logger.loginfo(
+            f"Finished {len(summary)} GARPOS runs, {n_failed} failed or timed out"
+        )
+        return summary
+
+    def run_garpos_sweep(
+        self,
+        param_grid: dict[str, list] | list[dict],
+        survey_id: Optional[str] = None,
+        surveys: Optional[list[GARPOSSurveyDir]] = None,
+        iterations: int = 1,
+        override: bool = False,
+        n_processes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        record_results: bool = True,
+    ) -> pd.DataFrame:
+        """Run a GARPOS hyperparameter sweep, reusing cached results.
+
+        Each configuration is merged into the current inversion parameters
+        and identified by a hash of the observation file content, the
+        effective InversionParams and ``iterations``. Configurations whose
+        hash already has results on disk (``results_dir/run_sweep_<hash>``)
+        are not rerun; the rest are run in parallel with
+        `run_garpos_parallel`'s scheduler.
+
+        Parameters
+        ----------
+        param_grid : dict[str, list] | list[dict]
+            InversionParams overrides, either as a grid of field name to
+            values (expanded as a cartesian product) or a list of overrides.
+        survey_id : str, optional
+            The ID of the survey to run, by default all surveys of the campaign.
+        surveys : list[GARPOSSurveyDir], optional
+            GARPOS survey directories to run instead of the campaign surveys.
+        iterations : int, optional
+            The number of iterations per configuration, by default 1.
+        override : bool, optional
+            If True, rerun configurations even if cached, by default False.
+        n_processes : int, optional
+            Number of concurrent inversions, by default the number of CPUs.
+        timeout : float, optional
+            Wall-clock limit per inversion in seconds, by default no limit.
+        record_results : bool, optional
+            If True, add newly completed runs to the asset catalog's model
+            results table, by default True.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per survey and configuration with the swept parameters,
+            ``abic``, ``rms_tt``, ``delta_center_east/north/up``, the run
+            status (``cached``, ``success``, ``skipped``, ``failed`` or
+            ``timeout``), hash, run ID and results path.
+        """
+        configurations = expand_param_grid(param_grid)
+        rows = []
+        tasks = []
+        pending = {}
+        for sid, garpos_survey_dir in self._collect_survey_dirs(
+            survey_id=survey_id, surveys=surveys
+        ):
+            obsfile_path = garpos_survey_dir.default_obsfile
+            if not obsfile_path.exists():
+                logger.logwarn(
+                    f"Skipping survey {sid}: observation file not found at {obsfile_path}"
                 )
+                continue
+            for overrides in configurations:
+                inversion_params = validate_and_merge_config(
+                    base_class=self.garpos_fixed.inversion_params,
+                    override_config=overrides,
+                )
+                config_hash = sweep_hash(obsfile_path, inversion_params, iterations)
+                run_id = sweep_run_id(config_hash)
+                run_dir = garpos_survey_dir.results_dir / f"run_{run_id}"
+                row = {
+                    "survey_id": sid,
+                    **overrides,
+                    "hash": config_hash,
+                    "run_id": run_id,
+                    "obsfile_path": str(obsfile_path),
+                    "hyper_params": inversion_params.model_dump(mode="json"),
+                }
+                manifest = None if override else load_sweep_manifest(run_dir, config_hash)
+                if manifest is not None:
+                    row.update(status="cached", results_path=manifest["results_path"])
+                    rows.append(row)
+                    continue
+                task_id = f"{sid}_run_{run_id}"
+                if task_id in pending:
+                    # duplicate configuration in the grid, already scheduled
+                    continue
+                # results without a matching manifest are partial; rerun them
+                task = self._build_garpos_task(
+                    garpos_survey_dir=garpos_survey_dir,
+                    survey_id=sid,
+                    custom_settings=inversion_params,
+                    run_id=run_id,
+                    iterations=iterations,
+                    override=True,
+                )
+                tasks.append(task)
+                pending[task.task_id] = (row, overrides, inversion_params)
+                rows.append(row)
 
-                iterationInput.to_datafile(obsfile_path)
+        logger.loginfo(
+            f"GARPOS sweep: {len(rows) - len(tasks)} cached, "
+            f"{len(tasks)} configurations to run"
+        )
+        if tasks:
+            scheduler = GarposScheduler(n_workers=n_processes, timeout=timeout)
+            for task, result in zip(tasks, scheduler.run(tasks)):
+                row, overrides, inversion_params = pending[task.task_id]
+                row.update(status=result.status, results_path=result.results_path)
+                if result.status == "success":
+                    write_sweep_manifest(
+                        run_dir=task.results_dir,
+                        config_hash=row["hash"],
+                        survey_id=task.survey_id,
+                        overrides=overrides,
+                        inversion_params=inversion_params,
+                        iterations=iterations,
+                        results_path=result.results_path,
+                    )
 
-            # Add array delta center position to the array center enu
+        for row in rows:
+            row.update(summarize_run_results(row.get("results_path")))
+        sweep_df = pd.DataFrame(rows)
+        if sweep_df.empty:
+            return sweep_df
+        sweep_df["results_path"] = sweep_df["results_path"].map(
+            lambda path: str(path) if pd.notna(path) else None
+        )
 
-        results = GarposInput.from_datafile(obsfile_path)
-        process_garpos_results(results)
+        if record_results:
+            # cached runs were recorded when they first completed
+            self.asset_catalog.add_model_results(
+                sweep_df[sweep_df.status == "success"]
+            )
+        return sweep_df
 
     def run_garpos(
         self,
@@ -443,7 +650,9 @@ class GarposHandler(WorkflowABC):
         override: bool = False,
         custom_settings: Optional[dict | InversionParams] = None,
         surveys: Optional[list[GARPOSSurveyDir]] = None,
-    ) -> None:
+        n_processes: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Optional[pd.DataFrame]:
         """Run the GARPOS model for a specific date or for all dates.
 
         Parameters
@@ -458,9 +667,33 @@ class GarposHandler(WorkflowABC):
             If True, override existing results, by default False.
         custom_settings : dict | InversionParams, optional
             Custom GARPOS settings to apply, by default None.
+        n_processes : int, optional
+            Number of surveys to run concurrently, by default 1 (serial).
+        timeout : float, optional
+            Wall-clock limit per survey in seconds when running in parallel,
+            by default no limit.
+
+        Returns
+        -------
+        pd.DataFrame | None
+            The run summary from `run_garpos_parallel` when ``n_processes``
+            is greater than 1, otherwise None.
         """
 
         logger.loginfo(f"Running GARPOS model. Run ID: {run_id}")
+        if n_processes > 1:
+            if surveys is None and custom_settings:
+                custom_settings = dict(custom_settings).get("inversion_params")
+            return self.run_garpos_parallel(
+                run_settings={run_id: custom_settings},
+                survey_id=survey_id,
+                iterations=iterations,
+                override=override,
+                surveys=surveys,
+                n_processes=n_processes,
+                timeout=timeout,
+            )
+
         if surveys is None:
             surveys_to_process = (
                 [s.id for s in self.current_campaign_metadata.surveys]
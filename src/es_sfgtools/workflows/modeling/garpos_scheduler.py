@@ -0,0 +1,398 @@
+"""
+Process-pool scheduler for running independent GARPOS inversions in parallel.
+
+Each task (one survey with one set of inversion settings) runs in its own
+child process so the Fortran-backed ``drive_garpos`` call can be given a
+wall-clock timeout and killed without affecting the other tasks. Each child
+loads GARPOS from ``GARPOS_PATH`` itself and redirects its output, including
+the Fortran output, to a per-task log file in the task's results directory.
+"""
+
+import logging
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+from multiprocessing import cpu_count, get_context
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, List, Literal, Optional
+
+import pandas as pd
+from pydantic import BaseModel, Field
+
+from es_sfgtools.logging import GarposLogger as logger
+from es_sfgtools.modeling.garpos_tools.functions import process_garpos_results
+from es_sfgtools.modeling.garpos_tools.load_utils import load_drive_garpos, load_lib
+from es_sfgtools.modeling.garpos_tools.schemas import GarposFixed, GarposInput
+
+TASK_LOG_FILE_NAME = "garpos_task.log"
+
+TaskStatus = Literal["success", "skipped", "failed", "timeout"]
+
+
+class GarposTask(BaseModel):
+    """A single GARPOS inversion: one survey with one set of settings."""
+
+    task_id: str = Field(..., description="Unique task identifier")
+    survey_id: str = Field(..., description="Survey identifier")
+    run_id: str = Field(..., description="Run identifier of the results directory")
+    obsfile_path: Path = Field(..., description="GARPOS observation file")
+    results_dir: Path = Field(..., description="Directory for the run results")
+    garpos_fixed: GarposFixed = Field(
+        ..., description="Fixed parameters, with any custom settings merged"
+    )
+    iterations: int = Field(1, ge=1, description="Number of GARPOS iterations")
+    override: bool = Field(False, description="Override existing results")
+
+    @property
+    def log_path(self) -> Path:
+        return self.results_dir / TASK_LOG_FILE_NAME
+
+
+class GarposTaskResult(BaseModel):
+    """Outcome of a `GarposTask`."""
+
+    task_id: str
+    survey_id: str
+    run_id: str
+    status: TaskStatus
+    results_path: Optional[Path] = None
+    log_path: Optional[Path] = None
+    elapsed_s: float = 0.0
+    error: Optional[str] = None
+
+
+def load_garpos_driver() -> Callable:
+    """
+    Load ``drive_garpos`` for the current process.
+
+    Uses ``GARPOS_PATH`` when it is set, otherwise the installed ``garpos``
+    package.
+
+    Raises:
+        ImportError: If GARPOS cannot be found.
+    """
+    garpos_path = os.getenv("GARPOS_PATH", None)
+    if garpos_path is not None and garpos_path != "None":
+        return load_drive_garpos()
+    from garpos import drive_garpos
+
+    return drive_garpos
+
+
+def run_garpos_iterations(
+    drive_garpos: Callable,
+    garpos_fixed: GarposFixed,
+    obsfile_path: Path,
+    results_dir: Path,
+    iterations: int = 1,
+    override: bool = False,
+) -> Optional[Path]:
+    """
+    Run GARPOS on an observation file, re-centering the array between iterations.
+
+    Used by both `GarposHandler`'s serial runs and the scheduler's worker
+    processes. ``drive_garpos`` is passed in so each worker can load its own.
+
+    Args:
+        drive_garpos (Callable): The GARPOS entry point.
+        garpos_fixed (GarposFixed): Fixed parameters for the inversion.
+        obsfile_path (Path): Initial observation file.
+        results_dir (Path): Directory to write the results to.
+        iterations (int, optional): Number of iterations. Defaults to 1.
+        override (bool, optional): Override existing results. Defaults to False.
+
+    Returns:
+        Optional[Path]: The results observation file of the last iteration,
+        or None if the results already existed.
+    """
+    initial_input = GarposInput.from_datafile(obsfile_path)
+    for i in range(iterations):
+        logger.loginfo(
+            f"Iteration {i + 1} of {iterations} for survey {initial_input.survey_id}"
+        )
+        garpos_input = GarposInput.from_datafile(obsfile_path)
+        results_path = results_dir / f"{garpos_input.survey_id}_{i}-res.dat"
+        if results_path.exists() and not override:
+            logger.loginfo(f"Results already exist for {str(results_path)}")
+            return None
+
+        logger.loginfo(
+            f"Running GARPOS model for {garpos_input.site_name}, "
+            f"{garpos_input.survey_id}. Run ID: {i}"
+        )
+        input_path = results_dir / f"_{i}_observation.ini"
+        fixed_path = results_dir / f"_{i}_settings.ini"
+        garpos_fixed._to_datafile(fixed_path)
+        garpos_input.to_datafile(input_path)
+        obsfile_path = Path(
+            drive_garpos(
+                str(input_path),
+                str(fixed_path),
+                str(results_dir) + "/",
+                f"{garpos_input.survey_id}_{i}",
+                13,
+            )
+        )
+        if iterations > 1 and i < iterations - 1:
+            iteration_input = GarposInput.from_datafile(obsfile_path)
+            delta_position = iteration_input.delta_center_position.get_position()
+            iteration_input.array_center_enu.east += delta_position[0]
+            iteration_input.array_center_enu.north += delta_position[1]
+            iteration_input.array_center_enu.up += delta_position[2]
+            # zero out delta position for next iteration
+            iteration_input.delta_center_position = (
+                initial_input.delta_center_position
+            )
+            iteration_input.to_datafile(obsfile_path)
+
+    process_garpos_results(GarposInput.from_datafile(obsfile_path))
+    return obsfile_path
+
+
+def run_garpos_task(task: GarposTask) -> Optional[Path]:
+    """
+    Default task function: load GARPOS and run the task's iterations.
+
+    Library paths are resolved in the worker so each process picks up the
+    ``GARPOS_PATH`` it was started with.
+    """
+    drive_garpos = load_garpos_driver()
+    garpos_fixed = task.garpos_fixed
+    libs = load_lib()
+    if libs is not None:
+        garpos_fixed = garpos_fixed.model_copy(
+            update={"lib_directory": libs[0], "lib_raytrace": libs[1]}
+        )
+    return run_garpos_iterations(
+        drive_garpos=drive_garpos,
+        garpos_fixed=garpos_fixed,
+        obsfile_path=task.obsfile_path,
+        results_dir=task.results_dir,
+        iterations=task.iterations,
+        override=task.override,
+    )
+
+
+def _redirect_output(log_path: Path) -> None:
+    """Send this process's stdout/stderr, including native output, to a log file."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.close(fd)
+    # sys.stdout/stderr may not be backed by fds 1/2 (e.g. in notebooks)
+    sys.stdout = open(1, "w", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    loggers = [logging.getLogger()] + [
+        lg for lg in logging.Logger.manager.loggerDict.values()
+        if isinstance(lg, logging.Logger)
+    ]
+    for lg in loggers:
+        for handler in lg.handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setStream(sys.stderr)
+
+
+def _task_worker(
+    task: GarposTask,
+    task_fn: Callable,
+    garpos_path: Optional[str],
+    conn,
+) -> None:
+    """Child process entry point; sends ``(status, results_path, error)`` on ``conn``."""
+    try:
+        task.results_dir.mkdir(parents=True, exist_ok=True)
+        _redirect_output(task.log_path)
+        if garpos_path is not None:
+            os.environ["GARPOS_PATH"] = str(garpos_path)
+        results_path = task_fn(task)
+        # task functions return None when existing results were kept
+        status = "skipped" if results_path is None else "success"
+        conn.send((status, results_path, None))
+    except BaseException:
+        error = traceback.format_exc()
+        print(error, file=sys.stderr)
+        conn.send(("failed", None, error))
+    finally:
+        conn.close()
+
+
+class GarposScheduler:
+    """
+    Run GARPOS tasks across a pool of worker processes.
+
+    A fresh process is started for every task so that a hung inversion can be
+    terminated on timeout and native state is never shared between runs;
+    at most ``n_workers`` tasks run at once.
+
+    Args:
+        n_workers (int, optional): Maximum number of concurrent tasks.
+            Defaults to the number of CPUs.
+        timeout (float, optional): Wall-clock limit per task in seconds.
+            Defaults to None (no limit).
+        garpos_path (str | Path, optional): ``GARPOS_PATH`` to set in each
+            worker. Defaults to the parent's environment.
+        task_fn (Callable, optional): Function run for each task in the
+            worker. Defaults to `run_garpos_task`.
+    """
+
+    def __init__(
+        self,
+        n_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        garpos_path: Optional[str | Path] = None,
+        task_fn: Callable[[GarposTask], Optional[Path]] = run_garpos_task,
+        poll_interval: float = 0.5,
+    ):
+        self.n_workers = max(1, n_workers or cpu_count())
+        self.timeout = timeout
+        self.garpos_path = str(garpos_path) if garpos_path is not None else None
+        self.task_fn = task_fn
+        self.poll_interval = poll_interval
+        # spawn: no TileDB or native GARPOS state is inherited from the parent
+        self._context = get_context("spawn")
+
+    def _start(self, task: GarposTask) -> dict:
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_task_worker,
+            args=(task, self.task_fn, self.garpos_path, child_conn),
+            name=f"garpos-{task.task_id}",
+        )
+        process.start()
+        child_conn.close()
+        logger.loginfo(f"Started GARPOS task {task.task_id} (pid {process.pid})")
+        return {
+            "task": task,
+            "process": process,
+            "conn": parent_conn,
+            "message": None,
+            "start": time.monotonic(),
+        }
+
+    @staticmethod
+    def _result(
+        job: dict, status: TaskStatus, results_path=None, error=None
+    ) -> GarposTaskResult:
+        task: GarposTask = job["task"]
+        return GarposTaskResult(
+            task_id=task.task_id,
+            survey_id=task.survey_id,
+            run_id=task.run_id,
+            status=status,
+            results_path=results_path,
+            log_path=task.log_path,
+            elapsed_s=time.monotonic() - job["start"],
+            error=error,
+        )
+
+    @staticmethod
+    def _receive(job: dict) -> None:
+        """Read a job's ``(status, results_path, error)`` message, if any.
+
+        Called as soon as the pipe is readable: a worker sending a message
+        larger than the pipe buffer cannot exit until it has been read.
+        """
+        conn = job["conn"]
+        try:
+            job["message"] = conn.recv()
+        except EOFError:
+            pass
+        finally:
+            conn.close()
+
+    def _collect(self, job: dict) -> GarposTaskResult:
+        """Build the result of a finished job from its message and exit code."""
+        if not job["conn"].closed and job["conn"].poll():
+            self._receive(job)
+        job["conn"].close()
+        job["process"].join()
+        if job["message"] is not None:
+            status, results_path, error = job["message"]
+        else:
+            status, results_path, error = (
+                "failed",
+                None,
+                f"Worker exited with code {job['process'].exitcode}",
+            )
+        return self._result(job, status, results_path, error)
+
+    def run(self, tasks: List[GarposTask]) -> List[GarposTaskResult]:
+        """
+        Run all tasks and return their results in task order.
+
+        Failures and timeouts are recorded in the results rather than raised.
+
+        Raises:
+            ValueError: If two tasks share a ``task_id``.
+        """
+        counts = Counter(task.task_id for task in tasks)
+        duplicates = sorted(task_id for task_id, n in counts.items() if n > 1)
+        if duplicates:
+            raise ValueError(f"Duplicate GARPOS task IDs: {duplicates}")
+        pending = list(tasks)
+        running: dict = {}
+        results: dict = {}
+        logger.loginfo(
+            f"Running {len(pending)} GARPOS tasks on {self.n_workers} workers"
+        )
+        while pending or running:
+            while pending and len(running) < self.n_workers:
+                job = self._start(pending.pop(0))
+                running[job["process"].sentinel] = job
+
+            # Wait on the pipes too, so messages are read before the workers exit
+            waiting = {}
+            for sentinel, job in running.items():
+                waiting[sentinel] = job
+                if not job["conn"].closed:
+                    waiting[job["conn"]] = job
+            ready = wait(list(waiting), timeout=self.poll_interval)
+            for obj in ready:
+                if obj is waiting[obj]["conn"]:
+                    self._receive(waiting[obj])
+            for sentinel in ready:
+                if sentinel not in running:
+                    continue
+                job = running.pop(sentinel)
+                result = self._collect(job)
+                results[result.task_id] = result
+                log = (
+                    logger.logerr
+                    if result.status in ("failed", "timeout")
+                    else logger.loginfo
+                )
+                log(
+                    f"GARPOS task {result.task_id} {result.status} "
+                    f"in {result.elapsed_s:.1f} s"
+                )
+
+            if self.timeout is None:
+                continue
+            now = time.monotonic()
+            for sentinel, job in list(running.items()):
+                if now - job["start"] <= self.timeout:
+                    continue
+                job["process"].terminate()
+                job["process"].join()
+                job["conn"].close()
+                running.pop(sentinel)
+                result = self._result(
+                    job, "timeout", error=f"Exceeded timeout of {self.timeout} s"
+                )
+                results[result.task_id] = result
+                logger.logerr(
+                    f"GARPOS task {result.task_id} timed out after {self.timeout} s"
+                )
+
+        return [results[task.task_id] for task in tasks]
+
+
+def summarize_results(results: List[GarposTaskResult]) -> pd.DataFrame:
+    """Tabulate task results, one row per task."""
+    columns = list(GarposTaskResult.model_fields.keys())
+    return pd.DataFrame([result.model_dump() for result in results], columns=columns)
@@ -0,0 +1,174 @@
+"""
+Helpers for GARPOS hyperparameter sweeps with content-hashed result caching.
+
+A sweep configuration is identified by the hash of the observation file
+content, the effective `InversionParams` and the number of iterations. Its
+results go to ``results_dir/run_sweep_<hash>``. A manifest written on
+success lets later sweeps reuse the results instead of rerunning GARPOS.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from es_sfgtools.logging import GarposLogger as logger
+from es_sfgtools.modeling.garpos_tools.schemas import (
+    GarposInput,
+    InversionParams,
+    InversionResults,
+)
+
+SWEEP_MANIFEST_FILE_NAME = "sweep.json"
+SWEEP_RUN_PREFIX = "sweep_"
+SWEEP_HASH_LENGTH = 16
+
+
+def expand_param_grid(
+    param_grid: Dict[str, List[Any]] | List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into a list of override dictionaries.
+
+    Args:
+        param_grid (dict | list): Either a mapping of InversionParams field
+            names to lists of values, expanded as a cartesian product, or a
+            list of override dictionaries used as given.
+
+    Returns:
+        List[Dict[str, Any]]: One override dictionary per configuration.
+
+    Example:
+        >>> expand_param_grid({"log_lambda": [[-2], [-1]], "maxloop": [50]})
+        [{'log_lambda': [-2], 'maxloop': 50}, {'log_lambda': [-1], 'maxloop': 50}]
+    """
+    if isinstance(param_grid, list):
+        return [dict(overrides) for overrides in param_grid]
+    keys = list(param_grid.keys())
+    return [
+        dict(zip(keys, values))
+        for values in itertools.product(*(param_grid[key] for key in keys))
+    ]
+
+
+def sweep_hash(
+    obsfile_path: Path, inversion_params: InversionParams, iterations: int = 1
+) -> str:
+    """
+    Hash an observation file's content with the effective inversion parameters.
+
+    Args:
+        obsfile_path (Path): The GARPOS observation file.
+        inversion_params (InversionParams): The merged inversion parameters.
+        iterations (int, optional): Number of GARPOS iterations. Defaults to 1.
+
+    Returns:
+        str: A hex digest identifying the configuration.
+    """
+    digest = hashlib.sha256()
+    digest.update(Path(obsfile_path).read_bytes())
+    params = json.dumps(inversion_params.model_dump(mode="json"), sort_keys=True)
+    digest.update(params.encode())
+    digest.update(f"iterations={iterations}".encode())
+    return digest.hexdigest()[:SWEEP_HASH_LENGTH]
+
+
+def sweep_run_id(config_hash: str) -> str:
+    """Run ID of a sweep configuration; results go to ``run_{run_id}``."""
+    return f"{SWEEP_RUN_PREFIX}{config_hash}"
+
+
+def latest_results_file(run_dir: Path) -> Optional[Path]:
+    """Return the ``*-res.dat`` file of the last iteration in a run directory."""
+    data_files = list(Path(run_dir).glob("*-res.dat"))
+    if not data_files:
+        return None
+    return max(data_files, key=lambda x: int(x.stem.split("_")[-1].split("-")[0]))
+
+
+def load_sweep_manifest(run_dir: Path, config_hash: str) -> Optional[dict]:
+    """
+    Return the manifest of a completed sweep run, or None if it must be (re)run.
+
+    A run is reusable only if its manifest records the same hash and its
+    results file is still on disk.
+    """
+    manifest_path = Path(run_dir) / SWEEP_MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return None
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError) as e:
+        logger.logwarn(f"Ignoring unreadable sweep manifest {manifest_path}: {e}")
+        return None
+    if manifest.get("hash") != config_hash:
+        return None
+    results_path = manifest.get("results_path")
+    if results_path is None or not Path(results_path).exists():
+        return None
+    return manifest
+
+
+def write_sweep_manifest(
+    run_dir: Path,
+    config_hash: str,
+    survey_id: str,
+    overrides: Dict[str, Any],
+    inversion_params: InversionParams,
+    iterations: int,
+    results_path: Path,
+) -> dict:
+    """Record a completed sweep run so later sweeps can reuse it."""
+    manifest = {
+        "hash": config_hash,
+        "survey_id": survey_id,
+        "overrides": overrides,
+        "inversion_params": inversion_params.model_dump(mode="json"),
+        "iterations": iterations,
+        "results_path": str(results_path),
+    }
+    (Path(run_dir) / SWEEP_MANIFEST_FILE_NAME).write_text(
+        json.dumps(manifest, indent=2, default=str)
+    )
+    return manifest
+
+
+def summarize_run_results(results_path: Optional[Path]) -> Dict[str, float]:
+    """
+    Extract ABIC, final RMS travel-time residual and the array delta-center.
+
+    Values that cannot be read from the results file are NaN.
+
+    Args:
+        results_path (Path, optional): A GARPOS ``*-res.dat`` file.
+
+    Returns:
+        Dict[str, float]: ``abic``, ``rms_tt`` (ms) and ``delta_center_east``,
+        ``delta_center_north``, ``delta_center_up`` (m).
+    """
+    summary = {
+        "abic": math.nan,
+        "rms_tt": math.nan,
+        "delta_center_east": math.nan,
+        "delta_center_north": math.nan,
+        "delta_center_up": math.nan,
+    }
+    if results_path is None or not Path(results_path).exists():
+        return summary
+    try:
+        inversion = InversionResults.from_dat_file(str(results_path))
+        summary["abic"] = inversion.ABIC
+        if inversion.loop_data:
+            summary["rms_tt"] = inversion.loop_data[-1].rms_tt
+    except Exception as e:
+        logger.logwarn(f"Could not read inversion summary from {results_path}: {e}")
+    try:
+        delta = GarposInput.from_datafile(results_path).delta_center_position
+        summary["delta_center_east"] = delta.east
+        summary["delta_center_north"] = delta.north
+        summary["delta_center_up"] = delta.up
+    except Exception as e:
+        logger.logwarn(f"Could not read delta center from {results_path}: {e}")
+    return summary
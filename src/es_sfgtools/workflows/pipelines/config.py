@@ -1,7 +1,7 @@
 # External imports
 from multiprocessing import cpu_count
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 import yaml
 from pydantic import BaseModel, Field, field_serializer, field_validator
@@ -9,6 +9,8 @@ from pydantic import BaseModel, Field, field_serializer, field_validator
 # External package imports
 from pride_ppp import PrideCLIConfig
 
+from es_sfgtools.tiledb_tools.maintenance import MaintenancePolicy
+
 
 class PrideConfig(BaseModel):
     """Pipeline-level configuration for PRIDE processing.
@@ -24,6 +26,31 @@ class PrideConfig(BaseModel):
     override_products_download: bool = Field(
         False, title="Flag to Override Existing Products Download"
     )
+    catalog_batch_size: int = Field(
+        default=10,
+        ge=1,
+        title="PRIDE results written to the asset catalog per transaction",
+    )
+    prefetch_products: bool = Field(
+        True, title="Download every day's GNSS products before running PRIDE"
+    )
+    prefetch_workers: int = Field(
+        default=8, title="Number of concurrent GNSS product downloads", ge=1
+    )
+    product_cache_max_gb: Optional[float] = Field(
+        default=None,
+        gt=0,
+        title="Size cap of the shared GNSS product cache in GB (None: no cap)",
+    )
+    deep_verify_products: bool = Field(
+        False, title="Verify cached GNSS products by sha256 instead of size/mtime"
+    )
+
+    @property
+    def product_cache_max_bytes(self) -> Optional[int]:
+        if self.product_cache_max_gb is None:
+            return None
+        return int(self.product_cache_max_gb * 1e9)
 
 
 class NovatelConfig(BaseModel):
@@ -69,6 +96,11 @@ class RinexConfig(BaseModel):
 
 class DFOP00Config(BaseModel):
     override: bool = Field(False, title="Flag to Override Existing Data")
+    batch_size: int = Field(
+        default=10000,
+        ge=1,
+        title="Number of ping/reply pairs per shotdata write",
+    )
 
 
 class PositionUpdateConfig(BaseModel):
@@ -77,6 +109,17 @@ class PositionUpdateConfig(BaseModel):
         default=0.1, ge=0.1, le=1, title="Length Scale for Interpolation in seconds"
     )
     plot: bool = Field(False)
+    merge_chunk_hours: float = Field(
+        default=24, gt=0, title="Hours of shot data merged with positions at once"
+    )
+    merge_pad_minutes: float = Field(
+        default=5,
+        ge=0,
+        title="Minutes of positions read before and after each merged chunk",
+    )
+    merge_processes: int = Field(
+        default=1, ge=1, title="Number of processes merging days in parallel"
+    )
 
 
 class SV3PipelineConfig(BaseModel):
@@ -85,6 +128,7 @@ class SV3PipelineConfig(BaseModel):
     rinex_config: RinexConfig = RinexConfig()
     dfop00_config: DFOP00Config = DFOP00Config()
     position_update_config: PositionUpdateConfig = PositionUpdateConfig()
+    tiledb_maintenance: MaintenancePolicy = MaintenancePolicy()
 
     class Config:
         title = "SV3 Pipeline Configuration"
@@ -150,6 +194,25 @@ class QCPinConfig(BaseModel):
     n_processes: int = Field(
         default_factory=cpu_count, title="Number of Processes to Use"
     )
+    files_per_batch: int = Field(
+        default=100,
+        ge=1,
+        title="Number of QC PIN files read per task",
+    )
+    flush_rows: int = Field(
+        default=200_000,
+        ge=1,
+        title="Number of shotdata rows buffered per TileDB write",
+    )
+    flush_interval_s: float = Field(
+        default=60.0,
+        gt=0,
+        title="Maximum seconds between TileDB writes",
+    )
+    gnss_obs_backend: Literal["python", "nova2tile"] = Field(
+        default="python",
+        title="Writer for RANGEA observations (in-process or nova2tile binary)",
+    )
 
 
 class QCPipelineConfig(BaseModel):
@@ -159,6 +222,7 @@ class QCPipelineConfig(BaseModel):
     pride_config: PrideConfig = PrideConfig()
     rinex_config: RinexConfig = RinexConfig()
     position_update_config: PositionUpdateConfig = PositionUpdateConfig()
+    tiledb_maintenance: MaintenancePolicy = MaintenancePolicy()
 
     class Config:
         title = "QC Pipeline Configuration"
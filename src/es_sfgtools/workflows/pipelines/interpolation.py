@@ -0,0 +1,265 @@
+"""
+Local interpolation of antenna positions over a shared sorted time index.
+
+`TimeSeriesInterpolator` sorts the training times once and answers every
+query with ``np.searchsorted`` windows on that index, for all three axes at
+once. It offers two estimators:
+
+- `TimeSeriesInterpolator.kernel_predict`: Gaussian process / kernel ridge
+  regression with an RBF kernel tapered by a compactly supported (C6)
+  Wendland function. Training points further apart than the taper support do not
+  interact, so the kernel matrix of the sorted training times is banded and
+  is factorized once with a banded Cholesky in O(n b^2) for bandwidth b.
+  The taper keeps the kernel positive definite.
+- `TimeSeriesInterpolator.radius_predict`: the uniform mean of the training
+  values within a radius, computed from prefix sums.
+
+Both cost time linear in the number of training and prediction points.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.linalg import cho_solve_banded, cholesky_banded
+
+# Kernel matrix elements held at once by the predictive standard deviation
+STD_BLOCK_ELEMENTS = 1 << 21
+
+
+def tapered_rbf(
+    distance: np.ndarray, length_scale: float, support: float
+) -> np.ndarray:
+    """
+    RBF kernel multiplied by the Wendland taper
+    ``(1 - r)^8 (32r^3 + 25r^2 + 8r + 1)``, ``r = |distance| / support``.
+
+    Args:
+        distance (np.ndarray): Absolute time differences.
+        length_scale (float): RBF length scale.
+        support (float): Distance beyond which the kernel is zero.
+
+    Returns:
+        np.ndarray: Kernel values, 1 at zero distance.
+    """
+    r = np.minimum(np.abs(distance) / support, 1.0)
+    taper = (1.0 - r) ** 8 * (((32.0 * r + 25.0) * r + 8.0) * r + 1.0)
+    return np.exp(-0.5 * (distance / length_scale) ** 2) * taper
+
+
+class TimeSeriesInterpolator:
+    """
+    Interpolates (time, east, north, up) samples at arbitrary times.
+
+    Args:
+        times (np.ndarray): Training times in seconds, shape (n,).
+        values (np.ndarray): Training values, shape (n,) or (n, k).
+
+    Raises:
+        ValueError: If the times and values differ in length.
+    """
+
+    def __init__(self, times: np.ndarray, values: np.ndarray):
+        times = np.asarray(times, dtype=float).ravel()
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[:, np.newaxis]
+        if values.shape[0] != times.shape[0]:
+            raise ValueError(
+                f"Got {times.shape[0]} training times and {values.shape[0]} values"
+            )
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.values = values[order]
+        self._factor: Optional[tuple] = None
+
+    def __len__(self) -> int:
+        return self.times.shape[0]
+
+    def window(
+        self, times: np.ndarray, radius: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ``[lo, hi)`` training index range within ``radius`` of each time.
+        """
+        times = np.asarray(times, dtype=float).ravel()
+        lo = np.searchsorted(self.times, times - radius, side="left")
+        hi = np.searchsorted(self.times, times + radius, side="right")
+        return lo, hi
+
+    def count(self, times: np.ndarray, radius: float) -> np.ndarray:
+        """Count the training points within ``radius`` of each time."""
+        lo, hi = self.window(times, radius)
+        return hi - lo
+
+    def radius_predict(self, times: np.ndarray, radius: float) -> np.ndarray:
+        """
+        Average the training values within ``radius`` of each time.
+
+        Matches ``RadiusNeighborsRegressor(radius, weights="uniform")``.
+
+        Returns:
+            np.ndarray: Shape (m, k); NaN where no training point is in range.
+        """
+        lo, hi = self.window(times, radius)
+        # Centering keeps the prefix sums of ECEF coordinates small
+        offset = self.values.mean(axis=0) if len(self) else 0.0
+        cumulative = np.vstack(
+            (
+                np.zeros((1, self.values.shape[1])),
+                np.cumsum(self.values - offset, axis=0),
+            )
+        )
+        n = (hi - lo)[:, np.newaxis]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            window_sum = cumulative[hi] - cumulative[lo]
+            return offset + window_sum / np.where(n > 0, n, np.nan)
+
+    def _band_factor(
+        self, length_scale: float, support: float, alpha: float
+    ) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Cholesky factor of the banded kernel matrix and the kernel weights."""
+        key = (length_scale, support, alpha)
+        if self._factor is not None and self._factor[0] == key:
+            return self._factor[1:]
+
+        n = len(self)
+        lo, hi = self.window(self.times, support)
+        bandwidth = int(max((hi - np.arange(n) - 1).max(initial=0), 0))
+        band = np.zeros((bandwidth + 1, n))
+        band[bandwidth] = 1.0 + alpha
+        for offset in range(1, bandwidth + 1):
+            band[bandwidth - offset, offset:] = tapered_rbf(
+                self.times[offset:] - self.times[:-offset], length_scale, support
+            )
+        factor = cholesky_banded(band, lower=False)
+        mean = self.values.mean(axis=0)
+        weights = cho_solve_banded((factor, False), self.values - mean)
+        self._factor = (key, weights, mean, bandwidth)
+        return weights, mean, bandwidth
+
+    def kernel_predict(
+        self,
+        times: np.ndarray,
+        length_scale: float,
+        support: Optional[float] = None,
+        alpha: float = 1e-6,
+        return_std: bool = False,
+        block_size: int = 4096,
+    ) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
+        """
+        Kernel regression with a tapered RBF kernel.
+
+        The prediction is the posterior mean of a Gaussian process with a
+        constant mean (the training mean), i.e. kernel ridge regression of
+        the centered values. ``alpha`` is the noise variance relative to the
+        unit kernel amplitude; ``alpha=1`` reproduces ``KernelRidge(alpha=1)``.
+
+        Args:
+            times (np.ndarray): Prediction times in seconds, shape (m,).
+            length_scale (float): RBF length scale in seconds.
+            support (float, optional): Taper support in seconds. Defaults
+                to eight length scales; shorter supports are faster but
+                less accurate across gaps in the training data.
+            alpha (float, optional): Noise variance. Defaults to 1e-6.
+            return_std (bool, optional): Also return the predictive standard
+                deviation, computed from the training points within three
+                length scales of each prediction. Defaults to False.
+            block_size (int, optional): Prediction points evaluated at once.
+
+        Returns:
+            np.ndarray | Tuple[np.ndarray, np.ndarray]: The predictions,
+            shape (m, k), and with ``return_std`` the standard deviations,
+            shape (m,), in units of the kernel amplitude. Predictions with
+            no training point within ``support`` revert to the training mean
+            with standard deviation 1.
+        """
+        support = 8.0 * length_scale if support is None else support
+        times = np.asarray(times, dtype=float).ravel()
+        n_values = self.values.shape[1]
+        if len(self) == 0:
+            mean = np.full((times.shape[0], n_values), np.nan)
+            return (mean, np.ones(times.shape[0])) if return_std else mean
+
+        weights, training_mean, _ = self._band_factor(length_scale, support, alpha)
+        prediction = np.empty((times.shape[0], n_values))
+        std = np.empty(times.shape[0]) if return_std else None
+        for start in range(0, times.shape[0], block_size):
+            block = np.s_[start : start + block_size]
+            index, valid = self._window_index(times[block], support)
+            k_star = self._k_star(times[block], index, valid, length_scale, support)
+            prediction[block] = training_mean + np.einsum(
+                "mw,mwk->mk", k_star, weights[index]
+            )
+            if return_std:
+                index, valid = self._window_index(
+                    times[block], min(support, 3.0 * length_scale)
+                )
+                k_star = self._k_star(
+                    times[block], index, valid, length_scale, support
+                )
+                std[block] = self._local_std(
+                    index, valid, k_star, length_scale, support, alpha
+                )
+        return (prediction, std) if return_std else prediction
+
+    def _window_index(
+        self, times: np.ndarray, radius: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Padded training indices within ``radius`` of each time and their mask."""
+        lo, hi = self.window(times, radius)
+        width = int((hi - lo).max(initial=0))
+        index = lo[:, np.newaxis] + np.arange(width)
+        valid = index < hi[:, np.newaxis]
+        return np.where(valid, index, 0), valid
+
+    def _k_star(
+        self,
+        times: np.ndarray,
+        index: np.ndarray,
+        valid: np.ndarray,
+        length_scale: float,
+        support: float,
+    ) -> np.ndarray:
+        """Cross-covariance between prediction times and their training windows."""
+        k_star = tapered_rbf(
+            times[:, np.newaxis] - self.times[index], length_scale, support
+        )
+        return np.where(valid, k_star, 0.0)
+
+    def _local_std(
+        self,
+        index: np.ndarray,
+        valid: np.ndarray,
+        k_star: np.ndarray,
+        length_scale: float,
+        support: float,
+        alpha: float,
+    ) -> np.ndarray:
+        """
+        Predictive standard deviation from each point's own training window.
+
+        Each point needs a (w, w) kernel matrix for a window of w training
+        points, so points are taken in groups of at most
+        ``STD_BLOCK_ELEMENTS // w**2`` to bound memory for wide windows.
+        """
+        n_points, width = index.shape
+        if width == 0:
+            return np.ones(n_points)
+        std = np.empty(n_points)
+        # Padding slots become identity rows with a zero cross-covariance
+        eye = np.eye(width)
+        rows = max(1, STD_BLOCK_ELEMENTS // width**2)
+        for start in range(0, n_points, rows):
+            block = np.s_[start : start + rows]
+            window_times = self.times[index[block]]
+            kernel = tapered_rbf(
+                window_times[:, :, np.newaxis] - window_times[:, np.newaxis, :],
+                length_scale,
+                support,
+            )
+            pair_valid = valid[block, :, np.newaxis] & valid[block, np.newaxis, :]
+            kernel = np.where(pair_valid, kernel + alpha * eye, eye)
+            lower = np.linalg.cholesky(kernel)
+            v = np.linalg.solve(lower, k_star[block, :, np.newaxis])[:, :, 0]
+            std[block] = np.sqrt(np.clip(1.0 - np.sum(v**2, axis=1), 0.0, None))
+        return std
@@ -0,0 +1,264 @@
+"""
+Columnar preparation of the Kalman smoother input.
+
+``run_filter_simulation`` consumes a float64 matrix with one row per
+observation and the columns of `STATE_COLUMNS`. The functions here build
+that matrix straight from the columns of a TileDB read, either a DataFrame
+or the dict of NumPy arrays returned by ``read_df(..., raw=True)``. Each
+source fills a preallocated matrix column by column, with vectorized ECEF
+conversion and NaN filling, and the sources are merged with one stable sort
+on time. They produce the same rows as ``prepare_positions_data``,
+``prepare_kinematic_data`` and ``combine_data`` in
+`shotdata_gnss_refinement` without the intermediate DataFrames.
+"""
+
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pymap3d
+from scipy.stats import zscore
+
+from es_sfgtools.logging import ProcessLogger as logger
+
+STATE_COLUMNS = (
+    "time",
+    "east",
+    "north",
+    "up",
+    "ant_x",
+    "ant_y",
+    "ant_z",
+    "ant_sigx",
+    "ant_sigy",
+    "ant_sigz",
+    "rho_xy",
+    "rho_xz",
+    "rho_yz",
+    "east_sig",
+    "north_sig",
+    "up_sig",
+    "v_sden",
+    "v_sdeu",
+    "v_sdnu",
+)
+COLUMN = {name: i for i, name in enumerate(STATE_COLUMNS)}
+ANTENNA = slice(COLUMN["ant_x"], COLUMN["ant_z"] + 1)
+
+# State uncertainty columns and the IMU columns they are filled from
+_POSITION_STD_COLUMNS = {
+    "ant_sigx": "latitude_std",
+    "ant_sigy": "longitude_std",
+    "ant_sigz": "height_std",
+    "east_sig": "eastVelocity_std",
+    "north_sig": "northVelocity_std",
+    "up_sig": "upVelocity_std",
+}
+# Uncertainty assigned to every kinematic position and velocity
+_KINEMATIC_SIGMA = 0.1
+
+
+def n_rows(data: Mapping[str, np.ndarray] | pd.DataFrame) -> int:
+    """Number of rows of a DataFrame or raw TileDB read."""
+    return len(data["time"]) if "time" in data else 0
+
+
+def to_epoch_seconds(time: np.ndarray | pd.Series) -> np.ndarray:
+    """
+    Convert timestamps to float epoch seconds, as ``pd.Timestamp.timestamp``.
+
+    Naive timestamps are UTC and numeric input is returned as float.
+    """
+    time = np.asarray(time)
+    if np.issubdtype(time.dtype, np.datetime64):
+        nanoseconds = time.astype("datetime64[ns]").astype(np.int64)
+        return np.round(nanoseconds / 1e9, 6)
+    if time.dtype == object:
+        return np.array([value.timestamp() for value in time], dtype=float)
+    return time.astype(float)
+
+
+def _bfill(values: np.ndarray) -> np.ndarray:
+    """Back-fill NaNs, as ``Series.bfill()``."""
+    n = values.shape[0]
+    next_valid = np.where(~np.isnan(values), np.arange(n), n)
+    next_valid = np.minimum.accumulate(next_valid[::-1])[::-1]
+    return np.where(next_valid < n, values[np.minimum(next_valid, n - 1)], np.nan)
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs, as ``Series.ffill()``."""
+    previous_valid = np.where(~np.isnan(values), np.arange(values.shape[0]), -1)
+    previous_valid = np.maximum.accumulate(previous_valid)
+    return np.where(
+        previous_valid >= 0, values[np.maximum(previous_valid, 0)], np.nan
+    )
+
+
+def fill_nan(values: np.ndarray) -> np.ndarray:
+    """Back-fill then forward-fill NaNs, as ``Series.bfill().ffill()``."""
+    return _ffill(_bfill(np.asarray(values, dtype=float)))
+
+
+def _empty_states(n: int) -> np.ndarray:
+    states = np.empty((n, len(STATE_COLUMNS)))
+    # Correlations and velocity covariances are not observed
+    for name in ("rho_xy", "rho_xz", "rho_yz", "v_sden", "v_sdeu", "v_sdnu"):
+        states[:, COLUMN[name]] = 0.0
+    return states
+
+
+def positions_state_matrix(
+    positions: Mapping[str, np.ndarray] | pd.DataFrame,
+) -> np.ndarray:
+    """
+    Build the state rows of IMU positions, as ``prepare_positions_data``.
+
+    Args:
+        positions (Mapping[str, np.ndarray] | pd.DataFrame): IMU positions
+            with the `IMUPositionDataFrame` columns.
+
+    Returns:
+        np.ndarray: Shape (n, len(STATE_COLUMNS)).
+    """
+    states = _empty_states(n_rows(positions))
+    states[:, COLUMN["time"]] = to_epoch_seconds(positions["time"])
+    (
+        states[:, COLUMN["ant_x"]],
+        states[:, COLUMN["ant_y"]],
+        states[:, COLUMN["ant_z"]],
+    ) = pymap3d.geodetic2ecef(
+        np.asarray(positions["latitude"], dtype=float),
+        np.asarray(positions["longitude"], dtype=float),
+        np.asarray(positions["height"], dtype=float),
+    )
+    states[:, COLUMN["east"]] = positions["eastVelocity"]
+    states[:, COLUMN["north"]] = positions["northVelocity"]
+    states[:, COLUMN["up"]] = positions["upVelocity"]
+    for column, source in _POSITION_STD_COLUMNS.items():
+        states[:, COLUMN[column]] = fill_nan(positions[source])
+    return states
+
+
+def kinematic_state_matrix(
+    kin_positions: Mapping[str, np.ndarray] | pd.DataFrame,
+    z_thresh: float = 4,
+) -> np.ndarray:
+    """
+    Build the state rows of kinematic GNSS positions.
+
+    Matches ``prepare_kinematic_data``.
+
+    Velocities are differentiated from the positions and rows with a
+    velocity z-score of ``z_thresh`` or more on any axis are dropped.
+
+    Args:
+        kin_positions (Mapping[str, np.ndarray] | pd.DataFrame): Kinematic
+            positions with ECEF 'east', 'north', 'up' and 'time' columns,
+            sorted by time.
+        z_thresh (float, optional): Velocity z-score threshold. Defaults to 4.
+
+    Returns:
+        np.ndarray: Shape (n, len(STATE_COLUMNS)).
+    """
+    original_len = n_rows(kin_positions)
+    states = _empty_states(original_len)
+    time = to_epoch_seconds(kin_positions["time"])
+    states[:, COLUMN["time"]] = time
+    states[:, COLUMN["ant_x"]] = kin_positions["east"]
+    states[:, COLUMN["ant_y"]] = kin_positions["north"]
+    states[:, COLUMN["ant_z"]] = kin_positions["up"]
+    for column in _POSITION_STD_COLUMNS:
+        states[:, COLUMN[column]] = _KINEMATIC_SIGMA
+    if original_len == 0:
+        return states
+
+    time_diff = _bfill(np.diff(time, prepend=np.nan))
+    keep = np.ones(original_len, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for axis, velocity_column in zip(
+            ("ant_x", "ant_y", "ant_z"), ("east", "north", "up")
+        ):
+            position_diff = np.diff(states[:, COLUMN[axis]], prepend=np.nan)
+            velocity = _bfill(position_diff / time_diff)
+            states[:, COLUMN[velocity_column]] = velocity
+            # filter by z-score to remove spikes
+            keep &= zscore(np.abs(velocity)) < z_thresh
+    states = states[keep]
+
+    filtered_len = len(states)
+    logger.loginfo(
+        f"Kinematic data filtered from {original_len} to {filtered_len} rows for a "
+        f"{((original_len - filtered_len) / original_len * 100):.2f} % reduction "
+        f"using z-score threshold of {z_thresh}."
+    )
+    return states
+
+
+def frame_state_matrix(
+    data: Mapping[str, np.ndarray] | pd.DataFrame,
+) -> np.ndarray:
+    """
+    Take the state columns of already prepared data; missing columns are NaN.
+    """
+    states = np.full((n_rows(data), len(STATE_COLUMNS)), np.nan)
+    for i, column in enumerate(STATE_COLUMNS):
+        if column in data:
+            values = data[column]
+            states[:, i] = (
+                to_epoch_seconds(values) if column == "time" else np.asarray(values)
+            )
+    return states
+
+
+def median_antenna_position(states: np.ndarray) -> Tuple[float, float, float]:
+    """Median ECEF antenna position of state rows."""
+    return tuple(float(value) for value in np.median(states[:, ANTENNA], axis=0))
+
+
+def spatial_mask(
+    states: np.ndarray,
+    radius: float,
+    center: Optional[Tuple[float, float, float]] = None,
+) -> np.ndarray:
+    """
+    Rows whose antenna position is within ``radius`` on every ECEF axis.
+
+    Args:
+        states (np.ndarray): State rows.
+        radius (float): Half-width of the accepted box in meters.
+        center (Tuple[float, float, float], optional): Box center. Defaults
+            to the median antenna position of ``states``.
+    """
+    if len(states) == 0:
+        return np.ones(0, dtype=bool)
+    if center is None:
+        center = median_antenna_position(states)
+    offset = np.abs(states[:, ANTENNA] - np.asarray(center))
+    return (offset <= radius).all(axis=1)
+
+
+def combine_state_matrices(*matrices: np.ndarray) -> np.ndarray:
+    """
+    Stack state rows of several sources and sort them by time.
+
+    Matches ``combine_data``.
+
+    Rows with equal times keep the order of ``matrices``.
+    """
+    times = np.concatenate([matrix[:, COLUMN["time"]] for matrix in matrices])
+    order = np.argsort(times, kind="stable")
+    # Row i of the stacked sources goes to row destination[i] of the result
+    destination = np.empty_like(order)
+    destination[order] = np.arange(order.shape[0])
+    combined = np.empty((times.shape[0], len(STATE_COLUMNS)))
+    start = 0
+    for matrix in matrices:
+        combined[destination[start : start + len(matrix)]] = matrix
+        start += len(matrix)
+    return combined
+
+
+def state_frame(states: np.ndarray) -> pd.DataFrame:
+    """View state rows as a DataFrame with the `STATE_COLUMNS` names."""
+    return pd.DataFrame(states, columns=list(STATE_COLUMNS), copy=False)
@@ -0,0 +1,333 @@
+"""
+Content-addressed cache of GNSS products with an integrity manifest.
+
+Every product file is stored once under ``pride_dir/product_cache/objects``
+by its sha256 and hard linked into the ``<year>/product/common`` directories
+that use it, so stations and years share one copy. A SQLite manifest records
+the size, hash, mtime, source and fetch time of each product, the links to
+it, and when it was last used:
+
+- `ProductCache.get` verifies a product cheaply (size and mtime of the
+  stored object) or, on demand, deeply (its sha256), and relinks it into a
+  common directory without downloading it again.
+- `ProductCache.add` records a product, adopting files downloaded before
+  the manifest existed or by PRIDE itself.
+- `ProductCache.evict` removes the least recently used products until the
+  cache fits a size cap.
+"""
+
+import datetime
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.declarative import declarative_base
+
+from es_sfgtools.data_mgmt.sqlite_utils import set_sqlite_pragmas
+from es_sfgtools.logging import PRIDELogger as logger
+
+CACHE_DIR = "product_cache"
+HASH_CHUNK = 1 << 20
+
+Base = declarative_base()
+
+
+class Products(Base):
+    """A cached product, keyed by its file name."""
+
+    __tablename__ = "products"
+    name = sa.Column(sa.String, primary_key=True)
+    sha256 = sa.Column(sa.String, nullable=False, index=True)
+    size = sa.Column(sa.Integer, nullable=False)
+    mtime_ns = sa.Column(sa.Integer, nullable=False)
+    source = sa.Column(sa.String, nullable=True)
+    fetched_at = sa.Column(sa.DateTime, nullable=False)
+    last_used = sa.Column(sa.DateTime, nullable=False, index=True)
+
+
+class ProductLinks(Base):
+    """A common directory path hard linked to a cached product."""
+
+    __tablename__ = "product_links"
+    path = sa.Column(sa.String, primary_key=True)
+    name = sa.Column(sa.String, nullable=False, index=True)
+
+
+def file_sha256(path: Path) -> str:
+    """Hex sha256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _replace_with_link(target: Path, path: Path) -> None:
+    """Atomically make ``path`` a hard link (or copy) of ``target``."""
+    temporary = path.parent / f".{path.name}.link"
+    temporary.unlink(missing_ok=True)
+    try:
+        os.link(target, temporary)
+    except OSError:
+        # Different file system
+        shutil.copy2(target, temporary)
+    os.replace(temporary, path)
+
+
+class ProductCache:
+    """Content-addressed GNSS product store shared by every PRIDE directory.
+
+    Args:
+        pride_dir (Path): The PRIDE directory; the cache lives in
+            ``pride_dir/product_cache``.
+        max_bytes (int, optional): Size cap applied by `evict`. Defaults to
+            None (unbounded).
+    """
+
+    def __init__(self, pride_dir: Path, max_bytes: Optional[int] = None):
+        self.pride_dir = Path(pride_dir)
+        self.cache_dir = self.pride_dir / CACHE_DIR
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.engine = sa.create_engine(
+            f"sqlite+pysqlite:///{self.cache_dir / 'manifest.sqlite'}",
+            poolclass=sa.pool.NullPool,
+            connect_args={"timeout": 60},
+        )
+        sa.event.listen(self.engine, "connect", set_sqlite_pragmas)
+        Base.metadata.create_all(self.engine)
+
+    def object_path(self, sha256: str) -> Path:
+        """Path of the stored object with a given hash."""
+        return self.objects_dir / sha256[:2] / sha256
+
+    def _relative(self, path: Path) -> str:
+        path = Path(path).absolute()
+        try:
+            return str(path.relative_to(self.pride_dir.absolute()))
+        except ValueError:
+            return str(path)
+
+    def _absolute(self, path: str) -> Path:
+        return self.pride_dir / path if not Path(path).is_absolute() else Path(path)
+
+    def entry(self, name: str) -> Optional[sa.Row]:
+        """The manifest entry of a product, if any."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                sa.select(Products).where(Products.name == name)
+            ).first()
+
+    def entries(self) -> List[sa.Row]:
+        """Every manifest entry, least recently used first."""
+        with self.engine.connect() as conn:
+            return conn.execute(
+                sa.select(Products).order_by(Products.last_used, Products.name)
+            ).fetchall()
+
+    def total_bytes(self) -> int:
+        """Size of the stored objects, counting shared content once."""
+        with self.engine.connect() as conn:
+            sizes = sa.select(Products.sha256, sa.func.max(Products.size).label("size"))
+            sizes = sizes.group_by(Products.sha256).subquery()
+            return conn.execute(sa.select(sa.func.sum(sizes.c.size))).scalar() or 0
+
+    def is_valid(self, entry: sa.Row, deep: bool = False) -> bool:
+        """Check the stored object of an entry.
+
+        The cheap check compares its size and mtime with the manifest; the
+        deep check also compares its sha256.
+        """
+        path = self.object_path(entry.sha256)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+            return False
+        return not deep or file_sha256(path) == entry.sha256
+
+    def add(self, path: Path, source: Optional[str] = None) -> sa.Row:
+        """Record a product file, storing its content once.
+
+        The file is hard linked into the object store, or replaced by a link
+        to an identical stored object.
+
+        Args:
+            path (Path): The product, in a common product directory.
+            source (str, optional): Where it was downloaded from, e.g.
+                "wuhan". Defaults to None (unknown).
+
+        Returns:
+            sa.Row: The manifest entry.
+        """
+        path = Path(path)
+        sha256 = file_sha256(path)
+        stored = self.object_path(sha256)
+        stored.parent.mkdir(exist_ok=True)
+        if stored.exists() and stored.stat().st_size == path.stat().st_size:
+            if not stored.samefile(path):
+                _replace_with_link(stored, path)
+        else:
+            _replace_with_link(path, stored)
+        stat = stored.stat()
+
+        previous = self.entry(path.name)
+        now = _now()
+        values = {
+            "name": path.name,
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "source": source,
+            "fetched_at": now,
+            "last_used": now,
+        }
+        with self.engine.begin() as conn:
+            conn.execute(
+                sqlite_insert(Products)
+                .values(**values)
+                .on_conflict_do_update(index_elements=["name"], set_=values)
+            )
+            self._record_link(conn, path)
+            replaced = previous is not None and previous.sha256 != sha256
+            if replaced and not conn.execute(
+                sa.select(sa.func.count()).where(Products.sha256 == previous.sha256)
+            ).scalar():
+                self.object_path(previous.sha256).unlink(missing_ok=True)
+        return self.entry(path.name)
+
+    def _record_link(self, conn: sa.Connection, path: Path) -> None:
+        conn.execute(
+            sqlite_insert(ProductLinks)
+            .values(path=self._relative(path), name=path.name)
+            .on_conflict_do_update(index_elements=["path"], set_={"name": path.name})
+        )
+
+    def get(self, name: str, directory: Path, deep: bool = False) -> Optional[Path]:
+        """Verified path of a cached product in ``directory``.
+
+        A valid product missing from ``directory`` (e.g. cached by another
+        year or station) is linked into it. An invalid product is removed
+        from the cache and from ``directory``.
+
+        Args:
+            name (str): The product file name.
+            directory (Path): The common product directory that needs it.
+            deep (bool, optional): Verify the sha256 as well. Defaults to
+                False.
+
+        Returns:
+            Optional[Path]: ``directory / name``, or None if the product is
+            not cached or fails verification.
+        """
+        entry = self.entry(name)
+        if entry is None:
+            return None
+        if not self.is_valid(entry, deep=deep):
+            logger.logwarn(f"Cached product {name} failed verification, removing it")
+            self._remove(entry)
+            return None
+
+        path = Path(directory) / name
+        stored = self.object_path(entry.sha256)
+        if not path.exists() or not path.samefile(stored):
+            directory.mkdir(parents=True, exist_ok=True)
+            _replace_with_link(stored, path)
+        with self.engine.begin() as conn:
+            conn.execute(
+                sa.update(Products)
+                .where(Products.name == name)
+                .values(last_used=_now())
+            )
+            self._record_link(conn, path)
+        return path
+
+    def verify(self, deep: bool = False) -> List[str]:
+        """Verify every product, removing the invalid ones.
+
+        Returns:
+            List[str]: The names of the removed products.
+        """
+        removed = []
+        for entry in self.entries():
+            if not self.is_valid(entry, deep=deep):
+                self._remove(entry)
+                removed.append(entry.name)
+        if removed:
+            logger.logwarn(f"Removed {len(removed)} invalid cached products")
+        return removed
+
+    def evict(
+        self, max_bytes: Optional[int] = None, keep: Iterable[str] = ()
+    ) -> List[str]:
+        """Remove least recently used products until the cache fits the cap.
+
+        Args:
+            max_bytes (int, optional): The cap. Defaults to ``max_bytes`` of
+                the cache; nothing is evicted if both are None.
+            keep (Iterable[str], optional): Product names never evicted,
+                e.g. those needed by the running batch.
+
+        Returns:
+            List[str]: The names of the evicted products.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+        keep = set(keep)
+        total = self.total_bytes()
+        evicted = []
+        for entry in self.entries():
+            if total <= max_bytes:
+                break
+            if entry.name in keep:
+                continue
+            total -= self._remove(entry)
+            evicted.append(entry.name)
+        if evicted:
+            logger.loginfo(
+                f"Evicted {len(evicted)} GNSS products from the cache, "
+                f"{total / 1e9:.2f} GB remain"
+            )
+        return evicted
+
+    def _remove(self, entry: sa.Row) -> int:
+        """Remove a product, its links and, if unshared, its object.
+
+        Returns:
+            int: The bytes freed.
+        """
+        stored = self.object_path(entry.sha256)
+        with self.engine.begin() as conn:
+            links = conn.execute(
+                sa.select(ProductLinks.path).where(ProductLinks.name == entry.name)
+            ).scalars()
+            for link in links:
+                self._absolute(link).unlink(missing_ok=True)
+            conn.execute(sa.delete(ProductLinks).where(ProductLinks.name == entry.name))
+            conn.execute(sa.delete(Products).where(Products.name == entry.name))
+            shared = conn.execute(
+                sa.select(sa.func.count()).where(Products.sha256 == entry.sha256)
+            ).scalar()
+        if shared:
+            return 0
+        stored.unlink(missing_ok=True)
+        return entry.size
+
+    def stats(self) -> Dict[str, int]:
+        """Number of products and stored bytes."""
+        with self.engine.connect() as conn:
+            n_products = conn.execute(
+                sa.select(sa.func.count()).select_from(Products)
+            ).scalar()
+        return {"products": n_products, "bytes": self.total_bytes()}
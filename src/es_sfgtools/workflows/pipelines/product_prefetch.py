@@ -0,0 +1,410 @@
+"""
+Prefetch of the GNSS products PRIDE-PPPAR needs before RINEX processing.
+
+``PrideProcessor.process_batch`` resolves each day's products inside its
+workers, so FTP downloads are serialized per worker and a product shared by
+several RINEX files can be fetched more than once. `ProductPrefetcher`
+collects every day of a batch first and downloads and uncompresses all of
+their products concurrently into the shared
+``pride_dir/<year>/product/common`` cache, where the workers find them
+without touching the network.
+
+Each product file is written under an exclusive ``fcntl`` lock on a
+sidecar lock file and moved into place with an atomic rename, so concurrent
+prefetchers (threads or processes) download a file once and readers never
+see a partial file. Temporary and lock files start with ``.`` so they never
+match a product pattern. Downloads are checked against the server's file
+size and gzip checksum, then recorded in the `ProductCache` manifest, which
+verifies cached products and shares them across stations and years.
+"""
+
+import datetime
+import fcntl
+import gzip
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ftplib import FTP, error_perm
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field
+
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.logging import PRIDELogger as logger
+
+from .product_cache import ProductCache
+
+GPS_EPOCH = datetime.date(1980, 1, 6)
+
+# Product types in the order PRIDE-PPPAR's config catalogs them
+PRODUCT_TYPES = ("sp3", "clk", "bias", "obx", "erp", "brdm")
+
+
+class ProductSource(BaseModel):
+    """An FTP directory holding one GNSS product type.
+
+    ``directory`` and ``pattern`` are ``str.format`` templates of the date
+    fields ``year``, ``yy``, ``doy`` (zero padded) and ``gps_week``.
+    """
+
+    product: str = Field(..., description="Product type, one of PRODUCT_TYPES")
+    name: str = Field(..., description="Name of the analysis center or archive")
+    server: str = Field(..., description="FTP server, e.g. ftp://igs.gnsswhu.cn")
+    directory: str = Field(..., description="Directory template on the server")
+    pattern: str = Field(..., description="File name regex template")
+    sort_order: List[str] = Field(
+        default_factory=list,
+        description="Preferred file name substrings, most preferred first",
+    )
+
+    def format(self, date: datetime.date) -> Tuple[str, re.Pattern]:
+        """Directory and file name pattern of the product for a day."""
+        fields = {
+            "year": f"{date.year:04d}",
+            "yy": f"{date.year % 100:02d}",
+            "doy": f"{date.timetuple().tm_yday:03d}",
+            "gps_week": f"{(date - GPS_EPOCH).days // 7:04d}",
+        }
+        return (
+            self.directory.format(**fields).strip("/"),
+            re.compile(self.pattern.format(**fields)),
+        )
+
+    def rank(self, names: Iterable[str], pattern: re.Pattern) -> List[str]:
+        """Names matching ``pattern``, most preferred first by `sort_order`."""
+        matches = sorted(name for name in names if pattern.match(name))
+
+        def preference(name: str) -> int:
+            for i, preferred in enumerate(self.sort_order):
+                if preferred in name:
+                    return i
+            return len(self.sort_order)
+
+        return sorted(matches, key=preference)
+
+    def choose(self, names: Iterable[str], pattern: re.Pattern) -> Optional[str]:
+        """The preferred name matching ``pattern``, by `sort_order`."""
+        ranked = self.rank(names, pattern)
+        return ranked[0] if ranked else None
+
+
+def _wuhan(product: str, subdirectory: str, content: str) -> ProductSource:
+    return ProductSource(
+        product=product,
+        name="wuhan",
+        server="ftp://igs.gnsswhu.cn",
+        directory=f"pub/whu/phasebias/{{year}}/{subdirectory}",
+        pattern=rf"WUM0MGX(FIN|RAP|ULT)_{{year}}{{doy}}0000_01D_\w+_{content}",
+        sort_order=["FIN", "RAP", "ULT"],
+    )
+
+
+def _ign_mgex(product: str, content: str) -> ProductSource:
+    return ProductSource(
+        product=product,
+        name="ign",
+        server="ftp://igs.ign.fr",
+        directory="pub/igs/products/mgex/{gps_week}",
+        pattern=rf"(COD|GFZ|WUM)0MGX(FIN|RAP)_{{year}}{{doy}}0000_01D_\w+_{content}",
+        sort_order=["COD0MGXFIN", "GFZ0MGXRAP", "WUM0MGXFIN"],
+    )
+
+
+DEFAULT_PRODUCT_SOURCES: List[ProductSource] = [
+    _wuhan("sp3", "orbit", r"ORB\.SP3"),
+    _ign_mgex("sp3", r"ORB\.SP3"),
+    _wuhan("clk", "clock", r"CLK\.CLK"),
+    _ign_mgex("clk", r"CLK\.CLK"),
+    _wuhan("bias", "bias", r"OSB\.BIA"),
+    _ign_mgex("bias", r"OSB\.BIA"),
+    _wuhan("obx", "orbit", r"ATT\.OBX"),
+    _ign_mgex("obx", r"ATT\.OBX"),
+    _wuhan("erp", "orbit", r"ERP\.ERP"),
+    _ign_mgex("erp", r"ERP\.ERP"),
+    ProductSource(
+        product="brdm",
+        name="wuhan",
+        server="ftp://igs.gnsswhu.cn",
+        directory="pub/gps/data/daily/{year}/{doy}/{yy}p",
+        pattern=r"(BRDC00IGS_R|BRDM00DLR_S)_{year}{doy}0000_01D_MN\.rnx",
+        sort_order=["BRDC00IGS_R", "BRDM00DLR_S"],
+    ),
+]
+
+
+def collect_product_dates(rinex_entries: Iterable[AssetEntry]) -> List[datetime.date]:
+    """Every day covered by the RINEX entries, sorted.
+
+    Entries without a data start time are skipped.
+    """
+    dates = set()
+    for entry in rinex_entries:
+        if entry.timestamp_data_start is None:
+            logger.logdebug(f"No data start time for {entry.local_path}, skipping")
+            continue
+        start = entry.timestamp_data_start.date()
+        end = (entry.timestamp_data_end or entry.timestamp_data_start).date()
+        for offset in range((end - start).days + 1):
+            dates.add(start + datetime.timedelta(days=offset))
+    return sorted(dates)
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on ``lock_path`` across threads and processes."""
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _connect(server: str, timeout: float) -> FTP:
+    url = urlparse(server if "://" in server else f"ftp://{server}")
+    ftp = FTP(timeout=timeout)
+    ftp.connect(url.hostname, url.port or 21)
+    ftp.set_pasv(True)
+    ftp.login()
+    return ftp
+
+
+def _uncompress(source: Path, destination: Path) -> None:
+    """Stream a gzip file to ``destination``."""
+    with gzip.open(source, "rb") as f_in, open(destination, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, length=1 << 20)
+
+
+class ProductPrefetcher:
+    """Concurrently downloads GNSS products into the PRIDE common cache.
+
+    Args:
+        pride_dir (Path): The PRIDE directory; products go to
+            ``pride_dir/<year>/product/common``.
+        sources (List[ProductSource], optional): Sources tried in order for
+            each product type. Defaults to `DEFAULT_PRODUCT_SOURCES`.
+        max_workers (int, optional): Concurrent downloads. Defaults to 8.
+        override (bool, optional): Download products even if they are
+            already cached. Defaults to False.
+        timeout (float, optional): FTP timeout in seconds. Defaults to 60.
+        cache (ProductCache, optional): The product manifest. Defaults to
+            the uncapped cache of ``pride_dir``.
+        deep_verify (bool, optional): Verify cached products by sha256
+            rather than by size and mtime. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        pride_dir: Path,
+        sources: Optional[List[ProductSource]] = None,
+        max_workers: int = 8,
+        override: bool = False,
+        timeout: float = 60,
+        cache: Optional[ProductCache] = None,
+        deep_verify: bool = False,
+    ):
+        self.pride_dir = Path(pride_dir)
+        self.sources = list(DEFAULT_PRODUCT_SOURCES if sources is None else sources)
+        self.max_workers = max_workers
+        self.override = override
+        self.timeout = timeout
+        self.cache = ProductCache(self.pride_dir) if cache is None else cache
+        self.deep_verify = deep_verify
+        # Remote directory listings, shared by every product in a directory
+        self._listings: Dict[Tuple[str, str], Optional[List[str]]] = {}
+        self._listing_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._listings_lock = threading.Lock()
+
+    def common_product_dir(self, date: datetime.date) -> Path:
+        """The shared product cache of the year of ``date``."""
+        directory = self.pride_dir / str(date.year) / "product" / "common"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def cached(
+        self, source: ProductSource, date: datetime.date
+    ) -> Optional[Path]:
+        """The cached, uncompressed product of ``source`` for a day, if any.
+
+        Products in the common directory that fail verification are removed;
+        ones missing from the manifest (e.g. downloaded by PRIDE) are added.
+        """
+        _, pattern = source.format(date)
+        directory = self.common_product_dir(date)
+        names = [
+            path.name
+            for path in directory.iterdir()
+            if not path.name.startswith(".")
+            and path.suffix != ".gz"
+            and path.stat().st_size > 0
+        ]
+        for name in source.rank(names, pattern):
+            if self.cache.entry(name) is None:
+                self.cache.add(directory / name)
+            path = self.cache.get(name, directory, deep=self.deep_verify)
+            if path is not None:
+                return path
+        return None
+
+    def list_remote(self, source: ProductSource, directory: str) -> Optional[List[str]]:
+        """List a remote directory once; None if it cannot be listed."""
+        key = (source.server, directory)
+        with self._listings_lock:
+            lock = self._listing_locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._listings:
+                try:
+                    with _connect(source.server, self.timeout) as ftp:
+                        ftp.cwd("/" + directory)
+                        self._listings[key] = ftp.nlst()
+                except Exception as e:
+                    logger.logerr(
+                        f"Failed to list {directory} on {source.server} | {e}"
+                    )
+                    self._listings[key] = None
+            return self._listings[key]
+
+    def download(self, source: ProductSource, directory: str, name: str, dest: Path):
+        """Download ``name`` and move it, uncompressed, to ``dest``."""
+        part = dest.parent / f".{name}.part"
+        try:
+            with _connect(source.server, self.timeout) as ftp:
+                ftp.cwd("/" + directory)
+                with open(part, "wb") as f:
+                    ftp.retrbinary(f"RETR {name}", f.write)
+                try:
+                    expected_size = ftp.size(name)
+                except error_perm:
+                    expected_size = None
+            size = part.stat().st_size
+            if size == 0:
+                raise FileNotFoundError(f"Downloaded file {name} is empty (0 bytes)")
+            if expected_size is not None and size != expected_size:
+                raise IOError(f"Downloaded {size} of {expected_size} bytes of {name}")
+            if name.endswith(".gz"):
+                uncompressed = dest.parent / f".{dest.name}.part"
+                _uncompress(part, uncompressed)
+                part.unlink()
+                part = uncompressed
+            os.replace(part, dest)
+        finally:
+            part.unlink(missing_ok=True)
+
+    def _fetch_file(
+        self, source: ProductSource, directory: str, name: str, date: datetime.date
+    ) -> Optional[Path]:
+        """Cached or downloaded path of one remote file; None on failure."""
+        dest = self.common_product_dir(date) / re.sub(r"\.gz$", "", name)
+        with file_lock(dest.parent / f".{dest.name}.lock"):
+            # Cached by another station or year, or by another prefetcher
+            # while we waited
+            if not self.override and (
+                path := self.cache.get(dest.name, dest.parent, self.deep_verify)
+            ):
+                return path
+            try:
+                self.download(source, directory, name, dest)
+            except Exception as e:
+                logger.logerr(f"Failed to download {name} from {source.server} | {e}")
+                return None
+            self.cache.add(dest, source=source.name)
+        return dest
+
+    def fetch(self, date: datetime.date, product: str) -> Optional[Path]:
+        """Cached path of a product for a day, downloading it if needed.
+
+        Sources of the product type are tried in order.
+
+        Returns:
+            Optional[Path]: The uncompressed product, or None if no source
+            has it.
+        """
+        for source in (s for s in self.sources if s.product == product):
+            if not self.override and (path := self.cached(source, date)) is not None:
+                logger.logdebug(f"Found cached {product} product {path.name}")
+                return path
+
+            directory, pattern = source.format(date)
+            names = source.rank(self.list_remote(source, directory) or [], pattern)
+            if not names:
+                logger.logdebug(
+                    f"No {product} product for {date} on {source.server}/{directory}"
+                )
+            # Fall back to less preferred files if a download fails
+            for name in names:
+                path = self._fetch_file(source, directory, name, date)
+                if path is not None:
+                    logger.logdebug(f"Fetched {product} product {path.name}")
+                    return path
+
+        logger.logwarn(f"No source found for {product} product on {date}")
+        return None
+
+    def prefetch(
+        self,
+        dates: Iterable[datetime.date],
+        products: Iterable[str] = PRODUCT_TYPES,
+    ) -> Dict[Tuple[datetime.date, str], Optional[Path]]:
+        """Fetch every product of every day concurrently.
+
+        Args:
+            dates (Iterable[datetime.date]): The days to fetch.
+            products (Iterable[str], optional): The product types. Defaults
+                to `PRODUCT_TYPES`.
+
+        Returns:
+            Dict[Tuple[datetime.date, str], Optional[Path]]: The product path
+            of each (day, product type), None where it was not found.
+        """
+        tasks = sorted({(date, product) for date in dates for product in products})
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            paths = list(executor.map(lambda task: self.fetch(*task), tasks))
+        results = dict(zip(tasks, paths))
+        self.cache.evict(keep=[path.name for path in paths if path is not None])
+
+        n_found = sum(path is not None for path in paths)
+        logger.loginfo(
+            f"Prefetched {n_found} of {len(tasks)} GNSS products for "
+            f"{len({date for date, _ in tasks})} days"
+        )
+        return results
+
+
+def prefetch_products(
+    rinex_entries: Iterable[AssetEntry],
+    pride_dir: Path,
+    max_workers: int = 8,
+    override: bool = False,
+    max_cache_bytes: Optional[int] = None,
+    deep_verify: bool = False,
+) -> Dict[Tuple[datetime.date, str], Optional[Path]]:
+    """Prefetch the GNSS products of every day of a batch of RINEX files.
+
+    Args:
+        rinex_entries (Iterable[AssetEntry]): The RINEX entries to process.
+        pride_dir (Path): The PRIDE directory.
+        max_workers (int, optional): Concurrent downloads. Defaults to 8.
+        override (bool, optional): Download products even if they are
+            already cached. Defaults to False.
+        max_cache_bytes (int, optional): Evict least recently used products
+            beyond this size. Defaults to None (unbounded).
+        deep_verify (bool, optional): Verify cached products by sha256.
+            Defaults to False.
+
+    Returns:
+        Dict[Tuple[datetime.date, str], Optional[Path]]: See
+        `ProductPrefetcher.prefetch`.
+    """
+    prefetcher = ProductPrefetcher(
+        pride_dir,
+        max_workers=max_workers,
+        override=override,
+        cache=ProductCache(pride_dir, max_bytes=max_cache_bytes),
+        deep_verify=deep_verify,
+    )
+    return prefetcher.prefetch(collect_product_dates(rinex_entries))
@@ -0,0 +1,298 @@
+"""
+Producer/consumer ingest of QC PIN files.
+
+Batches of PIN files are parsed in a spawned process pool with
+`read_qcpin_batch`.
+At most ``max_pending`` batches are in flight, and parsed batches go through
+a bounded queue to a single writer thread, so a slow writer throttles the
+parsers instead of letting results pile up in memory. The writer coalesces
+shot data, RANGEA strings and processed catalog entries and flushes them
+together once enough rows are buffered or the flush interval has passed,
+writing one large TileDB fragment per array per flush.
+"""
+
+import concurrent.futures
+import queue
+import threading
+import time
+from multiprocessing import cpu_count, get_context
+from typing import List, Optional
+
+import pandas as pd
+from tqdm.auto import tqdm
+
+from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.logging import ProcessLogger as logger
+from es_sfgtools.sonardyne_tools.sv3_qc_operations import read_qcpin_batch
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    GNSSObsBackend,
+    TDBGNSSObsArray,
+    TDBShotDataArray,
+)
+
+_STOP = object()
+
+
+class QCIngestWriter:
+    """
+    Single writer thread that coalesces parsed QC PIN batches.
+
+    Buffered data is flushed when ``flush_rows`` shot data rows or
+    ``flush_rangea`` RANGEA strings are buffered, when ``flush_interval``
+    seconds have passed since the last flush, and on `close`. Catalog
+    entries are marked processed only after their data has been written.
+
+    Args:
+        shotdata_tdb (TDBShotDataArray): Destination for the shot data.
+        gnss_obs_tdb (TDBGNSSObsArray): Destination for the RANGEA strings.
+        asset_catalog (PreProcessCatalogHandler): Catalog to update.
+        flush_rows (int, optional): Shot data rows per flush.
+        flush_rangea (int, optional): RANGEA strings per flush.
+        flush_interval (float, optional): Maximum seconds between flushes.
+        max_queue (int, optional): Parsed batches waiting for the writer
+            before `put` blocks.
+        gnss_obs_backend (GNSSObsBackend, optional): Backend used to write
+            the RANGEA strings. Defaults to ``"python"``.
+    """
+
+    def __init__(
+        self,
+        shotdata_tdb: TDBShotDataArray,
+        gnss_obs_tdb: TDBGNSSObsArray,
+        asset_catalog: PreProcessCatalogHandler,
+        flush_rows: int = 200_000,
+        flush_rangea: int = 50_000,
+        flush_interval: float = 60.0,
+        max_queue: int = 8,
+        gnss_obs_backend: GNSSObsBackend = "python",
+    ):
+        self.shotdata_tdb = shotdata_tdb
+        self.gnss_obs_tdb = gnss_obs_tdb
+        self.asset_catalog = asset_catalog
+        self.flush_rows = flush_rows
+        self.flush_rangea = flush_rangea
+        self.flush_interval = flush_interval
+        self.gnss_obs_backend = gnss_obs_backend
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queue))
+        self._thread = threading.Thread(
+            target=self._run, name="qc-ingest-writer", daemon=True
+        )
+        self._error: Optional[BaseException] = None
+        self._shotdata: List[pd.DataFrame] = []
+        self._shotdata_rows = 0
+        self._rangea_strings: dict = {}
+        self._entries: List[AssetEntry] = []
+        self.n_flushes = 0
+
+    def start(self) -> "QCIngestWriter":
+        self._thread.start()
+        return self
+
+    def __enter__(self) -> "QCIngestWriter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def put(
+        self,
+        shotdata: Optional[pd.DataFrame],
+        rangea_strings: List[str],
+        entries: List[AssetEntry],
+    ) -> None:
+        """
+        Queue a parsed batch, blocking while the queue is full.
+
+        Raises:
+            RuntimeError: If the writer thread has failed.
+        """
+        item = (shotdata, rangea_strings, entries)
+        while True:
+            self._raise_if_failed()
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> None:
+        """
+        Flush everything still buffered and stop the writer thread.
+
+        Raises:
+            RuntimeError: If the writer thread failed.
+        """
+        if self._thread.is_alive():
+            while self._thread.is_alive():
+                try:
+                    self._queue.put(_STOP, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            self._thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"QC ingest writer failed: {self._error}") from self._error
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        try:
+            while True:
+                remaining = self.flush_interval - (time.monotonic() - last_flush)
+                try:
+                    item = self._queue.get(timeout=max(remaining, 0.0))
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    self._flush()
+                    return
+                if item is not None:
+                    self._buffer(*item)
+                if (
+                    self._shotdata_rows >= self.flush_rows
+                    or len(self._rangea_strings) >= self.flush_rangea
+                    or time.monotonic() - last_flush >= self.flush_interval
+                ):
+                    self._flush()
+                    last_flush = time.monotonic()
+        except BaseException as e:
+            logger.logerr(f"QC ingest writer failed: {e}")
+            self._error = e
+
+    def _buffer(
+        self,
+        shotdata: Optional[pd.DataFrame],
+        rangea_strings: List[str],
+        entries: List[AssetEntry],
+    ) -> None:
+        if shotdata is not None and not shotdata.empty:
+            self._shotdata.append(shotdata)
+            self._shotdata_rows += len(shotdata)
+        self._rangea_strings.update(dict.fromkeys(rangea_strings))
+        self._entries.extend(entries)
+
+    def _flush(self) -> None:
+        if not (self._shotdata or self._rangea_strings or self._entries):
+            return
+        if self._shotdata:
+            shotdata = self.shotdata_tdb.drop_duplicate_cells(
+                pd.concat(self._shotdata, ignore_index=True)
+            )
+            self.shotdata_tdb.write_df(shotdata, validate=False)
+        if self._rangea_strings:
+            self.gnss_obs_tdb.write_rangea_strings(
+                list(self._rangea_strings),
+                verbose=False,
+                backend=self.gnss_obs_backend,
+            )
+        if self._entries:
+            self.asset_catalog.add_or_update_many(self._entries)
+        logger.logdebug(
+            f"Flushed {self._shotdata_rows} shot data rows, "
+            f"{len(self._rangea_strings)} RANGEA strings and "
+            f"{len(self._entries)} QC PIN entries"
+        )
+        self.n_flushes += 1
+        self._shotdata, self._shotdata_rows = [], 0
+        self._rangea_strings, self._entries = {}, []
+
+
+def ingest_qcpin_files(
+    entries: List[AssetEntry],
+    shotdata_tdb: TDBShotDataArray,
+    gnss_obs_tdb: TDBGNSSObsArray,
+    asset_catalog: PreProcessCatalogHandler,
+    n_processes: Optional[int] = None,
+    files_per_batch: int = 100,
+    max_pending: Optional[int] = None,
+    flush_rows: int = 200_000,
+    flush_rangea: int = 50_000,
+    flush_interval: float = 60.0,
+    gnss_obs_backend: GNSSObsBackend = "python",
+) -> int:
+    """
+    Parse QC PIN files in a process pool and write them through one writer.
+
+    Args:
+        entries (List[AssetEntry]): QC PIN catalog entries to ingest.
+        shotdata_tdb (TDBShotDataArray): Destination for the shot data.
+        gnss_obs_tdb (TDBGNSSObsArray): Destination for the RANGEA strings.
+        asset_catalog (PreProcessCatalogHandler): Catalog to mark entries
+            processed in.
+        n_processes (int, optional): Parser processes. Defaults to the
+            number of CPUs.
+        files_per_batch (int, optional): PIN files parsed per task.
+        max_pending (int, optional): Batches submitted but not yet handed
+            to the writer. Defaults to twice ``n_processes``.
+        flush_rows, flush_rangea, flush_interval, gnss_obs_backend: See
+            `QCIngestWriter`.
+
+    Returns:
+        int: The number of PIN files processed.
+
+    Raises:
+        RuntimeError: If the writer failed; entries of unflushed batches
+            are left unprocessed in the catalog.
+    """
+    n_processes = max(1, n_processes or cpu_count())
+    max_pending = max(1, max_pending or 2 * n_processes)
+    batches = iter(
+        [
+            entries[i : i + files_per_batch]
+            for i in range(0, len(entries), max(1, files_per_batch))
+        ]
+    )
+    count = 0
+    with (
+        QCIngestWriter(
+            shotdata_tdb,
+            gnss_obs_tdb,
+            asset_catalog,
+            flush_rows=flush_rows,
+            flush_rangea=flush_rangea,
+            flush_interval=flush_interval,
+            max_queue=max_pending,
+            gnss_obs_backend=gnss_obs_backend,
+        ) as writer,
+        # spawn: the parent already holds TileDB contexts, which are not fork-safe
+        concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_processes, mp_context=get_context("spawn")
+        ) as executor,
+        tqdm(total=len(entries), desc="Processing QCPIN files") as pbar,
+    ):
+        pending: dict = {}
+
+        def submit_next() -> None:
+            batch = next(batches, None)
+            if batch:
+                paths = [str(entry.local_path) for entry in batch]
+                pending[executor.submit(read_qcpin_batch, paths)] = batch
+
+        for _ in range(max_pending):
+            submit_next()
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                batch = pending.pop(future)
+                pbar.update(len(batch))
+                try:
+                    shotdata, rangea_strings, read_paths = future.result()
+                except Exception as e:
+                    logger.logerr(
+                        f"Error processing QC PIN batch starting at "
+                        f"{batch[0].local_path}: {e}"
+                    )
+                else:
+                    entry_map = {str(entry.local_path): entry for entry in batch}
+                    processed = [entry_map[str(path)] for path in read_paths]
+                    for entry in processed:
+                        entry.is_processed = True
+                    writer.put(shotdata, rangea_strings, processed)
+                    count += len(processed)
+                submit_next()
+    return count
@@ -1,17 +1,12 @@
 # External Imports
-import concurrent.futures
 import datetime
 import json
 import sys
-from functools import partial
 from multiprocessing import Pool
 from pathlib import Path
-import threading
 from typing import List, Optional, Tuple
 import pandas as pd
 from tqdm.auto import tqdm
-from collections import deque
-import time
 
 # Local Imports
 from es_sfgtools.logging import ProcessLogger, change_all_logger_dirs
@@ -29,11 +24,14 @@ from es_sfgtools.data_mgmt.utils import get_merge_signature_shotdata
 from es_sfgtools.novatel_tools import novatel_ascii_operations as nova_ops
 from es_sfgtools.novatel_tools.utils import get_metadata, get_metadatav2
 
-from es_sfgtools.sonardyne_tools.sv3_qc_operations import qcjson_to_shotdata
 from es_sfgtools.novatel_tools.rangea_parser import (
     GNSSEpoch,
     extract_rangea_from_qcpin,
-    extract_rangea_strings_from_qcpin,
+)
+from es_sfgtools.tiledb_tools.maintenance import (
+    TILEDB_DIR_ARRAYS,
+    maintain_tiledb_dir,
+    summarize_maintenance,
 )
 from es_sfgtools.tiledb_tools.tiledb_operations import tile2rinex
 from es_sfgtools.tiledb_tools.tiledb_schemas import (
@@ -42,6 +40,7 @@ from es_sfgtools.tiledb_tools.tiledb_schemas import (
     TDBShotDataArray,
 )
 from .config import QCPipelineConfig
+from .qc_ingest import ingest_qcpin_files
 from .exceptions import (
     NoLocalData,
     NoQCPinFound,
@@ -51,69 +50,11 @@ from .exceptions import (
     NoKinFound,
 )
 from pride_ppp import PrideProcessor, ProcessingMode, kin_to_kin_position_df, rinex_get_time_range
+from .product_prefetch import prefetch_products
 from .shotdata_gnss_refinement import merge_shotdata_kinposition, merge_shotdata_qc
 from ..utils.protocols import WorkflowABC, validate_network_station_campaign
 
 
-def process_single_qcpin(
-    entry: AssetEntry,
-    shotdata_tdb: TDBShotDataArray,
-    rangea_string_queue: deque,
-    processed_asset_queue: deque,
-) -> bool:
-    try:
-        df = qcjson_to_shotdata(entry.local_path)
-        rangea_strings: List[str] = extract_rangea_strings_from_qcpin(entry.local_path)
-        entry.is_processed = True
-        shotdata_tdb.write_df(df)
-        rangea_string_queue.extend(rangea_strings)
-        processed_asset_queue.append(entry)
-        return True
-    except Exception as e:
-        ProcessLogger.logerr(f"Error processing {entry.local_path}: {e}")
-        return False
-
-
-def rangea_string_epoch(
-    gnss_obs_tdb: TDBGNSSObsArray,
-    rangea_string_queue: deque,
-    processed_asset_queue: deque,
-    asset_catalog: PreProcessCatalogHandler,
-    entries_to_process: int,
-    stop_event: threading.Event,
-) -> None:
-
-    SLEEP_TIME_SECONDS = 10
-    total_processed = 0
-    sleep_time = SLEEP_TIME_SECONDS
-    while True and not stop_event.is_set():
-        time.sleep(sleep_time)
-        with threading.Lock():
-            rangea_string_list = list(rangea_string_queue)
-            rangea_string_queue.clear()
-        if rangea_string_list:
-            print(
-                f"Processing {len(rangea_string_list)} RANGEA strings. Total processed: {total_processed}/{entries_to_process}"
-            )
-            gnss_obs_tdb.write_rangea_strings(rangea_string_list, verbose=False)
-            print(
-                f"Finished processing batch of RANGEA strings. Total processed: {total_processed}/{entries_to_process}"
-            )
-        start_time = time.time()
-        while processed_asset_queue:
-            entry = processed_asset_queue.popleft()
-            asset_catalog.add_or_update(entry)
-            total_processed += 1
-            if total_processed >= entries_to_process:
-                return
-        elapsed_time = time.time() - start_time
-        remainder = SLEEP_TIME_SECONDS - elapsed_time
-        if remainder <= 0:
-            sleep_time = 0
-        else:
-            sleep_time = remainder
-
-
 class QCPipeline(WorkflowABC):
     """Orchestrates the QC data processing pipeline for seafloor geodesy.
 
@@ -300,9 +241,10 @@ class QCPipeline(WorkflowABC):
     def process_qcpin(self) -> None:
         """Process QC PIN files to generate preliminary shotdata.
 
-        This method retrieves all QC PIN files from the asset catalog, converts them
-        into ShotDataFrames using qcjson_to_shotdata, and stores the results
-        in the QC-specific TileDB ShotData array.
+        This method retrieves all QC PIN files from the asset catalog, parses them
+        with read_qcpin_batch in a process pool, and stores the shotdata and
+        RANGEA observations in the QC-specific TileDB arrays through a single
+        coalescing writer (see ingest_qcpin_files).
 
         Raises
         ------
@@ -325,46 +267,18 @@ class QCPipeline(WorkflowABC):
 
         response = f"Found {len(qcpin_entries)} QCPIN Files"
         ProcessLogger.loginfo(response)
-        count = 0
-        rangea_string_queue = deque()
-        processed_asset_queue = deque()
-        process_func_partial = partial(
-            process_single_qcpin,
+        qcpin_config = self.config.qcpin_config
+        count = ingest_qcpin_files(
+            qcpin_entries,
             shotdata_tdb=self.qcShotDataPreTDB,
-            rangea_string_queue=rangea_string_queue,
-            processed_asset_queue=processed_asset_queue,
-        )
-        stop_event = threading.Event()
-        second_step = threading.Thread(
-            target=rangea_string_epoch,
-            args=(
-                self.qcGnssObsTDB,
-                rangea_string_queue,
-                processed_asset_queue,
-                self.asset_catalog,
-                len(qcpin_entries),
-                stop_event,
-            ),
+            gnss_obs_tdb=self.qcGnssObsTDB,
+            asset_catalog=self.asset_catalog,
+            n_processes=qcpin_config.n_processes,
+            files_per_batch=qcpin_config.files_per_batch,
+            flush_rows=qcpin_config.flush_rows,
+            flush_interval=qcpin_config.flush_interval_s,
+            gnss_obs_backend=qcpin_config.gnss_obs_backend,
         )
-        second_step.start()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
-            # futures = executor.map(process_func_partial, qcpin_entries)
-            futures = [
-                executor.submit(process_func_partial, entry) for entry in qcpin_entries
-            ]
-            for future in tqdm(
-                concurrent.futures.as_completed(futures),
-                total=len(qcpin_entries),
-                desc="Processing QCPIN files",
-            ):
-                success = future.result()
-                if success:
-                    count += 1
-        if len(rangea_string_queue) == 0 and len(processed_asset_queue) == 0:
-            # stop the second thread if there are no entries to process
-            stop_event.set()
-
-        second_step.join(timeout=10)
         response = f"Processed {count} out of {len(qcpin_entries)} QCPIN Files"
         ProcessLogger.loginfo(response)
 
@@ -510,6 +424,18 @@ class QCPipeline(WorkflowABC):
         response = f"Found {len(rinex_entries)} Rinex Files to Process"
         ProcessLogger.loginfo(response)
 
+        # Download every day's products up front so PRIDE workers find them
+        # in the common product directory instead of downloading them
+        if self.config.pride_config.prefetch_products:
+            prefetch_products(
+                rinex_entries,
+                prideDir,
+                max_workers=self.config.pride_config.prefetch_workers,
+                override=self.config.pride_config.override_products_download,
+                max_cache_bytes=self.config.pride_config.product_cache_max_bytes,
+                deep_verify=self.config.pride_config.deep_verify_products,
+            )
+
         # Process Rinex files using PrideProcessor
         processor = PrideProcessor(
             pride_dir=prideDir,
@@ -521,7 +447,10 @@ class QCPipeline(WorkflowABC):
 
         kin_count = 0
         res_count = 0
+        processed_rinex_entries: List[AssetEntry] = []
+        new_entries: List[AssetEntry] = []
         uploadCount = 0
+        catalog_batch_size = self.config.pride_config.catalog_batch_size
 
         for result in processor.process_batch(
             [x.local_path for x in rinex_entries],
@@ -531,8 +460,7 @@ class QCPipeline(WorkflowABC):
             rinex_entry = rinex_path_entry_map.get(result.rinex_path)
             if result.kin_path is not None:
                 kin_count += 1
-                rinex_entry.is_processed = True
-                self.asset_catalog.add_or_update(rinex_entry)
+                processed_rinex_entries.append(rinex_entry)
 
                 kin_entry = AssetEntry(
                     local_path=result.kin_path,
@@ -544,8 +472,7 @@ class QCPipeline(WorkflowABC):
                     type=AssetType.KIN,
                     timestamp_created=datetime.datetime.now(tz=datetime.timezone.utc),
                 )
-                if self.asset_catalog.add_or_update(kin_entry):
-                    uploadCount += 1
+                new_entries.append(kin_entry)
 
                 if result.residual_path is not None:
                     res_count += 1
@@ -559,8 +486,16 @@ class QCPipeline(WorkflowABC):
                         type=AssetType.KINRESIDUALS,
                         timestamp_created=datetime.datetime.now(tz=datetime.timezone.utc),
                     )
-                    if self.asset_catalog.add_or_update(res_entry):
-                        uploadCount += 1
+                    new_entries.append(res_entry)
+
+            # Commit every few results, so a crash does not lose hours of PPP
+            if len(processed_rinex_entries) >= catalog_batch_size:
+                uploadCount += self.asset_catalog.add_or_update_many(new_entries)
+                self.asset_catalog.mark_processed_many(processed_rinex_entries)
+                processed_rinex_entries, new_entries = [], []
+
+        uploadCount += self.asset_catalog.add_or_update_many(new_entries)
+        self.asset_catalog.mark_processed_many(processed_rinex_entries)
 
         response = f"Generated {kin_count} Kin Files and {res_count} Residual Files From {len(rinex_entries)} QC Rinex Files, Added {uploadCount} to the Catalog"
         ProcessLogger.loginfo(response)
@@ -603,17 +538,29 @@ class QCPipeline(WorkflowABC):
             f"Found {len(kin_entries)} QC Kin Files to Process: processing"
         )
 
-        processed_count = 0
-        for kin_entry in tqdm(kin_entries, desc="Processing QC Kin Files"):
-            try:
-                kin_position_df = kin_to_kin_position_df(kin_entry.local_path)
-                if kin_position_df is not None:
-                    processed_count += 1
-                    kin_entry.is_processed = True
-                    self.asset_catalog.add_or_update(kin_entry)
-                    self.qcKinPositionTDB.write_df(kin_position_df)
-            except Exception as e:
-                ProcessLogger.logerr(f"Error processing {kin_entry.local_path}: {e}")
+        processed_entries: List[AssetEntry] = []
+        pending: List[AssetEntry] = []
+        with self.qcKinPositionTDB.buffered_writer(sort=True) as writer:
+            for kin_entry in tqdm(kin_entries, desc="Processing QC Kin Files"):
+                try:
+                    kin_position_df = kin_to_kin_position_df(kin_entry.local_path)
+                    if kin_position_df is not None:
+                        n_flushes = writer.n_flushes
+                        writer.write_df(kin_position_df)
+                        pending.append(kin_entry)
+                        # A flush wrote every pending file: mark them processed
+                        if writer.n_flushes > n_flushes:
+                            self.asset_catalog.mark_processed_many(pending)
+                            processed_entries.extend(pending)
+                            pending = []
+                except Exception as e:
+                    ProcessLogger.logerr(
+                        f"Error processing {kin_entry.local_path}: {e}"
+                    )
+            writer.flush()
+        self.asset_catalog.mark_processed_many(pending)
+        processed_entries.extend(pending)
+        processed_count = len(processed_entries)
 
         ProcessLogger.loginfo(
             f"Generated {processed_count} QC KinPosition Dataframes From {len(kin_entries)} Kin Files"
@@ -659,9 +606,46 @@ class QCPipeline(WorkflowABC):
                 shotdata=self.qcShotDataFinalTDB,
                 kin_position=self.qcKinPositionTDB,
                 dates=dates,
+                chunk=datetime.timedelta(
+                    hours=self.config.position_update_config.merge_chunk_hours
+                ),
+                pad=datetime.timedelta(
+                    minutes=self.config.position_update_config.merge_pad_minutes
+                ),
             )
             self.asset_catalog.add_merge_job(**merge_job)
 
+    @validate_network_station_campaign
+    def maintain_tiledb(self, force: bool = False) -> None:
+        """Consolidate and vacuum the station's QC TileDB arrays.
+
+        Only arrays whose fragment or metadata counts exceed
+        ``config.tiledb_maintenance`` are consolidated; read latency before
+        and after is logged when the policy measures it.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Consolidate fragments regardless of the thresholds, by default False.
+        """
+        reports = maintain_tiledb_dir(
+            self.current_station_dir.tiledb_directory,
+            policy=self.config.tiledb_maintenance,
+            arrays=[name for name in TILEDB_DIR_ARRAYS if name.startswith("qc_")],
+            force=force,
+        )
+        summary = summarize_maintenance(reports)
+        if not summary.empty and (summary.consolidated != "").any():
+            ProcessLogger.loginfo(
+                f"TileDB maintenance for {self.current_station_name}:\n"
+                f"{summary.to_string(index=False)}"
+            )
+
+    def _maintain_tiledb_after_stage(self) -> None:
+        """Run `maintain_tiledb` if enabled in the pipeline config."""
+        if self.config.tiledb_maintenance.enabled:
+            self.maintain_tiledb()
+
     @validate_network_station_campaign
     def run_pipeline(self) -> None:
         """Execute the complete QC data processing pipeline in sequence.
@@ -686,6 +670,7 @@ class QCPipeline(WorkflowABC):
             self.process_qcpin()
         except NoQCPinFound:
             pass
+        self._maintain_tiledb_after_stage()
 
         try:
             self.get_rinex_files()
@@ -701,8 +686,10 @@ class QCPipeline(WorkflowABC):
             self.process_kin()
         except NoKinFound:
             pass
+        self._maintain_tiledb_after_stage()
 
         self.update_shotdata()
+        self._maintain_tiledb_after_stage()
 
         ProcessLogger.loginfo(
             f"Completed QC Processing Pipeline for {self.current_network_name} {self.current_station_name} {self.current_campaign_name}"
@@ -1,4 +1,7 @@
-from typing import List, Union
+import concurrent.futures
+import datetime
+from multiprocessing import get_context
+from typing import Iterator, List, Optional, Tuple, Union
 from pandera.typing import DataFrame
 import gnatss.constants as constants
 import numpy as np
@@ -7,17 +10,25 @@ import pymap3d
 from gnatss.ops.kalman import run_filter_simulation
 from numpy import datetime64
 from scipy.stats import zscore
-from sklearn.gaussian_process import GaussianProcessRegressor
-from sklearn.gaussian_process.kernels import RBF
-from sklearn.kernel_ridge import KernelRidge
-from sklearn.neighbors import KDTree, RadiusNeighborsRegressor
-from sklearn.preprocessing import StandardScaler
+from sklearn.neighbors import RadiusNeighborsRegressor
 import time
-import itertools
 
 from es_sfgtools.logging import ProcessLogger as logger
 
 # Local imports
+from .interpolation import TimeSeriesInterpolator
+from .kalman_prep import (
+    COLUMN,
+    STATE_COLUMNS,
+    combine_state_matrices,
+    frame_state_matrix,
+    kinematic_state_matrix,
+    median_antenna_position,
+    n_rows,
+    positions_state_matrix,
+    spatial_mask,
+    state_frame,
+)
 from es_sfgtools.tiledb_tools.tiledb_schemas import (
     TDBIMUPositionArray,
     IMUPositionDataFrame,
@@ -27,9 +38,11 @@ from es_sfgtools.tiledb_tools.tiledb_schemas import (
     ShotDataFrame,
 )
 
-MEDIAN_EAST_POSITION = 0
-MEDIAN_NORTH_POSITION = 0
-MEDIAN_UP_POSITION = 0
+# Shot data is merged in chunks of MERGE_CHUNK; the kinematic and IMU
+# positions around each chunk are read with MERGE_PAD on either side so the
+# Kalman filter has settled by the chunk edges.
+MERGE_CHUNK = datetime.timedelta(days=1)
+MERGE_PAD = datetime.timedelta(minutes=5)
 
 
 def prepare_positions_data(
@@ -60,8 +73,8 @@ def prepare_positions_data(
 
     Notes
     -----
-    Also sets global variables MEDIAN_EAST_POSITION, MEDIAN_NORTH_POSITION, and MEDIAN_UP_POSITION
-    to the median ECEF coordinates.
+    `kalman_prep.positions_state_matrix` builds the same columns as a float64
+    state matrix without the intermediate DataFrame; `main` uses that.
     """
 
     positions_data_copy = positions_data.copy()
@@ -69,17 +82,12 @@ def prepare_positions_data(
         lambda x: x.timestamp() if hasattr(x, "timestamp") else x
     )
 
-    global MEDIAN_EAST_POSITION, MEDIAN_NORTH_POSITION, MEDIAN_UP_POSITION
     e, n, u = pymap3d.geodetic2ecef(
         lat=positions_data_copy.latitude,
         lon=positions_data_copy.longitude,
         alt=positions_data_copy.height,
     )
 
-    MEDIAN_EAST_POSITION = np.median(e)
-    MEDIAN_NORTH_POSITION = np.median(n)
-    MEDIAN_UP_POSITION = np.median(u)
-
     (
         positions_data_copy["ant_x"],
         positions_data_copy["ant_y"],
@@ -228,29 +236,8 @@ def combine_data(
         Note: Rows with NaN values are retained to preserve kinematic velocity information.
     """
 
-    column_order = [
-        "time",
-        "east",
-        "north",
-        "up",
-        "ant_x",
-        "ant_y",
-        "ant_z",
-        "ant_sigx",
-        "ant_sigy",
-        "ant_sigz",
-        "rho_xy",
-        "rho_xz",
-        "rho_yz",
-        "east_sig",
-        "north_sig",
-        "up_sig",
-        "v_sden",
-        "v_sdeu",
-        "v_sdnu",
-    ]
     df_all = pd.concat([imu_position_data, ppp_position_data])
-    df_all = df_all[column_order]
+    df_all = df_all[list(STATE_COLUMNS)]
     df_all = df_all.sort_values(by="time")
     # Don't dropna here, as kinematic velocities are NaN
 
@@ -259,7 +246,7 @@ def combine_data(
 
 
 def run_kalman_filter_and_smooth(
-    df_all: pd.DataFrame,
+    df_all: pd.DataFrame | np.ndarray,
     start_dt: float,
     gnss_pos_psd: float,
     vel_psd: float,
@@ -269,8 +256,10 @@ def run_kalman_filter_and_smooth(
 
     Parameters
     ----------
-    df_all : pd.DataFrame
-        Input DataFrame containing GNSS shot data. Rows with NaN values are dropped before processing.
+    df_all : pd.DataFrame or np.ndarray
+        Input DataFrame containing GNSS shot data, or its float64 state matrix
+        with the `kalman_prep.STATE_COLUMNS` columns. Rows with NaN values are
+        dropped before processing.
     start_dt : float
         Initial time delta for the Kalman filter simulation.
     gnss_pos_psd : float
@@ -287,13 +276,17 @@ def run_kalman_filter_and_smooth(
         If the input DataFrame is empty after dropping NaNs, returns an empty DataFrame.
     """
 
+    if isinstance(df_all, pd.DataFrame):
+        states = df_all[list(STATE_COLUMNS)].to_numpy(dtype=float)
+    else:
+        states = df_all
     # Drop rows with NaN values which are from the first row of kinematic velocity calculation
-    df_all = df_all.dropna()
-    if df_all.empty:
+    states = states[~np.isnan(states).any(axis=1)]
+    if states.shape[0] == 0:
         return pd.DataFrame()
 
     x, P, _, _ = run_filter_simulation(
-        df_all.to_numpy(), start_dt, gnss_pos_psd, vel_psd, cov_err
+        states, start_dt, gnss_pos_psd, vel_psd, cov_err
     )
     logger.loginfo(
         f"Filter Parameters - Start DT: {start_dt}, GNSS_POS_PSD: {gnss_pos_psd}, VEL_PSD: {vel_psd}, COV_ERR: {cov_err}"
@@ -318,7 +311,7 @@ def run_kalman_filter_and_smooth(
     smoothed_results["merge_idx"] = smoothed_results.index
     ant_cov_df["merge_idx"] = ant_cov_df.index
 
-    time_reset = df_all[constants.GPS_TIME].reset_index(drop=True)
+    time_reset = pd.Series(states[:, COLUMN["time"]], name=constants.GPS_TIME)
     smoothed_results[constants.GPS_TIME] = time_reset
     ant_cov_df[constants.GPS_TIME] = time_reset
 
@@ -429,15 +422,26 @@ def update_shotdata_with_smoothed_positions(
     return shotdata
 
 
-def filter_spatial_outliers(df: pd.DataFrame, radius: float = 5000) -> pd.DataFrame:
-    """Filters out rows that are outside a specified radius from the median ECEF position.
+def median_position(df: pd.DataFrame) -> Tuple[float, float, float]:
+    """Returns the median ECEF position ('ant_x', 'ant_y', 'ant_z') of a DataFrame."""
+    return tuple(float(np.median(df[column])) for column in ("ant_x", "ant_y", "ant_z"))
+
+
+def filter_spatial_outliers(
+    df: pd.DataFrame,
+    radius: float = 5000,
+    center: Tuple[float, float, float] | None = None,
+) -> pd.DataFrame:
+    """Filters out rows that are outside a specified radius from a reference ECEF position.
 
     Parameters
     ----------
     df : pd.DataFrame
         Input DataFrame containing ECEF position columns 'ant_x', 'ant_y', 'ant_z'.
     radius : float
-        Radius in meters to define the acceptable range from the median position.
+        Radius in meters to define the acceptable range from the reference position.
+    center : tuple of float, optional
+        Reference ECEF position. Defaults to the median position of ``df``.
 
     Returns
     -------
@@ -445,14 +449,13 @@ def filter_spatial_outliers(df: pd.DataFrame, radius: float = 5000) -> pd.DataFr
         Filtered DataFrame with rows outside the specified radius removed.
     """
     original_len = len(df)
+    if original_len == 0:
+        return df
+    center_x, center_y, center_z = center if center is not None else median_position(df)
     position_filters = (
-        (df.ant_x.between(MEDIAN_EAST_POSITION - radius, MEDIAN_EAST_POSITION + radius))
-        & (
-            df.ant_y.between(
-                MEDIAN_NORTH_POSITION - radius, MEDIAN_NORTH_POSITION + radius
-            )
-        )
-        & (df.ant_z.between(MEDIAN_UP_POSITION - radius, MEDIAN_UP_POSITION + radius))
+        df.ant_x.between(center_x - radius, center_x + radius)
+        & df.ant_y.between(center_y - radius, center_y + radius)
+        & df.ant_z.between(center_z - radius, center_z + radius)
     )
     df_filtered = df[position_filters]
     filtered_len = len(df_filtered)
@@ -479,10 +482,10 @@ def main(
     ----------
     shotdata : pd.DataFrame
         DataFrame containing shot event data to be refined.
-    kin_positions : pd.DataFrame
-        DataFrame containing kinematic GNSS positions.
-    positions_data : pd.DataFrame
-        DataFrame containing original positions data.
+    kin_positions : pd.DataFrame or dict of np.ndarray
+        Kinematic GNSS positions, as a DataFrame or a raw TileDB read.
+    positions_data : pd.DataFrame or dict of np.ndarray
+        Original positions data, as a DataFrame or a raw TileDB read.
     gnss_pos_psd : float or array-like, optional
         GNSS position process noise spectral density (default: constants.GNSS_POS_PSD).
     vel_psd : float or array-like, optional
@@ -506,28 +509,35 @@ def main(
     - Updates shotdata with refined positions and prints summary statistics of antenna offsets.
     """
 
-    if positions_data.empty:
+    if positions_data is None or n_rows(positions_data) == 0:
         logger.loginfo("No positions data provided.")
         return shotdata
 
+    # Build the filter input as float64 state matrices, see kalman_prep
     if prepare_position_data:
-        positions_data_copy = prepare_positions_data(positions_data)
+        positions = positions_state_matrix(positions_data)
     else:
-        positions_data_copy = positions_data.copy()
+        positions = frame_state_matrix(positions_data)
 
-    if kin_positions.empty:
+    if kin_positions is None or n_rows(kin_positions) == 0:
         logger.loginfo("No kinematic positions data provided.")
-        gps_data = pd.DataFrame(columns=positions_data_copy.columns)
+        gps_data = np.empty((0, len(STATE_COLUMNS)))
     else:
-        gps_data = prepare_kinematic_data(kin_positions)
+        gps_data = kinematic_state_matrix(kin_positions)
 
     if filter_radius > 0:
-        positions_data_copy = filter_spatial_outliers(
-            positions_data_copy, radius=filter_radius
+        # Both sources are filtered around the median IMU position of this call
+        center = median_antenna_position(positions)
+        original_len = len(positions) + len(gps_data)
+        positions = positions[spatial_mask(positions, filter_radius, center)]
+        gps_data = gps_data[spatial_mask(gps_data, filter_radius, center)]
+        filtered_len = len(positions) + len(gps_data)
+        logger.loginfo(
+            f"Data filtered from {original_len} to {filtered_len} rows using "
+            f"{filter_radius}m position threshold."
         )
-        gps_data = filter_spatial_outliers(gps_data, radius=filter_radius)
 
-    df_all = combine_data(positions_data_copy, gps_data)
+    df_all = combine_state_matrices(positions, gps_data)
 
     smoothed_results = run_kalman_filter_and_smooth(
         df_all, start_dt, gnss_pos_psd, vel_psd, cov_err
@@ -538,7 +548,7 @@ def main(
         return shotdata
 
     merged_positions = pd.merge_asof(
-        positions_data_copy.sort_values("time"),
+        state_frame(positions).sort_values("time"),
         smoothed_results.sort_values("time"),
         on="time",
         tolerance=pd.Timedelta("10ms").total_seconds(),
@@ -556,60 +566,88 @@ def main(
     return shotdata_updated
 
 
-def merge_shotdata_kinposition(
+def day_range(date) -> Tuple[datetime.datetime, datetime.datetime]:
+    """Return the first and last microsecond of a day."""
+    start = pd.Timestamp(date).normalize().to_pydatetime()
+    return start, start + datetime.timedelta(days=1, microseconds=-1)
+
+
+def padded_window(
+    shotdata_df: pd.DataFrame, pad: datetime.timedelta
+) -> Tuple[datetime.datetime, datetime.datetime]:
+    """Return the ping time span of a shot data chunk, widened by ``pad``.
+
+    Raises
+    ------
+    ValueError
+        If the chunk has no shots.
+    """
+    if shotdata_df.empty:
+        raise ValueError("Cannot pad the time span of an empty shot data chunk")
+    start = pd.Timestamp(shotdata_df.pingTime.min(), unit="s").to_pydatetime()
+    end = pd.Timestamp(shotdata_df.pingTime.max(), unit="s").to_pydatetime()
+    return start - pad, end + pad
+
+
+def refine_shotdata_day(
     shotdata_pre: TDBShotDataArray,
-    shotdata: TDBShotDataArray,
     kin_position: TDBKinPositionArray,
-    position_data: TDBIMUPositionArray,
-    dates: List[datetime64],
+    position_data: Optional[TDBIMUPositionArray],
+    date: datetime64,
     filter_radius: float = 5000,
-) -> TDBShotDataArray:
-    """Merge the shotdata and kin_position data.
+    chunk: datetime.timedelta | int = MERGE_CHUNK,
+    pad: datetime.timedelta = MERGE_PAD,
+) -> Iterator[pd.DataFrame]:
+    """Refine one day of shotdata with the kinematic and IMU positions.
+
+    The day's shot data is streamed in chunks, and only the positions within
+    ``pad`` of a chunk are read, so the filter has context across chunk and
+    day boundaries while memory stays bounded by the chunk size.
 
     Parameters
     ----------
     shotdata_pre : TDBShotDataArray
         The DFOP00 data.
-    shotdata : TDBShotDataArray
-        The shotdata array to write to.
     kin_position : TDBKinPositionArray
         The TileDB KinPosition array.
-    position_data : TDBIMUPositionArray
+    position_data : TDBIMUPositionArray or None
         The TileDB IMU position array.
-    dates : List[datetime64]
-        The dates to merge.
+    date : datetime64
+        The day to refine.
     filter_radius : float, optional
         Radius for spatial outlier filtering in meters, by default 5000.
+    chunk : datetime.timedelta or int, optional
+        Time window or number of shots refined at once, by default one day.
+    pad : datetime.timedelta, optional
+        Positions read before and after each chunk, by default 5 minutes.
 
-    Returns
-    -------
-    TDBShotDataArray
-        The updated shotdata array.
+    Yields
+    ------
+    pd.DataFrame
+        The refined shotdata of each chunk.
     """
-
-    logger.loginfo("Merging shotdata and kin_position data")
-    for date in dates:
-        shotdata_df = shotdata_pre.read_df(start=date)
-        kin_position_df = kin_position.read_df(start=date)
-
+    logger.loginfo(f"Interpolating shotdata for date {str(date)}")
+    day_start, day_end = day_range(date)
+    for shotdata_df in shotdata_pre.iter_df(day_start, day_end, chunk=chunk):
+        window_start, window_end = padded_window(shotdata_df, pad)
+        # Raw reads skip pandas; main builds the filter input from the arrays
+        kin_position_df = kin_position.read_df(
+            start=window_start, end=window_end, raw=True
+        )
         try:
             position_df = (
-                position_data.read_df(start=date) if position_data is not None else None
+                position_data.read_df(start=window_start, end=window_end, raw=True)
+                if position_data is not None
+                else None
             )
         except Exception as e:
             logger.loginfo(
                 f"Error reading position data for date {str(date)}: {e}. Proceeding without position data."
             )
             position_df = None
-        if shotdata_df is None or shotdata_df.empty:
-            continue
-        if shotdata_df.empty:
-            continue
-
-        logger.loginfo(f"Interpolating shotdata for date {str(date)}")
 
         # interpolate the enu values
-        shotdata_df_updated = main(
+        yield main(
             shotdata=shotdata_df,
             kin_positions=kin_position_df,
             positions_data=position_df,
@@ -620,7 +658,136 @@ def merge_shotdata_kinposition(
             filter_radius=filter_radius,
         )
 
-        shotdata.write_df(shotdata_df_updated, validate=False)
+
+def _refine_shotdata_day_worker(
+    shotdata_pre_uri: str,
+    kin_position_uri: str,
+    position_data_uri: Optional[str],
+    date: datetime64,
+    filter_radius: float,
+    chunk: datetime.timedelta | int,
+    pad: datetime.timedelta,
+) -> Optional[pd.DataFrame]:
+    """Process pool entry point: `refine_shotdata_day` on arrays opened by URI."""
+    position_data = (
+        TDBIMUPositionArray(position_data_uri)
+        if position_data_uri is not None
+        else None
+    )
+    chunks = list(
+        refine_shotdata_day(
+            TDBShotDataArray(shotdata_pre_uri),
+            TDBKinPositionArray(kin_position_uri),
+            position_data,
+            date,
+            filter_radius=filter_radius,
+            chunk=chunk,
+            pad=pad,
+        )
+    )
+    return pd.concat(chunks, ignore_index=True) if chunks else None
+
+
+def merge_shotdata_kinposition(
+    shotdata_pre: TDBShotDataArray,
+    shotdata: TDBShotDataArray,
+    kin_position: TDBKinPositionArray,
+    position_data: TDBIMUPositionArray,
+    dates: List[datetime64],
+    filter_radius: float = 5000,
+    chunk: datetime.timedelta | int = MERGE_CHUNK,
+    pad: datetime.timedelta = MERGE_PAD,
+    n_processes: int = 1,
+) -> TDBShotDataArray:
+    """Merge the shotdata and kin_position data.
+
+    Each day is refined with `refine_shotdata_day`. With ``n_processes``
+    greater than one, days are refined in a process pool and the results
+    are written by this process through a single buffered writer as they
+    complete; at most two days per process are in flight at once.
+
+    Parameters
+    ----------
+    shotdata_pre : TDBShotDataArray
+        The DFOP00 data.
+    shotdata : TDBShotDataArray
+        The shotdata array to write to.
+    kin_position : TDBKinPositionArray
+        The TileDB KinPosition array.
+    position_data : TDBIMUPositionArray
+        The TileDB IMU position array.
+    dates : List[datetime64]
+        The dates to merge.
+    filter_radius : float, optional
+        Radius for spatial outlier filtering in meters, by default 5000.
+    chunk : datetime.timedelta or int, optional
+        Time window or number of shots merged at once, by default one day.
+    pad : datetime.timedelta, optional
+        Positions read before and after each chunk, by default 5 minutes.
+    n_processes : int, optional
+        Number of processes refining days in parallel, by default 1.
+
+    Returns
+    -------
+    TDBShotDataArray
+        The updated shotdata array.
+    """
+
+    logger.loginfo("Merging shotdata and kin_position data")
+    with shotdata.buffered_writer(validate=False) as writer:
+        if n_processes <= 1 or len(dates) <= 1:
+            for date in dates:
+                for shotdata_df_updated in refine_shotdata_day(
+                    shotdata_pre,
+                    kin_position,
+                    position_data,
+                    date,
+                    filter_radius=filter_radius,
+                    chunk=chunk,
+                    pad=pad,
+                ):
+                    writer.write_df(shotdata_df_updated)
+            return shotdata
+
+        position_data_uri = (
+            str(position_data.uri) if position_data is not None else None
+        )
+        remaining = iter(dates)
+        # spawn: the parent already holds TileDB contexts, which are not fork-safe
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_processes, mp_context=get_context("spawn")
+        ) as executor:
+            pending: dict = {}
+
+            def submit_next() -> None:
+                date = next(remaining, None)
+                if date is not None:
+                    future = executor.submit(
+                        _refine_shotdata_day_worker,
+                        str(shotdata_pre.uri),
+                        str(kin_position.uri),
+                        position_data_uri,
+                        date,
+                        filter_radius,
+                        chunk,
+                        pad,
+                    )
+                    pending[future] = date
+
+            for _ in range(2 * n_processes):
+                submit_next()
+            while pending:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    date = pending.pop(future)
+                    shotdata_df_updated = future.result()
+                    if shotdata_df_updated is not None:
+                        writer.write_df(shotdata_df_updated)
+                    logger.loginfo(f"Merged shotdata for date {str(date)}")
+                    submit_next()
+    return shotdata
 
 
 def merge_shotdata_qc(
@@ -628,9 +795,13 @@ def merge_shotdata_qc(
     shotdata: TDBShotDataArray,
     kin_position: TDBKinPositionArray,
     dates: List[datetime64],
+    chunk: datetime.timedelta | int = MERGE_CHUNK,
+    pad: datetime.timedelta = MERGE_PAD,
 ) -> None:
     """Merge the shotdata and kin_position data for QC purposes.
 
+    Shot data is streamed in chunks as in `merge_shotdata_kinposition`.
+
     Parameters
     ----------
     shotdata_pre : TDBShotDataArray
@@ -641,6 +812,11 @@ def merge_shotdata_qc(
         The TileDB KinPosition array.
     dates : List[datetime64]
         The dates to merge.
+    chunk : datetime.timedelta or int, optional
+        Time window or number of shots merged at once, by default one day.
+    pad : datetime.timedelta, optional
+        Kinematic positions read before and after each chunk, by default
+        5 minutes.
 
     Returns
     -------
@@ -649,30 +825,32 @@ def merge_shotdata_qc(
     """
 
     logger.loginfo("Merging shotdata and kin_position data for QC")
-    for date in dates:
-        shotdata_df = shotdata_pre.read_df(start=date)
-        kin_position_df = kin_position.read_df(start=date)
-        if shotdata_df is None or shotdata_df.empty:
-            continue
-        if shotdata_df.empty:
-            continue
-
-        logger.loginfo(f"Interpolating shotdata for date {str(date)}")
-        positions_data: pd.DataFrame = shotdata_to_imu_position_df(shotdata_df)
-        # interpolate the enu values
-        shotdata_df_updated = main(
-            shotdata=shotdata_df,
-            kin_positions=kin_position_df,
-            positions_data=positions_data,
-            gnss_pos_psd=constants.gnss_pos_psd,
-            vel_psd=constants.vel_psd,
-            cov_err=constants.cov_err,
-            start_dt=constants.start_dt,
-            filter_radius=0,  # no spatial filtering for QC purposes
-            prepare_position_data=False,  # positions data is already prepared from shotdata
-        )
+    with shotdata.buffered_writer(validate=False) as writer:
+        for date in dates:
+            logger.loginfo(f"Interpolating shotdata for date {str(date)}")
+            day_start, day_end = day_range(date)
+            for shotdata_df in shotdata_pre.iter_df(day_start, day_end, chunk=chunk):
+                window_start, window_end = padded_window(shotdata_df, pad)
+                kin_position_df = kin_position.read_df(
+                    start=window_start, end=window_end
+                )
+                positions_data: pd.DataFrame = shotdata_to_imu_position_df(
+                    shotdata_df
+                )
+                # interpolate the enu values
+                shotdata_df_updated = main(
+                    shotdata=shotdata_df,
+                    kin_positions=kin_position_df,
+                    positions_data=positions_data,
+                    gnss_pos_psd=constants.gnss_pos_psd,
+                    vel_psd=constants.vel_psd,
+                    cov_err=constants.cov_err,
+                    start_dt=constants.start_dt,
+                    filter_radius=0,  # no spatial filtering for QC purposes
+                    prepare_position_data=False,  # positions data is already prepared from shotdata
+                )
 
-        shotdata.write_df(shotdata_df_updated, validate=False)
+                writer.write_df(shotdata_df_updated)
 
 
 def interpolate_enu(
@@ -703,40 +881,20 @@ def interpolate_enu(
 
     logger.loginfo("Interpolating ENU values")
     length_scale = 3  # seconds
-    kernel = RBF(length_scale=length_scale)
-    X_train = np.hstack((tenu_l[:, 0], tenu_r[:, 0])).T.astype(float).reshape(-1, 1)
+    X_train = np.hstack((tenu_l[:, 0], tenu_r[:, 0])).astype(float)
     Y_train = np.vstack((tenu_l[:, 1:], tenu_r[:, 1:])).astype(float)
-    var_train = np.vstack((enu_l_sig, enu_r_sig)).astype(float)
-    # take the inverse of the variance to get the precision
-
-    TS_TREE = KDTree(X_train)
 
-    block_size = 200
-    # neighbors = 5
     start = time.time()
-    for i in range(0, tenu_r.shape[0], block_size):
-        idx = np.s_[i : i + block_size]
-        ind, dist = TS_TREE.query_radius(
-            tenu_r[idx, 0].astype(float).reshape(-1, 1),
-            r=length_scale,
-            return_distance=True,
-        )
-        # dist,ind = TS_TREE.query(tenu_r[idx,0].astype(float).reshape(-1,1),k=neighbors,return_distance=True)
-        dist, ind = (
-            list(itertools.chain.from_iterable(dist)),
-            list(itertools.chain.from_iterable(ind)),
+    interpolator = TimeSeriesInterpolator(X_train, Y_train)
+    predict_times = tenu_r[:, 0].astype(float)
+    # Only update points with a training sample other than themselves in range
+    to_update = interpolator.count(predict_times, length_scale) > 1
+    if to_update.any():
+        y_mean, y_std = interpolator.kernel_predict(
+            predict_times[to_update], length_scale, return_std=True
         )
-        ind = np.unique(ind).astype(int)
-        dist = np.array(dist)
-        if any(dist != 0):
-            for j in range(3):
-                gp = GaussianProcessRegressor(kernel=kernel)
-                gpr = gp.fit(X_train[ind], Y_train[ind, j])
-                y_mean, y_std = gpr.predict(
-                    tenu_r[idx, 0].reshape(-1, 1), return_std=True
-                )
-                enu_r_sig[idx, j] = y_std
-                tenu_r[idx, j + 1] = y_mean
+        tenu_r[to_update, 1:] = y_mean
+        enu_r_sig[to_update, :] = y_std[:, np.newaxis]
 
     logger.loginfo(
         f"Interpolation took {time.time() - start:.3f} seconds for {tenu_r.shape[0]} x {tenu_r.shape[1]} points"
@@ -765,81 +923,25 @@ def interpolate_enu_kernelridge(
     """
 
     logger.loginfo("Interpolating ENU values using Kernel Ridge Regression")
-    # First, we need to find the indices of tenu_l that are within the lengthscale of tenu_r
-    # We will use a KDTree to find the indices efficiently
-    KIN_POSITION_DATA_TREE = KDTree(
-        kin_position_data[:, 0].astype(float).reshape(-1, 1)
+    interpolator = TimeSeriesInterpolator(
+        kin_position_data[:, 0], kin_position_data[:, 1:]
     )
-
-    shotdata_near_kin_position_count = KIN_POSITION_DATA_TREE.query_radius(
-        shot_data[:, 0].astype(float).reshape(-1, 1),
-        r=lengthscale,  # seconds
-        count_only=True,
+    shotdata_to_update_filter = (
+        interpolator.count(shot_data[:, 0].astype(float), lengthscale) > 0
     )
-    shotdata_to_update_filter = shotdata_near_kin_position_count > 0
     shotdata_to_update = shot_data[shotdata_to_update_filter, :]
 
     if shotdata_to_update.shape[0] == 0:
         logger.loginfo("No points to update, returning original shot_data")
         return shot_data
 
-    kin_position_training_data_inds = KIN_POSITION_DATA_TREE.query_radius(
-        shotdata_to_update[:, 0].astype(float).reshape(-1, 1),
-        r=lengthscale,  # seconds
-        return_distance=False,
-        count_only=False,
+    # KernelRidge(alpha=1, kernel=RBF(lengthscale)) on the centered positions
+    updated_positions = interpolator.kernel_predict(
+        shotdata_to_update[:, 0].astype(float), lengthscale, alpha=1.0
     )
-    kin_position_training_data_inds = np.unique(
-        list(itertools.chain.from_iterable(kin_position_training_data_inds))
-    ).astype(int)
-
-    if len(kin_position_training_data_inds) == 0:
-        logger.loginfo("No points to update, returning original tenu_r")
-        return shot_data
-
-    scaler = StandardScaler(
-        with_std=False
-    )  # we do not want to scale the standard deviation
-    scaler.fit(kin_position_data[kin_position_training_data_inds, :])
-
-    XY_train = scaler.transform(
-        kin_position_data[kin_position_training_data_inds, :]
-    )  # East, North, Up values
-    XY_predict = scaler.transform(shotdata_to_update[:, 0:-1])  # East, North, Up values
-
-    X_train = XY_train[:, 0][:, np.newaxis]  # timestamps
-    Y_train = XY_train[:, 1:]  # East, North, Up values
-    X_predict = XY_predict[:, 0][:, np.newaxis]  # timestamps for the points to update
-    # create the kernel ridge regression model
-
-    kernel = RBF(length_scale=lengthscale)
-    kernal_ridge = KernelRidge(alpha=1, kernel=kernel)
-    kernal_ridge = kernal_ridge.fit(X_train, Y_train)
-    err = kernal_ridge.score(
-        XY_predict[:, 0][:, np.newaxis],
-        XY_predict[:, 1:],
+    updated_shotdata = np.hstack(
+        (shotdata_to_update[:, 0:1].astype(float), updated_positions)
     )
-
-    train_score = kernal_ridge.score(X_train, Y_train)
-
-    logger.loginfo(f"Kernel Ridge Regression model score: {err:.3f}")
-    logger.loginfo(f"Kernel Ridge Regression model training score: {train_score:.3f}")
-    # predict the values at the tenu_r timestamps
-    updated_shotdata_scaled = kernal_ridge.predict(X_predict)
-    # create a merged array with each column being the East, North, Up values
-    # and the first column being the timestamps
-
-    updated_shotdata_scaled_merged = np.vstack(
-        (
-            (
-                X_predict.T,
-                updated_shotdata_scaled[:, 0][:, np.newaxis].T,
-                updated_shotdata_scaled[:, 1][:, np.newaxis].T,
-                updated_shotdata_scaled[:, 2][:, np.newaxis].T,
-            )
-        )
-    ).T
-    updated_shotdata = scaler.inverse_transform(updated_shotdata_scaled_merged)
     # compute the offset between the predicted values and the original values
     offset = np.abs(updated_shotdata - shotdata_to_update[:, :-1])
     if offset.max() > 1:
@@ -854,7 +956,7 @@ def interpolate_enu_kernelridge(
     )
 
     # update the tenu_r values with the predicted values
-    shot_data[shotdata_to_update_filter, 1:-1] = updated_shotdata
+    shot_data[shotdata_to_update_filter, 1:-1] = updated_positions
     # set the isUpdated flag to True for the updated points
     shot_data[shotdata_to_update_filter, -1] = True
     # return the updated tenu_r values
@@ -901,22 +1003,14 @@ def interpolate_enu_radius_regression(
     XY_predict_return = shotdata_df[["returnTime", "east1", "north1", "up1"]].to_numpy()
     isUpdated = shotdata_df["isUpdated"].to_numpy()[:, np.newaxis]
 
-    X_train = np.vstack(
-        (
-            X_train,
-            XY_predict_ping[:, 0][:, np.newaxis],
-            XY_predict_return[:, 0][:, np.newaxis],
-        )
+    X_train = np.hstack(
+        (X_train[:, 0], XY_predict_ping[:, 0], XY_predict_return[:, 0])
     )
     Y_train = np.vstack((Y_train, XY_predict_ping[:, 1:], XY_predict_return[:, 1:]))
-    KIN_POSITION_DATA_TREE = RadiusNeighborsRegressor(
-        radius=lengthscale, weights="uniform", algorithm="kd_tree"
-    )
-    KIN_POSITION_DATA_TREE.fit(X_train, Y_train)
-    train_score = KIN_POSITION_DATA_TREE.score(X_train, Y_train)
-    logger.loginfo(f"Training Score: {train_score}")
-    pred_ping = KIN_POSITION_DATA_TREE.predict(XY_predict_ping[:, 0][:, np.newaxis])
-    pred_return = KIN_POSITION_DATA_TREE.predict(XY_predict_return[:, 0][:, np.newaxis])
+    # Uniform mean of the samples within lengthscale, as RadiusNeighborsRegressor
+    interpolator = TimeSeriesInterpolator(X_train, Y_train)
+    pred_ping = interpolator.radius_predict(XY_predict_ping[:, 0], lengthscale)
+    pred_return = interpolator.radius_predict(XY_predict_return[:, 0], lengthscale)
 
     # Get offsets between predicted and original values
     offset_ping = np.abs(pred_ping - XY_predict_ping[:, 1:])
@@ -974,25 +1068,26 @@ def merge_shotdata_kinposition_radius_regression(
     """
 
     logger.loginfo("Merging shotdata and kin_position data")
-    for start, end in zip(dates, dates[1:]):
-        logger.loginfo(f"Interpolating shotdata for date {str(start)}")
+    with shotdata.buffered_writer(validate=False) as writer:
+        for start, end in zip(dates, dates[1:]):
+            logger.loginfo(f"Interpolating shotdata for date {str(start)}")
 
-        shotdata_df = shotdata_pre.read_df(start=start, end=end)
-        kin_position_df = kin_position.read_df(start=start, end=end)
+            shotdata_df = shotdata_pre.read_df(start=start, end=end)
+            kin_position_df = kin_position.read_df(start=start, end=end)
 
-        if shotdata_df.empty or kin_position_df.empty:
-            continue
+            if shotdata_df.empty or kin_position_df.empty:
+                continue
 
-        kin_position_df.time = kin_position_df.time.apply(lambda x: x.timestamp())
+            kin_position_df.time = kin_position_df.time.apply(lambda x: x.timestamp())
 
-        # interpolate the enu values
-        shotdata_df_updated = interpolate_enu_radius_regression(
-            kin_position_df=kin_position_df,
-            shotdata_df=shotdata_df.copy(),
-            lengthscale=lengthscale,
-        )
+            # interpolate the enu values
+            shotdata_df_updated = interpolate_enu_radius_regression(
+                kin_position_df=kin_position_df,
+                shotdata_df=shotdata_df.copy(),
+                lengthscale=lengthscale,
+            )
 
-        shotdata.write_df(shotdata_df_updated, validate=False)
+            writer.write_df(shotdata_df_updated)
 
     return shotdata
 
@@ -1,8 +1,9 @@
 # External Imports
 import datetime
 import json
+import queue
 import sys
-from multiprocessing import Pool
+from multiprocessing import cpu_count, get_context
 from pathlib import Path
 from typing import List, Optional
 
@@ -30,6 +31,11 @@ from es_sfgtools.seafloor_site_tools.soundspeed_operations import (
     seabird_to_soundvelocity,
 )
 from es_sfgtools.sonardyne_tools import sv3_operations as sv3_ops
+from es_sfgtools.tiledb_tools.maintenance import (
+    TILEDB_DIR_ARRAYS,
+    maintain_tiledb_dir,
+    summarize_maintenance,
+)
 from es_sfgtools.tiledb_tools.tiledb_operations import tile2rinex
 from es_sfgtools.tiledb_tools.tiledb_schemas import (
     TDBIMUPositionArray,
@@ -37,6 +43,7 @@ from es_sfgtools.tiledb_tools.tiledb_schemas import (
     TDBShotDataArray,
 )
 from .config import SV3PipelineConfig
+from .product_prefetch import prefetch_products
 from .shotdata_gnss_refinement import merge_shotdata_kinposition
 from .exceptions import (
     NoRinexFound,
@@ -50,6 +57,45 @@ from .exceptions import (
 from ..utils.protocols import WorkflowABC, validate_network_station_campaign
 
 
+# Parsed DFOP00 batches waiting for the parent writer, per parser process
+DFOP00_BATCHES_PER_PROCESS = 2
+
+# Set in each parser process by `_init_dfop00_worker`
+_dfop00_batches = None
+
+
+def _init_dfop00_worker(batches) -> None:
+    global _dfop00_batches
+    _dfop00_batches = batches
+
+
+def _read_dfop00(index: int, source: str, batch_size: int) -> None:
+    """Stream a DFOP00 file's shotdata to the parent in a worker process.
+
+    Every batch of ``batch_size`` ping/reply pairs is put on the bounded
+    batch queue as ``("batch", index, shotdata)`` as soon as it is parsed,
+    so a worker holds one batch at a time and blocks while the parent's
+    writer is behind. ``("done", index, error)`` follows the file's last
+    batch. Errors are caught here so one bad file does not stop the pool.
+
+    Parameters
+    ----------
+    index : int
+        Position of the file in the parent's list of entries.
+    source : str
+        Path to the DFOP00 file.
+    batch_size : int
+        Ping/reply pairs per batch.
+    """
+    error = None
+    try:
+        for shotdata in sv3_ops.iter_dfop00_shotdata(source, batch_size=batch_size):
+            _dfop00_batches.put(("batch", index, shotdata))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    _dfop00_batches.put(("done", index, error))
+
+
 class SV3Pipeline(WorkflowABC):
     """Orchestrates the end-to-end processing of Sonardyne SV3 and Novatel GNSS data for seafloor geodesy.
 
@@ -530,7 +576,6 @@ class SV3Pipeline(WorkflowABC):
                     )
 
                 rinex_entries: List[AssetEntry] = []
-                uploadCount = 0
                 for rinex_path in rinex_paths:
                     # Get the start and end time from the RINEX file for metadata
                     rinex_time_start, rinex_time_end = rinex_get_time_range(
@@ -547,9 +592,8 @@ class SV3Pipeline(WorkflowABC):
                         timestamp_created=datetime.datetime.now(tz=datetime.timezone.utc),
                     )
                     rinex_entries.append(rinex_entry)
-                    if self.asset_catalog.add_or_update(rinex_entry):
-                        uploadCount += 1
 
+                uploadCount = self.asset_catalog.add_or_update_many(rinex_entries)
                 self.asset_catalog.add_merge_job(**merge_signature)
 
                 ProcessLogger.loginfo(
@@ -636,6 +680,18 @@ class SV3Pipeline(WorkflowABC):
         response = f"Found {len(rinex_entries)} Rinex Files to Process"
         ProcessLogger.loginfo(response)
 
+        # Download every day's products up front so PRIDE workers find them
+        # in the common product directory instead of downloading them
+        if self.config.pride_config.prefetch_products:
+            prefetch_products(
+                rinex_entries,
+                prideDir,
+                max_workers=self.config.pride_config.prefetch_workers,
+                override=self.config.pride_config.override_products_download,
+                max_cache_bytes=self.config.pride_config.product_cache_max_bytes,
+                deep_verify=self.config.pride_config.deep_verify_products,
+            )
+
         # Process the Rinex files using PrideProcessor
         # 1. Convert each Rinex to KIN using PRIDE
         # 2. Create AssetEntry for each KIN and residual file
@@ -652,7 +708,10 @@ class SV3Pipeline(WorkflowABC):
 
         kin_count = 0
         res_count = 0
+        processed_rinex_entries: List[AssetEntry] = []
+        new_entries: List[AssetEntry] = []
         uploadCount = 0
+        catalog_batch_size = self.config.pride_config.catalog_batch_size
 
         for result in tqdm(processor.process_batch(
             [x.local_path for x in rinex_entries],
@@ -673,11 +732,9 @@ class SV3Pipeline(WorkflowABC):
                     timestamp_created=datetime.datetime.now(tz=datetime.timezone.utc),
                     parent_id=rinex_entry.id,
                 )
-                rinex_entry.is_processed = True
                 kin_count += 1
-                self.asset_catalog.add_or_update(rinex_entry)
-                if self.asset_catalog.add_or_update(kin_entry):
-                    uploadCount += 1
+                processed_rinex_entries.append(rinex_entry)
+                new_entries.append(kin_entry)
             if result.res_path is not None:
                 resfile = AssetEntry(
                     local_path=result.res_path,
@@ -692,10 +749,16 @@ class SV3Pipeline(WorkflowABC):
                 )
 
                 res_count += 1
-                if self.asset_catalog.add_or_update(resfile):
-                    uploadCount += 1
+                new_entries.append(resfile)
 
+            # Commit every few results, so a crash does not lose hours of PPP
+            if len(processed_rinex_entries) >= catalog_batch_size:
+                uploadCount += self.asset_catalog.add_or_update_many(new_entries)
+                self.asset_catalog.mark_processed_many(processed_rinex_entries)
+                processed_rinex_entries, new_entries = [], []
 
+        uploadCount += self.asset_catalog.add_or_update_many(new_entries)
+        self.asset_catalog.mark_processed_many(processed_rinex_entries)
 
         response = f"Generated {kin_count} Kin Files and {res_count} Residual Files From {len(rinex_entries)} Rinex Files, Added {uploadCount} to the Catalog"
         ProcessLogger.loginfo(response)
@@ -743,17 +806,29 @@ class SV3Pipeline(WorkflowABC):
         )
 
         # Process KIN files to generate kinematic position dataframes
-        processed_count = 0
-        for kin_entry in tqdm(kin_entries, desc="Processing Kin Files"):
-            try:
-                kin_position_df = kin_to_kin_position_df(kin_entry.local_path)
-                if kin_position_df is not None:
-                    processed_count += 1
-                    kin_entry.is_processed = True
-                    self.asset_catalog.add_or_update(kin_entry)
-                    self.kinPositionTDB.write_df(kin_position_df)
-            except Exception as e:
-                ProcessLogger.logerr(f"Error processing {kin_entry.local_path}: {e}")
+        processed_entries: List[AssetEntry] = []
+        pending: List[AssetEntry] = []
+        with self.kinPositionTDB.buffered_writer(sort=True) as writer:
+            for kin_entry in tqdm(kin_entries, desc="Processing Kin Files"):
+                try:
+                    kin_position_df = kin_to_kin_position_df(kin_entry.local_path)
+                    if kin_position_df is not None:
+                        n_flushes = writer.n_flushes
+                        writer.write_df(kin_position_df)
+                        pending.append(kin_entry)
+                        # A flush wrote every pending file: mark them processed
+                        if writer.n_flushes > n_flushes:
+                            self.asset_catalog.mark_processed_many(pending)
+                            processed_entries.extend(pending)
+                            pending = []
+                except Exception as e:
+                    ProcessLogger.logerr(
+                        f"Error processing {kin_entry.local_path}: {e}"
+                    )
+            writer.flush()
+        self.asset_catalog.mark_processed_many(pending)
+        processed_entries.extend(pending)
+        processed_count = len(processed_entries)
 
         ProcessLogger.loginfo(
             f"Generated {processed_count} KinPosition Dataframes From {len(kin_entries)} Kin Files"
@@ -765,12 +840,16 @@ class SV3Pipeline(WorkflowABC):
 
         Steps:
         1. Retrieves DFOP00 files needing processing
-        2. Converts each file to shotdata dataframe (acoustic ping-reply
-           sequences)
-        3. Writes dataframes to preliminary shotdata TileDB array
-        4. Marks files as processed in asset catalog
-
-        Uses multiprocessing for efficient parallel processing.
+        2. Parses each file into shotdata (acoustic ping-reply sequences)
+        3. Writes the shotdata to the preliminary shotdata TileDB array and
+           marks files as processed in asset catalog as their shotdata is
+           flushed
+
+        Files are parsed in parallel worker processes, each streaming its
+        file in batches of ``dfop00_config.batch_size`` pairs through a
+        bounded queue. The parent writes every batch through one buffered
+        writer, so many files share a fragment and neither side holds a
+        whole file.
         """
 
         # 1. Get the DFOP00 files to process
@@ -790,27 +869,71 @@ class SV3Pipeline(WorkflowABC):
 
         response = f"Found {len(dfop00_entries)} DFOP00 Files to Process"
         ProcessLogger.loginfo(response)
-        count = 0
-
-        # 2. Process DFOP00 files to generate shotdata dataframes
-        with Pool() as pool:
-            results = pool.imap(
-                sv3_ops.dfop00_to_shotdata, [x.local_path for x in dfop00_entries]
+        processed_entries: List[AssetEntry] = []
+
+        # 2. Parse DFOP00 files in worker processes and write each batch here
+        # as it arrives. Files are marked processed once their last batch has
+        # been flushed
+        batch_size = self.config.dfop00_config.batch_size
+        n_processes = cpu_count()
+        # spawn: the parent already holds TileDB contexts, which are not fork-safe
+        context = get_context("spawn")
+        batches = context.Queue(maxsize=DFOP00_BATCHES_PER_PROCESS * n_processes)
+        n_shots = [0] * len(dfop00_entries)
+        pending: List[AssetEntry] = []
+        with (
+            context.Pool(
+                n_processes,
+                initializer=_init_dfop00_worker,
+                initargs=(batches,),
+            ) as pool,
+            # batches are already validated by the parser
+            self.shotDataPreTDB.buffered_writer(sort=True, validate=False) as writer,
+            tqdm(total=len(dfop00_entries), desc="Processing DFOP00 Files") as pbar,
+        ):
+            result = pool.starmap_async(
+                _read_dfop00,
+                [
+                    (i, str(x.local_path), batch_size)
+                    for i, x in enumerate(dfop00_entries)
+                ],
             )
-            for shotdata_df, dfo_entry in tqdm(
-                zip(results, dfop00_entries),
-                total=len(dfop00_entries),
-                desc="Processing DFOP00 Files",
-            ):
-                if shotdata_df is not None and not shotdata_df.empty:
-                    self.shotDataPreTDB.write_df(shotdata_df)  # write to pre-shotdata
-                    count += 1
-                    dfo_entry.is_processed = True  # mark as processed
-                    self.asset_catalog.add_or_update(dfo_entry)
-                    ProcessLogger.logdebug(f" Processed {dfo_entry.local_path}")
-                else:
-                    ProcessLogger.logerr(f"Failed to Process {dfo_entry.local_path}")
+            n_done = 0
+            while n_done < len(dfop00_entries):
+                try:
+                    kind, index, payload = batches.get(timeout=1.0)
+                except queue.Empty:
+                    if result.ready() and not result.successful():
+                        result.get()
+                    continue
+                dfo_entry = dfop00_entries[index]
+                if kind == "batch":
+                    n_flushes = writer.n_flushes
+                    writer.write_df(payload)
+                    n_shots[index] += len(payload)
+                    # 3. A flush wrote the last batch of every pending file
+                    if writer.n_flushes > n_flushes:
+                        self.asset_catalog.mark_processed_many(pending)
+                        processed_entries.extend(pending)
+                        pending = []
+                    continue
 
+                n_done += 1
+                pbar.update(1)
+                if payload is not None or n_shots[index] == 0:
+                    reason = f": {payload}" if payload else ": no shots found"
+                    ProcessLogger.logerr(
+                        f"Failed to Process {dfo_entry.local_path}{reason}"
+                    )
+                    continue
+                pending.append(dfo_entry)
+                ProcessLogger.logdebug(
+                    f" Processed {dfo_entry.local_path} ({n_shots[index]} shots)"
+                )
+            writer.flush()
+        self.asset_catalog.mark_processed_many(pending)
+        processed_entries.extend(pending)
+        count = len(processed_entries)
         response = f"Generated {count} ShotData dataframes From {len(dfop00_entries)} DFOP00 Files"
         ProcessLogger.loginfo(response)
 
@@ -858,6 +981,13 @@ class SV3Pipeline(WorkflowABC):
                 kin_position=self.kinPositionTDB,
                 position_data=self.imuPositionTDB,
                 dates=dates,
+                chunk=datetime.timedelta(
+                    hours=self.config.position_update_config.merge_chunk_hours
+                ),
+                pad=datetime.timedelta(
+                    minutes=self.config.position_update_config.merge_pad_minutes
+                ),
+                n_processes=self.config.position_update_config.merge_processes,
             )
             self.asset_catalog.add_merge_job(**merge_job)
 
@@ -944,6 +1074,37 @@ class SV3Pipeline(WorkflowABC):
                 )
                 continue
 
+    @validate_network_station_campaign
+    def maintain_tiledb(self, force: bool = False) -> None:
+        """Consolidate and vacuum the station's SV3 TileDB arrays.
+
+        Only arrays whose fragment or metadata counts exceed
+        ``config.tiledb_maintenance`` are consolidated; read latency before
+        and after is logged when the policy measures it.
+
+        Parameters
+        ----------
+        force : bool, optional
+            Consolidate fragments regardless of the thresholds, by default False.
+        """
+        reports = maintain_tiledb_dir(
+            self.current_station_dir.tiledb_directory,
+            policy=self.config.tiledb_maintenance,
+            arrays=[name for name in TILEDB_DIR_ARRAYS if not name.startswith("qc_")],
+            force=force,
+        )
+        summary = summarize_maintenance(reports)
+        if not summary.empty and (summary.consolidated != "").any():
+            ProcessLogger.loginfo(
+                f"TileDB maintenance for {self.current_station_name}:\n"
+                f"{summary.to_string(index=False)}"
+            )
+
+    def _maintain_tiledb_after_stage(self) -> None:
+        """Run `maintain_tiledb` if enabled in the pipeline config."""
+        if self.config.tiledb_maintenance.enabled:
+            self.maintain_tiledb()
+
     @validate_network_station_campaign
     def run_pipeline(self) -> None:
         """Execute the complete SV3 data processing pipeline in sequence.
@@ -968,6 +1129,7 @@ class SV3Pipeline(WorkflowABC):
             self.pre_process_novatel()
         except NoNovatelFound as e:
             pass
+        self._maintain_tiledb_after_stage()
 
         try:
             self.get_rinex_files()
@@ -983,13 +1145,16 @@ class SV3Pipeline(WorkflowABC):
             self.process_kin()
         except NoKinFound as e:
             pass
+        self._maintain_tiledb_after_stage()
 
         try:
             self.process_dfop00()
         except NoDFOP00Found as e:
             pass
+        self._maintain_tiledb_after_stage()
 
         self.update_shotdata()
+        self._maintain_tiledb_after_stage()
 
         try:
             self.process_svp()
@@ -12,7 +12,6 @@ from typing import (
 )
 
 import boto3
-from tqdm.auto import tqdm
 import json
 
 from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
@@ -46,10 +45,11 @@ from es_sfgtools.tiledb_tools.tiledb_schemas import (
     TDBShotDataArray,
 )
 from es_sfgtools.data_mgmt.ingestion.archive_pull import (
-    download_file_from_archive,
     list_campaign_files,
     load_site_metadata,
+    retrieve_token,
 )
+from es_sfgtools.data_mgmt.ingestion.http_download import HTTPDownloader
 from es_sfgtools.workflows.utils.protocols import (
     WorkflowABC,
     validate_network_station_campaign,
@@ -428,6 +428,7 @@ class DataHandler(WorkflowABC):
         ] = DEFAULT_FILE_TYPES_TO_DOWNLOAD,
         override: bool = False,
         rinex_1Hz: bool = False,
+        max_http_workers: int = 8,
     ):
         """
         Downloads files of specified types from remote storage.
@@ -440,6 +441,8 @@ class DataHandler(WorkflowABC):
             If True, redownloads files even if they exist locally.
         rinex_1Hz : bool, default False
             If True, downloads 1Hz RINEX files instead of higher rate rinex files
+        max_http_workers : int, default 8
+            The number of files downloaded at once from HTTP storage.
 
         Raises
         ------
@@ -545,7 +548,11 @@ class DataHandler(WorkflowABC):
                         self.asset_catalog.update_local_path(file.id, file.local_path)
 
             if len(http_assets) > 0:
-                self.download_HTTP_files(http_assets=http_assets, file_type=type)
+                self.download_HTTP_files(
+                    http_assets=http_assets,
+                    file_type=type,
+                    max_workers=max_http_workers,
+                )
 
     def _download_S3_files(self, s3_assets: List[AssetEntry]):
         """
@@ -625,10 +632,18 @@ class DataHandler(WorkflowABC):
             return local_path
 
     def download_HTTP_files(
-        self, http_assets: List[AssetEntry], file_type: Optional[AssetType] = None
+        self,
+        http_assets: List[AssetEntry],
+        file_type: Optional[AssetType] = None,
+        max_workers: int = 8,
+        batch_size: int = 100,
     ):
         """
-        Downloads files from an HTTP server and updates the catalog.
+        Downloads files from an HTTP server concurrently and updates the catalog.
+
+        Files are fetched by an `HTTPDownloader` over pooled connections, resuming
+        interrupted transfers and verifying their size and checksum. The local paths
+        are written to the catalog every ``batch_size`` completed downloads.
 
         Parameters
         ----------
@@ -636,61 +651,47 @@ class DataHandler(WorkflowABC):
             A list of HTTP assets to download.
         file_type : AssetType, optional
             The type of file being downloaded.
+        max_workers : int, default 8
+            The number of files downloaded at once.
+        batch_size : int, default 100
+            The number of downloaded files per catalog update.
         """
 
-        for file_asset in tqdm(
-            http_assets, desc=f"Downloading {file_type.value} files"
-        ):
+        files = []
+        assets_by_url = {}
+        for file_asset in http_assets:
             if file_asset.type.value == AssetType.RINEX2.value:
                 # If the file type is RINEX, download to the intermediate directory for processing, otherwise download to the raw directory
                 local_dir = self.current_campaign_dir.intermediate
             else:
-                local_dir = self.current_campaign_dir.raw 
-            if (
-                local_path := self._HTTP_download_file(remote_url=file_asset.remote_path, 
-                                                       local_dir=local_dir)
-            ) is not None:
+                local_dir = self.current_campaign_dir.raw
+            files.append((file_asset.remote_path, local_dir))
+            assets_by_url[file_asset.remote_path] = file_asset
+
+        desc = f"Downloading {file_type.value if file_type else 'HTTP'} files"
+        downloaded = []
+        failed = 0
+        with HTTPDownloader(
+            max_workers=max_workers, token_provider=retrieve_token
+        ) as downloader:
+            for url, local_path in downloader.download_many(files, desc=desc):
+                if local_path is None:
+                    failed += 1
+                    continue
                 # Update the local path in the AssetEntry
+                file_asset = assets_by_url[url]
                 file_asset.local_path = str(local_path)
-                # Update catalog with local path
-                self.asset_catalog.update_local_path(
-                    id=file_asset.id, 
-                    local_path=file_asset.local_path
-                )
-
-    def _HTTP_download_file(self, remote_url: Path, local_dir: Path) -> Path:
-        """
-        Downloads a single file from an HTTP URL.
-
-        Parameters
-        ----------
-        remote_url : Path
-            The URL of the file to download.
-
-        Returns
-        -------
-        Path or None
-            The local path of the downloaded file, or None if the download fails.
-        """
-        try:
-            local_path = local_dir / Path(remote_url).name
-            download_file_from_archive(url=remote_url, 
-                                       dest_dir=local_path.parent)
-
-            if not local_path.exists():
-                raise Exception
-
-            logger.logdebug(f"Downloaded {str(remote_url)} to {str(local_path)}")
-
-        except Exception as e:
+                downloaded.append(file_asset)
+                if len(downloaded) >= batch_size:
+                    self.asset_catalog.update_local_paths(downloaded)
+                    downloaded = []
+        # Update catalog with the remaining local paths
+        self.asset_catalog.update_local_paths(downloaded)
+        if failed:
             logger.logerr(
-                f"Error downloading {str(remote_url)} \n {e}"
+                f"Failed to download {failed} of {len(files)} files"
                 + "\n HINT: Check authentication credentials"
             )
-            local_path = None
-
-        finally:
-            return local_path
 
     @validate_network_station_campaign
     def update_catalog_from_archive(self) -> None:
@@ -6,6 +6,7 @@ from typing import (
     Union,
 )
 
+import pandas as pd
 
 from es_sfgtools.config.file_config import DEFAULT_FILE_TYPES_TO_DOWNLOAD, DEFAULT_INTERMEDIATE_FILE_TYPES_TO_DOWNLOAD
 from es_sfgtools.modeling.garpos_tools.schemas import InversionParams
@@ -884,7 +885,10 @@ class WorkflowHandler(WorkflowABC):
 
     @validate_network_station_campaign
     def midprocess_upload_s3(
-        self, overwrite: bool = False, override_metadata_require: bool = False
+        self,
+        overwrite: bool = False,
+        override_metadata_require: bool = False,
+        delete: bool = False,
     ) -> None:
         """Uploads intermediate processed data to S3 for the current station.
         Parameters
@@ -893,6 +897,9 @@ class WorkflowHandler(WorkflowABC):
             If True, overwrites existing data on S3, by default False.
         override_metadata_require : bool, optional
             If True, bypasses the requirement for loaded site metadata, by default False.
+        delete : bool, optional
+            If True, deletes TileDB files on S3 that were removed locally (e.g. by
+            vacuuming), by default False.
 
         Raises
         ------
@@ -903,7 +910,7 @@ class WorkflowHandler(WorkflowABC):
             self.current_station_metadata,
             override_metadata_require=override_metadata_require,
         )
-        dataPostProcessor.midprocess_sync_s3(overwrite=overwrite)
+        dataPostProcessor.midprocess_sync_s3(overwrite=overwrite, delete=delete)
 
     @validate_network_station_campaign
     def modeling_get_garpos_handler(self) -> GarposHandler:
@@ -941,7 +948,9 @@ class WorkflowHandler(WorkflowABC):
         iterations: int = 1,
         override: bool = False,
         custom_settings: Optional[dict] = None,
-    ) -> None:
+        n_processes: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Optional[pd.DataFrame]:
         """Runs GARPOS processing for the current station.
 
         Parameters
@@ -958,6 +967,16 @@ class WorkflowHandler(WorkflowABC):
             If True, re-runs GARPOS even if results exist, by default False.
         custom_settings : Optional[dict], optional
             Custom settings to override GARPOS defaults, by default None.
+        n_processes : int, optional
+            Number of surveys to run concurrently, by default 1 (serial).
+        timeout : Optional[float], optional
+            Wall-clock limit per survey in seconds when running in parallel,
+            by default None.
+
+        Returns
+        -------
+        Optional[pd.DataFrame]
+            Per-survey run summary when running in parallel, otherwise None.
 
         Raises
         ------
@@ -965,12 +984,14 @@ class WorkflowHandler(WorkflowABC):
             If site metadata is not loaded.
         """
         gp_handler = self.modeling_get_garpos_handler()
-        gp_handler.run_garpos(
+        return gp_handler.run_garpos(
             survey_id=survey_id,
             run_id=run_id,
             iterations=iterations,
             override=override,
             custom_settings=custom_settings,
+            n_processes=n_processes,
+            timeout=timeout,
         )
 
     @validate_network_station_campaign
@@ -0,0 +1,198 @@
+import datetime
+import sqlite3
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+
+from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.config.file_config import AssetType
+
+
+def make_entries(n: int, asset_type: AssetType = AssetType.DFOP00) -> list:
+    return [
+        AssetEntry(
+            local_path=f"/data/NCC1/file_{i:05d}.raw",
+            remote_path=f"s3://bucket/NCC1/file_{i:05d}.raw",
+            network="cascadia-gorda",
+            station="NCC1",
+            campaign="2025_A_1126",
+            type=asset_type,
+            timestamp_created=datetime.datetime(2025, 5, 1),
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def catalog(tmp_path) -> PreProcessCatalogHandler:
+    return PreProcessCatalogHandler(tmp_path / "catalog.sqlite")
+
+
+def assets(catalog: PreProcessCatalogHandler):
+    return catalog.query_catalog("SELECT * FROM assets ORDER BY local_path")
+
+
+def test_add_or_update_many_inserts(catalog):
+    assert catalog.add_or_update_many(make_entries(25) + [None]) == 25
+    stored = assets(catalog)
+    assert len(stored) == 25
+    assert not stored.is_processed.any()
+
+
+def test_add_or_update_many_matches_single_updates(tmp_path, catalog):
+    reference = PreProcessCatalogHandler(tmp_path / "reference.sqlite")
+    for handler in (catalog, reference):
+        handler.add_or_update_many(make_entries(10))
+
+    entries = catalog.get_single_entries_to_process(
+        network="cascadia-gorda",
+        station="NCC1",
+        campaign="2025_A_1126",
+        parent_type=AssetType.DFOP00,
+    )
+    for entry in entries[:4]:
+        entry.is_processed = True
+    catalog.add_or_update_many(entries[:4])
+    for entry in entries[:4]:
+        reference.add_or_update(entry)
+
+    assert assets(catalog).is_processed.tolist() == assets(reference).is_processed.tolist()
+    assert assets(catalog).is_processed.sum() == 4
+
+
+def test_add_or_update_many_upserts_on_remote_path(catalog):
+    catalog.add_or_update_many(make_entries(3))
+    updated = make_entries(3)
+    updated[1].local_path = "/data/NCC1/moved.raw"
+    assert catalog.add_or_update_many(updated) == 3
+    stored = assets(catalog)
+    assert len(stored) == 3
+    assert "/data/NCC1/moved.raw" in stored.local_path.tolist()
+
+
+def test_mark_processed_many(catalog):
+    catalog.add_or_update_many(make_entries(1200))
+    entries = catalog.get_single_entries_to_process(
+        network="cascadia-gorda",
+        station="NCC1",
+        campaign="2025_A_1126",
+        parent_type=AssetType.DFOP00,
+    )
+    # more entries than a single IN (...) chunk
+    assert catalog.mark_processed_many(entries[:1100]) == 1100
+    assert all(entry.is_processed for entry in entries[:1100])
+    assert assets(catalog).is_processed.sum() == 1100
+
+    # entries without an id are matched by local path
+    unsaved = make_entries(1200)[1150:]
+    assert catalog.mark_processed_many(unsaved) == 50
+    assert assets(catalog).is_processed.sum() == 1150
+
+
+def test_merge_jobs_use_signature(catalog):
+    job = {
+        "parent_type": "kinposition",
+        "child_type": "shotdata",
+        "parent_ids": ["2025-05-02", "2025-05-01"],
+    }
+    assert not catalog.is_merge_complete(**job)
+    catalog.add_merge_job(**job)
+    catalog.add_merge_job(**job)
+    assert catalog.is_merge_complete(**dict(job, parent_ids=["2025-05-01", "2025-05-02"]))
+    assert not catalog.is_merge_complete(**dict(job, child_type="gnssobstdb"))
+    assert len(catalog.query_catalog("SELECT * FROM mergejobs")) == 1
+
+
+def test_pragmas_and_query_plan(catalog):
+    catalog.add_or_update_many(make_entries(50))
+    with catalog.engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        plan = " ".join(
+            str(row[-1])
+            for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT * FROM assets WHERE network='a' "
+                "AND station='b' AND campaign='c' AND type='d'"
+            )
+        )
+    assert "ix_assets_station_campaign_type" in plan
+
+
+def test_migrates_existing_catalog(tmp_path):
+    db_path = tmp_path / "catalog.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE assets (
+                id INTEGER PRIMARY KEY, network VARCHAR, station VARCHAR,
+                campaign VARCHAR, remote_path VARCHAR UNIQUE, remote_type VARCHAR,
+                local_path VARCHAR, type VARCHAR, timestamp_data_start DATETIME,
+                timestamp_data_end DATETIME, timestamp_created DATETIME,
+                parent_id INTEGER REFERENCES assets (id), is_processed BOOLEAN
+            );
+            CREATE TABLE mergejobs (
+                id INTEGER PRIMARY KEY, child_type VARCHAR,
+                parent_ids VARCHAR, parent_type VARCHAR
+            );
+            INSERT INTO mergejobs (child_type, parent_ids, parent_type) VALUES
+                ('gnssobstdb', '1-2-3', 'novatel770'),
+                ('gnssobstdb', '1-2-3', 'novatel770'),
+                ('shotdata', '2025-05-01-2025-05-02', 'kinposition');
+            """
+        )
+
+    catalog = PreProcessCatalogHandler(db_path)
+    jobs = catalog.query_catalog("SELECT * FROM mergejobs")
+    assert len(jobs) == 2
+    assert jobs.signature.notna().all()
+    assert catalog.is_merge_complete("novatel770", "gnssobstdb", [3, 1, 2])
+    assert catalog.is_merge_complete("kinposition", "shotdata", ["2025-05-02", "2025-05-01"])
+    indexes = set(
+        catalog.query_catalog("SELECT name FROM sqlite_master WHERE type='index'").name
+    )
+    assert {"ix_assets_station_campaign_type", "ix_mergejobs_signature"} <= indexes
+
+    assert catalog.query_catalog("SELECT * FROM sqlite_stat1").size > 0
+
+    # reopening an already migrated catalog is a no-op and skips ANALYZE
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa.event.listen(sa.engine.Engine, "before_cursor_execute", record)
+    try:
+        PreProcessCatalogHandler(db_path)
+    finally:
+        sa.event.remove(sa.engine.Engine, "before_cursor_execute", record)
+    assert statements
+    assert not any("ANALYZE" in statement.upper() for statement in statements)
+    assert len(catalog.query_catalog("SELECT * FROM mergejobs")) == 2
+
+
+def test_update_local_paths(catalog):
+    catalog.add_or_update_many(make_entries(1200))
+    entries = catalog.get_single_entries_to_process(
+        network="cascadia-gorda",
+        station="NCC1",
+        campaign="2025_A_1126",
+        parent_type=AssetType.DFOP00,
+    )
+    catalog.mark_processed_many(entries[:10])
+    for entry in entries:
+        entry.local_path = str(entry.local_path).replace("/data/", "/moved/")
+        # only the local path is written
+        entry.is_processed = False
+    assert catalog.update_local_paths(entries[:1100]) == 1100
+    stored = assets(catalog)
+    assert stored.local_path.str.startswith("/moved/").sum() == 1100
+    assert stored.is_processed.sum() == 10
+
+    # entries without an id are matched by remote path
+    unsaved = make_entries(1200)[1150:]
+    for entry in unsaved:
+        entry.local_path = f"/raw/{Path(entry.local_path).name}"
+    assert catalog.update_local_paths(unsaved) == 50
+    assert assets(catalog).local_path.str.startswith("/raw/").sum() == 50
@@ -0,0 +1,105 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("garpos")
+
+from es_sfgtools.modeling.garpos_tools.schemas import GarposFixed
+from es_sfgtools.workflows.modeling.garpos_scheduler import (
+    GarposScheduler,
+    GarposTask,
+    summarize_results,
+)
+
+
+def make_task(tmp_path: Path, task_id: str) -> GarposTask:
+    return GarposTask(
+        task_id=task_id,
+        survey_id=task_id,
+        run_id="0",
+        obsfile_path=tmp_path / "obs.ini",
+        results_dir=tmp_path / task_id,
+        garpos_fixed=GarposFixed(),
+    )
+
+
+def fake_inversion(task: GarposTask):
+    """Stand in for GARPOS: sleep, then fail or write a results file by task ID."""
+    print(f"running {task.task_id} in {os.getpid()}")
+    time.sleep(0.5)
+    if task.task_id.startswith("fail"):
+        raise RuntimeError("inversion diverged")
+    if task.task_id.startswith("hang"):
+        time.sleep(60)
+    if task.task_id.startswith("skip"):
+        return None
+    results_path = task.results_dir / "res.dat"
+    results_path.write_text(str(os.getpid()))
+    return results_path
+
+
+def test_scheduler_collects_all_outcomes(tmp_path):
+    tasks = [
+        make_task(tmp_path, task_id)
+        for task_id in ("ok_a", "ok_b", "fail_c", "hang_d", "skip_e")
+    ]
+    # spawned workers import the package first, so leave room for start-up
+    scheduler = GarposScheduler(
+        n_workers=5, timeout=30, task_fn=fake_inversion, poll_interval=0.1
+    )
+    start = time.monotonic()
+    results = scheduler.run(tasks)
+    elapsed = time.monotonic() - start
+
+    assert [r.task_id for r in results] == [t.task_id for t in tasks]
+    status = {r.task_id: r.status for r in results}
+    assert status == {
+        "ok_a": "success",
+        "ok_b": "success",
+        "fail_c": "failed",
+        "hang_d": "timeout",
+        "skip_e": "skipped",
+    }
+    assert "inversion diverged" in results[2].error
+    # tasks ran concurrently: bounded by the timeout, not the sum of runtimes
+    assert elapsed < 50
+    # each task ran in its own process and logged to its own file
+    pids = {(tmp_path / t).joinpath("res.dat").read_text() for t in ("ok_a", "ok_b")}
+    assert len(pids) == 2
+    assert "running ok_a" in results[0].log_path.read_text()
+    assert "inversion diverged" in results[2].log_path.read_text()
+
+    summary = summarize_results(results)
+    assert list(summary.task_id) == [t.task_id for t in tasks]
+    assert (summary.status == "success").sum() == 2
+
+
+def test_scheduler_limits_concurrency(tmp_path):
+    tasks = [make_task(tmp_path, f"ok_{i}") for i in range(4)]
+    scheduler = GarposScheduler(n_workers=2, task_fn=fake_inversion, poll_interval=0.05)
+    start = time.monotonic()
+    results = scheduler.run(tasks)
+    elapsed = time.monotonic() - start
+    assert all(r.status == "success" for r in results)
+    # four 0.5 s tasks on two workers take at least two rounds
+    assert elapsed >= 1.0
+
+
+def large_result(task: GarposTask):
+    """Return a results path far longer than a pipe buffer."""
+    return task.results_dir / ("x" * 200) / ("y" * 1_000_000)
+
+
+def test_large_result_does_not_block_worker(tmp_path):
+    scheduler = GarposScheduler(n_workers=1, timeout=60, task_fn=large_result)
+    [result] = scheduler.run([make_task(tmp_path, "big")])
+    assert result.status == "success"
+    assert result.results_path.name == "y" * 1_000_000
+
+
+def test_duplicate_task_ids_are_rejected(tmp_path):
+    tasks = [make_task(tmp_path, "ok_a"), make_task(tmp_path, "ok_a")]
+    with pytest.raises(ValueError, match="ok_a"):
+        GarposScheduler(task_fn=fake_inversion).run(tasks)
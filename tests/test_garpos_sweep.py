@@ -0,0 +1,145 @@
+import json
+import math
+
+import pandas as pd
+
+from es_sfgtools.data_mgmt.assetcatalog.handler import PreProcessCatalogHandler
+from es_sfgtools.data_mgmt.directorymgmt import GARPOSSurveyDir
+from es_sfgtools.modeling.garpos_tools.schemas import GarposFixed, InversionParams
+from es_sfgtools.workflows.modeling import garpos_handler
+from es_sfgtools.workflows.modeling.garpos_scheduler import GarposTaskResult
+from es_sfgtools.workflows.modeling.garpos_sweep import (
+    SWEEP_MANIFEST_FILE_NAME,
+    expand_param_grid,
+    load_sweep_manifest,
+    summarize_run_results,
+    sweep_hash,
+    write_sweep_manifest,
+)
+
+
+def test_expand_param_grid():
+    grid = {"maxloop": [10, 20], "rejectcriteria": [2.0, 3.0, 4.0]}
+    configurations = expand_param_grid(grid)
+    assert len(configurations) == 6
+    assert {"maxloop": 20, "rejectcriteria": 3.0} in configurations
+    overrides = [{"maxloop": 10}, {"convcriteria": 1e-3}]
+    assert expand_param_grid(overrides) == overrides
+
+
+def test_sweep_hash_tracks_content_and_params(tmp_path):
+    obsfile = tmp_path / "obs.ini"
+    obsfile.write_text("[Obs-parameter]\n")
+    params = InversionParams()
+    base = sweep_hash(obsfile, params)
+
+    assert sweep_hash(obsfile, InversionParams()) == base
+    assert sweep_hash(obsfile, InversionParams(maxloop=10)) != base
+    assert sweep_hash(obsfile, params, iterations=2) != base
+    obsfile.write_text("[Obs-parameter]\n    Site_name = X\n")
+    assert sweep_hash(obsfile, params) != base
+
+
+def test_sweep_manifest_cache(tmp_path):
+    results_path = tmp_path / "SURVEY_0-res.dat"
+    params = InversionParams(maxloop=10)
+    write_sweep_manifest(
+        run_dir=tmp_path,
+        config_hash="abc",
+        survey_id="SURVEY",
+        overrides={"maxloop": 10},
+        inversion_params=params,
+        iterations=1,
+        results_path=results_path,
+    )
+    # results file missing: must rerun
+    assert load_sweep_manifest(tmp_path, "abc") is None
+    results_path.write_text("")
+    assert load_sweep_manifest(tmp_path, "abc")["overrides"] == {"maxloop": 10}
+    assert load_sweep_manifest(tmp_path, "other") is None
+
+
+def test_summarize_missing_results():
+    summary = summarize_run_results(None)
+    assert all(math.isnan(value) for value in summary.values())
+
+
+def test_add_model_results(tmp_path):
+    catalog = PreProcessCatalogHandler(tmp_path / "catalog.sqlite")
+    results = pd.DataFrame(
+        {
+            "obsfile_path": ["obs.ini"],
+            "hyper_params": [{"maxloop": 10}],
+            "rms_tt": [1.5],
+            "abic": [-100.0],
+            "delta_center_east": [0.1],
+            "delta_center_north": [0.2],
+            "delta_center_up": [0.3],
+        }
+    )
+    assert catalog.add_model_results(results) == 1
+    stored = catalog.query_catalog("SELECT * FROM modelresults")
+    assert stored.abic.tolist() == [-100.0]
+
+
+class StubScheduler:
+    """Stand in for GarposScheduler: runs with maxloop 20 fail, others succeed."""
+
+    task_ids = []
+
+    def __init__(self, n_workers=None, timeout=None):
+        pass
+
+    def run(self, tasks):
+        results = []
+        for task in tasks:
+            StubScheduler.task_ids.append(task.task_id)
+            if task.garpos_fixed.inversion_params.maxloop == 20:
+                results.append(self.result(task, "failed"))
+                continue
+            results_path = task.results_dir / f"{task.survey_id}_0-res.dat"
+            results_path.write_text("")
+            results.append(self.result(task, "success", results_path))
+        return results
+
+    @staticmethod
+    def result(task, status, results_path=None):
+        return GarposTaskResult(
+            task_id=task.task_id,
+            survey_id=task.survey_id,
+            run_id=task.run_id,
+            status=status,
+            results_path=results_path,
+        )
+
+
+def test_sweep_caches_successful_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(garpos_handler, "GarposScheduler", StubScheduler)
+    StubScheduler.task_ids = []
+    survey_dir = GARPOSSurveyDir(survey_dir=tmp_path / "SURVEY")
+    survey_dir.build()
+    survey_dir.default_obsfile.write_text("[Obs-parameter]\n")
+    handler = garpos_handler.GarposHandler.__new__(garpos_handler.GarposHandler)
+    handler.garpos_fixed = GarposFixed()
+    handler.asset_catalog = PreProcessCatalogHandler(tmp_path / "catalog.sqlite")
+
+    grid = {"maxloop": [10, 20]}
+    sweep = handler.run_garpos_sweep(grid, surveys=[survey_dir]).set_index("maxloop")
+    assert sweep.status.to_dict() == {10: "success", 20: "failed"}
+    assert sweep.results_path[20] is None
+    manifest_path = survey_dir.results_dir / f"run_{sweep.run_id[10]}"
+    manifest = json.loads((manifest_path / SWEEP_MANIFEST_FILE_NAME).read_text())
+    assert manifest["results_path"] == sweep.results_path[10]
+    assert math.isnan(sweep.abic[20])
+    stored = handler.asset_catalog.query_catalog("SELECT * FROM modelresults")
+    assert len(stored) == 1
+
+    # Only the failed configuration runs again
+    rerun = handler.run_garpos_sweep(grid, surveys=[survey_dir]).set_index("maxloop")
+    assert rerun.status.to_dict() == {10: "cached", 20: "failed"}
+    assert rerun.hash.to_dict() == sweep.hash.to_dict()
+    assert StubScheduler.task_ids == [
+        f"SURVEY_run_{sweep.run_id[10]}",
+        f"SURVEY_run_{sweep.run_id[20]}",
+        f"SURVEY_run_{sweep.run_id[20]}",
+    ]
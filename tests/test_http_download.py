@@ -0,0 +1,216 @@
+import base64
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from es_sfgtools.data_mgmt.ingestion.http_download import (
+    DownloadError,
+    HTTPDownloader,
+)
+
+
+class HTTPStandInHandler(BaseHTTPRequestHandler):
+    """Keep-alive GET with Range, If-Range, ETag, Repr-Digest and bearer auth."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def send_body(self, status: int, headers: dict, body: bytes = b"") -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server: HTTPStandIn = self.server
+        name = self.path.strip("/")
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.requests.append((name, self.headers.get("Range")))
+            cut = name in server.truncate_once
+            server.truncate_once.discard(name)
+        if self.headers.get("Authorization") != f"Bearer {server.token}":
+            return self.send_body(401, {})
+        if name not in server.files:
+            return self.send_body(404, {})
+
+        data = server.files[name]
+        headers = {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+        if server.send_digest:
+            digest = base64.b64encode(hashlib.sha256(data).digest()).decode()
+            headers["Repr-Digest"] = f"sha-256=:{digest}:"
+        status, body = 200, data
+        requested = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if requested and if_range in (None, headers["ETag"]):
+            start = int(requested.removeprefix("bytes=").rstrip("-"))
+            if start >= len(data):
+                headers["Content-Range"] = f"bytes */{len(data)}"
+                return self.send_body(416, headers)
+            status, body = 206, data[start:]
+            headers["Content-Range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+
+        if not cut:
+            return self.send_body(status, headers, body)
+        # Announce the whole body, send half of it and drop the connection
+        self.send_response(status)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[: len(body) // 2])
+        self.wfile.flush()
+        self.close_connection = True
+
+
+class HTTPStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files: dict):
+        self.files = files
+        self.token = "token-1"
+        self.send_digest = True
+        self.truncate_once = set()
+        self.connections = set()
+        self.requests = []
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), HTTPStandInHandler)
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+
+FILES = {f"NCC1_{i:03d}.raw": bytes([i]) * (1000 + 37 * i) for i in range(40)}
+
+
+@pytest.fixture
+def http_server():
+    server = HTTPStandIn(dict(FILES))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_many_reuses_pooled_connections(http_server, tmp_path):
+    files = [(http_server.url(name), tmp_path / "raw") for name in FILES]
+    with HTTPDownloader(max_workers=4, token_provider=lambda: "token-1") as loader:
+        results = dict(loader.download_many(files))
+
+    assert len(results) == len(FILES)
+    for name, data in FILES.items():
+        assert results[http_server.url(name)].read_bytes() == data
+    # Four keep-alive connections serve all 40 files
+    assert len(http_server.connections) <= 4
+    assert not list((tmp_path / "raw").glob(".*"))
+
+
+def test_interrupted_transfer_resumes_with_range(http_server, tmp_path):
+    name = "NCC1_039.raw"
+    http_server.truncate_once.add(name)
+
+    path = HTTPDownloader(token_provider=lambda: "token-1").download(
+        http_server.url(name), tmp_path
+    )
+
+    assert path.read_bytes() == FILES[name]
+    half = len(FILES[name]) // 2
+    assert http_server.requests == [(name, None), (name, f"bytes={half}-")]
+
+
+def test_partial_file_from_previous_run_is_resumed(http_server, tmp_path):
+    name = "NCC1_010.raw"
+    (tmp_path / f".{name}.part").write_bytes(FILES[name][:500])
+    downloader = HTTPDownloader(token_provider=lambda: "token-1")
+
+    assert downloader.download(http_server.url(name), tmp_path).read_bytes() == (
+        FILES[name]
+    )
+    assert http_server.requests == [(name, "bytes=500-")]
+
+    # A complete part is only confirmed by the server (416)
+    http_server.requests.clear()
+    (tmp_path / f".{name}.part").write_bytes(FILES[name])
+    assert downloader.download(http_server.url(name), tmp_path).read_bytes() == (
+        FILES[name]
+    )
+
+
+def test_changed_remote_file_restarts_download(http_server, tmp_path):
+    name = "NCC1_005.raw"
+    http_server.truncate_once.add(name)
+    downloader = HTTPDownloader(token_provider=lambda: "token-1", retries=0)
+    with pytest.raises(DownloadError):
+        downloader.download(http_server.url(name), tmp_path)
+    assert (tmp_path / f".{name}.part").exists()
+
+    # The ETag no longer matches, so the server sends the whole new file
+    http_server.files[name] = b"new content" * 100
+    path = downloader.download(http_server.url(name), tmp_path)
+    assert path.read_bytes() == b"new content" * 100
+
+
+def test_checksum_mismatch_is_rejected(http_server, tmp_path):
+    name = "NCC1_001.raw"
+    downloader = HTTPDownloader(token_provider=lambda: "token-1")
+    with pytest.raises(DownloadError, match="Checksum"):
+        downloader.download(http_server.url(name), tmp_path, sha256="0" * 64)
+    assert not list(tmp_path.iterdir())
+
+    # Without a caller digest the server's Repr-Digest is checked
+    http_server.send_digest = False
+    expected = hashlib.sha256(FILES[name]).hexdigest()
+    path = downloader.download(http_server.url(name), tmp_path, sha256=expected)
+    assert path.read_bytes() == FILES[name]
+
+
+def test_expired_token_is_refreshed(http_server, tmp_path):
+    tokens = iter(["expired", "token-1"])
+    calls = Counter()
+
+    def token_provider():
+        calls["token"] += 1
+        return next(tokens)
+
+    downloader = HTTPDownloader(token_provider=token_provider)
+    results = dict(
+        downloader.download_many(
+            [(http_server.url(name), tmp_path) for name in list(FILES)[:8]]
+        )
+    )
+    assert all(path is not None for path in results.values())
+    assert calls["token"] == 2
+
+    missing = dict(downloader.download_many([(http_server.url("nope"), tmp_path)]))
+    assert missing == {http_server.url("nope"): None}
+
+
+def test_token_is_fetched_on_first_request(http_server, tmp_path):
+    def unavailable():
+        raise RuntimeError("token service unavailable")
+
+    # Creating a downloader never calls the provider
+    with HTTPDownloader(token_provider=unavailable) as downloader:
+        url = http_server.url("NCC1_002.raw")
+        assert dict(downloader.download_many([(url, tmp_path)])) == {url: None}
+    assert http_server.requests == []
+
+    calls = Counter()
+
+    def token_provider():
+        calls["token"] += 1
+        return "token-1"
+
+    downloader = HTTPDownloader(token_provider=token_provider)
+    assert calls["token"] == 0
+    files = [(http_server.url(name), tmp_path) for name in list(FILES)[:4]]
+    assert all(path is not None for _, path in downloader.download_many(files))
+    assert calls["token"] == 1
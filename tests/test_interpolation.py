@@ -0,0 +1,116 @@
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF
+from sklearn.kernel_ridge import KernelRidge
+from sklearn.neighbors import RadiusNeighborsRegressor
+
+from es_sfgtools.workflows.pipelines import interpolation
+from es_sfgtools.workflows.pipelines.interpolation import TimeSeriesInterpolator
+
+T0 = 1.7e9
+
+
+def trajectory(times: np.ndarray) -> np.ndarray:
+    """Smooth synthetic ECEF antenna track."""
+    s = times - T0
+    return np.column_stack(
+        (
+            -2.6e6 + 2.0 * np.sin(s / 40.0),
+            -3.7e6 + s / 120.0,
+            4.3e6 + np.cos(s / 25.0),
+        )
+    )
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    train = np.sort(T0 + rng.uniform(0, 600, 900))
+    predict = T0 + rng.uniform(5, 595, 300)
+    return train, trajectory(train), predict
+
+
+def test_gp_parity(samples):
+    train, values, predict = samples
+    length_scale, alpha = 3.0, 1e-6
+    mean, std = TimeSeriesInterpolator(train, values).kernel_predict(
+        predict, length_scale, support=40 * length_scale, alpha=alpha, return_std=True
+    )
+
+    gp = GaussianProcessRegressor(RBF(length_scale), alpha=alpha, optimizer=None)
+    gp.fit((train - T0)[:, np.newaxis], values - values.mean(axis=0))
+    gp_mean, gp_std = gp.predict((predict - T0)[:, np.newaxis], return_std=True)
+
+    np.testing.assert_allclose(mean, gp_mean + values.mean(axis=0), rtol=0, atol=1e-3)
+    np.testing.assert_allclose(std, gp_std[:, 0], rtol=0, atol=0.05)
+
+
+def test_std_blocks_bound_memory(samples, monkeypatch):
+    train, values, predict = samples
+    interpolator = TimeSeriesInterpolator(train, values)
+    _, expected = interpolator.kernel_predict(predict, 3.0, return_std=True)
+    # The windows are 39 training points wide, so a budget of 500 kernel
+    # elements takes one point at a time
+    monkeypatch.setattr(interpolation, "STD_BLOCK_ELEMENTS", 500)
+    _, std = interpolator.kernel_predict(predict, 3.0, return_std=True)
+    np.testing.assert_allclose(std, expected, rtol=0, atol=1e-12)
+
+
+def test_default_support_accuracy(samples):
+    train, values, predict = samples
+    mean = TimeSeriesInterpolator(train, values).kernel_predict(predict, 3.0)
+    assert np.abs(mean - trajectory(predict)).max() < 0.05
+
+
+def test_kernel_ridge_parity(samples):
+    train, values, predict = samples
+    mean = TimeSeriesInterpolator(train, values).kernel_predict(
+        predict, 0.5, support=50.0, alpha=1.0
+    )
+
+    ridge = KernelRidge(alpha=1.0, kernel=RBF(0.5))
+    ridge.fit((train - T0)[:, np.newaxis], values - values.mean(axis=0))
+    expected = ridge.predict((predict - T0)[:, np.newaxis]) + values.mean(axis=0)
+
+    np.testing.assert_allclose(mean, expected, rtol=0, atol=5e-3)
+
+
+def test_radius_parity(samples):
+    train, values, predict = samples
+    predict = np.append(predict, T0 + 1e4)  # out of range of every sample
+    mean = TimeSeriesInterpolator(train, values).radius_predict(predict, 0.5)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = (
+            RadiusNeighborsRegressor(radius=0.5)
+            .fit(train[:, np.newaxis], values)
+            .predict(predict[:, np.newaxis])
+        )
+
+    np.testing.assert_array_equal(np.isnan(mean), np.isnan(expected))
+    np.testing.assert_allclose(mean, expected, rtol=0, atol=1e-6)
+    assert np.isnan(mean[-1]).all()
+
+
+def test_unsorted_training_data(samples):
+    train, values, predict = samples
+    order = np.random.default_rng(1).permutation(len(train))
+    sorted_mean = TimeSeriesInterpolator(train, values).kernel_predict(predict, 3.0)
+    shuffled_mean = TimeSeriesInterpolator(
+        train[order], values[order]
+    ).kernel_predict(predict, 3.0)
+    np.testing.assert_allclose(shuffled_mean, sorted_mean, rtol=0, atol=1e-6)
+
+
+def test_count_and_errors(samples):
+    train, values, _ = samples
+    interpolator = TimeSeriesInterpolator(train, values)
+    assert interpolator.count(np.array([T0 - 100.0]), 1.0)[0] == 0
+    assert interpolator.count(train[:1], 0.0)[0] >= 1
+
+    with pytest.raises(ValueError):
+        TimeSeriesInterpolator(train, values[:-1])
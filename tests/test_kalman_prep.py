@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from es_sfgtools.workflows.pipelines.kalman_prep import (
+    COLUMN,
+    STATE_COLUMNS,
+    combine_state_matrices,
+    fill_nan,
+    frame_state_matrix,
+    kinematic_state_matrix,
+    positions_state_matrix,
+    spatial_mask,
+    to_epoch_seconds,
+)
+
+DAY_START = np.datetime64("2025-05-01T00:00:00", "ms")
+
+
+def make_imu_positions(n: int = 600) -> dict:
+    """Raw IMU position read at 10 Hz with some missing uncertainties."""
+    rng = np.random.default_rng(0)
+    data = {
+        "time": DAY_START + (np.arange(n) * 100).astype("timedelta64[ms]"),
+        "latitude": 44.0 + rng.normal(0, 1e-6, n),
+        "longitude": -125.0 + rng.normal(0, 1e-6, n),
+        "height": 10.0 + rng.normal(0, 0.1, n),
+    }
+    for column in (
+        "azimuth",
+        "pitch",
+        "roll",
+        "northVelocity",
+        "eastVelocity",
+        "upVelocity",
+        "roll_std",
+        "pitch_std",
+        "azimuth_std",
+    ):
+        data[column] = rng.normal(0, 1, n)
+    for column in (
+        "latitude_std",
+        "longitude_std",
+        "height_std",
+        "northVelocity_std",
+        "eastVelocity_std",
+        "upVelocity_std",
+    ):
+        values = rng.uniform(0.01, 0.1, n)
+        values[rng.uniform(size=n) < 0.2] = np.nan
+        values[:3] = np.nan
+        values[-2:] = np.nan
+        data[column] = values
+    return data
+
+
+def make_kin_positions(n: int = 120) -> dict:
+    """Raw kinematic position read at 1 Hz with one spike."""
+    rng = np.random.default_rng(1)
+    east = -2.6e6 + np.cumsum(rng.normal(0, 0.5, n))
+    east[60] += 500.0
+    return {
+        "time": DAY_START + (np.arange(n) * 1000).astype("timedelta64[ms]"),
+        "east": east,
+        "north": -3.7e6 + np.cumsum(rng.normal(0, 0.5, n)),
+        "up": 4.3e6 + rng.normal(0, 0.05, n),
+    }
+
+
+def test_to_epoch_seconds_matches_timestamp():
+    times = DAY_START + np.array([0, 1, 1500, 86_399_999]).astype("timedelta64[ms]")
+    expected = [pd.Timestamp(t).timestamp() for t in times]
+    np.testing.assert_array_equal(to_epoch_seconds(times), expected)
+    np.testing.assert_array_equal(to_epoch_seconds(pd.Series(times)), expected)
+    np.testing.assert_array_equal(to_epoch_seconds(np.array([1.5])), [1.5])
+
+
+def test_fill_nan_matches_pandas():
+    values = np.array([np.nan, np.nan, 1.0, np.nan, 3.0, np.nan])
+    expected = pd.Series(values).bfill().ffill().to_numpy()
+    np.testing.assert_array_equal(fill_nan(values), expected)
+    assert np.isnan(fill_nan(np.full(3, np.nan))).all()
+
+
+def test_positions_state_matrix():
+    data = make_imu_positions()
+    states = positions_state_matrix(data)
+
+    assert states.shape == (600, len(STATE_COLUMNS))
+    assert not np.isnan(states).any()
+    np.testing.assert_array_equal(states[:, COLUMN["east"]], data["eastVelocity"])
+    np.testing.assert_array_equal(
+        states[:, COLUMN["ant_sigz"]],
+        pd.Series(data["height_std"]).bfill().ffill().to_numpy(),
+    )
+    # DataFrame input gives the same matrix
+    np.testing.assert_array_equal(positions_state_matrix(pd.DataFrame(data)), states)
+
+
+def test_kinematic_state_matrix_drops_spikes():
+    data = make_kin_positions()
+    states = kinematic_state_matrix(data)
+
+    assert len(states) < 120
+    assert not np.isnan(states).any()
+    spike_time = to_epoch_seconds(data["time"][60:61])[0]
+    assert spike_time not in states[:, COLUMN["time"]]
+    np.testing.assert_array_equal(states[:, COLUMN["ant_sigx"]], 0.1)
+    empty = {column: values[:0] for column, values in data.items()}
+    assert len(kinematic_state_matrix(empty)) == 0
+
+
+def test_frame_state_matrix_fills_missing_columns():
+    frame = pd.DataFrame({"time": [1.0, 2.0], "ant_x": [3.0, 4.0]})
+    states = frame_state_matrix(frame)
+    np.testing.assert_array_equal(states[:, COLUMN["ant_x"]], [3.0, 4.0])
+    assert np.isnan(states[:, COLUMN["east_sig"]]).all()
+
+
+def test_combine_state_matrices_is_stable():
+    a = np.zeros((3, len(STATE_COLUMNS)))
+    a[:, COLUMN["time"]] = [1.0, 3.0, 5.0]
+    b = np.ones((3, len(STATE_COLUMNS)))
+    b[:, COLUMN["time"]] = [0.0, 3.0, 6.0]
+
+    combined = combine_state_matrices(a, b)
+
+    np.testing.assert_array_equal(combined[:, COLUMN["time"]], [0, 1, 3, 3, 5, 6])
+    np.testing.assert_array_equal(combined[:, COLUMN["east"]], [1, 0, 0, 1, 0, 1])
+
+
+def test_spatial_mask():
+    states = positions_state_matrix(make_imu_positions())
+    assert spatial_mask(states, 1000.0).all()
+    far = states.copy()
+    far[0, COLUMN["ant_y"]] += 5000.0
+    mask = spatial_mask(far, 1000.0)
+    assert not mask[0] and mask[1:].all()
+
+
+def test_parity_with_dataframe_preparation():
+    pytest.importorskip("gnatss")
+    from es_sfgtools.workflows.pipelines.shotdata_gnss_refinement import (
+        combine_data,
+        prepare_kinematic_data,
+        prepare_positions_data,
+    )
+
+    imu, kin = make_imu_positions(), make_kin_positions()
+    expected = combine_data(
+        prepare_positions_data(pd.DataFrame(imu)),
+        prepare_kinematic_data(pd.DataFrame(kin)),
+    )
+    states = combine_state_matrices(
+        positions_state_matrix(imu), kinematic_state_matrix(kin)
+    )
+
+    # combine_data sorts with an unstable sort, so order ties by position
+    expected = expected.to_numpy(dtype=float)
+    ant_x, time = COLUMN["ant_x"], COLUMN["time"]
+    expected = expected[np.lexsort((expected[:, ant_x], expected[:, time]))]
+    states = states[np.lexsort((states[:, ant_x], states[:, time]))]
+    np.testing.assert_allclose(states, expected, rtol=1e-12, atol=1e-9)
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from es_sfgtools.data_models.metadata import Campaign, IntervalIndex, MetadataIndex
+from es_sfgtools.data_models.metadata.benchmark import Benchmark
+
+T0 = datetime(2025, 5, 1)
+
+
+def make_campaign() -> Campaign:
+    surveys = [
+        {
+            "id": f"2025_A_1126_{i + 1}",
+            "type": "circledrive",
+            "benchmarkIDs": ["NCC1"],
+            "start": T0 + timedelta(hours=6 * i),
+            "end": T0 + timedelta(hours=6 * i + 4),
+        }
+        for i in range(4)
+    ]
+    return Campaign(
+        name="2025_A_1126",
+        type="measure",
+        vesselCode="1126",
+        start=T0,
+        end=T0 + timedelta(days=1),
+        surveys=surveys,
+    )
+
+
+def make_benchmarks() -> list:
+    swap = T0 + timedelta(hours=12)
+    return [
+        Benchmark(
+            name="NCC1",
+            transponders=[
+                {
+                    "address": "5209",
+                    "start": T0 - timedelta(days=30),
+                    "end": swap,
+                    "tat": [
+                        {"value": 100.0, "start": T0 - timedelta(days=30), "end": swap},
+                        {"value": 120.0, "start": swap},
+                    ],
+                },
+                {"address": "5210", "start": swap, "tat": [{"value": 200.0}]},
+            ],
+        ),
+        Benchmark(
+            name="NCC2",
+            transponders=[{"address": "5211", "tat": [{"value": 300.0}]}],
+        ),
+    ]
+
+
+def random_times(n: int = 2000) -> list:
+    rng = np.random.default_rng(0)
+    seconds = rng.uniform(-3600, 26 * 3600, n).round()
+    # Include the survey boundaries themselves
+    seconds[:8] = [h * 3600 for h in (0, 4, 6, 10, 12, 16, 18, 22)]
+    return [T0 + timedelta(seconds=float(s)) for s in seconds]
+
+
+def scalar_survey_id(campaign: Campaign, dt: datetime):
+    try:
+        return campaign.get_survey_by_datetime(dt).id
+    except ValueError:
+        return None
+
+
+def test_survey_ids_match_scalar_lookup():
+    campaign = make_campaign()
+    index = MetadataIndex.from_campaign(campaign)
+    times = random_times()
+
+    expected = [scalar_survey_id(campaign, dt) for dt in times]
+
+    assert index.survey_ids(times).tolist() == expected
+    ping_time = [dt.replace(tzinfo=timezone.utc).timestamp() for dt in times]
+    assert index.survey_ids(np.array(ping_time)).tolist() == expected
+    assert index.survey_ids(np.array(times, dtype="datetime64[ms]")).tolist() == (
+        expected
+    )
+
+
+def test_label_shotdata_matches_scalar_lookups():
+    campaign, benchmarks = make_campaign(), make_benchmarks()
+    index = MetadataIndex(campaign.surveys, benchmarks)
+    times = random_times()
+    rng = np.random.default_rng(1)
+    shots = pd.DataFrame(
+        {
+            "pingTime": [dt.replace(tzinfo=timezone.utc).timestamp() for dt in times],
+            "transponderID": rng.choice(["5209", "5210", "5211", "9999"], len(times)),
+        }
+    )
+
+    labelled = index.label_shotdata(shots)
+
+    assert "surveyID" not in shots.columns
+    for dt, row in zip(times, labelled.itertuples()):
+        assert row.surveyID == scalar_survey_id(campaign, dt)
+        benchmark = next(
+            (
+                benchmark
+                for benchmark in benchmarks
+                for transponder in benchmark.transponders
+                if transponder.address == row.transponderID
+                and benchmark.get_transponder_by_datetime(dt) is transponder
+            ),
+            None,
+        )
+        if benchmark is None:
+            assert row.benchmarkName is None and np.isnan(row.tat)
+            continue
+        transponder = benchmark.get_transponder_by_datetime(dt)
+        assert row.benchmarkName == benchmark.name
+        assert row.tat == transponder.get_tat_by_datetime(dt)
+
+
+def test_interval_index_first_match_and_open_ends():
+    # Overlapping intervals resolve to the first one given
+    index = IntervalIndex([0.0, 5.0, -np.inf], [10.0, 20.0, -1.0])
+    times = np.array([-5.0, -1.0, -0.5, 0.0, 5.0, 10.0, 10.5, 20.0, 21.0, np.nan])
+    np.testing.assert_array_equal(
+        index.lookup(times), [2, 2, -1, 0, 0, 0, 1, 1, -1, -1]
+    )
+    assert len(IntervalIndex([], [])) == 0
+    assert (IntervalIndex([], []).lookup(times) == -1).all()
+    with pytest.raises(ValueError):
+        IntervalIndex([0.0], [])
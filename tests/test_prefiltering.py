@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+import pymap3d as pm
+import pytest
+
+from es_sfgtools.data_models.metadata import SurveyType
+from es_sfgtools.prefiltering.schemas import FilterConfig, FilterLevel
+from es_sfgtools.prefiltering.utils import (
+    exclusion_mask,
+    filter_ping_replies,
+    filter_pride_residuals,
+    filter_shotdata,
+    filter_wg_distance_from_center,
+    get_enu_transformer,
+    get_pride_residuals_mask,
+    get_wg_distance_mask,
+    merge_exclusion_intervals,
+    ok_acoustic_diagnostics,
+)
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    TDBKinPositionArray,
+    datetime64_to_epoch_seconds,
+)
+
+from test_tiledb_schemas import DAY_START, make_kin_position
+
+
+def brute_force_mask(times, bad_times, buffer_seconds):
+    keep = np.ones(times.shape, dtype=bool)
+    for bad_time in bad_times:
+        in_range = (times >= bad_time - buffer_seconds) & (
+            times <= bad_time + buffer_seconds
+        )
+        keep &= ~in_range
+    return keep
+
+
+class TestExclusionIntervals:
+    def test_overlapping_windows_are_merged(self):
+        starts, ends = merge_exclusion_intervals(
+            np.array([10.0, 11.5, 30.0, 12.0, np.nan]), buffer_seconds=1.0
+        )
+        np.testing.assert_array_equal(starts, [9.0, 29.0])
+        np.testing.assert_array_equal(ends, [13.0, 31.0])
+
+    def test_no_bad_times_keeps_everything(self):
+        starts, ends = merge_exclusion_intervals(np.array([]))
+        assert exclusion_mask(np.arange(5.0), starts, ends).all()
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(42)
+        times = np.sort(rng.uniform(0, 86400, 20000))
+        bad_times = rng.uniform(0, 86400, 500)
+        for buffer_seconds in (0.5, 1.0, 30.0):
+            starts, ends = merge_exclusion_intervals(bad_times, buffer_seconds)
+            np.testing.assert_array_equal(
+                exclusion_mask(times, starts, ends),
+                brute_force_mask(times, bad_times, buffer_seconds),
+            )
+
+    def test_window_edges_are_inclusive(self):
+        starts, ends = merge_exclusion_intervals(np.array([100.0]), 1.0)
+        mask = exclusion_mask(np.array([98.9, 99.0, 101.0, 101.1]), starts, ends)
+        np.testing.assert_array_equal(mask, [True, False, False, True])
+
+
+class TestPrideResiduals:
+    def test_mask_excludes_shots_near_high_wrms(self, tmp_path):
+        kin = make_kin_position()
+        TDBKinPositionArray(tmp_path / "kin.tdb").write_df(kin.copy())
+        kin_seconds = datetime64_to_epoch_seconds(kin.time)
+        shots = pd.DataFrame({"pingTime": kin_seconds + 0.25})
+
+        keep = get_pride_residuals_mask(
+            shots,
+            kinPostionTDBUri=str(tmp_path / "kin.tdb"),
+            start_time=DAY_START.replace(tzinfo=None),
+            end_time=DAY_START.replace(tzinfo=None) + pd.Timedelta(hours=1),
+            max_wrms=15,
+            time_buffer_seconds=1.0,
+        )
+
+        bad_times = kin_seconds[kin.wrms.to_numpy() > 15]
+        np.testing.assert_array_equal(
+            keep.to_numpy(),
+            brute_force_mask(shots.pingTime.to_numpy(), bad_times, 1.0),
+        )
+
+
+class TestFilterShotdata:
+    def test_combined_mask_matches_stage_by_stage(self, tmp_path):
+        kin = make_kin_position()
+        TDBKinPositionArray(tmp_path / "kin.tdb").write_df(kin.copy())
+        rng = np.random.default_rng(1)
+        n_pings = 100
+        ping_times = datetime64_to_epoch_seconds(kin.time)[:n_pings]
+        shots = pd.DataFrame(
+            {
+                "pingTime": np.repeat(ping_times, 3),
+                "snr": rng.uniform(5, 30, 3 * n_pings),
+                "dbv": rng.uniform(-40, 0, 3 * n_pings),
+                "xc": rng.uniform(30, 90, 3 * n_pings),
+            },
+            index=np.arange(3 * n_pings) * 2,
+        )
+        config = FilterConfig()
+        config.acoustic_filters.enabled = True
+        config.acoustic_filters.level = FilterLevel.OK
+        config.ping_replies.enabled = True
+        config.ping_replies.min_replies = 2
+        config.pride_residuals.enabled = True
+        config.pride_residuals.max_residual_mm = 15
+        start = DAY_START.replace(tzinfo=None)
+        end = start + pd.Timedelta(hours=1)
+
+        filtered = filter_shotdata(
+            SurveyType.CIRCLE,
+            None,
+            shots,
+            str(tmp_path / "kin.tdb"),
+            start,
+            end,
+            base_config=config,
+        )
+
+        expected = filter_pride_residuals(
+            filter_ping_replies(ok_acoustic_diagnostics(shots), min_replies=2),
+            kinPostionTDBUri=str(tmp_path / "kin.tdb"),
+            start_time=DAY_START,
+            end_time=DAY_START + pd.Timedelta(hours=1),
+            max_wrms=15,
+        )
+        assert 0 < len(filtered) < len(shots)
+        pd.testing.assert_frame_equal(filtered, expected)
+
+
+class TestDistanceFromCenter:
+    @pytest.fixture(autouse=True)
+    def requires_garpos(self):
+        # CoordTransformer lives in the GARPOS tooling
+        pytest.importorskip("garpos")
+
+    @staticmethod
+    def shots(lat0, lon0, n=2000, seed=0):
+        rng = np.random.default_rng(seed)
+        east = rng.uniform(-300, 300, n)
+        north = rng.uniform(-300, 300, n)
+        up = rng.uniform(-2, 2, n)
+        x, y, z = pm.enu2ecef(east, north, up, lat0, lon0, 0)
+        df = pd.DataFrame({"east0": x, "north0": y, "up0": z, "pingTime": np.arange(n)})
+        return df, np.hypot(east, north)
+
+    @pytest.mark.parametrize("lat0,lon0", [(44.8, -125.1), (-54.0, 160.0), (0.5, 10.0)])
+    def test_filters_on_horizontal_enu_distance(self, lat0, lon0):
+        df, distance = self.shots(lat0, lon0)
+        filtered = filter_wg_distance_from_center(df, lat0, lon0, max_distance_m=150)
+        np.testing.assert_array_equal(
+            filtered.pingTime.to_numpy(), df.pingTime.to_numpy()[distance <= 150]
+        )
+
+    def test_transformer_is_cached(self):
+        transformer = get_enu_transformer(44.8, -125.1)
+        assert get_enu_transformer(44.8, -125.1) is transformer
+        df, distance = self.shots(44.8, -125.1)
+        mask = get_wg_distance_mask(df, 44.8, -125.1, 100, transformer=transformer)
+        np.testing.assert_array_equal(mask.to_numpy(), distance <= 100)
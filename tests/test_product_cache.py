@@ -0,0 +1,127 @@
+import os
+
+from es_sfgtools.workflows.pipelines.product_cache import ProductCache, file_sha256
+from es_sfgtools.workflows.pipelines.product_prefetch import ProductPrefetcher
+
+from test_product_prefetch import (  # noqa: F401
+    DAY_1,
+    DAY_2,
+    common_dir,
+    ftp_server,
+    make_sources,
+)
+
+NAV_1 = "BRDC_2025121_MN.rnx"
+
+
+def prefetch(pride_dir, url, **kwargs):
+    prefetcher = ProductPrefetcher(pride_dir, sources=make_sources(url), **kwargs)
+    return prefetcher.prefetch([DAY_1, DAY_2], products=["sp3", "brdm"])
+
+
+def test_manifest_records_downloads(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    results = prefetch(pride_dir, ftp_server.url)
+
+    cache = ProductCache(pride_dir)
+    entry = cache.entry("ORB_FIN_2025121.SP3")
+    assert entry.source == "primary"
+    assert entry.size == len("final 121")
+    assert entry.sha256 == file_sha256(results[(DAY_1, "sp3")])
+    assert cache.entry("ORB_RAP_2025122.SP3").source == "fallback"
+    assert cache.stats() == {"products": 4, "bytes": 9 + 9 + 7 + 7}
+    # Common directory files are links to the stored objects
+    assert results[(DAY_1, "sp3")].samefile(cache.object_path(entry.sha256))
+
+
+def test_reuse_across_directories(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    prefetch(pride_dir, ftp_server.url)
+    cache = ProductCache(pride_dir)
+
+    # Another year's directory gets a link, not a download
+    other = pride_dir / "2024" / "product" / "common"
+    path = cache.get(NAV_1, other)
+    assert path.read_text() == "nav 121"
+    assert path.samefile(common_dir(pride_dir) / NAV_1)
+
+    # A deleted common directory is restored from the store
+    ftp_server.retrieved.clear()
+    for path in common_dir(pride_dir).iterdir():
+        path.unlink()
+    results = prefetch(pride_dir, ftp_server.url)
+    assert results[(DAY_1, "brdm")].read_text() == "nav 121"
+    assert not ftp_server.retrieved
+
+
+def test_corrupt_products_are_refetched(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    prefetch(pride_dir, ftp_server.url)
+    ftp_server.retrieved.clear()
+
+    # Truncated in place: caught by the size check
+    (common_dir(pride_dir) / NAV_1).write_text("nav")
+    results = prefetch(pride_dir, ftp_server.url)
+    assert results[(DAY_1, "brdm")].read_text() == "nav 121"
+    assert dict(ftp_server.retrieved) == {NAV_1: 1}
+
+    # Same size and mtime: only caught by the deep check
+    path = common_dir(pride_dir) / NAV_1
+    stat = path.stat()
+    path.write_text("NAV 121")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    cache = ProductCache(pride_dir)
+    assert cache.verify() == []
+    assert cache.verify(deep=True) == [NAV_1]
+    assert not path.exists()
+    assert cache.entry(NAV_1) is None
+
+
+def test_truncated_download_is_rejected(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    ftp_server.truncated = {NAV_1, "ORB_FIN_2025121.SP3.gz"}
+
+    results = prefetch(pride_dir, ftp_server.url)
+
+    assert results[(DAY_1, "brdm")] is None
+    # The final orbit fails and the rapid one is used instead
+    assert results[(DAY_1, "sp3")].name == "ORB_RAP_2025121.SP3"
+    assert not (common_dir(pride_dir) / NAV_1).exists()
+    assert ProductCache(pride_dir).entry(NAV_1) is None
+
+
+def test_existing_files_are_adopted(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    common_dir(pride_dir).mkdir(parents=True)
+    (common_dir(pride_dir) / NAV_1).write_text("downloaded by PRIDE")
+
+    results = prefetch(pride_dir, ftp_server.url)
+
+    assert results[(DAY_1, "brdm")].read_text() == "downloaded by PRIDE"
+    assert NAV_1 not in ftp_server.retrieved
+    entry = ProductCache(pride_dir).entry(NAV_1)
+    assert entry.source is None and entry.size == len("downloaded by PRIDE")
+
+
+def test_lru_eviction(tmp_path):
+    pride_dir = tmp_path / "pride"
+    directory = pride_dir / "2025" / "product" / "common"
+    directory.mkdir(parents=True)
+    cache = ProductCache(pride_dir)
+    for name, content in [("a", "1" * 100), ("b", "2" * 100), ("c", "3" * 100)]:
+        (directory / name).write_text(content)
+        cache.add(directory / name, source="test")
+    # Identical content is stored, and counted, once
+    (directory / "a_copy").write_text("1" * 100)
+    cache.add(directory / "a_copy")
+    assert cache.total_bytes() == 300
+
+    # "a" becomes the most recently used
+    cache.get("a", directory)
+    assert cache.evict(max_bytes=250, keep=["b"]) == ["c"]
+    assert not (directory / "c").exists()
+    assert cache.evict(max_bytes=150) == ["b"]
+    assert cache.stats() == {"products": 2, "bytes": 100}
+    # Shared content survives until its last product is evicted
+    assert cache.evict(max_bytes=0) == ["a_copy", "a"]
+    assert not list(cache.objects_dir.rglob("*/*"))
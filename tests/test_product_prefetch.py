@@ -0,0 +1,233 @@
+import datetime
+import gzip
+import socket
+import socketserver
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.workflows.pipelines.product_prefetch import (
+    ProductPrefetcher,
+    ProductSource,
+    collect_product_dates,
+)
+
+DAY_1 = datetime.date(2025, 5, 1)
+DAY_2 = datetime.date(2025, 5, 2)
+
+
+class FTPStandInHandler(socketserver.StreamRequestHandler):
+    """Anonymous, passive-mode subset of FTP: CWD, NLST, RETR and SIZE."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        root: Path = self.server.root
+        cwd, data = root, None
+        self.reply("220 stand-in ready")
+        for raw in self.rfile:
+            command, _, arg = raw.decode().strip().partition(" ")
+            command = command.upper()
+            if command == "USER":
+                self.reply("331 password please")
+            elif command in ("PASS", "TYPE"):
+                self.reply("230 ok" if command == "PASS" else "200 ok")
+            elif command == "CWD":
+                target = root / arg.strip("/")
+                if target.is_dir():
+                    cwd = target
+                    self.reply("250 ok")
+                else:
+                    self.reply("550 no such directory")
+            elif command == "PASV":
+                data = socket.create_server(("127.0.0.1", 0))
+                port = data.getsockname()[1]
+                self.reply(f"227 passive (127,0,0,1,{port >> 8},{port & 255})")
+            elif command in ("NLST", "RETR"):
+                connection, _ = data.accept()
+                path = cwd / arg
+                if command == "NLST":
+                    payload = "\r\n".join(p.name for p in cwd.iterdir()).encode()
+                elif path.is_file():
+                    payload = path.read_bytes()
+                    if arg in self.server.truncated:
+                        payload = payload[: len(payload) // 2]
+                    with self.server.lock:
+                        self.server.retrieved[arg] += 1
+                else:
+                    connection.close()
+                    data.close()
+                    self.reply("550 no such file")
+                    continue
+                self.reply("150 sending")
+                connection.sendall(payload)
+                connection.close()
+                data.close()
+                self.reply("226 done")
+            elif command == "SIZE":
+                path = cwd / arg
+                if path.is_file():
+                    self.reply(f"213 {path.stat().st_size}")
+                else:
+                    self.reply("550 no such file")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+class FTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.retrieved = Counter()
+        # Files sent cut short, as by a dropped connection
+        self.truncated = set()
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), FTPStandInHandler)
+
+    @property
+    def url(self) -> str:
+        return f"ftp://127.0.0.1:{self.server_address[1]}"
+
+
+def write_gz(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def ftp_server(tmp_path):
+    root = tmp_path / "remote"
+    # Primary source: both a rapid and a final orbit on day 1, nothing on day 2
+    write_gz(root / "primary/2025/121/ORB_FIN_2025121.SP3.gz", "final 121")
+    write_gz(root / "primary/2025/121/ORB_RAP_2025121.SP3.gz", "rapid 121")
+    (root / "primary/2025/122").mkdir(parents=True)
+    # Fallback source
+    write_gz(root / "fallback/2025/122/ORB_RAP_2025122.SP3.gz", "rapid 122")
+    # Uncompressed navigation files
+    for doy in ("121", "122"):
+        nav = root / f"nav/{doy}/BRDC_2025{doy}_MN.rnx"
+        nav.parent.mkdir(parents=True)
+        nav.write_text(f"nav {doy}")
+
+    server = FTPStandIn(root)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_sources(url: str) -> list:
+    orbit = {
+        "product": "sp3",
+        "server": url,
+        "pattern": r"ORB_(FIN|RAP)_{year}{doy}\.SP3",
+        "sort_order": ["FIN", "RAP"],
+    }
+    return [
+        ProductSource(name="primary", directory="primary/{year}/{doy}", **orbit),
+        ProductSource(name="fallback", directory="fallback/{year}/{doy}", **orbit),
+        ProductSource(
+            product="brdm",
+            name="nav",
+            server=url,
+            directory="nav/{doy}",
+            pattern=r"BRDC_{year}{doy}_MN\.rnx",
+        ),
+    ]
+
+
+def common_dir(pride_dir: Path) -> Path:
+    return pride_dir / "2025" / "product" / "common"
+
+
+def test_prefetch_downloads_each_product_once(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    prefetcher = ProductPrefetcher(pride_dir, sources=make_sources(ftp_server.url))
+
+    results = prefetcher.prefetch([DAY_1, DAY_2, DAY_1], products=["sp3", "brdm"])
+
+    assert results[(DAY_1, "sp3")].read_text() == "final 121"
+    assert results[(DAY_2, "sp3")].read_text() == "rapid 122"
+    assert results[(DAY_2, "brdm")].read_text() == "nav 122"
+    assert sorted(path.name for path in common_dir(pride_dir).glob("[!.]*")) == [
+        "BRDC_2025121_MN.rnx",
+        "BRDC_2025122_MN.rnx",
+        "ORB_FIN_2025121.SP3",
+        "ORB_RAP_2025122.SP3",
+    ]
+    assert not list(common_dir(pride_dir).glob(".*.part"))
+    assert set(ftp_server.retrieved.values()) == {1}
+
+    # A second run is served from the cache
+    ftp_server.retrieved.clear()
+    again = ProductPrefetcher(pride_dir, sources=make_sources(ftp_server.url))
+    assert again.prefetch([DAY_1, DAY_2], products=["sp3", "brdm"]) == results
+    assert not ftp_server.retrieved
+
+
+def test_concurrent_prefetchers_share_downloads(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    prefetchers = [
+        ProductPrefetcher(pride_dir, sources=make_sources(ftp_server.url))
+        for _ in range(4)
+    ]
+    threads = [
+        threading.Thread(target=p.prefetch, args=([DAY_1, DAY_2], ["sp3", "brdm"]))
+        for p in prefetchers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(ftp_server.retrieved) == 4
+    assert set(ftp_server.retrieved.values()) == {1}
+
+
+def test_missing_product_and_override(ftp_server, tmp_path):
+    pride_dir = tmp_path / "pride"
+    sources = make_sources(ftp_server.url)
+    day_3 = datetime.date(2025, 5, 3)
+
+    results = ProductPrefetcher(pride_dir, sources=sources).prefetch(
+        [day_3], products=["sp3", "clk"]
+    )
+    assert results == {(day_3, "clk"): None, (day_3, "sp3"): None}
+
+    ProductPrefetcher(pride_dir, sources=sources).prefetch([DAY_1], ["brdm"])
+    ProductPrefetcher(pride_dir, sources=sources, override=True).prefetch(
+        [DAY_1], ["brdm"]
+    )
+    assert ftp_server.retrieved["BRDC_2025121_MN.rnx"] == 2
+
+
+def test_collect_product_dates():
+    def entry(start, end):
+        return AssetEntry(
+            local_path="NCC11210.25o",
+            timestamp_data_start=start,
+            timestamp_data_end=end,
+        )
+
+    entries = [
+        entry(datetime.datetime(2025, 5, 2, 1), datetime.datetime(2025, 5, 2, 23)),
+        entry(datetime.datetime(2025, 5, 3, 22), datetime.datetime(2025, 5, 4, 2)),
+        entry(datetime.datetime(2025, 5, 2, 5), None),
+        entry(None, None),
+    ]
+    assert collect_product_dates(entries) == [
+        datetime.date(2025, 5, 2),
+        datetime.date(2025, 5, 3),
+        datetime.date(2025, 5, 4),
+    ]
@@ -0,0 +1,156 @@
+import datetime
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pride_ppp")
+
+from es_sfgtools.config.file_config import AssetType
+from es_sfgtools.data_mgmt.assetcatalog.schemas import AssetEntry
+from es_sfgtools.sonardyne_tools.sv3_qc_operations import read_qcpin_batch
+from es_sfgtools.tiledb_tools.tiledb_schemas import TDBShotDataArray
+from es_sfgtools.workflows.pipelines.qc_ingest import (
+    QCIngestWriter,
+    ingest_qcpin_files,
+)
+
+from test_tiledb_schemas import DAY_START, make_shotdata
+
+QC_FILES = sorted((Path(__file__).parent / "resources" / "qcdata").glob("*.pin"))
+
+
+class RecordingArray:
+    """Stands in for the shotdata and GNSS observation arrays."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.shotdata = []
+        self.rangea = []
+        self.fail = fail
+        self.delay = delay
+        self.threads = set()
+
+    def write_df(self, df, validate=True):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        if self.fail:
+            raise OSError("disk full")
+        self.shotdata.append(df)
+
+    def write_rangea_strings(self, rangea_strings, verbose=False, backend="python"):
+        self.rangea.append(list(rangea_strings))
+
+    def drop_duplicate_cells(self, df):
+        return df
+
+
+class RecordingCatalog:
+    def __init__(self):
+        self.updates = []
+
+    def add_or_update_many(self, entries):
+        self.updates.append(list(entries))
+        return len(entries)
+
+
+def make_entries(copies: int, tmp_path: Path) -> list:
+    entries = []
+    for i in range(copies):
+        for path in QC_FILES:
+            copy = tmp_path / f"{i:03d}_{path.name}"
+            copy.write_bytes(path.read_bytes())
+            entries.append(
+                AssetEntry(
+                    local_path=copy,
+                    network="cascadia-gorda",
+                    station="NCC1",
+                    campaign="2025_A_1126",
+                    type=AssetType.QCPIN,
+                    timestamp_created=datetime.datetime(2025, 8, 12),
+                )
+            )
+    return entries
+
+
+def test_ingest_coalesces_into_one_flush(tmp_path):
+    entries = make_entries(4, tmp_path) + [
+        AssetEntry(
+            local_path=tmp_path / "missing.pin",
+            network="cascadia-gorda",
+            station="NCC1",
+            campaign="2025_A_1126",
+            type=AssetType.QCPIN,
+        )
+    ]
+    array, catalog = RecordingArray(), RecordingCatalog()
+
+    count = ingest_qcpin_files(
+        entries, array, array, catalog, n_processes=2, files_per_batch=3
+    )
+
+    assert count == 4 * len(QC_FILES)
+    expected, expected_rangea, _ = read_qcpin_batch(QC_FILES)
+    assert len(array.shotdata) == 1
+    assert len(array.shotdata[0]) == 4 * len(expected)
+    assert set(array.rangea[0]) == set(expected_rangea)
+    assert array.threads == {"qc-ingest-writer"}
+    updated = catalog.updates[0]
+    assert len(updated) == count and all(entry.is_processed for entry in updated)
+    assert not entries[-1].is_processed
+
+
+def test_ingest_flushes_on_row_threshold(tmp_path):
+    entries = make_entries(3, tmp_path)
+    array, catalog = RecordingArray(), RecordingCatalog()
+
+    ingest_qcpin_files(
+        entries, array, array, catalog, n_processes=1, files_per_batch=2, flush_rows=1
+    )
+
+    assert len(array.shotdata) > 1
+    assert sum(len(df) for df in array.shotdata) == 3 * 12
+    assert sum(len(update) for update in catalog.updates) == len(entries)
+
+
+def test_writer_failure_is_raised(tmp_path):
+    entries = make_entries(1, tmp_path)
+    array, catalog = RecordingArray(fail=True), RecordingCatalog()
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        ingest_qcpin_files(
+            entries, array, array, catalog, n_processes=1, files_per_batch=1, flush_rows=1
+        )
+    # entries are only recorded once their data is written
+    assert catalog.updates == []
+
+
+def test_writer_put_applies_backpressure():
+    array, catalog = RecordingArray(delay=0.2), RecordingCatalog()
+    shotdata = pd.DataFrame({"pingTime": [1.0]})
+    with QCIngestWriter(array, array, catalog, flush_rows=1, max_queue=1) as writer:
+        start = time.monotonic()
+        for _ in range(4):
+            writer.put(shotdata, [], [])
+        blocked = time.monotonic() - start
+    assert blocked >= 0.2
+    assert len(array.shotdata) == 4
+    assert writer.n_flushes == 4
+
+
+def test_writer_keeps_last_of_overlapping_shotdata(tmp_path):
+    shotdata_tdb = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    catalog = RecordingCatalog()
+    # A re-ingested PIN file repeats every shot of the first
+    first = make_shotdata(10)
+    again = make_shotdata(10)
+    again["snr"] = 99.0
+    with QCIngestWriter(shotdata_tdb, RecordingArray(), catalog) as writer:
+        writer.put(first, [], [])
+        writer.put(again, [], [])
+
+    assert writer.n_flushes == 1
+    result = shotdata_tdb.read_df(start=DAY_START.replace(tzinfo=None))
+    assert len(result) == 10
+    assert (result.snr == 99.0).all()
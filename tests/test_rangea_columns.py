@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from es_sfgtools.novatel_tools.rangea_parser import (
+    GNSS_OBS_COLUMNS,
+    GNSS_OBS_DTYPES,
+    decode_rangea_batch,
+    deserialize_rangea,
+    epochs_to_columns,
+    extract_rangea_strings_from_qcpin,
+)
+
+QC_PIN_FILES = sorted((Path(__file__).parent / "resources" / "qcdata").glob("*.pin"))
+
+
+@pytest.fixture(scope="module")
+def rangea_strings():
+    strings = []
+    for pin_file in QC_PIN_FILES:
+        strings.extend(extract_rangea_strings_from_qcpin(pin_file))
+    assert strings, "no RANGEA strings found in the QC test resources"
+    return sorted(strings)
+
+
+def test_batch_decoder_matches_epoch_path(rangea_strings):
+    expected = epochs_to_columns(deserialize_rangea(s) for s in rangea_strings)
+    columns = decode_rangea_batch(rangea_strings)
+
+    assert set(columns) == set(GNSS_OBS_COLUMNS)
+    for name in GNSS_OBS_COLUMNS:
+        assert columns[name].dtype == np.dtype(GNSS_OBS_DTYPES[name]), name
+        np.testing.assert_array_equal(columns[name], expected[name], err_msg=name)
+
+
+def test_malformed_input_is_skipped(rangea_strings):
+    good = rangea_strings[0]
+    header, data = good.split(";")
+    fields = data.split(",")
+    fields[3] = "not-a-number"  # pseudorange of the first observation
+    corrupted = header + ";" + ",".join(fields)
+
+    columns = decode_rangea_batch([corrupted, "garbage", "", good])
+    n_good = len(decode_rangea_batch([good])["time"])
+    assert len(columns["time"]) == 2 * n_good - 1
+
+
+def test_empty_input():
+    columns = decode_rangea_batch([])
+    assert all(len(columns[name]) == 0 for name in GNSS_OBS_COLUMNS)
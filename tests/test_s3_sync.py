@@ -0,0 +1,332 @@
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import boto3
+import pytest
+from botocore.config import Config
+
+from es_sfgtools.data_mgmt.directorymgmt.s3_sync import S3Sync
+from es_sfgtools.tiledb_tools.maintenance import MaintenancePolicy, maintain_array
+from es_sfgtools.tiledb_tools.tiledb_schemas import TDBShotDataArray
+
+from test_tiledb_maintenance import write_hourly
+from test_tiledb_schemas import DAY_START
+
+BUCKET = "sfg-sync"
+
+
+class S3StandInHandler(BaseHTTPRequestHandler):
+    """Path-style subset of S3: List/Head/PutObject, multipart, DeleteObjects."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def reply(self, status: int = 200, body: bytes = b"", headers=None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def parse(self):
+        url = urlparse(self.path)
+        _, _, key = url.path.lstrip("/").partition("/")
+        query = parse_qs(url.query, keep_blank_values=True)
+        query = {name: values[0] for name, values in query.items()}
+        length = int(self.headers.get("Content-Length", 0))
+        return unquote(key), query, self.rfile.read(length)
+
+    def do_GET(self) -> None:
+        server: S3StandIn = self.server
+        _, query, _ = self.parse()
+        server.count("list")
+        prefix = query.get("prefix", "")
+        keys = sorted(k for k in server.objects if k.startswith(prefix))
+        start = int(query.get("continuation-token", 0))
+        page = keys[start : start + server.page_size]
+        truncated = start + server.page_size < len(keys)
+        contents = "".join(
+            f"<Contents><Key>{escape(k)}</Key><Size>{len(server.objects[k][0])}"
+            f"</Size><ETag>&quot;{server.objects[k][1]}&quot;</ETag></Contents>"
+            for k in page
+        )
+        token = (
+            f"<NextContinuationToken>{start + server.page_size}</NextContinuationToken>"
+            if truncated
+            else ""
+        )
+        xml = (
+            f"<ListBucketResult><Name>{BUCKET}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<KeyCount>{len(page)}</KeyCount>"
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>{token}{contents}"
+            "</ListBucketResult>"
+        )
+        self.reply(body=xml.encode())
+
+    def do_HEAD(self) -> None:
+        server: S3StandIn = self.server
+        key, _, _ = self.parse()
+        server.count("head")
+        if key not in server.objects:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, etag = server.objects[key]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+
+    def do_PUT(self) -> None:
+        server: S3StandIn = self.server
+        key, query, body = self.parse()
+        if "partNumber" in query:
+            server.count("upload_part")
+            with server.lock:
+                server.parts[query["uploadId"]][int(query["partNumber"])] = body
+            etag = hashlib.md5(body).hexdigest()
+        else:
+            server.count("put")
+            etag = hashlib.md5(body).hexdigest()
+            with server.lock:
+                server.objects[key] = (body, etag)
+        self.reply(headers={"ETag": f'"{etag}"'})
+
+    def do_POST(self) -> None:
+        server: S3StandIn = self.server
+        key, query, body = self.parse()
+        if "uploads" in query:
+            server.count("create_multipart")
+            upload_id = uuid.uuid4().hex
+            with server.lock:
+                server.parts[upload_id] = {}
+            xml = (
+                f"<InitiateMultipartUploadResult><Bucket>{BUCKET}</Bucket>"
+                f"<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            )
+            self.reply(body=xml.encode())
+        elif "uploadId" in query:
+            server.count("complete_multipart")
+            with server.lock:
+                parts = server.parts.pop(query["uploadId"])
+            data = [parts[n] for n in sorted(parts)]
+            digests = b"".join(hashlib.md5(part).digest() for part in data)
+            etag = f"{hashlib.md5(digests).hexdigest()}-{len(data)}"
+            with server.lock:
+                server.objects[key] = (b"".join(data), etag)
+            xml = (
+                f"<CompleteMultipartUploadResult><Key>{escape(key)}</Key>"
+                f"<ETag>&quot;{etag}&quot;</ETag></CompleteMultipartUploadResult>"
+            )
+            self.reply(body=xml.encode())
+        elif "delete" in query:
+            server.count("delete")
+            root = ElementTree.fromstring(body)
+            with server.lock:
+                for element in root.iter():
+                    if element.tag.endswith("Key"):
+                        server.objects.pop(element.text, None)
+            self.reply(body=b"<DeleteResult></DeleteResult>")
+        else:
+            self.reply(400)
+
+
+class S3StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, page_size: int = 50):
+        self.objects = {}
+        self.parts = {}
+        self.requests = Counter()
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), S3StandInHandler)
+
+    def count(self, operation: str) -> None:
+        with self.lock:
+            self.requests[operation] += 1
+
+    def keys(self, prefix: str) -> set:
+        return {k[len(prefix) + 1 :] for k in self.objects if k.startswith(prefix)}
+
+
+@pytest.fixture
+def s3_server():
+    server = S3StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_syncer(server: S3StandIn, **kwargs) -> S3Sync:
+    client = boto3.client(
+        "s3",
+        endpoint_url=f"http://127.0.0.1:{server.server_address[1]}",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=Config(
+            s3={"addressing_style": "path"},
+            request_checksum_calculation="when_required",
+            response_checksum_validation="when_required",
+            max_pool_connections=8,
+        ),
+    )
+    return S3Sync(client=client, max_workers=8, **kwargs)
+
+
+def local_files(directory) -> set:
+    return {
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_sync_uploads_only_new_fragments(s3_server, tmp_path):
+    array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    write_hourly(array, 3)
+    syncer = make_syncer(s3_server)
+    remote = f"s3://{BUCKET}/cascadia-gorda/NCC1/TileDB/shotdata.tdb"
+    prefix = "cascadia-gorda/NCC1/TileDB/shotdata.tdb"
+
+    first = syncer.sync_directory(array.uri, remote, tiledb=True)
+    assert first.files_uploaded == len(local_files(array.uri))
+    assert first.bytes_uploaded == sum(
+        p.stat().st_size for p in array.uri.rglob("*") if p.is_file()
+    )
+    assert s3_server.keys(prefix) == local_files(array.uri)
+
+    # Nothing changed: one listing, no uploads
+    s3_server.requests.clear()
+    again = syncer.sync_directory(array.uri, remote, tiledb=True)
+    assert again.files_uploaded == 0
+    assert again.files_skipped == first.files_uploaded
+    assert set(s3_server.requests) == {"list"}
+
+    # One more write: only its fragment, commit and metadata are sent
+    before = local_files(array.uri)
+    write_hourly(array, 1)
+    third = syncer.sync_directory(array.uri, remote, tiledb=True)
+    assert third.files_uploaded == len(local_files(array.uri) - before)
+    assert s3_server.keys(prefix) == local_files(array.uri)
+
+
+def test_sync_deletes_vacuumed_fragments(s3_server, tmp_path):
+    array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    write_hourly(array, 6)
+    expected = array.read_df(start=DAY_START.replace(tzinfo=None))
+    syncer = make_syncer(s3_server)
+    remote = f"s3://{BUCKET}/NCC1/shotdata.tdb"
+    syncer.sync_directory(array.uri, remote, tiledb=True)
+
+    maintain_array(array.uri, MaintenancePolicy(max_fragments=2))
+    kept = syncer.sync_directory(array.uri, remote, tiledb=True)
+    assert kept.files_deleted == 0
+    assert s3_server.keys("NCC1/shotdata.tdb") > local_files(array.uri)
+
+    pruned = syncer.sync_directory(array.uri, remote, tiledb=True, delete=True)
+    assert pruned.files_deleted > 0
+    assert s3_server.keys("NCC1/shotdata.tdb") == local_files(array.uri)
+
+    # The remote copy is a readable array with the same data
+    mirror = tmp_path / "mirror" / "shotdata.tdb"
+    for key in s3_server.keys("NCC1/shotdata.tdb"):
+        path = mirror / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(s3_server.objects[f"NCC1/shotdata.tdb/{key}"][0])
+    for name in ("__fragments", "__commits", "__fragment_meta", "__meta"):
+        (mirror / name).mkdir(exist_ok=True)
+    restored = TDBShotDataArray(mirror).read_df(start=DAY_START.replace(tzinfo=None))
+    assert restored.equals(expected)
+
+
+def test_changed_files_and_multipart(s3_server, tmp_path):
+    part_size = 5 * 1024 * 1024
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "process.log").write_text("first run\n")
+    (logs / "big.log").write_bytes(b"a" * (part_size + 123))
+    (logs / "unchanged.log").write_text("same\n")
+    syncer = make_syncer(
+        s3_server, multipart_threshold=part_size, multipart_chunksize=part_size
+    )
+    remote = f"s3://{BUCKET}/NCC1/2025_A_1126/logs"
+
+    report = syncer.sync_directory(logs, remote)
+    assert report.files_uploaded == 3
+    assert s3_server.requests["upload_part"] == 2
+    assert s3_server.objects["NCC1/2025_A_1126/logs/big.log"][1].endswith("-2")
+
+    # Same size, new content: caught by the ETag. The local multipart ETag
+    # of big.log matches the remote one, so it is skipped
+    (logs / "process.log").write_text("other run\n")
+    s3_server.requests.clear()
+    report = syncer.sync_directory(logs, remote)
+    assert report.files_uploaded == 1 and report.files_skipped == 2
+    assert s3_server.objects["NCC1/2025_A_1126/logs/process.log"][0] == (
+        (logs / "process.log").read_bytes()
+    )
+    assert syncer.sync_directory(logs, remote, overwrite=True).files_uploaded == 3
+
+
+def test_listing_is_paginated(s3_server, tmp_path):
+    s3_server.page_size = 7
+    directory = tmp_path / "many"
+    directory.mkdir()
+    for i in range(30):
+        (directory / f"file_{i:02d}.txt").write_text(str(i))
+    syncer = make_syncer(s3_server)
+    remote = f"s3://{BUCKET}/many"
+
+    assert syncer.sync_directory(directory, remote).files_uploaded == 30
+    s3_server.requests.clear()
+    assert syncer.sync_directory(directory, remote).files_skipped == 30
+    assert s3_server.requests == {"list": 5}
+
+    only = syncer.sync_directory(
+        directory, remote, files=[directory / "file_00.txt"], overwrite=True
+    )
+    assert only.files_uploaded == 1
+
+
+def test_single_file_sync_uses_head(s3_server, tmp_path):
+    s3_server.page_size = 7
+    campaign = tmp_path / "2025_A_1126"
+    campaign.mkdir()
+    for i in range(30):
+        (campaign / f"other_{i:02d}.txt").write_text(str(i))
+    svp = campaign / "svp.csv"
+    svp.write_text("depth,speed\n0,1500\n")
+    syncer = make_syncer(s3_server)
+    remote = f"s3://{BUCKET}/NCC1/2025_A_1126"
+    syncer.sync_directory(campaign, remote)
+
+    # Unchanged: one HEAD request and no listing of the campaign prefix
+    s3_server.requests.clear()
+    report = syncer.sync_directory(campaign, remote, files=[svp])
+    assert report.files_skipped == 1
+    assert s3_server.requests == {"head": 1}
+
+    svp.write_text("depth,speed\n0,1501\n")
+    assert syncer.sync_directory(campaign, remote, files=[svp]).files_uploaded == 1
+    assert s3_server.objects["NCC1/2025_A_1126/svp.csv"][0] == svp.read_bytes()
+
+    new = campaign / "new.csv"
+    new.write_text("x")
+    s3_server.requests.clear()
+    assert syncer.sync_directory(campaign, remote, files=[new]).files_uploaded == 1
+    assert s3_server.requests == {"head": 1, "put": 1}
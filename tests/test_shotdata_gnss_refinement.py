@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("gnatss")
+pymap3d = pytest.importorskip("pymap3d")
+
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    TDBIMUPositionArray,
+    TDBKinPositionArray,
+    TDBShotDataArray,
+)
+from es_sfgtools.workflows.pipelines.shotdata_gnss_refinement import (
+    day_range,
+    merge_shotdata_kinposition,
+    padded_window,
+    refine_shotdata_day,
+)
+
+from test_tiledb_schemas import DAY_START, make_kin_position, make_shotdata
+
+START = DAY_START.replace(tzinfo=None)
+LATITUDE, LONGITUDE, HEIGHT = 44.0, -125.0, 10.0
+
+
+def make_imu_position(n_epochs: int, start: datetime) -> pd.DataFrame:
+    """IMU positions at 1 Hz of a vessel drifting slowly north."""
+    rng = np.random.default_rng(2)
+    data = {
+        "time": np.datetime64(start, "ms")
+        + np.arange(n_epochs).astype("timedelta64[s]"),
+        "latitude": LATITUDE + 1e-7 * np.arange(n_epochs),
+        "longitude": np.full(n_epochs, LONGITUDE),
+        "height": HEIGHT + rng.normal(0, 0.05, n_epochs),
+        "azimuth": rng.uniform(0, 10, n_epochs),
+        "pitch": rng.normal(0, 1, n_epochs),
+        "roll": rng.normal(0, 1, n_epochs),
+        "northVelocity": np.full(n_epochs, 0.011),
+        "eastVelocity": np.zeros(n_epochs),
+        "upVelocity": np.zeros(n_epochs),
+    }
+    for column in (
+        "latitude_std",
+        "longitude_std",
+        "height_std",
+        "northVelocity_std",
+        "eastVelocity_std",
+        "upVelocity_std",
+        "roll_std",
+        "pitch_std",
+        "azimuth_std",
+    ):
+        data[column] = np.full(n_epochs, 0.05)
+    return pd.DataFrame(data)
+
+
+def make_campaign(tmp_path: Path, days: int = 2, hours: float = 0.5):
+    """Pre-refinement shot data with kinematic and IMU positions over ``days``."""
+    shotdata_pre = TDBShotDataArray(tmp_path / "shotdata_pre.tdb")
+    kin_position = TDBKinPositionArray(tmp_path / "kin_position.tdb")
+    imu_position = TDBIMUPositionArray(tmp_path / "imu_position.tdb")
+    rng = np.random.default_rng(3)
+    n_epochs = int(hours * 3600)
+    for day in range(days):
+        start = DAY_START + timedelta(days=day)
+        shotdata_pre.write_df(make_shotdata(n_epochs // 15, start))
+        kin = make_kin_position(n_epochs, start)
+        kin["east"], kin["north"], kin["up"] = pymap3d.geodetic2ecef(
+            LATITUDE + 1e-7 * np.arange(n_epochs),
+            LONGITUDE + rng.normal(0, 1e-8, n_epochs),
+            HEIGHT + rng.normal(0, 0.05, n_epochs),
+        )
+        kin_position.write_df(kin)
+        imu_position.write_df(make_imu_position(n_epochs, start.replace(tzinfo=None)))
+    return shotdata_pre, kin_position, imu_position
+
+
+def by_time(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["pingTime", "transponderID"]).reset_index(drop=True)
+
+
+def read_all(array: TDBShotDataArray) -> pd.DataFrame:
+    return by_time(array.read_df(start=START, end=START + timedelta(days=2)))
+
+
+def refine(arrays, date, **kwargs) -> pd.DataFrame:
+    return by_time(pd.concat(refine_shotdata_day(*arrays, date, **kwargs)))
+
+
+def test_day_range_covers_one_day():
+    start, end = day_range(np.datetime64("2025-05-01T13:45:10"))
+    assert start == datetime(2025, 5, 1)
+    assert end == datetime(2025, 5, 1, 23, 59, 59, 999999)
+    assert day_range(pd.Timestamp("2025-05-01")) == (start, end)
+
+
+def test_padded_window_edges():
+    pad = timedelta(minutes=5)
+    single = make_shotdata(1)
+    ping = datetime.fromtimestamp(single.pingTime.iloc[0], DAY_START.tzinfo)
+    ping = ping.replace(tzinfo=None)
+    assert padded_window(single, pad) == (ping - pad, ping + pad)
+
+    window_start, window_end = padded_window(make_shotdata(100), timedelta(0))
+    assert window_end - window_start == timedelta(seconds=15 * 99)
+
+    with pytest.raises(ValueError, match="empty"):
+        padded_window(make_shotdata(0), pad)
+
+
+def test_empty_array_refines_nothing(tmp_path):
+    arrays = (
+        TDBShotDataArray(tmp_path / "shotdata_pre.tdb"),
+        TDBKinPositionArray(tmp_path / "kin_position.tdb"),
+        TDBIMUPositionArray(tmp_path / "imu_position.tdb"),
+    )
+    date = np.datetime64("2025-05-01")
+    assert list(refine_shotdata_day(*arrays, date)) == []
+
+    shotdata = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    merge_shotdata_kinposition(
+        arrays[0], shotdata, *arrays[1:], [date, date + 1], n_processes=2
+    )
+    assert read_all(shotdata).empty
+
+
+def test_chunk_boundary_inside_and_outside_pad(tmp_path):
+    arrays = make_campaign(tmp_path, days=1)
+    date = np.datetime64("2025-05-01")
+    whole = refine(arrays, date)
+    assert len(whole) == 120
+
+    # Each 20 minute chunk reads every position of the half hour
+    wide = refine(arrays, date, chunk=timedelta(minutes=20), pad=timedelta(hours=1))
+    pd.testing.assert_frame_equal(wide, whole)
+
+    # Positions beyond 5 minutes of a chunk boundary are not read
+    for chunk in (timedelta(minutes=20), 50):
+        narrow = refine(arrays, date, chunk=chunk, pad=timedelta(minutes=5))
+        pd.testing.assert_frame_equal(
+            narrow, whole, check_exact=False, rtol=0, atol=0.05
+        )
+
+
+def test_parallel_merge_matches_serial(tmp_path):
+    arrays = make_campaign(tmp_path, days=2)
+    dates = [np.datetime64("2025-05-01"), np.datetime64("2025-05-02")]
+    results = {}
+    for n_processes in (1, 2):
+        shotdata = TDBShotDataArray(tmp_path / f"shotdata_{n_processes}.tdb")
+        merge_shotdata_kinposition(
+            arrays[0],
+            shotdata,
+            *arrays[1:],
+            dates,
+            chunk=timedelta(minutes=10),
+            n_processes=n_processes,
+        )
+        results[n_processes] = read_all(shotdata)
+
+    assert len(results[1]) == 2 * 120
+    pd.testing.assert_frame_equal(results[2], results[1])
+
+    # A single day takes the serial path whatever n_processes is
+    single = TDBShotDataArray(tmp_path / "shotdata_single.tdb")
+    merge_shotdata_kinposition(
+        arrays[0], single, *arrays[1:], dates[:1], n_processes=2
+    )
+    pd.testing.assert_frame_equal(read_all(single), results[1].iloc[:120])
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from es_sfgtools.data_models.constants import TRIGGER_DELAY_SV3
+from es_sfgtools.sonardyne_tools.sv3_operations import (
+    dfop00_to_shotdata,
+    iter_dfop00_shotdata,
+)
+
+RESOURCES = Path(__file__).parent / "resources" / "sv3"
+DFOP00_SAMPLE = (
+    RESOURCES
+    / "dfo_ncc1_2022_A_1065_329653_002_20220501_021315_00082_DFOP00_sample.json"
+)
+
+
+@pytest.fixture
+def dfop00_file(tmp_path) -> Path:
+    """Write a DFOP00 file of consistent ping/reply events built from the sample."""
+    interrogation, reply = json.loads(DFOP00_SAMPLE.read_text())
+    rng = np.random.default_rng(0)
+    path = tmp_path / "sample.DFOP00.raw"
+    with open(path, "w") as f:
+        for i in range(20):
+            ping = json.loads(json.dumps(interrogation))
+            ping_time = interrogation["time"]["common"] + 20.0 * i
+            ping["time"]["common"] = ping_time
+            ping["observations"]["GNSS"]["latitude"] += rng.normal(0, 1e-5)
+            ping["observations"]["AHRS"]["h"] = float(rng.uniform(0, 360))
+            f.write(json.dumps(ping) + "\n")
+            for j, transponder in enumerate(("IR5209", "IR5210", "IR5211")):
+                event = json.loads(json.dumps(reply))
+                two_way = float(rng.uniform(2.0, 4.0))
+                event["range"]["cn"] = transponder
+                event["range"]["range"] = two_way
+                event["range"]["diag"]["xc"] = [int(rng.integers(20, 90))]
+                event["range"]["diag"]["dbv"] = [-int(rng.integers(5, 20))]
+                event["time"]["common"] = ping_time + two_way - TRIGGER_DELAY_SV3
+                event["observations"]["GNSS"]["sdx"] = None if i % 5 == 0 else 0.5
+                f.write(json.dumps(event) + "\n")
+        # reply without a range value fails the merge checks in both parsers
+        f.write(json.dumps(reply) + "\n")
+    return path
+
+
+def test_streaming_matches_model_parser(dfop00_file):
+    expected = dfop00_to_shotdata(dfop00_file)
+    assert expected is not None and not expected.empty
+
+    streamed = pd.concat(
+        list(iter_dfop00_shotdata(dfop00_file)), ignore_index=True
+    )
+    expected = expected.reset_index(drop=True)
+    assert sorted(streamed.columns) == sorted(expected.columns)
+    assert len(streamed) == len(expected)
+    for col in expected.columns:
+        if expected[col].dtype.kind in "fiu":
+            np.testing.assert_allclose(
+                streamed[col].to_numpy(dtype=float),
+                expected[col].to_numpy(dtype=float),
+                rtol=0,
+                atol=1e-6,
+                err_msg=col,
+            )
+        else:
+            assert streamed[col].tolist() == expected[col].tolist(), col
+
+
+def test_streaming_batches(dfop00_file):
+    n_rows = len(dfop00_to_shotdata(dfop00_file))
+    batches = list(iter_dfop00_shotdata(dfop00_file, batch_size=2))
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sum(len(batch) for batch in batches) == n_rows
+
+
+def test_streaming_skips_undecodable_lines(dfop00_file, tmp_path):
+    corrupted = tmp_path / "corrupted.DFOP00.raw"
+    lines = dfop00_file.read_text().splitlines(keepends=True)
+    corrupted.write_text("not json\n" + "".join(lines) + '{"event": "range"\n')
+    n_rows = len(dfop00_to_shotdata(dfop00_file))
+    assert sum(len(batch) for batch in iter_dfop00_shotdata(corrupted)) == n_rows
+
+
+def test_streaming_missing_file(tmp_path):
+    assert list(iter_dfop00_shotdata(tmp_path / "missing.DFOP00.raw")) == []
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from es_sfgtools.novatel_tools.rangea_parser import extract_rangea_strings_from_qcpin
+from es_sfgtools.sonardyne_tools.sv3_qc_operations import (
+    qcjson_to_shotdata,
+    read_qcpin,
+    read_qcpin_batch,
+)
+
+QC_FILES = sorted((Path(__file__).parent / "resources" / "qcdata").glob("*.pin"))
+
+
+def assert_same_shotdata(expected: pd.DataFrame, actual: pd.DataFrame) -> None:
+    columns = sorted(expected.columns)
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True)[columns],
+        actual.reset_index(drop=True)[columns],
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("path", QC_FILES, ids=lambda p: p.name)
+def test_read_qcpin_matches_two_pass_readers(path):
+    shotdata, rangea_strings = read_qcpin(path)
+    assert set(rangea_strings) == set(extract_rangea_strings_from_qcpin(path))
+    assert len(rangea_strings) == len(set(rangea_strings))
+    expected = qcjson_to_shotdata(path)
+    if expected is None or expected.empty:
+        assert shotdata is None or shotdata.empty
+    else:
+        assert_same_shotdata(expected, shotdata)
+
+
+def test_read_qcpin_batch_combines_files(tmp_path):
+    broken = tmp_path / "broken.pin"
+    broken.write_text('{"interrogation": ')
+    missing = tmp_path / "missing.pin"
+
+    shotdata, rangea_strings, read_paths = read_qcpin_batch(
+        QC_FILES + [broken, missing]
+    )
+
+    assert read_paths == QC_FILES
+    expected = pd.concat(
+        [df for df in map(qcjson_to_shotdata, QC_FILES) if df is not None]
+    )
+    assert_same_shotdata(expected, shotdata)
+    assert set(rangea_strings) == set().union(
+        *(extract_rangea_strings_from_qcpin(path) for path in QC_FILES)
+    )
+
+
+def test_read_qcpin_latin1_fallback(tmp_path):
+    path = tmp_path / "latin1.pin"
+    content = QC_FILES[1].read_bytes()
+    assert b'"GPS_SYNC"' in content
+    path.write_bytes(content.replace(b'"GPS_SYNC"', b'"GPS_SYNC\xe9"'))
+    shotdata, rangea_strings = read_qcpin(path)
+    assert len(shotdata) == len(qcjson_to_shotdata(QC_FILES[1]))
+    assert rangea_strings
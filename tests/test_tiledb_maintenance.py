@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import tiledb
+
+from es_sfgtools.data_mgmt.directorymgmt import TileDBDir
+from es_sfgtools.tiledb_tools.maintenance import (
+    FragmentStats,
+    MaintenancePolicy,
+    fragment_stats,
+    maintain_array,
+    maintain_tiledb_dir,
+    measure_read_latency,
+    plan_consolidation,
+    summarize_maintenance,
+)
+from es_sfgtools.tiledb_tools.tiledb_schemas import TDBGNSSObsArray, TDBShotDataArray
+
+from test_tiledb_schemas import DAY_START, make_shotdata
+
+
+def write_hourly(array: TDBShotDataArray, n_writes: int) -> None:
+    for i in range(n_writes):
+        array.write_df(make_shotdata(10, start=DAY_START + timedelta(hours=i)))
+
+
+def test_plan_consolidation():
+    policy = MaintenancePolicy(
+        max_fragments=10,
+        max_small_fragments=4,
+        max_fragment_metadata=8,
+        max_array_metadata=8,
+    )
+    assert plan_consolidation(FragmentStats(n_fragments=3), policy) == []
+    assert plan_consolidation(
+        FragmentStats(n_fragments=11, n_small_fragments=0), policy
+    ) == ["fragments"]
+    assert plan_consolidation(
+        FragmentStats(n_fragments=5, n_small_fragments=5), policy
+    ) == ["fragments"]
+    assert plan_consolidation(
+        FragmentStats(n_fragments=1, unconsolidated_metadata=9, n_array_metadata=9),
+        policy,
+    ) == ["fragment_meta", "array_meta"]
+
+
+def test_maintain_array_consolidates_over_threshold(tmp_path):
+    array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    write_hourly(array, 12)
+    expected = array.read_df(start=DAY_START.replace(tzinfo=None))
+    assert fragment_stats(array.uri).n_fragments == 12
+
+    report = maintain_array(array.uri, MaintenancePolicy(max_fragments=4))
+
+    assert report.error is None
+    assert "fragments" in report.consolidated
+    assert report.before.n_fragments == 12
+    assert report.after.n_fragments == 1
+    assert report.read_latency_before_s > 0
+    assert report.read_latency_after_s > 0
+    result = array.read_df(start=DAY_START.replace(tzinfo=None))
+    assert len(result) == len(expected)
+    np.testing.assert_array_equal(
+        array.get_unique_dates(), np.array(["2025-05-01"], dtype="datetime64[D]")
+    )
+
+
+def test_maintain_array_skips_healthy_array(tmp_path):
+    array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+    write_hourly(array, 3)
+
+    report = array.consolidate()
+
+    assert report.consolidated == []
+    assert report.read_latency_before_s is None
+    assert len(tiledb.array_fragments(str(array.uri))) == 3
+
+    report = array.consolidate(force=True)
+    assert report.consolidated == ["fragments"]
+    assert report.after.n_fragments == 1
+
+
+def test_read_latency_of_integer_time_dimension(tmp_path):
+    array = TDBGNSSObsArray(tmp_path / "gnss_obs.tdb")
+    times = np.array(["2025-05-01T12:00", "2025-05-03T01:00"], dtype="datetime64[ms]")
+    array.write_columns(
+        {
+            "time": times.view(np.int64),
+            "sys": np.uint8([0, 0]),
+            "sat": np.uint8([1, 2]),
+            "obs": np.uint16([1, 1]),
+            "range": np.array([2.1e7, 2.2e7]),
+            "phase": np.array([1.1e8, 1.2e8]),
+            "doppler": np.array([100.0, 200.0]),
+            "snr": np.float32([45, 46]),
+            "slip": np.uint16([0, 0]),
+            "flags": np.uint16([0, 0]),
+            "fcn": np.int8([0, 0]),
+        }
+    )
+    assert measure_read_latency(array.uri, repeats=1) > 0
+    assert measure_read_latency(TDBGNSSObsArray(tmp_path / "empty.tdb").uri) is None
+
+
+def test_maintain_tiledb_dir(tmp_path):
+    tiledb_dir = TileDBDir(station=tmp_path)
+    tiledb_dir.build()
+    shotdata = TDBShotDataArray(tiledb_dir.shot_data)
+    write_hourly(shotdata, 6)
+    TDBShotDataArray(tiledb_dir.qc_shot_data)
+
+    reports = maintain_tiledb_dir(tiledb_dir, MaintenancePolicy(max_fragments=4))
+    summary = summarize_maintenance(reports)
+
+    assert set(summary.name) == {"shot_data", "qc_shot_data"}
+    row = summary.set_index("name").loc["shot_data"]
+    assert (row.fragments_before, row.fragments_after) == (6, 1)
+    assert summary.set_index("name").loc["qc_shot_data"].consolidated == ""
+
+    reports = maintain_tiledb_dir(
+        tiledb_dir, MaintenancePolicy(max_fragments=4), arrays=["qc_shot_data"]
+    )
+    assert [report.name for report in reports] == ["qc_shot_data"]
+    assert isinstance(summarize_maintenance(reports), pd.DataFrame)
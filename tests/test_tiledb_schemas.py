@@ -0,0 +1,531 @@
+import contextlib
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import tiledb
+
+from es_sfgtools.novatel_tools import novatel_ascii_operations as nova_ops
+from es_sfgtools.novatel_tools.rangea_parser import (
+    decode_rangea_batch,
+    extract_rangea_strings_from_qcpin,
+)
+from es_sfgtools.tiledb_tools import tiledb_schemas
+from es_sfgtools.tiledb_tools.tiledb_schemas import (
+    DATE_INDEX_PREFIX,
+    TDBBufferedWriter,
+    TDBGNSSObsArray,
+    TDBKinPositionArray,
+    TDBShotDataArray,
+    check_time_range,
+    datetime64_to_epoch_seconds,
+    epoch_seconds_to_datetime64,
+)
+
+DAY_START = datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+def make_shotdata(n_shots: int = 100, start: datetime = DAY_START) -> pd.DataFrame:
+    """Build a synthetic shot data frame with one shot every 15 seconds."""
+    rng = np.random.default_rng(0)
+    ping_time = start.timestamp() + 15.0 * np.arange(n_shots) + 0.123456
+    tt = rng.uniform(2.0, 4.0, n_shots)
+    position = {
+        f"{axis}{i}": rng.normal(0, 1, n_shots) + offset
+        for i in (0, 1)
+        for axis, offset in zip(
+            ("east", "north", "up"), (-2.6e6, -3.7e6, 4.3e6)
+        )
+    }
+    position_std = {
+        f"{axis}_std{i}": np.full(n_shots, 0.05)
+        for i in (0, 1)
+        for axis in ("east", "north", "up")
+    }
+    attitude = {
+        f"{axis}{i}": rng.uniform(-10, 10, n_shots)
+        for i in (0, 1)
+        for axis in ("head", "pitch", "roll")
+    }
+    return pd.DataFrame(
+        {
+            "transponderID": np.array(["5209", "5210", "5211"])[
+                np.arange(n_shots) % 3
+            ],
+            "pingTime": ping_time,
+            "returnTime": ping_time + tt,
+            "tt": tt,
+            "dbv": rng.integers(-30, -10, n_shots),
+            "xc": rng.integers(50, 100, n_shots),
+            "snr": rng.uniform(10, 30, n_shots),
+            "tat": np.full(n_shots, 0.2),
+            "isUpdated": np.zeros(n_shots, dtype=bool),
+            **position,
+            **position_std,
+            **attitude,
+        }
+    )
+
+
+class TestTimeConversion:
+    def test_epoch_seconds_matches_per_row(self):
+        seconds = np.array([1.7e9 + 0.123456789, 1.7e9 + 15.5, 1.6e9])
+        expected = np.array(
+            [np.datetime64(int(x * 1e9), "ns") for x in seconds]
+        )
+        np.testing.assert_array_equal(epoch_seconds_to_datetime64(seconds), expected)
+
+    def test_datetime_objects_are_converted_to_utc(self):
+        values = pd.Series(
+            [
+                datetime(2025, 5, 1, 2, tzinfo=timezone(timedelta(hours=2))),
+                datetime(2025, 5, 1, 0, 30, tzinfo=timezone.utc),
+            ],
+            dtype=object,
+        )
+        result = epoch_seconds_to_datetime64(values)
+        assert result[0] == np.datetime64("2025-05-01T00:00:00", "ns")
+        assert result[1] == np.datetime64("2025-05-01T00:30:00", "ns")
+
+    def test_round_trip(self):
+        seconds = DAY_START.timestamp() + np.linspace(0, 86000, 1000)
+        round_trip = datetime64_to_epoch_seconds(epoch_seconds_to_datetime64(seconds))
+        np.testing.assert_allclose(round_trip, seconds, rtol=0, atol=1e-6)
+
+    def test_range_check(self):
+        values = epoch_seconds_to_datetime64(np.array([10.0, 20.0, 30.0]))
+        check_time_range(values, values[0], values[-1], "pingTime")
+        with pytest.raises(ValueError, match="pingTime"):
+            check_time_range(values, values[1], values[-1], "pingTime")
+
+
+def make_kin_position(n_epochs: int = 120, start: datetime = DAY_START) -> pd.DataFrame:
+    """Build a synthetic kinematic position frame at 1 Hz with rising WRMS."""
+    time = np.datetime64(start.replace(tzinfo=None), "ms") + np.arange(
+        n_epochs
+    ).astype("timedelta64[s]")
+    return pd.DataFrame(
+        {
+            "time": time,
+            "east": np.full(n_epochs, -2.6e6),
+            "north": np.full(n_epochs, -3.7e6),
+            "up": np.full(n_epochs, 4.3e6),
+            "latitude": np.full(n_epochs, 44.0),
+            "longitude": np.full(n_epochs, -125.0),
+            "height": np.full(n_epochs, 10.0),
+            "number_of_satellites": np.full(n_epochs, 12, dtype=np.uint8),
+            "pdop": np.full(n_epochs, 1.5),
+            "wrms": np.linspace(0.0, 30.0, n_epochs),
+        }
+    )
+
+
+def test_shotdata_write_read_round_trip():
+    shotdata = make_shotdata()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        array = TDBShotDataArray(Path(tmpdir) / "shotdata.tdb")
+        array.write_df(shotdata.copy())
+        result = array.read_df(start=DAY_START.replace(tzinfo=None))
+
+    assert len(result) == len(shotdata)
+    result = result.sort_values("pingTime").reset_index(drop=True)
+    np.testing.assert_allclose(
+        result.pingTime.to_numpy(), shotdata.pingTime.to_numpy(), rtol=0, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        result.returnTime.to_numpy(),
+        shotdata.returnTime.to_numpy(),
+        rtol=0,
+        atol=1e-6,
+    )
+
+
+class TestDateIndex:
+    def test_index_tracks_written_days(self):
+        day_one = make_shotdata(10)
+        day_two = make_shotdata(10, start=DAY_START + timedelta(days=2))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            array = TDBShotDataArray(Path(tmpdir) / "shotdata.tdb")
+            array.write_df(day_one)
+            array.write_df(day_two)
+            with tiledb.open(str(array.uri), mode="r") as tdb:
+                assert f"{DATE_INDEX_PREFIX}2025-05-03" in tdb.meta
+            dates = array.get_unique_dates()
+
+        np.testing.assert_array_equal(
+            dates,
+            np.array(["2025-05-01", "2025-05-03"], dtype="datetime64[D]"),
+        )
+
+    def test_indexed_days_do_not_rewrite_metadata(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        array.write_df(make_shotdata(10))
+        meta_files = list((tmp_path / "shotdata.tdb" / "__meta").iterdir())
+        array.write_df(make_shotdata(10, start=DAY_START + timedelta(hours=1)))
+
+        assert list((tmp_path / "shotdata.tdb" / "__meta").iterdir()) == meta_files
+        np.testing.assert_array_equal(
+            array.get_unique_dates(),
+            np.array(["2025-05-01"], dtype="datetime64[D]"),
+        )
+
+    def test_unindexed_fragments_fall_back_to_domain(self):
+        times = np.array(
+            ["2025-05-01T12:00", "2025-05-02T01:00"], dtype="datetime64[ms]"
+        )
+        with tempfile.TemporaryDirectory() as tmpdir:
+            array = TDBGNSSObsArray(Path(tmpdir) / "gnss_obs.tdb")
+            # Simulates an external (Go) writer that does not update the index
+            tiledb.from_pandas(
+                str(array.uri),
+                pd.DataFrame(
+                    {
+                        "time": times.view(np.int64),
+                        "sys": np.uint8([0, 0]),
+                        "sat": np.uint8([1, 2]),
+                        "obs": np.uint16([1, 1]),
+                        "range": [2.1e7, 2.2e7],
+                        "phase": [1.1e8, 1.2e8],
+                        "doppler": [100.0, 200.0],
+                        "snr": np.float32([45, 46]),
+                        "slip": np.uint16([0, 0]),
+                        "flags": np.uint16([0, 0]),
+                        "fcn": np.int8([0, 0]),
+                    }
+                ),
+                mode="append",
+            )
+            dates = array.get_unique_dates()
+
+        np.testing.assert_array_equal(
+            dates,
+            np.array(["2025-05-01", "2025-05-02"], dtype="datetime64[D]"),
+        )
+
+    def test_concurrent_writers_keep_each_others_days(self, tmp_path, monkeypatch):
+        # Writers in other processes do not share the lock
+        monkeypatch.setattr(
+            tiledb_schemas, "_date_index_lock", contextlib.nullcontext()
+        )
+        uri = tmp_path / "kin.tdb"
+        TDBKinPositionArray(uri).write_df(make_kin_position(10))
+        opened_at = TDBKinPositionArray(uri)._latest_fragment_timestamp() + 1
+        slow, fast = (
+            make_kin_position(10, DAY_START + timedelta(days=day)).astype(
+                {"time": "datetime64[ns]"}
+            )
+            for day in (1, 2)
+        )
+        slow_writer, fast_writer = TDBKinPositionArray(uri), TDBKinPositionArray(uri)
+        time.sleep(0.01)
+        tiledb.from_pandas(str(uri), fast, mode="append")
+
+        # The slow writer opened before the fast one, but commits its fragment
+        # and index update while the fast writer is updating the index
+        fast_indexed_days = fast_writer._indexed_days
+
+        def interleaved():
+            indexed = fast_indexed_days()
+            tiledb.from_pandas(str(uri), slow, mode="append", timestamp=opened_at)
+            slow_writer.update_date_index(slow.time)
+            return indexed
+
+        monkeypatch.setattr(fast_writer, "_indexed_days", interleaved)
+        fast_writer.update_date_index(fast.time)
+
+        expected = np.array(
+            ["2025-05-01", "2025-05-02", "2025-05-03"], dtype="datetime64[D]"
+        )
+        array = TDBKinPositionArray(uri)
+        np.testing.assert_array_equal(array._indexed_days()[0], expected)
+        np.testing.assert_array_equal(array.get_unique_dates(), expected)
+
+
+class TestReadProjection:
+    @pytest.fixture
+    def kin_array(self, tmp_path):
+        array = TDBKinPositionArray(tmp_path / "kin.tdb")
+        array.write_df(make_kin_position())
+        return array
+
+    def test_attrs_projection(self, kin_array):
+        df = kin_array.read_df(start=DAY_START.replace(tzinfo=None), attrs=["wrms"])
+        assert list(df.columns) == ["time", "wrms"]
+        assert len(df) == 120
+
+    def test_query_condition(self, kin_array):
+        expected = make_kin_position()
+        df = kin_array.read_df(
+            start=DAY_START.replace(tzinfo=None), attrs=["wrms"], cond="wrms > 15.0"
+        )
+        assert len(df) == int((expected.wrms > 15.0).sum())
+        assert (df.wrms > 15.0).all()
+
+    def test_raw_output(self, kin_array):
+        expected = make_kin_position()
+        data = kin_array.read_df(
+            start=DAY_START.replace(tzinfo=None),
+            attrs=["wrms"],
+            cond="wrms > 15.0",
+            raw=True,
+        )
+        assert set(data) == {"time", "wrms"}
+        assert isinstance(data["wrms"], np.ndarray)
+        np.testing.assert_array_equal(
+            np.sort(data["time"]),
+            expected.time[expected.wrms > 15.0].to_numpy().astype(data["time"].dtype),
+        )
+
+    def test_shotdata_projection_and_raw(self, tmp_path):
+        shotdata = make_shotdata()
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        array.write_df(shotdata.copy())
+        start = DAY_START.replace(tzinfo=None)
+
+        df = array.read_df(start=start, attrs=["tt"], cond="tt > 3.0")
+        assert set(df.columns) == {"pingTime", "transponderID", "tt"}
+        assert len(df) == int((shotdata.tt > 3.0).sum())
+
+        data = array.read_df(start=start, attrs=["returnTime"], raw=True)
+        np.testing.assert_allclose(
+            np.sort(data["pingTime"]), shotdata.pingTime.to_numpy(), atol=1e-6
+        )
+        np.testing.assert_allclose(
+            np.sort(data["returnTime"]), shotdata.returnTime.to_numpy(), atol=1e-6
+        )
+
+
+class TestIterDf:
+    @pytest.fixture
+    def kin_array(self, tmp_path):
+        array = TDBKinPositionArray(tmp_path / "kin.tdb")
+        # one epoch every 30 seconds for three hours
+        kin = make_kin_position(360)
+        kin["time"] = kin.time.iloc[0] + pd.to_timedelta(np.arange(360) * 30, unit="s")
+        array.write_df(kin)
+        return array
+
+    def test_time_windows(self, kin_array):
+        start = DAY_START.replace(tzinfo=None)
+        end = start + timedelta(days=1)
+        chunks = list(kin_array.iter_df(start, end, chunk=timedelta(hours=1)))
+        assert [len(chunk) for chunk in chunks] == [120, 120, 120]
+        times = pd.concat([chunk.time for chunk in chunks])
+        assert times.is_monotonic_increasing
+        assert times.is_unique
+
+    def test_row_chunks(self, kin_array):
+        start = DAY_START.replace(tzinfo=None)
+        chunks = list(kin_array.iter_df(start, start + timedelta(days=1), chunk=100))
+        assert [len(chunk) for chunk in chunks] == [100, 100, 100, 60]
+        expected = kin_array.read_df(start=start)
+        np.testing.assert_array_equal(
+            np.sort(pd.concat(chunks).time.to_numpy()), expected.time.to_numpy()
+        )
+
+    def test_projection_and_condition(self, kin_array):
+        start = DAY_START.replace(tzinfo=None)
+        chunks = list(
+            kin_array.iter_df(
+                start,
+                start + timedelta(days=1),
+                chunk=timedelta(hours=1),
+                attrs=["wrms"],
+                cond="wrms > 15.0",
+            )
+        )
+        df = pd.concat(chunks)
+        assert list(df.columns) == ["time", "wrms"]
+        assert (df.wrms > 15.0).all()
+
+    def test_shotdata_times_are_epoch_seconds(self, tmp_path):
+        shotdata = make_shotdata(480)
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        array.write_df(shotdata.copy())
+        start = DAY_START.replace(tzinfo=None)
+
+        chunks = list(
+            array.iter_df(start, start + timedelta(hours=3), chunk=timedelta(hours=1))
+        )
+        assert len(chunks) == 2
+        df = pd.concat(chunks)
+        np.testing.assert_allclose(
+            np.sort(df.pingTime.to_numpy()), shotdata.pingTime.to_numpy(), atol=1e-6
+        )
+        np.testing.assert_allclose(
+            np.sort(df.returnTime.to_numpy()),
+            shotdata.returnTime.to_numpy(),
+            atol=1e-6,
+        )
+
+    def test_invalid_chunk(self, kin_array):
+        start = DAY_START.replace(tzinfo=None)
+        with pytest.raises(ValueError):
+            next(kin_array.iter_df(start, start, chunk=timedelta(0)))
+        with pytest.raises(ValueError):
+            next(kin_array.iter_df(start, start, chunk=0))
+
+
+class TestBufferedWriter:
+    @staticmethod
+    def n_fragments(array) -> int:
+        return len(tiledb.array_fragments(str(array.uri)))
+
+    def test_coalesces_writes_into_one_fragment(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        frames = [
+            make_shotdata(10, start=DAY_START + timedelta(hours=i)) for i in range(20)
+        ]
+        with array.buffered_writer() as writer:
+            for df in frames:
+                writer.write_df(df)
+            assert self.n_fragments(array) == 0
+
+        assert writer.n_flushes == 1
+        assert writer.rows_written == 200
+        assert self.n_fragments(array) == 1
+        result = array.read_df(start=DAY_START.replace(tzinfo=None))
+        assert len(result) == 200
+
+    def test_flushes_on_row_threshold(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        with array.buffered_writer(max_rows=25) as writer:
+            for i in range(10):
+                writer.write_df(make_shotdata(10, start=DAY_START + timedelta(hours=i)))
+                assert writer.rows_buffered < 25
+
+        assert writer.n_flushes == 4
+        assert self.n_fragments(array) == 4
+
+    def test_flushes_on_byte_threshold(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        with array.buffered_writer(max_bytes=1) as writer:
+            writer.write_df(make_shotdata(10))
+            assert writer.n_flushes == 1
+
+    def test_sorts_by_time_dimension(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        frames = [
+            make_shotdata(5, start=DAY_START + timedelta(hours=i)) for i in (3, 1, 2)
+        ]
+        flushed = []
+        array._write_buffered = flushed.append
+        with TDBBufferedWriter(array, sort=True) as writer:
+            for df in frames:
+                writer.write_df(df)
+
+        ping_time = flushed[0].pingTime.to_numpy()
+        assert np.all(np.diff(ping_time) >= 0)
+
+    def test_overlapping_frames_keep_last_write(self, tmp_path):
+        array = TDBKinPositionArray(tmp_path / "kin.tdb")
+        first = make_kin_position(120)
+        # Overlaps the last 60 epochs of the first frame, as overlapping
+        # KIN files or a re-ingested file do
+        second = make_kin_position(120, start=DAY_START + timedelta(seconds=60))
+        second["wrms"] = 99.0
+        with array.buffered_writer(sort=True) as writer:
+            writer.write_df(first)
+            writer.write_df(second)
+
+        assert writer.rows_written == 180
+        result = array.read_df(start=DAY_START.replace(tzinfo=None))
+        assert len(result) == 180
+        assert (result.wrms.to_numpy()[60:] == 99.0).all()
+        np.testing.assert_array_equal(
+            result.wrms.to_numpy()[:60], first.wrms.to_numpy()[:60]
+        )
+
+    def test_overlapping_shotdata_keep_last_write(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        with array.buffered_writer() as writer:
+            writer.write_df(make_shotdata(10))
+            writer.write_df(make_shotdata(10))
+
+        assert writer.rows_written == 10
+        assert len(array.read_df(start=DAY_START.replace(tzinfo=None))) == 10
+
+    def test_invalid_frame_is_rejected_on_write(self, tmp_path):
+        array = TDBShotDataArray(tmp_path / "shotdata.tdb")
+        with array.buffered_writer() as writer:
+            writer.write_df(make_shotdata(10))
+            with pytest.raises(Exception):
+                writer.write_df(make_shotdata(10).drop(columns="tt"))
+
+        assert writer.rows_written == 10
+
+    def test_gnss_obs_columns(self, tmp_path):
+        array = TDBGNSSObsArray(tmp_path / "gnss_obs.tdb")
+        times = np.array(
+            ["2025-05-01T12:00", "2025-05-02T01:00"], dtype="datetime64[ms]"
+        )
+        columns = {
+            "time": times.view(np.int64),
+            "sys": np.uint8([0, 0]),
+            "sat": np.uint8([1, 2]),
+            "obs": np.uint16([1, 1]),
+            "range": np.array([2.1e7, 2.2e7]),
+            "phase": np.array([1.1e8, 1.2e8]),
+            "doppler": np.array([100.0, 200.0]),
+            "snr": np.float32([45, 46]),
+            "slip": np.uint16([0, 0]),
+            "flags": np.uint16([0, 0]),
+            "fcn": np.int8([0, 0]),
+        }
+        with array.buffered_writer(sort=True) as writer:
+            writer.write_columns(columns)
+            writer.write_columns({k: v[::-1] for k, v in columns.items()})
+
+        assert self.n_fragments(array) == 1
+        np.testing.assert_array_equal(
+            array.get_unique_dates(),
+            np.array(["2025-05-01", "2025-05-02"], dtype="datetime64[D]"),
+        )
+
+
+class TestWriteRangeaStrings:
+    @pytest.fixture(scope="class")
+    def rangea_strings(self):
+        pin_files = sorted(
+            (Path(__file__).parent / "resources" / "qcdata").glob("*.pin")
+        )
+        strings = []
+        for pin_file in pin_files:
+            strings.extend(extract_rangea_strings_from_qcpin(pin_file))
+        return sorted(set(strings))
+
+    def test_python_backend_writes_decoded_columns(self, rangea_strings, tmp_path):
+        array = TDBGNSSObsArray(tmp_path / "gnss_obs.tdb")
+        n_obs = array.write_rangea_strings(rangea_strings)
+
+        columns = decode_rangea_batch(rangea_strings)
+        assert n_obs == len(columns["time"])
+        with tiledb.open(str(array.uri), mode="r") as tdb:
+            stored = tdb.df[:]
+        expected = pd.DataFrame(columns).drop_duplicates(
+            subset=["time", "sys", "sat", "obs"]
+        )
+        assert len(stored) == len(expected)
+        assert set(stored.time) == set(expected.time)
+        days = expected.time.to_numpy().astype("datetime64[ms]").astype("datetime64[D]")
+        np.testing.assert_array_equal(array.get_unique_dates(), np.unique(days))
+
+    def test_nova2tile_backend_runs_binary(self, rangea_strings, tmp_path, monkeypatch):
+        calls = []
+
+        def fake_nova2tile(files, gnss_obs_tdb, n_procs, verbose):
+            calls.append((Path(files[0]).read_text().splitlines(), gnss_obs_tdb))
+
+        monkeypatch.setattr(nova_ops, "novatel_ascii_2tile", fake_nova2tile)
+        array = TDBGNSSObsArray(tmp_path / "gnss_obs.tdb")
+        assert array.write_rangea_strings(rangea_strings, backend="nova2tile") is None
+        assert calls == [(rangea_strings, str(array.uri))]
+
+    def test_unknown_backend(self, rangea_strings, tmp_path):
+        array = TDBGNSSObsArray(tmp_path / "gnss_obs.tdb")
+        with pytest.raises(ValueError, match="backend"):
+            array.write_rangea_strings(rangea_strings, backend="rust")